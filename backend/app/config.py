@@ -4,6 +4,7 @@ Loads environment variables for Supabase, external APIs, and LLM.
 """
 
 import os
+import tempfile
 from typing import Optional
 
 
@@ -32,6 +33,24 @@ class Settings:
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     LLM_MODEL: str = "claude-3-5-haiku-20241022"  # Fast, cost-effective
     LLM_TIMEOUT: int = 30  # seconds (target <60s end-to-end)
+    # Mark static system prompts as cacheable prefixes (Anthropic cache_control).
+    # Off by default: the ebook prefix (~1.1k tokens) clears the 1024-token minimum
+    # of Sonnet/Opus models but not the 2048 of the default Haiku model.
+    LLM_PROMPT_CACHE: bool = os.getenv("LLM_PROMPT_CACHE", "false").lower() == "true"
+    # Estimated-token budget for the ebook prompt; sections are packed by relevance (0 = off)
+    LLM_PROMPT_TOKEN_BUDGET: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1000"))
+
+    # Enrichment single-flight (optional cross-worker advisory locks in a local SQLite file)
+    SINGLE_FLIGHT_LOCK_DB: Optional[str] = os.getenv("SINGLE_FLIGHT_LOCK_DB")
+    SINGLE_FLIGHT_LOCK_TTL: float = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "90"))
+
+    # Enrichment vendor rate limits (token bucket per vendor; queue instead of failing)
+    ENRICHMENT_RATE_LIMIT_PER_SEC: float = float(os.getenv("ENRICHMENT_RATE_LIMIT_PER_SEC", "5"))
+    ENRICHMENT_RATE_LIMIT_BURST: int = int(os.getenv("ENRICHMENT_RATE_LIMIT_BURST", "10"))
+    ENRICHMENT_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("ENRICHMENT_RATE_LIMIT_MAX_WAIT", "20"))
+    ENRICHMENT_RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("ENRICHMENT_RATE_LIMIT_MAX_RETRIES", "3"))
+    # Per-vendor overrides as "vendor=rate/burst", e.g. "apollo=1.5/5,gnews=0.2/10"
+    ENRICHMENT_RATE_LIMITS: str = os.getenv("ENRICHMENT_RATE_LIMITS", "")
 
     # Marketo Integration
     MARKETO_CLIENT_ID: Optional[str] = os.getenv("MARKETO_CLIENT_ID")
@@ -40,10 +59,61 @@ class Settings:
     MARKETO_IDENTITY_URL: Optional[str] = os.getenv("MARKETO_IDENTITY_URL")
     MARKETO_WEBHOOK_SECRET: Optional[str] = os.getenv("MARKETO_WEBHOOK_SECRET")
     MARKETO_EMAIL_CAMPAIGN_ID: Optional[str] = os.getenv("MARKETO_EMAIL_CAMPAIGN_ID")
+    # Marketo REST quotas: 100 calls per 20 seconds, 50,000 calls per day
+    MARKETO_RATE_LIMIT_CALLS: int = int(os.getenv("MARKETO_RATE_LIMIT_CALLS", "100"))
+    MARKETO_RATE_LIMIT_WINDOW: float = float(os.getenv("MARKETO_RATE_LIMIT_WINDOW", "20"))
+    MARKETO_DAILY_QUOTA: int = int(os.getenv("MARKETO_DAILY_QUOTA", "50000"))
+    # Fast-ack webhook mode: persist and return immediately, run the pipeline on workers
+    MARKETO_WEBHOOK_ASYNC: bool = os.getenv("MARKETO_WEBHOOK_ASYNC", "false").lower() == "true"
+    WEBHOOK_QUEUE_WORKERS: int = int(os.getenv("WEBHOOK_QUEUE_WORKERS", "4"))
+    WEBHOOK_QUEUE_POLL_SECONDS: float = float(os.getenv("WEBHOOK_QUEUE_POLL_SECONDS", "2"))
+    WEBHOOK_QUEUE_MAX_ATTEMPTS: int = int(os.getenv("WEBHOOK_QUEUE_MAX_ATTEMPTS", "3"))
+    WEBHOOK_QUEUE_STALE_SECONDS: int = int(os.getenv("WEBHOOK_QUEUE_STALE_SECONDS", "300"))
+    # Deferred PDF mode: the webhook returns a signed link at once and renders in the background
+    MARKETO_DEFERRED_PDF: bool = os.getenv("MARKETO_DEFERRED_PDF", "false").lower() == "true"
+    # Lead updates and campaign triggers are collected this long, then sent in batches
+    MARKETO_OUTBOX_FLUSH_SECONDS: float = float(os.getenv("MARKETO_OUTBOX_FLUSH_SECONDS", "2"))
+    # Pass the PDF URL as a my.pdfUrl token on trigger. Tokens are shared by every lead
+    # in a trigger call, so disable this (and use {{lead.Custom_PDF_URL}} in the email)
+    # to let triggers batch.
+    MARKETO_TRIGGER_PDF_TOKEN: bool = os.getenv("MARKETO_TRIGGER_PDF_TOKEN", "true").lower() == "true"
+
+    # Public links (signed PDF redirect URLs)
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+    PDF_LINK_SECRET: str = os.getenv("PDF_LINK_SECRET", "")
+    PDF_LINK_TTL_HOURS: int = int(os.getenv("PDF_LINK_TTL_HOURS", str(24 * 30)))
+
+    # Email delivery: "link" sends a download link to the stored PDF; "attachment"
+    # (opt-in) attaches the PDF itself
+    EMAIL_DELIVERY_MODE: str = os.getenv("EMAIL_DELIVERY_MODE", "link").lower()
+    # Email (batched SendGrid dynamic-template sends)
+    SENDGRID_TEMPLATE_ID: Optional[str] = os.getenv("SENDGRID_TEMPLATE_ID")
+    EMAIL_BATCH_FLUSH_SECONDS: float = float(os.getenv("EMAIL_BATCH_FLUSH_SECONDS", "2"))
+    EMAIL_BATCH_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_BATCH_MAX_ATTEMPTS", "3"))
+
+    # PDF rendering backends in preference order (weasyprint, reportlab, acroform).
+    # Selection "ordered" uses this order; "latency" prefers the fastest backend
+    # whose recent error rate is within the budget.
+    PDF_RENDERERS: str = os.getenv("PDF_RENDERERS", "weasyprint,reportlab")
+    # "acroform" (production mode) fills the designer template first and keeps the
+    # HTML backends above as fallbacks; "html" uses PDF_RENDERERS as given
+    PDF_RENDER_MODE: str = os.getenv("PDF_RENDER_MODE", "html").lower()
+    PDF_RENDERER_SELECTION: str = os.getenv("PDF_RENDERER_SELECTION", "ordered").lower()
+    PDF_RENDERER_ERROR_BUDGET: float = float(os.getenv("PDF_RENDERER_ERROR_BUDGET", "0.2"))
+    PDF_RENDERER_WINDOW: int = int(os.getenv("PDF_RENDERER_WINDOW", "50"))
+
+    # Rendered PDF cache for /rad/download (keyed by personalization fingerprint)
+    PDF_CACHE_DIR: str = os.getenv(
+        "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "amd1-pdf-cache")
+    )
+    PDF_CACHE_MAX_MB: int = int(os.getenv("PDF_CACHE_MAX_MB", "512"))
 
     # App Configuration
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Pre-import LLM SDKs, build their clients and warm the PDF renderers during
+    # startup instead of on the first request
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
     MOCK_MODE: bool = os.getenv("MOCK_SUPABASE", "false").lower() == "true"
 
     def is_marketo_configured(self) -> bool:
@@ -63,6 +133,8 @@ class Settings:
         missing = [k for k in required if not getattr(self, k, None)]
         if missing:
             raise ValueError(f"Missing required environment variables: {missing}")
+        if self.MARKETO_DEFERRED_PDF and not self.PDF_LINK_SECRET:
+            raise ValueError("MARKETO_DEFERRED_PDF requires PDF_LINK_SECRET")
 
 
 settings = Settings()
@@ -2,13 +2,25 @@
 FastAPI app initialization and middleware setup.
 """
 
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.routes import enrichment, marketo
+from app.services.marketo_service import close_marketo_service
+from app.services.compliance import get_compliance_service
+from app.services.content_index import get_content_index
+from app.services.email_service import close_email_transports, get_email_service
+from app.services.llm_service import get_llm_service, warm_up_llm_clients
+from app.services.metrics import CONTENT_TYPE_LATEST, PROMETHEUS_AVAILABLE, render_metrics
+from app.services.pdf_renderers import get_renderer_registry
+from app.services.pdf_service import get_pdf_service
+from app.services.rad_orchestrator import get_rad_orchestrator
+from app.services.supabase_client import get_supabase_client
+from app.services.webhook_queue import start_webhook_queue, stop_webhook_queue
 
 # Configure logging
 logging.basicConfig(
@@ -32,10 +44,38 @@ async def lifespan(app: FastAPI):
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         raise
+
+    # Probe PDF backends once so unavailable ones are skipped per request
+    registry = get_renderer_registry()
+    await asyncio.to_thread(registry.probe)
+
+    # Parse the knowledge-pack markdown once; files are re-read only when changed
+    await asyncio.to_thread(get_content_index().load)
+
+    # Pay SDK import, client setup and first-render costs before the first request
+    if settings.WARM_UP_ON_STARTUP:
+        await asyncio.gather(
+            asyncio.to_thread(registry.warm_up),
+            asyncio.to_thread(warm_up_llm_clients)
+        )
+
+    # Build the shared services once; routes get them through Depends
+    get_rad_orchestrator()
+    get_llm_service()
+    get_compliance_service()
+    get_pdf_service()
+    get_email_service()
+
+    # Fast-ack webhook mode: workers drain the marketo_webhooks queue
+    if settings.MARKETO_WEBHOOK_ASYNC:
+        start_webhook_queue(get_supabase_client(), marketo.process_queued_webhook)
     
     yield
     
     logger.info("FastAPI app shutting down")
+    await stop_webhook_queue()
+    await close_marketo_service()
+    await close_email_transports()
 
 
 # Create FastAPI app
@@ -80,6 +120,17 @@ async def status_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (vendor, LLM, compliance, render, upload and queue)."""
+    if not PROMETHEUS_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="prometheus_client is not installed"
+        )
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
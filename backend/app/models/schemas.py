@@ -3,7 +3,7 @@ Pydantic schemas for request/response validation.
 """
 
 from datetime import datetime
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -47,6 +47,15 @@ class EnrichmentRequest(BaseModel):
         }
 
 
+class ResendRequest(BaseModel):
+    """
+    POST /rad/resend request body.
+    Re-sends the ebook email to leads that already have a finalized profile.
+    """
+    emails: List[EmailStr] = Field(..., min_length=1, max_length=10000, description="Recipients to re-send to")
+    template_id: Optional[str] = Field(None, description="SendGrid dynamic template (defaults to SENDGRID_TEMPLATE_ID)")
+
+
 # ============================================================================
 # RESPONSE SCHEMAS
 # ============================================================================
@@ -3,27 +3,42 @@ Enrichment routes: POST /rad/enrich and GET /rad/profile/{email}
 Alpha endpoints for the personalization pipeline.
 """
 
+import asyncio
 import logging
+import os
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import Response, StreamingResponse
+from app.config import settings
 from app.models.schemas import (
     EnrichmentRequest,
     EnrichmentResponse,
     ProfileResponse,
     NormalizedProfile,
     PersonalizationContent,
-    ErrorResponse
+    ErrorResponse,
+    ResendRequest
 )
 from app.services.supabase_client import SupabaseClient, get_supabase_client
-from app.services.rad_orchestrator import RADOrchestrator
-from app.services.llm_service import LLMService
-from app.services.compliance import ComplianceService, validate_personalization
-from app.services.pdf_service import PDFService
-from app.services.email_service import EmailService
+from app.services.rad_orchestrator import EnrichmentContext, RADOrchestrator, apply_user_context, get_rad_orchestrator
+from app.services.single_flight import get_single_flight
+from app.services.rate_limiter import get_rate_limiter
+from app.services.llm_service import LLMService, get_llm_service, record_lead_usage
+from app.services.compliance import ComplianceService, get_compliance_service, validate_personalization
+from app.services.pdf_service import PDFService, get_pdf_service
+from app.services.pdf_renderers import get_renderer_registry
+from app.services.pdf_cache import get_pdf_cache, iter_file, parse_range, pdf_fingerprint, variant_key
+from app.services.email_service import (
+    EmailService,
+    get_batch_sender,
+    get_delivery_stats,
+    get_email_service,
+)
+from app.services.tracing import start_trace
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +55,10 @@ router = APIRouter(prefix="/rad", tags=["enrichment"])
 )
 async def enrich_profile(
     request: EnrichmentRequest,
-    supabase: SupabaseClient = Depends(get_supabase_client)
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    orchestrator: RADOrchestrator = Depends(get_rad_orchestrator),
+    llm_service: LLMService = Depends(get_llm_service),
+    compliance_service: ComplianceService = Depends(get_compliance_service)
 ) -> EnrichmentResponse:
     """
     POST /rad/enrich
@@ -53,6 +71,7 @@ async def enrich_profile(
     Args:
         request: EnrichmentRequest with email and optional domain
         supabase: Supabase client (injected)
+        orchestrator, llm_service, compliance_service: Shared services (injected)
         
     Returns:
         EnrichmentResponse with job_id and status
@@ -83,97 +102,87 @@ async def enrich_profile(
                 "message": "Using cached enrichment data. Set force_refresh=true to re-enrich."
             }
 
-        # Create services
-        orchestrator = RADOrchestrator(supabase)
-        llm_service = LLMService()
-        compliance_service = ComplianceService()
-
-        # Run enrichment (sync in alpha, could be async/queued later)
-        finalized = await orchestrator.enrich(email, domain)
-
-        # Log which data sources returned real vs mock data
-        logger.info(f"[{job_id}] Data sources used: {orchestrator.data_sources}")
-        logger.info(f"[{job_id}] Quality score: {finalized.get('data_quality_score', 0)}")
-
-        # Override enriched data with user-provided info (more reliable than API data)
-        if request.firstName:
-            finalized["first_name"] = request.firstName
-        if request.lastName:
-            finalized["last_name"] = request.lastName
-        if request.company:
-            finalized["company_name"] = request.company
-        if request.companySize:
-            finalized["company_size"] = request.companySize
-        if request.industry:
-            finalized["industry"] = request.industry
-        if request.persona:
-            finalized["title"] = request.persona  # Store specific role as title
-
-        # Add user-provided context to the profile for LLM
-        user_context = {
-            "goal": request.goal,
-            "persona": request.persona,
-            "industry_input": request.industry,  # User-selected industry
-            "company": request.company,  # User-provided company name
-            "company_size": request.companySize,  # User-selected company size
-            "first_name": request.firstName,
-            "last_name": request.lastName,
-        }
+        with start_trace("enrich", job_id=job_id) as trace:
+            # Run enrichment (sync in alpha, could be async/queued later)
+            context = EnrichmentContext()
+            finalized = await orchestrator.enrich(email, domain, context=context)
+
+            # Log which data sources returned real vs mock data
+            logger.info(f"[{job_id}] Data sources used: {context.data_sources}")
+            logger.info(f"[{job_id}] Quality score: {finalized.get('data_quality_score', 0)}")
+
+            # Add user-provided context to the profile for LLM
+            user_context = {
+                "goal": request.goal,
+                "persona": request.persona,
+                "industry_input": request.industry,  # User-selected industry
+                "company": request.company,  # User-provided company name
+                "company_size": request.companySize,  # User-selected company size
+                "first_name": request.firstName,
+                "last_name": request.lastName,
+            }
 
-        # Get company news from Tavily (if available in enrichment)
-        company_news = finalized.get("company_context", "")
+            # Override enriched data with user-provided info (more reliable than API data)
+            apply_user_context(finalized, user_context)
 
-        # Generate AMD ebook personalization (3 sections)
-        ebook_personalization = await llm_service.generate_ebook_personalization(
-            profile=finalized,
-            user_context=user_context,
-            company_news=company_news
-        )
+            # Get company news from Tavily (if available in enrichment)
+            company_news = finalized.get("company_context", "")
 
-        # Also generate legacy personalization for backward compatibility
-        use_opus = llm_service.should_use_opus(finalized)
-        personalization = await llm_service.generate_personalization(
-            finalized,
-            use_opus=use_opus,
-            user_context=user_context
-        )
+            # Generate AMD ebook personalization (3 sections)
+            ebook_personalization = await llm_service.generate_ebook_personalization(
+                profile=finalized,
+                user_context=user_context,
+                company_news=company_news
+            )
 
-        intro_hook = personalization.get("intro_hook", "")
-        cta = personalization.get("cta", "")
-
-        # Run compliance check on all personalized content
-        compliance_service = ComplianceService()
-        compliance_result = compliance_service.check(intro_hook, cta, auto_correct=True)
-
-        if not compliance_result.passed and compliance_result.corrected_intro:
-            intro_hook = compliance_result.corrected_intro
-            cta = compliance_result.corrected_cta
-            logger.info(f"[{job_id}] Using compliance-corrected content")
-        elif not compliance_result.passed:
-            intro_hook = compliance_service.get_safe_intro(finalized)
-            cta = compliance_service.get_safe_cta(finalized)
-            logger.warning(f"[{job_id}] Compliance failed, using fallback content")
-
-        # Also check ebook personalization
-        ebook_hook = ebook_personalization.get("personalized_hook", "")
-        ebook_cta = ebook_personalization.get("personalized_cta", "")
-        ebook_compliance = compliance_service.check(ebook_hook, ebook_cta, auto_correct=True)
-        if not ebook_compliance.passed and ebook_compliance.corrected_intro:
-            ebook_personalization["personalized_hook"] = ebook_compliance.corrected_intro
-            ebook_personalization["personalized_cta"] = ebook_compliance.corrected_cta
-
-        # Store ebook personalization in normalized_data for PDF generation
-        finalized["ebook_personalization"] = ebook_personalization
-        finalized["user_context"] = user_context
-
-        # Update finalize_data with personalization
-        supabase.upsert_finalize_data(
-            email=email,
-            normalized_data=finalized,
-            intro=intro_hook,
-            cta=cta,
-            data_sources=orchestrator.data_sources
-        )
+            # Also generate legacy personalization for backward compatibility
+            use_opus = llm_service.should_use_opus(finalized)
+            personalization = await llm_service.generate_personalization(
+                finalized,
+                use_opus=use_opus,
+                user_context=user_context
+            )
+
+            intro_hook = personalization.get("intro_hook", "")
+            cta = personalization.get("cta", "")
+
+            # Run compliance check on all personalized content
+            compliance_result = compliance_service.check(intro_hook, cta, auto_correct=True)
+
+            if not compliance_result.passed and compliance_result.corrected_intro:
+                intro_hook = compliance_result.corrected_intro
+                cta = compliance_result.corrected_cta
+                logger.info(f"[{job_id}] Using compliance-corrected content")
+            elif not compliance_result.passed:
+                intro_hook = compliance_service.get_safe_intro(finalized)
+                cta = compliance_service.get_safe_cta(finalized)
+                logger.warning(f"[{job_id}] Compliance failed, using fallback content")
+
+            # Also check ebook personalization
+            ebook_hook = ebook_personalization.get("personalized_hook", "")
+            ebook_cta = ebook_personalization.get("personalized_cta", "")
+            ebook_compliance = compliance_service.check(ebook_hook, ebook_cta, auto_correct=True)
+            if not ebook_compliance.passed and ebook_compliance.corrected_intro:
+                ebook_personalization["personalized_hook"] = ebook_compliance.corrected_intro
+                ebook_personalization["personalized_cta"] = ebook_compliance.corrected_cta
+
+            record_lead_usage(
+                supabase, email, personalization, ebook_personalization,
+                compliance_passed=compliance_result.passed
+            )
+
+            # Store ebook personalization in normalized_data for PDF generation
+            finalized["ebook_personalization"] = ebook_personalization
+            finalized["user_context"] = user_context
+
+            # Update finalize_data with personalization
+            supabase.upsert_finalize_data(
+                email=email,
+                normalized_data=finalized,
+                intro=intro_hook,
+                cta=cta,
+                data_sources=context.data_sources
+            )
         
         logger.info(f"[{job_id}] Enrichment completed for {email}")
         
@@ -188,8 +197,9 @@ async def enrich_profile(
         # Add extra info about data sources (for debugging)
         return {
             **response.model_dump(),
-            "data_sources": orchestrator.data_sources,
+            "data_sources": context.data_sources,
             "data_quality_score": finalized.get("data_quality_score", 0),
+            "stage_timings": trace.summary(),
             "enriched_fields": {
                 "first_name": finalized.get("first_name"),
                 "company_name": finalized.get("company_name"),
@@ -411,11 +421,16 @@ async def api_status() -> dict:
         "email": {
             "provider": check_email_provider(),
             "from_address": os.getenv("EMAIL_FROM", "not set"),
+            "delivery_mode": settings.EMAIL_DELIVERY_MODE,
+            "delivery_stats": get_delivery_stats(),
         },
         "database": {
             "supabase_url": "configured" if settings.SUPABASE_URL else "not set",
             "supabase_key": "configured" if settings.SUPABASE_KEY else "not set",
         },
+        "single_flight": get_single_flight().get_stats(),
+        "rate_limits": get_rate_limiter().get_stats(),
+        "pdf_renderers": get_renderer_registry().get_stats(),
         "raw_env_vars_found": raw_env if raw_env else "none detected",
         "mode": "mock" if settings.MOCK_MODE else "production"
     }
@@ -430,7 +445,8 @@ async def api_status() -> dict:
 )
 async def generate_pdf(
     email: str,
-    supabase: SupabaseClient = Depends(get_supabase_client)
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    pdf_service: PDFService = Depends(get_pdf_service)
 ) -> dict:
     """
     POST /rad/pdf/{email}
@@ -441,6 +457,7 @@ async def generate_pdf(
     Args:
         email: Email address to generate PDF for
         supabase: Supabase client (injected)
+        pdf_service: Shared PDF service (injected)
 
     Returns:
         Dict with pdf_url, storage_path, file_size
@@ -464,9 +481,6 @@ async def generate_pdf(
         # Get job ID (if exists)
         job_id = finalized_record.get("id", 0)
 
-        # Initialize PDF service
-        pdf_service = PDFService(supabase)
-
         # Get profile data
         normalized_data = finalized_record.get("normalized_data", {})
         ebook_personalization = normalized_data.get("ebook_personalization", {})
@@ -530,7 +544,9 @@ async def generate_pdf(
 )
 async def deliver_ebook(
     email: str,
-    supabase: SupabaseClient = Depends(get_supabase_client)
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    pdf_service: PDFService = Depends(get_pdf_service),
+    email_service: EmailService = Depends(get_email_service)
 ) -> dict:
     """
     POST /rad/deliver/{email}
@@ -541,6 +557,7 @@ async def deliver_ebook(
     Args:
         email: Email address to deliver ebook to
         supabase: Supabase client (injected)
+        pdf_service, email_service: Shared services (injected)
 
     Returns:
         Dict with email_sent status, pdf_url fallback, delivery details
@@ -568,37 +585,28 @@ async def deliver_ebook(
         ebook_personalization = profile.get("ebook_personalization", {})
         user_context = profile.get("user_context", {})
 
-        # Initialize services
-        pdf_service = PDFService(supabase)
-        email_service = EmailService()
-
-        # Generate PDF (get raw bytes for email attachment)
-        if ebook_personalization:
-            html_content = pdf_service._render_amd_ebook_template(
-                profile=profile,
-                personalized_hook=ebook_personalization.get("personalized_hook", ""),
-                case_study=pdf_service._get_case_study_for_profile(profile, user_context),
-                case_study_framing=ebook_personalization.get("case_study_framing", ""),
-                personalized_cta=ebook_personalization.get("personalized_cta", ""),
-                user_context=user_context
-            )
-        else:
-            html_content = pdf_service._render_template(profile, intro_hook, cta)
-        pdf_bytes = await pdf_service._html_to_pdf(html_content)
-
-        if not pdf_bytes:
-            raise ValueError("PDF generation returned empty content")
-
-        # Try to send email
-        email_result = await email_service.send_ebook(
-            to_email=email,
-            pdf_bytes=pdf_bytes,
-            profile=profile,
-            intro_hook=ebook_personalization.get("personalized_hook", intro_hook),
-            cta=ebook_personalization.get("personalized_cta", cta)
-        )
-
-        # Also store PDF for fallback download
+        # Attachment mode needs the raw bytes; link mode only needs the stored PDF
+        pdf_bytes = None
+        if email_service.delivery_mode == "attachment":
+            document = None
+            if ebook_personalization:
+                document = pdf_service._build_amd_ebook_document(
+                    profile=profile,
+                    personalized_hook=ebook_personalization.get("personalized_hook", ""),
+                    case_study=pdf_service._get_case_study_for_profile(profile, user_context),
+                    case_study_framing=ebook_personalization.get("case_study_framing", ""),
+                    personalized_cta=ebook_personalization.get("personalized_cta", ""),
+                    user_context=user_context
+                )
+                html_content = document.html
+            else:
+                html_content = pdf_service._render_template(profile, intro_hook, cta)
+            pdf_bytes = await pdf_service._html_to_pdf(html_content, document=document)
+
+            if not pdf_bytes:
+                raise ValueError("PDF generation returned empty content")
+
+        # Store PDF (the link sent in link mode, fallback download otherwise)
         if ebook_personalization:
             pdf_result = await pdf_service.generate_amd_ebook(
                 job_id=job_id,
@@ -614,6 +622,16 @@ async def deliver_ebook(
                 cta=cta
             )
 
+        # Try to send email
+        email_result = await email_service.send_ebook(
+            to_email=email,
+            pdf_bytes=pdf_bytes,
+            profile=profile,
+            intro_hook=ebook_personalization.get("personalized_hook", intro_hook),
+            cta=ebook_personalization.get("personalized_cta", cta),
+            pdf_url=pdf_result.get("pdf_url")
+        )
+
         # Store delivery record
         try:
             supabase.create_pdf_delivery(
@@ -630,6 +648,7 @@ async def deliver_ebook(
             "email_sent": email_result.get("success", False),
             "email_provider": email_result.get("provider"),
             "message_id": email_result.get("message_id"),
+            "delivery_mode": email_result.get("delivery_mode"),
             "pdf_url": pdf_result.get("pdf_url"),  # Fallback download URL
             "file_size_bytes": pdf_result.get("file_size_bytes"),
             "delivered_at": datetime.utcnow().isoformat()
@@ -653,6 +672,88 @@ async def deliver_ebook(
         )
 
 
+@router.post(
+    "/resend",
+    responses={
+        500: {"model": ErrorResponse}
+    }
+)
+async def resend_ebooks(
+    request: ResendRequest,
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    email_service: EmailService = Depends(get_email_service)
+) -> dict:
+    """
+    POST /rad/resend
+
+    Campaign re-send: email the ebook template again to leads that already
+    have a finalized profile. Recipients go through the batching SendGrid
+    sender, so the whole list costs one request per 1000 recipients, and
+    transient failures are retried from its queue.
+
+    The emailed link is /rad/download/{email}, which renders on first open
+    and serves the cached PDF afterwards, so no PDFs are rendered here.
+
+    Args:
+        request: ResendRequest with the recipient emails and template
+        supabase: Supabase client (injected)
+        email_service: Shared email service (injected)
+
+    Returns:
+        Dict with sent/failed counts and per-recipient results in input order
+
+    Raises:
+        HTTPException: 500 if the profiles can't be loaded
+    """
+    emails = list(dict.fromkeys(email.lower().strip() for email in request.emails))
+    try:
+        records = supabase.get_finalize_data_for_emails(emails)
+    except Exception as e:
+        logger.error(f"Re-send failed to load {len(emails)} profiles: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to load profiles"
+        )
+
+    recipients = []
+    for email in emails:
+        record = records.get(email)
+        if not record:
+            continue
+        profile = record.get("normalized_data") or {}
+        ebook_personalization = profile.get("ebook_personalization") or {}
+        recipients.append({
+            "email": email,
+            "template_data": email_service.ebook_template_data(
+                profile,
+                ebook_personalization.get("personalized_hook") or record.get("personalization_intro", ""),
+                ebook_personalization.get("personalized_cta") or record.get("personalization_cta", ""),
+                f"{settings.PUBLIC_BASE_URL.rstrip('/')}/rad/download/{quote(email)}"
+            )
+        })
+
+    sent = await email_service.send_template_batch(recipients, request.template_id)
+    results_by_email = {r["email"]: result for r, result in zip(recipients, sent)}
+
+    results = []
+    for email in emails:
+        result = results_by_email.get(email) or {
+            "success": False,
+            "error": f"No profile found for {email}"
+        }
+        results.append({"email": email, **result})
+
+    succeeded = sum(1 for r in results if r.get("success"))
+    logger.info(f"Re-sent ebook to {succeeded}/{len(results)} leads")
+    return {
+        "requested": len(results),
+        "sent": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        "batching": get_batch_sender().get_stats() if email_service.provider == "sendgrid" else None
+    }
+
+
 @router.get(
     "/download/{email}",
     responses={
@@ -662,20 +763,31 @@ async def deliver_ebook(
 )
 async def download_pdf(
     email: str,
-    supabase: SupabaseClient = Depends(get_supabase_client)
+    request: Request,
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    pdf_service: PDFService = Depends(get_pdf_service)
 ) -> Response:
     """
     GET /rad/download/{email}
 
     Download personalized PDF directly as a file.
-    No storage required - generates and streams the PDF.
+    No storage required - renders on first request and serves later
+    requests from the on-disk PDF cache.
+
+    The ETag is the personalization fingerprint (including render mode and
+    configured backends) plus the backend that rendered the file, so a
+    matching If-None-Match returns 304 without touching the PDF. Renderer
+    failures return 500 and are never cached. Single byte
+    ranges are honoured (206) for viewers that load incrementally.
 
     Args:
         email: Email address to generate PDF for
+        request: Incoming request (conditional and Range headers)
         supabase: Supabase client (injected)
+        pdf_service: Shared PDF service (injected)
 
     Returns:
-        PDF file as direct download
+        PDF file as direct download (200/206), or 304 if unchanged
     """
     try:
         email = email.lower().strip()
@@ -694,43 +806,110 @@ async def download_pdf(
         intro_hook = finalized_record.get("personalization_intro", "")
         cta = finalized_record.get("personalization_cta", "")
 
-        # Initialize PDF service
-        pdf_service = PDFService(supabase)
-
-        # Get ebook personalization if available
-        ebook_personalization = profile.get("ebook_personalization", {})
-        user_context = profile.get("user_context", {})
-
-        # Generate PDF bytes directly
-        if ebook_personalization:
-            html_content = pdf_service._render_amd_ebook_template(
-                profile=profile,
-                personalized_hook=ebook_personalization.get("personalized_hook", ""),
-                case_study=pdf_service._get_case_study_for_profile(profile, user_context),
-                case_study_framing=ebook_personalization.get("case_study_framing", ""),
-                personalized_cta=ebook_personalization.get("personalized_cta", ""),
-                user_context=user_context
+        # The mode and configured backends are part of the fingerprint, and the
+        # backend that rendered a cached file is part of its key and ETag
+        backends = [renderer.name for renderer in get_renderer_registry().renderers]
+        fingerprint = pdf_fingerprint(profile, intro_hook, cta, backends)
+        etags = [f'"{variant_key(fingerprint, name)}"' for name in backends]
+        cache_headers = {"Cache-Control": "private, max-age=0, must-revalidate"}
+
+        if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+        matched = next((tag for tag in if_none_match if tag in etags), None)
+        if matched or "*" in if_none_match:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={**cache_headers, "ETag": matched or (etags[0] if etags else '""')}
             )
-        else:
-            html_content = pdf_service._render_template(profile, intro_hook, cta)
-        pdf_bytes = await pdf_service._html_to_pdf(html_content)
 
-        if not pdf_bytes:
-            raise ValueError("PDF generation returned empty content")
+        pdf_cache = get_pdf_cache()
+        cached = await asyncio.to_thread(
+            pdf_cache.open_any, [variant_key(fingerprint, name) for name in backends]
+        )
+        if cached is not None:
+            key, pdf_file = cached
+            size = os.fstat(pdf_file.fileno()).st_size
+            body = lambda start, end: iter_file(pdf_file, start, end)
+        else:
+            async def render() -> Tuple[str, bytes]:
+                # Get ebook personalization if available
+                ebook_personalization = profile.get("ebook_personalization", {})
+                user_context = profile.get("user_context", {})
+
+                # Generate PDF bytes directly
+                document = None
+                if ebook_personalization:
+                    document = pdf_service._build_amd_ebook_document(
+                        profile=profile,
+                        personalized_hook=ebook_personalization.get("personalized_hook", ""),
+                        case_study=pdf_service._get_case_study_for_profile(profile, user_context),
+                        case_study_framing=ebook_personalization.get("case_study_framing", ""),
+                        personalized_cta=ebook_personalization.get("personalized_cta", ""),
+                        user_context=user_context
+                    )
+                    html_content = document.html
+                else:
+                    html_content = pdf_service._render_template(profile, intro_hook, cta)
+                # Raises RenderError instead of degrading to a placeholder
+                # page, so a failed render is never cached
+                pdf_bytes, backend = await pdf_service._render_pdf(html_content, document)
+
+                if not pdf_bytes:
+                    raise ValueError("PDF generation returned empty content")
+                key = variant_key(fingerprint, backend)
+                await asyncio.to_thread(pdf_cache.put, key, pdf_bytes)
+                return key, pdf_bytes
+
+            # Concurrent first opens of the same PDF share one render; the
+            # bytes are served from memory, so eviction can't race this response
+            key, pdf_bytes = await get_single_flight().do(("pdf-download", fingerprint), render)
+            size = len(pdf_bytes)
+            body = lambda start, end: iter([pdf_bytes[start:end + 1]])
+
+        etag = f'"{key}"'
+        cache_headers["ETag"] = etag
 
         # Generate filename
         first_name = profile.get("first_name", "user")
         safe_name = "".join(c for c in first_name if c.isalnum()).lower()
         filename = f"personalized-ebook-{safe_name}.pdf"
 
-        logger.info(f"Serving PDF download for {email}: {len(pdf_bytes)} bytes")
+        headers = {
+            **cache_headers,
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Accept-Ranges": "bytes",
+        }
+
+        # If-Range: only honour Range when the client's copy is current
+        byte_range = None
+        if request.headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(request.headers.get("range"), size)
+            except ValueError:
+                if cached is not None:
+                    pdf_file.close()
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={**headers, "Content-Range": f"bytes */{size}"}
+                )
+
+        if byte_range is None:
+            logger.info(f"Serving PDF download for {email}: {size} bytes")
+            return StreamingResponse(
+                body(0, size - 1),
+                media_type="application/pdf",
+                headers={**headers, "Content-Length": str(size)}
+            )
 
-        return Response(
-            content=pdf_bytes,
+        start, end = byte_range
+        logger.info(f"Serving PDF range {start}-{end}/{size} for {email}")
+        return StreamingResponse(
+            body(start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Length": str(len(pdf_bytes))
+                **headers,
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1)
             }
         )
 
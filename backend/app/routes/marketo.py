@@ -9,30 +9,74 @@ Flow:
   4. Generate personalized PDF
   5. Return PDF URL (for Marketo response mapping)
   6. Background: Update lead in Marketo + trigger email campaign
+
+Fast-ack mode (MARKETO_WEBHOOK_ASYNC=true): steps 3-6 run on the webhook
+queue workers; the webhook returns status "queued" right after step 2 and
+the PDF URL reaches Marketo through the lead update.
+
+Deferred PDF mode (MARKETO_DEFERRED_PDF=true): the webhook returns a signed
+link to GET /rad/marketo/pdf/{webhook_id} immediately and renders in the
+background; the link redirects to the stored PDF once it exists.
 """
 
 import hmac
 import time
 import logging
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Header, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Header, BackgroundTasks, Depends, Query
+from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, EmailStr, Field
 
 from app.config import settings
 from app.services.supabase_client import SupabaseClient, get_supabase_client
-from app.services.rad_orchestrator import RADOrchestrator
-from app.services.llm_service import LLMService
-from app.services.pdf_service import PDFService
+from app.services.rad_orchestrator import RADOrchestrator, apply_user_context, get_rad_orchestrator
+from app.services.llm_service import LLMService, get_llm_service, record_lead_usage
+from app.services.pdf_service import PDFService, get_pdf_service
 from app.services.marketo_service import MarketoService, get_marketo_service
+from app.services.webhook_queue import get_webhook_queue
+from app.services.tracing import Trace, activate, span, start_trace
+from app.services.pdf_links import (
+    pdf_filename,
+    register_pdf_renderer,
+    render_pdf,
+    resolve_pdf,
+    sign_pdf_link,
+    start_pdf_render,
+    verify_pdf_link,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/rad/marketo", tags=["marketo"])
 
 
+@dataclass
+class WebhookServices:
+    """Services the webhook pipeline runs on, all writing through one Supabase client."""
+    orchestrator: RADOrchestrator
+    llm_service: LLMService
+    pdf_service: PDFService
+
+
+def _webhook_services(supabase: SupabaseClient) -> WebhookServices:
+    """
+    Services for pipelines started outside a request (queue workers, deferred
+    renders): the shared ones, or ones bound to ``supabase`` when it is not
+    the client they were built with.
+    """
+    orchestrator = get_rad_orchestrator()
+    if orchestrator.supabase is not supabase:
+        orchestrator = RADOrchestrator(supabase)
+    pdf_service = get_pdf_service()
+    if pdf_service.supabase is not supabase:
+        pdf_service = PDFService(supabase)
+    return WebhookServices(orchestrator, get_llm_service(), pdf_service)
+
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -74,7 +118,7 @@ class WebhookResponse(BaseModel):
     Response returned to Marketo webhook.
     Marketo can map these fields to lead records via response mapping.
     """
-    status: str = Field(..., description="Processing status: completed, processing, failed")
+    status: str = Field(..., description="Processing status: completed, queued, processing, failed")
     pdfUrl: Optional[str] = Field(None, description="Signed URL for personalized PDF")
     message: Optional[str] = Field(None, description="Status message or error details")
     webhookId: Optional[str] = Field(None, description="Internal webhook tracking ID")
@@ -283,7 +327,10 @@ async def handle_marketo_webhook(
     payload: MarketoWebhookPayload,
     background_tasks: BackgroundTasks,
     x_marketo_secret: str = Header(..., alias="X-Marketo-Secret"),
-    supabase: SupabaseClient = Depends(get_supabase_client)
+    supabase: SupabaseClient = Depends(get_supabase_client),
+    orchestrator: RADOrchestrator = Depends(get_rad_orchestrator),
+    llm_service: LLMService = Depends(get_llm_service),
+    pdf_service: PDFService = Depends(get_pdf_service)
 ) -> WebhookResponse:
     """
     Handle incoming Marketo form submission webhook.
@@ -296,11 +343,19 @@ async def handle_marketo_webhook(
     5. Return PDF URL for Marketo response mapping
     6. (Background) Update lead in Marketo + trigger email campaign
 
+    In fast-ack mode only steps 1-2 run here (the payload is queued in
+    marketo_webhooks) and the response status is "queued". In deferred PDF
+    mode the response carries a signed link whose PDF renders in the
+    background.
+
     Args:
         payload: Marketo webhook payload with lead data
         background_tasks: FastAPI background tasks
         x_marketo_secret: Shared secret header
         supabase: Database client
+        orchestrator: Enrichment orchestrator
+        llm_service: Personalization LLM service
+        pdf_service: PDF generation service
 
     Returns:
         WebhookResponse with status and PDF URL
@@ -316,6 +371,31 @@ async def handle_marketo_webhook(
 
     logger.info(f"[{webhook_id}] Marketo webhook received for lead {payload.leadId} ({payload.email})")
 
+    # Fast-ack mode: persist to the durable queue and return immediately.
+    # If the queue can't be written, fall through and process inline.
+    if settings.MARKETO_WEBHOOK_ASYNC and _enqueue_webhook(supabase, webhook_id, payload, "queued"):
+        queue = get_webhook_queue()
+        if queue:
+            queue.notify()
+        logger.info(f"[{webhook_id}] Queued in {int((time.time() - start_time) * 1000)}ms")
+        return WebhookResponse(
+            status="queued",
+            pdfUrl=sign_pdf_link(webhook_id) if settings.MARKETO_DEFERRED_PDF else None,
+            message="Accepted; the PDF URL will be written to the lead record",
+            webhookId=webhook_id
+        )
+
+    # Deferred PDF mode: hand out the signed link now, render in the background
+    if settings.MARKETO_DEFERRED_PDF and _enqueue_webhook(supabase, webhook_id, payload, "processing"):
+        start_pdf_render(webhook_id, supabase)
+        logger.info(f"[{webhook_id}] Issued PDF link in {int((time.time() - start_time) * 1000)}ms")
+        return WebhookResponse(
+            status="processing",
+            pdfUrl=sign_pdf_link(webhook_id),
+            message="PDF is rendering; the link redirects once it is ready",
+            webhookId=webhook_id
+        )
+
     # Log incoming webhook to database
     try:
         webhook_record = _log_webhook(supabase, webhook_id, payload, "processing")
@@ -323,101 +403,24 @@ async def handle_marketo_webhook(
         logger.error(f"[{webhook_id}] Failed to log webhook: {e}")
         # Continue processing even if logging fails
 
+    trace = Trace("webhook", webhook_id=webhook_id)
     try:
-        # Map Marketo fields to our enrichment request format
-        email = payload.email.lower().strip()
-        domain = email.split("@")[1]
-
-        enrichment_data = {
-            "email": email,
-            "domain": domain,
-            "firstName": payload.firstName,
-            "lastName": payload.lastName,
-            "company": payload.company,
-            "industry": _map_industry(payload.industry),
-            "persona": _map_persona(payload.jobFunction),
-            "goal": _map_buyer_stage(payload.buyerStage),
-            "companySize": _map_company_size(payload.companySize),
-        }
-
-        # Initialize services
-        orchestrator = RADOrchestrator(supabase)
-        llm_service = LLMService()
-
-        # Run enrichment
-        logger.info(f"[{webhook_id}] Starting enrichment for {email}")
-        finalized = await orchestrator.enrich(email, domain)
-
-        # Override with user-provided data (more reliable)
-        if payload.firstName:
-            finalized["first_name"] = payload.firstName
-        if payload.lastName:
-            finalized["last_name"] = payload.lastName
-        if payload.company:
-            finalized["company_name"] = payload.company
-        if enrichment_data["industry"]:
-            finalized["industry"] = enrichment_data["industry"]
-
-        # Build user context for LLM
-        user_context = {
-            "goal": enrichment_data["goal"],
-            "persona": enrichment_data["persona"],
-            "industry_input": enrichment_data["industry"],
-            "company": payload.company,
-            "company_size": enrichment_data["companySize"],
-            "first_name": payload.firstName,
-            "last_name": payload.lastName,
-        }
-
-        # Generate ebook personalization
-        logger.info(f"[{webhook_id}] Generating personalization for {email}")
-        company_news = finalized.get("company_context", "")
-
-        ebook_personalization = await llm_service.generate_ebook_personalization(
-            profile=finalized,
-            user_context=user_context,
-            company_news=company_news
-        )
-
-        # Generate legacy personalization for PDF
-        personalization = await llm_service.generate_personalization(
-            finalized,
-            use_opus=False,  # Use Haiku for speed (30s timeout)
-            user_context=user_context
-        )
-
-        # Store personalization in finalized data
-        finalized["ebook_personalization"] = ebook_personalization
-        finalized["user_context"] = user_context
-
-        # Update finalize_data with personalization
-        supabase.upsert_finalize_data(
-            email=email,
-            normalized_data=finalized,
-            intro=personalization.get("intro_hook", ""),
-            cta=personalization.get("cta", "")
-        )
-
-        # Generate PDF
-        logger.info(f"[{webhook_id}] Generating PDF for {email}")
-        pdf_service = PDFService(supabase_client=supabase)
-
-        # Use AMD ebook generation with full personalization
-        pdf_result = await pdf_service.generate_amd_ebook(
-            job_id=hash(webhook_id) % 1000000,  # Generate numeric job ID from webhook ID
-            profile=finalized,
-            personalization=ebook_personalization,
-            user_context=user_context
-        )
-        pdf_url = pdf_result.get("pdf_url", "")
+        with activate(trace), span("webhook", webhook_id=webhook_id):
+            finalized, pdf_url = await _run_webhook_pipeline(
+                payload, webhook_id, supabase,
+                services=WebhookServices(orchestrator, llm_service, pdf_service)
+            )
 
         processing_time = int((time.time() - start_time) * 1000)
         logger.info(f"[{webhook_id}] Completed in {processing_time}ms, PDF URL: {pdf_url[:50]}...")
 
         # Update webhook record
-        _update_webhook(supabase, webhook_id, "completed", pdf_url, processing_time)
+        _update_webhook(
+            supabase, webhook_id, "completed", pdf_url, processing_time,
+            stage_timings=trace.summary()
+        )
 
-        # Queue background task to update Marketo
+        # Queue background task to update Marketo (adds its span to this trace)
         if settings.is_marketo_configured():
             background_tasks.add_task(
                 _update_marketo_lead_background,
@@ -425,7 +428,8 @@ async def handle_marketo_webhook(
                 pdf_url,
                 finalized,
                 webhook_id,
-                supabase
+                supabase,
+                trace
             )
 
         return WebhookResponse(
@@ -440,7 +444,10 @@ async def handle_marketo_webhook(
         logger.error(f"[{webhook_id}] Webhook processing failed after {processing_time}ms: {e}")
 
         # Update webhook record with error
-        _update_webhook(supabase, webhook_id, "failed", None, processing_time, str(e))
+        _update_webhook(
+            supabase, webhook_id, "failed", None, processing_time, str(e),
+            stage_timings=trace.summary()
+        )
 
         # Return error response (Marketo will see this via response mapping)
         return WebhookResponse(
@@ -451,6 +458,214 @@ async def handle_marketo_webhook(
         )
 
 
+async def _run_webhook_pipeline(
+    payload: MarketoWebhookPayload,
+    webhook_id: str,
+    supabase: SupabaseClient,
+    filename: Optional[str] = None,
+    services: Optional[WebhookServices] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Enrich, personalize and render the PDF for one webhook.
+
+    Args:
+        payload: Marketo webhook payload
+        webhook_id: Webhook tracking ID
+        supabase: Database client
+        filename: Fixed storage filename (deterministic PDF links)
+        services: Injected services (default: bound to ``supabase``)
+
+    Returns:
+        Tuple of (finalized profile, PDF URL)
+    """
+    # Map Marketo fields to our enrichment request format
+    email = payload.email.lower().strip()
+    domain = email.split("@")[1]
+
+    enrichment_data = {
+        "email": email,
+        "domain": domain,
+        "firstName": payload.firstName,
+        "lastName": payload.lastName,
+        "company": payload.company,
+        "industry": _map_industry(payload.industry),
+        "persona": _map_persona(payload.jobFunction),
+        "goal": _map_buyer_stage(payload.buyerStage),
+        "companySize": _map_company_size(payload.companySize),
+    }
+
+    services = services or _webhook_services(supabase)
+    orchestrator = services.orchestrator
+    llm_service = services.llm_service
+
+    # Run enrichment
+    logger.info(f"[{webhook_id}] Starting enrichment for {email}")
+    finalized = await orchestrator.enrich(email, domain)
+
+    # Build user context for LLM
+    user_context = {
+        "goal": enrichment_data["goal"],
+        "persona": enrichment_data["persona"],
+        "industry_input": enrichment_data["industry"],
+        "company": payload.company,
+        "company_size": enrichment_data["companySize"],
+        "first_name": payload.firstName,
+        "last_name": payload.lastName,
+    }
+
+    # Override with user-provided data (more reliable)
+    apply_user_context(finalized, user_context)
+
+    # Generate ebook personalization
+    logger.info(f"[{webhook_id}] Generating personalization for {email}")
+    company_news = finalized.get("company_context", "")
+
+    ebook_personalization = await llm_service.generate_ebook_personalization(
+        profile=finalized,
+        user_context=user_context,
+        company_news=company_news
+    )
+
+    # Generate legacy personalization for PDF
+    personalization = await llm_service.generate_personalization(
+        finalized,
+        use_opus=False,  # Use Haiku for speed (30s timeout)
+        user_context=user_context
+    )
+
+    record_lead_usage(supabase, email, personalization, ebook_personalization)
+
+    # Store personalization in finalized data
+    finalized["ebook_personalization"] = ebook_personalization
+    finalized["user_context"] = user_context
+
+    # Update finalize_data with personalization
+    supabase.upsert_finalize_data(
+        email=email,
+        normalized_data=finalized,
+        intro=personalization.get("intro_hook", ""),
+        cta=personalization.get("cta", "")
+    )
+
+    # Generate PDF
+    logger.info(f"[{webhook_id}] Generating PDF for {email}")
+    pdf_service = services.pdf_service
+
+    # Use AMD ebook generation with full personalization
+    pdf_result = await pdf_service.generate_amd_ebook(
+        job_id=hash(webhook_id) % 1000000,  # Generate numeric job ID from webhook ID
+        profile=finalized,
+        personalization=ebook_personalization,
+        user_context=user_context,
+        filename=filename
+    )
+    pdf_url = pdf_result.get("pdf_url", "")
+
+    return finalized, pdf_url
+
+
+async def process_queued_webhook(webhook: Dict[str, Any], supabase: SupabaseClient) -> str:
+    """
+    Webhook queue handler (fast-ack mode).
+
+    Runs the pipeline for a claimed webhook and pushes Custom_PDF_URL back to
+    the lead. Exceptions propagate so the queue can retry the webhook.
+
+    With deferred links the render goes through the same single-flight as the
+    link endpoint, so a reader clicking the link early joins this render
+    instead of starting a second pipeline (and vice versa).
+
+    Returns:
+        PDF URL (the signed link in deferred PDF mode)
+    """
+    payload = MarketoWebhookPayload(**webhook["payload"])
+    webhook_id = webhook["id"]
+
+    if settings.MARKETO_DEFERRED_PDF:
+        await render_pdf(webhook_id, supabase)
+        return sign_pdf_link(webhook_id)
+
+    finalized, pdf_url = await _run_webhook_pipeline(
+        payload, webhook_id, supabase, filename=pdf_filename(webhook_id)
+    )
+
+    if settings.is_marketo_configured():
+        await _update_marketo_lead_background(
+            payload.leadId, pdf_url, finalized, webhook_id, supabase, raise_errors=True
+        )
+    return pdf_url
+
+
+async def render_webhook_pdf(webhook_id: str, supabase: SupabaseClient) -> str:
+    """
+    PDF renderer for deferred links.
+
+    Loads the stored webhook payload, runs the pipeline into the webhook's
+    deterministic filename and writes the stable link back to the lead.
+    A failed lead update fails the render, so the queue retries it.
+
+    Returns:
+        Signed storage URL
+    """
+    webhook = supabase.get_webhook(webhook_id)
+    if not webhook:
+        raise ValueError(f"Unknown webhook {webhook_id}")
+
+    start_time = time.time()
+    payload = MarketoWebhookPayload(**webhook["payload"])
+    with start_trace("webhook", webhook_id=webhook_id) as trace:
+        link = sign_pdf_link(webhook_id)
+        try:
+            finalized, pdf_url = await _run_webhook_pipeline(
+                payload, webhook_id, supabase, filename=pdf_filename(webhook_id)
+            )
+            if settings.is_marketo_configured():
+                await _update_marketo_lead_background(
+                    payload.leadId, link, finalized, webhook_id, supabase, raise_errors=True
+                )
+        except Exception as e:
+            supabase.update_webhook(
+                webhook_id, status="failed", error_message=str(e),
+                processing_time_ms=int((time.time() - start_time) * 1000),
+                stage_timings=trace.summary()
+            )
+            raise
+    supabase.update_webhook(
+        webhook_id, status="completed", pdf_url=link,
+        processing_time_ms=int((time.time() - start_time) * 1000),
+        stage_timings=trace.summary()
+    )
+    return pdf_url
+
+
+register_pdf_renderer(render_webhook_pdf)
+
+
+@router.get("/pdf/{webhook_id}")
+async def redirect_to_pdf(
+    webhook_id: str,
+    expires: int = Query(...),
+    sig: str = Query(...),
+    supabase: SupabaseClient = Depends(get_supabase_client)
+):
+    """
+    Signed PDF link issued by the webhook in deferred PDF mode.
+
+    Redirects to the stored PDF, waiting for (or starting) the render if it
+    has not finished yet.
+    """
+    if not verify_pdf_link(webhook_id, expires, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired PDF link")
+
+    try:
+        url = await resolve_pdf(webhook_id, supabase)
+    except Exception as e:
+        logger.error(f"[{webhook_id}] PDF link render failed: {e}")
+        raise HTTPException(status_code=502, detail="PDF rendering failed")
+
+    return RedirectResponse(url, status_code=307)
+
+
 @router.get("/status")
 async def marketo_status():
     """Check Marketo integration status."""
@@ -458,7 +673,10 @@ async def marketo_status():
         "configured": settings.is_marketo_configured(),
         "webhook_secret_set": bool(settings.MARKETO_WEBHOOK_SECRET),
         "base_url": settings.MARKETO_BASE_URL[:30] + "..." if settings.MARKETO_BASE_URL else None,
-        "email_campaign_id": settings.MARKETO_EMAIL_CAMPAIGN_ID
+        "email_campaign_id": settings.MARKETO_EMAIL_CAMPAIGN_ID,
+        "api_usage": get_marketo_service().get_usage(),
+        "webhook_mode": "async" if settings.MARKETO_WEBHOOK_ASYNC else "inline",
+        "webhook_queue": get_webhook_queue().get_stats() if get_webhook_queue() else None
     }
 
 
@@ -466,6 +684,29 @@ async def marketo_status():
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _enqueue_webhook(
+    supabase: SupabaseClient,
+    webhook_id: str,
+    payload: MarketoWebhookPayload,
+    status: str
+) -> bool:
+    """
+    Persist a webhook for queued or deferred processing.
+
+    Returns:
+        False if the write failed (the caller then processes inline)
+    """
+    try:
+        supabase.enqueue_webhook(
+            webhook_id, payload.leadId, payload.email, payload.model_dump(),
+            status=status
+        )
+        return True
+    except Exception as e:
+        logger.error(f"[{webhook_id}] Failed to enqueue webhook, processing inline: {e}")
+        return False
+
+
 def _log_webhook(
     supabase: SupabaseClient,
     webhook_id: str,
@@ -498,7 +739,8 @@ def _update_webhook(
     status: str,
     pdf_url: Optional[str],
     processing_time_ms: int,
-    error_message: Optional[str] = None
+    error_message: Optional[str] = None,
+    stage_timings: Optional[Dict[str, Any]] = None
 ):
     """Update webhook record with result."""
     if supabase.mock_mode:
@@ -513,6 +755,8 @@ def _update_webhook(
         }
         if error_message:
             data["error_message"] = error_message
+        if stage_timings is not None:
+            data["stage_timings"] = stage_timings
 
         supabase.client.table("marketo_webhooks").update(data).eq("id", webhook_id).execute()
     except Exception as e:
@@ -524,50 +768,86 @@ async def _update_marketo_lead_background(
     pdf_url: str,
     enrichment_result: dict,
     webhook_id: str,
-    supabase: SupabaseClient
+    supabase: SupabaseClient,
+    trace: Optional[Trace] = None,
+    raise_errors: bool = False
 ):
     """
     Background task to update lead in Marketo and trigger email campaign.
 
     This runs after the webhook response is sent, so it doesn't block
-    the 30-second timeout.
+    the 30-second timeout. When given the webhook's trace (inline mode,
+    where the trace has already ended) the callback span is added to it
+    and the webhook's stage_timings are rewritten.
+
+    With raise_errors (queue workers, deferred renders) a failed update
+    propagates so the webhook is retried instead of marked completed.
+    """
+    if trace is None:
+        with span("marketo.callback", lead_id=lead_id):
+            await _push_lead_to_marketo(lead_id, pdf_url, webhook_id, supabase, raise_errors)
+        return
+
+    with activate(trace), span("marketo.callback", lead_id=lead_id):
+        await _push_lead_to_marketo(lead_id, pdf_url, webhook_id, supabase)
+    if not supabase.mock_mode:
+        try:
+            supabase.update_webhook(webhook_id, stage_timings=trace.summary())
+        except Exception as e:
+            logger.error(f"[{webhook_id}] Failed to save stage timings: {e}")
+
+
+async def _push_lead_to_marketo(
+    lead_id: str,
+    pdf_url: str,
+    webhook_id: str,
+    supabase: SupabaseClient,
+    raise_errors: bool = False
+):
+    """
+    Write Custom_PDF_URL to the lead and trigger the email campaign.
+
+    Failures are logged, and re-raised when ``raise_errors`` is set.
     """
-    marketo = get_marketo_service()
+    outbox = get_marketo_service().outbox
 
     try:
-        # Update lead with PDF URL
-        logger.info(f"[{webhook_id}] Updating Marketo lead {lead_id} with PDF URL")
+        # Update lead with PDF URL (sent with other leads in one leads.json call)
+        logger.info(f"[{webhook_id}] Queueing Marketo lead update for {lead_id}")
 
-        await marketo.update_lead(lead_id, {
+        result = await outbox.update_lead(lead_id, {
             "Custom_PDF_URL": pdf_url,
             "Enrichment_Status": "completed",
             "Enrichment_Date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
         })
 
-        # Log API call
+        # Log per-lead result from the batch call
         _log_marketo_api_call(
             supabase, webhook_id,
             "/rest/v1/leads.json", "POST",
-            {"lead_id": lead_id, "fields": ["Custom_PDF_URL", "Enrichment_Status"]},
-            200, {"success": True}
+            {"lead_id": lead_id, "fields": ["Custom_PDF_URL", "Enrichment_Status"],
+             "batch_size": result.get("batch_size")},
+            200, result
         )
 
         # Trigger email campaign if configured
         if settings.MARKETO_EMAIL_CAMPAIGN_ID:
-            logger.info(f"[{webhook_id}] Triggering email campaign for lead {lead_id}")
+            logger.info(f"[{webhook_id}] Queueing email campaign trigger for lead {lead_id}")
 
-            await marketo.trigger_campaign(
+            # A per-lead token prevents batching; without it the email reads the lead field
+            tokens = {"pdfUrl": pdf_url} if settings.MARKETO_TRIGGER_PDF_TOKEN else None
+            result = await outbox.trigger_campaign(
                 settings.MARKETO_EMAIL_CAMPAIGN_ID,
                 lead_id,
-                tokens={"pdfUrl": pdf_url}
+                tokens=tokens
             )
 
             _log_marketo_api_call(
                 supabase, webhook_id,
                 f"/rest/v1/campaigns/{settings.MARKETO_EMAIL_CAMPAIGN_ID}/trigger.json",
                 "POST",
-                {"lead_id": lead_id},
-                200, {"success": True}
+                {"lead_id": lead_id, "batch_size": result.get("batch_size")},
+                200, result
             )
 
         logger.info(f"[{webhook_id}] Marketo background tasks completed for lead {lead_id}")
@@ -581,6 +861,8 @@ async def _update_marketo_lead_background(
             {"error": str(e)},
             500, {"error": str(e)}
         )
+        if raise_errors:
+            raise
 
 
 def _log_marketo_api_call(
@@ -0,0 +1,335 @@
+"""
+Bulk re-resolution of stored raw_data into finalize_data.
+
+After a change to SOURCE_PRIORITY or FIELD_MAPPINGS every stored lead has
+to be resolved again. Instead of calling _resolve_profile dict by dict,
+raw_data is read in pages keyed by email and laid out column-wise: one
+list per (source, source_field) pair of the resolution plan, aligned by
+lead. Priority selection then runs per field across the whole page,
+filling only the leads still unresolved from each source in turn. The
+rewritten profiles go back to finalize_data in one upsert per page.
+
+Progress is checkpointed to a JSON file after every page (last complete
+email plus running counts and timings), so an interrupted run resumes
+where it stopped. A checkpoint written for a different resolution plan is
+ignored and the run starts over.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.rad_orchestrator import (
+    RESOLUTION_PLAN,
+    SOURCE_PRIORITY,
+    RADOrchestrator,
+    apply_user_context,
+    get_rad_orchestrator,
+)
+from app.services.supabase_client import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+
+# Every (source, source_field) column the plan reads
+PLAN_COLUMNS: Tuple[Tuple[str, str], ...] = tuple(
+    dict.fromkeys(pair for _, sources in RESOLUTION_PLAN for pair in sources)
+)
+
+
+def plan_version() -> str:
+    """Fingerprint of the resolution plan and priorities (checkpoints are per plan)."""
+    spec = json.dumps([RESOLUTION_PLAN, sorted(SOURCE_PRIORITY.items())])
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+@dataclass
+class ColumnarPage:
+    """A page of leads with the plan's source fields stored as columns."""
+    emails: List[str]
+    # source -> latest usable payload per lead (None when missing or errored)
+    payloads: Dict[str, List[Optional[Dict[str, Any]]]]
+    # (source, source_field) -> value per lead (None when empty)
+    columns: Dict[Tuple[str, str], List[Any]]
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "ColumnarPage":
+        """
+        Build a page from raw_data records ordered by email, then fetched_at
+        (later records for the same email and source replace earlier ones).
+        """
+        latest: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for record in records:
+            payload = record.get("payload")
+            if payload and not payload.get("_error"):
+                latest.setdefault(record["email"], {})[record["source"]] = payload
+
+        emails = list(latest)
+        sources = {source for by_source in latest.values() for source in by_source}
+        payloads = {
+            source: [latest[email].get(source) for email in emails]
+            for source in sources
+        }
+
+        columns = {}
+        for source, source_field in PLAN_COLUMNS:
+            rows = payloads.get(source)
+            if rows is None:
+                continue
+            column = [row.get(source_field) if row else None for row in rows]
+            columns[(source, source_field)] = [None if value == "" else value for value in column]
+        return cls(emails=emails, payloads=payloads, columns=columns)
+
+    def raw_data(self, index: int) -> Dict[str, Dict[str, Any]]:
+        """Per-source payloads of one lead, shaped like the orchestrator's raw_data."""
+        return {
+            source: rows[index] for source, rows in self.payloads.items()
+            if rows[index] is not None
+        }
+
+
+def resolve_columns(
+    page: ColumnarPage
+) -> Tuple[Dict[str, List[Any]], Dict[str, List[Optional[str]]]]:
+    """
+    Priority selection for every plan field across a whole page.
+
+    For each field the candidate columns are visited in priority order and
+    only the leads still unresolved are checked against the next one, so
+    each lead takes the first non-empty value exactly as _resolve_profile does.
+
+    Returns:
+        (field -> value per lead, field -> winning source per lead)
+    """
+    count = len(page.emails)
+    values: Dict[str, List[Any]] = {}
+    winners: Dict[str, List[Optional[str]]] = {}
+
+    for name, sources in RESOLUTION_PLAN:
+        resolved: List[Any] = [None] * count
+        won: List[Optional[str]] = [None] * count
+        pending = range(count)
+        for source, source_field in sources:
+            column = page.columns.get((source, source_field))
+            if column is None:
+                continue
+            unresolved = []
+            for index in pending:
+                value = column[index]
+                if value is None:
+                    unresolved.append(index)
+                else:
+                    resolved[index], won[index] = value, source
+            pending = unresolved
+            if not pending:
+                break
+        values[name], winners[name] = resolved, won
+
+    return values, winners
+
+
+@dataclass
+class ResolutionCheckpoint:
+    """Progress of a bulk re-resolution run (persisted after every page)."""
+    plan_version: str
+    last_email: Optional[str] = None
+    pages: int = 0
+    leads: int = 0
+    written: int = 0
+    # Leads with raw_data but no finalize_data (enrichment never completed)
+    skipped: int = 0
+    done: bool = False
+    load_seconds: float = 0.0
+    resolve_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return self.load_seconds + self.resolve_seconds + self.write_seconds
+
+    @property
+    def leads_per_second(self) -> float:
+        return self.leads / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str], version: str) -> "ResolutionCheckpoint":
+        """Checkpoint from ``path``, or a fresh one if missing or for another plan."""
+        if not path or not os.path.exists(path):
+            return cls(plan_version=version)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("plan_version") != version:
+            logger.warning(f"Checkpoint {path} is for another resolution plan; starting over")
+            return cls(plan_version=version)
+        return cls(**data)
+
+    def save(self, path: str) -> None:
+        """Write atomically, so a crash mid-write keeps the previous checkpoint."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "leads_per_second": round(self.leads_per_second, 1),
+        }
+
+
+class BulkResolutionJob:
+    """
+    Re-resolves every lead in raw_data page by page and writes finalize_data.
+
+    Only the resolved profile fields change: personalization, user context
+    and the LLM intro/CTA already stored on each finalize_data record are kept.
+    """
+
+    def __init__(
+        self,
+        supabase_client: SupabaseClient,
+        orchestrator: Optional[RADOrchestrator] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        checkpoint_path: Optional[str] = None,
+        dry_run: bool = False
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            supabase_client: Supabase data access layer
+            orchestrator: Source of the single-source fields and quality score
+            page_size: raw_data records read per page
+            checkpoint_path: JSON progress file (None disables resume)
+            dry_run: Resolve and count without writing finalize_data
+        """
+        self.supabase = supabase_client
+        self.orchestrator = orchestrator or get_rad_orchestrator()
+        self.page_size = page_size
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+
+    def run(self, max_pages: Optional[int] = None, restart: bool = False) -> ResolutionCheckpoint:
+        """
+        Process pages until raw_data is exhausted (or ``max_pages`` pages).
+
+        Args:
+            max_pages: Stop after this many pages in this run
+            restart: Ignore an existing checkpoint
+
+        Returns:
+            The checkpoint with totals and throughput
+        """
+        version = plan_version()
+        checkpoint = ResolutionCheckpoint(plan_version=version) if restart else \
+            ResolutionCheckpoint.load(self.checkpoint_path, version)
+        if checkpoint.done:
+            logger.info(f"Bulk re-resolution already complete ({checkpoint.leads} leads)")
+            return checkpoint
+        if checkpoint.last_email:
+            logger.info(f"Resuming bulk re-resolution after {checkpoint.last_email}")
+
+        pages_run = 0
+        while max_pages is None or pages_run < max_pages:
+            start = time.perf_counter()
+            records, cursor, exhausted = self._next_page(checkpoint.last_email)
+            page = ColumnarPage.from_records(records)
+            checkpoint.load_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            finalized = self.supabase.get_finalize_data_for_emails(page.emails)
+            rows = self._resolve_page(page, finalized)
+            checkpoint.resolve_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if not self.dry_run:
+                checkpoint.written += self.supabase.upsert_finalize_data_batch(rows)
+            checkpoint.write_seconds += time.perf_counter() - start
+
+            checkpoint.pages += 1
+            checkpoint.leads += len(page.emails)
+            checkpoint.skipped += len(page.emails) - len(rows)
+            checkpoint.last_email = cursor or checkpoint.last_email
+            checkpoint.done = exhausted
+            pages_run += 1
+            if self.checkpoint_path and not self.dry_run:
+                checkpoint.save(self.checkpoint_path)
+
+            logger.info(
+                f"Re-resolved page {checkpoint.pages}: {len(page.emails)} leads, "
+                f"{checkpoint.leads} total at {checkpoint.leads_per_second:.0f} leads/s"
+            )
+            if exhausted:
+                break
+
+        return checkpoint
+
+    def _next_page(self, after_email: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str], bool]:
+        """
+        Next page of whole leads.
+
+        Returns:
+            (records, last email included, whether raw_data is exhausted)
+        """
+        records = self.supabase.get_raw_data_page(after_email, self.page_size)
+        if len(records) < self.page_size:
+            return records, records[-1]["email"] if records else None, True
+
+        # The last email may continue on the next page: leave it for then
+        last_email = records[-1]["email"]
+        complete = [r for r in records if r["email"] != last_email]
+        if complete:
+            return complete, complete[-1]["email"], False
+
+        # One lead fills the whole page: read all of its records (a failed
+        # read raises, so the checkpoint never moves past an unread lead)
+        return self.supabase.get_raw_data_records(last_email), last_email, False
+
+    def _resolve_page(
+        self,
+        page: ColumnarPage,
+        finalized: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """finalize_data rows for the page's leads that already have a record."""
+        values, winners = resolve_columns(page)
+        rows = []
+
+        for index, email in enumerate(page.emails):
+            existing = finalized.get(email)
+            if existing is None:
+                continue
+
+            normalized = dict(existing.get("normalized_data") or {})
+            provenance: Dict[str, str] = {}
+            for name, column in values.items():
+                if column[index] is None:
+                    normalized.pop(name, None)
+                else:
+                    normalized[name] = column[index]
+                    provenance[name] = winners[name][index]
+
+            raw_data = page.raw_data(index)
+            self.orchestrator._apply_source_fields(normalized, raw_data, provenance)
+
+            # The same overrides /rad/enrich and the Marketo webhook apply
+            apply_user_context(normalized, normalized.get("user_context") or {})
+
+            normalized["data_sources"] = list(raw_data)
+            normalized["field_sources"] = provenance
+            normalized["data_quality_score"] = self.orchestrator._calculate_quality_score(raw_data)
+
+            rows.append({
+                "email": email,
+                "normalized_data": normalized,
+                "personalization_intro": existing.get("personalization_intro"),
+                "personalization_cta": existing.get("personalization_cta"),
+                "data_sources": list(raw_data),
+            })
+
+        return rows
@@ -0,0 +1,104 @@
+"""
+Templates compiled once into static chunks and slot indices.
+
+string.Template.safe_substitute rescans the whole source on every call. A
+CompiledTemplate parses the source once (same $name / ${name} / $$ syntax)
+into a list of parts, so rendering is a list copy, a few slot assignments
+and one join. bind() folds values that never change (static sections, a
+case-study variant) into the static chunks ahead of time.
+"""
+
+from string import Template
+from typing import Any, Dict, List, Mapping, Tuple
+
+
+class CompiledTemplate:
+    """
+    A string.Template-compatible template pre-split into parts.
+
+    Rendering matches safe_substitute: unknown placeholders are left as
+    written and substituted values are not rescanned.
+    """
+
+    def __init__(self, parts: List[str], slots: List[Tuple[int, str, str]]):
+        """
+        Initialize from parsed parts (use CompiledTemplate.compile).
+
+        Args:
+            parts: Static text with placeholder positions filled by their source text
+            slots: (index into parts, placeholder name, source text) per placeholder
+        """
+        self._parts = parts
+        self._slots = slots
+
+    @classmethod
+    def compile(cls, source: str) -> "CompiledTemplate":
+        """Parse a string.Template source into static chunks and slots."""
+        parts: List[str] = []
+        slots: List[Tuple[int, str, str]] = []
+        static: List[str] = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            static.append(source[position:match.start()])
+            position = match.end()
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                parts.append("".join(static))
+                static = []
+                slots.append((len(parts), name, match.group()))
+                parts.append(match.group())
+            elif match.group("escaped") is not None:
+                static.append(Template.delimiter)
+            else:
+                # Invalid placeholder: safe_substitute leaves it as written
+                static.append(match.group())
+        static.append(source[position:])
+        parts.append("".join(static))
+        return cls(parts, slots)
+
+    @property
+    def slot_names(self) -> List[str]:
+        """Names of the placeholders still open, in order."""
+        return [name for _, name, _ in self._slots]
+
+    def bind(self, values: Mapping[str, Any]) -> "CompiledTemplate":
+        """
+        Return a new template with the given slots folded into static text.
+
+        Adjacent static chunks are merged, so a template bound to all of
+        its static content renders as a join over only the remaining slots.
+        """
+        parts: List[str] = []
+        slots: List[Tuple[int, str, str]] = []
+        static: List[str] = []
+        slot_at = {index: (name, text) for index, name, text in self._slots}
+        for index, part in enumerate(self._parts):
+            if index not in slot_at:
+                static.append(part)
+                continue
+            name, text = slot_at[index]
+            if name in values:
+                static.append(str(values[name]))
+            else:
+                parts.append("".join(static))
+                static = []
+                slots.append((len(parts), name, text))
+                parts.append(text)
+        parts.append("".join(static))
+        return CompiledTemplate(parts, slots)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Fill the open slots (like safe_substitute) and join."""
+        parts = self._parts.copy()
+        for index, name, _ in self._slots:
+            if name in values:
+                parts[index] = str(values[name])
+        return "".join(parts)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+
+def freeze(values: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Hashable key for a dict of template values (e.g. a case study)."""
+    return tuple(sorted((key, str(value)) for key, value in values.items()))
@@ -12,6 +12,8 @@ import re
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass, field
 
+from app.services.tracing import span
+
 logger = logging.getLogger(__name__)
 
 # Length constraints
@@ -158,6 +160,17 @@ class ComplianceService:
         Returns:
             ComplianceResult with pass/fail and any issues
         """
+        with span("compliance") as compliance_span:
+            result = self._check(intro_hook, cta, auto_correct)
+            compliance_span.set_attribute("issues", len(result.issues))
+            # pass: clean; corrected: auto-correction passed; fallback: caller must use safe copy
+            if not result.issues:
+                compliance_span.set_attribute("outcome", "pass")
+            else:
+                compliance_span.set_attribute("outcome", "corrected" if result.passed else "fallback")
+            return result
+
+    def _check(self, intro_hook: str, cta: str, auto_correct: bool) -> ComplianceResult:
         # Handle None inputs
         intro_hook = intro_hook or ""
         cta = cta or ""
@@ -399,5 +412,16 @@ def validate_personalization(
     Returns:
         ComplianceResult
     """
-    service = ComplianceService()
-    return service.check(intro_hook, cta, auto_correct)
+    return get_compliance_service().check(intro_hook, cta, auto_correct)
+
+
+# Singleton instance, built at startup (see app.main lifespan)
+_compliance_service: Optional[ComplianceService] = None
+
+
+def get_compliance_service() -> ComplianceService:
+    """Get or create the shared ComplianceService (default limits and terms)."""
+    global _compliance_service
+    if _compliance_service is None:
+        _compliance_service = ComplianceService()
+    return _compliance_service
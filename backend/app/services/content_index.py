@@ -0,0 +1,148 @@
+"""
+Content Index: parsed knowledge-pack (KP) markdown, loaded once.
+
+The KP files under assets/content are read and split into "## " sections,
+each with its bullet points, so key-point lookups no longer re-read and
+re-scan the file. A file is re-parsed when its mtime changes, and
+key-point results are memoized per (section, max_points).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = Path(__file__).parent.parent.parent / "assets" / "content"
+
+# Bullet points this short (after the marker) are labels, not insights
+MIN_POINT_CHARS = 11
+
+
+def _bullet(line: str) -> Optional[str]:
+    """Bullet text for a "- " / "* " line, or None."""
+    stripped = line.strip()
+    if not (stripped.startswith("- ") or stripped.startswith("* ")):
+        return None
+    point = stripped.lstrip("-*").strip()
+    return point if len(point) >= MIN_POINT_CHARS else None
+
+
+def parse_sections(content: str) -> List[Tuple[Optional[str], List[str]]]:
+    """
+    Split markdown into (lowercased "## " header, bullet points) pairs.
+    Bullets before the first header are kept under a None header.
+    """
+    sections: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    for line in content.split("\n"):
+        if line.startswith("## "):
+            sections.append((line.lower(), []))
+            continue
+        point = _bullet(line)
+        if point:
+            sections[-1][1].append(point)
+    return sections
+
+
+@dataclass
+class ContentDocument:
+    """One parsed KP file."""
+    text: str
+    mtime_ns: int
+    sections: List[Tuple[Optional[str], List[str]]]
+    _points: Dict[Tuple[Optional[str], int], List[str]] = field(default_factory=dict)
+
+    def key_points(self, section: Optional[str] = None, max_points: int = 5) -> List[str]:
+        """
+        Bullet points under the first header containing ``section``
+        (case-insensitive), continuing through directly following headers
+        that also match. Without a section, bullets from the whole file.
+        """
+        key = (section.lower() if section else None, max_points)
+        points = self._points.get(key)
+        if points is None:
+            points = self._collect(key[0], max_points)
+            self._points[key] = points
+        return list(points)
+
+    def _collect(self, section: Optional[str], max_points: int) -> List[str]:
+        if section is None:
+            return [p for _, bullets in self.sections for p in bullets][:max_points]
+        points: List[str] = []
+        matched = False
+        for header, bullets in self.sections:
+            if header is not None and section in header:
+                matched = True
+            elif matched:
+                break
+            if matched:
+                points.extend(bullets)
+        return points[:max_points]
+
+
+class ContentIndex:
+    """KP files parsed into sections, keyed by filename."""
+
+    def __init__(self, content_dir: Path = CONTENT_DIR):
+        self.content_dir = content_dir
+        self._documents: Dict[str, ContentDocument] = {}
+        self._stats = {"loads": 0, "hits": 0}
+
+    def load(self) -> int:
+        """Parse every markdown file in the content directory (app startup)."""
+        loaded = 0
+        for path in sorted(self.content_dir.glob("*.md")):
+            if self.document(path.name) is not None:
+                loaded += 1
+        logger.info(f"Content index loaded {loaded} files from {self.content_dir}")
+        return loaded
+
+    def document(self, filename: str) -> Optional[ContentDocument]:
+        """
+        Parsed file, re-read only when its mtime has changed.
+
+        Returns:
+            ContentDocument, or None if the file is missing or unreadable
+        """
+        path = self.content_dir / filename
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            self._documents.pop(filename, None)
+            return None
+
+        document = self._documents.get(filename)
+        if document is not None and document.mtime_ns == mtime_ns:
+            self._stats["hits"] += 1
+            return document
+
+        try:
+            text = path.read_text(encoding="utf-8")
+        except Exception as e:
+            logger.error(f"Error reading content file {path}: {e}")
+            return None
+        document = ContentDocument(text=text, mtime_ns=mtime_ns, sections=parse_sections(text))
+        self._documents[filename] = document
+        self._stats["loads"] += 1
+        return document
+
+    def text(self, filename: str) -> Optional[str]:
+        """Full markdown of a file, or None."""
+        document = self.document(filename)
+        return document.text if document else None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "documents": len(self._documents)}
+
+
+# Global instance (loaded at startup, see app.main lifespan)
+_content_index: Optional[ContentIndex] = None
+
+
+def get_content_index() -> ContentIndex:
+    """Get or create the process-wide content index."""
+    global _content_index
+    if _content_index is None:
+        _content_index = ContentIndex()
+    return _content_index
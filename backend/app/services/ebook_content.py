@@ -218,15 +218,14 @@ def get_persona_context(persona: str) -> dict:
 
 
 # --- Content File Loading ---
-# Load detailed content from the uploaded markdown files
+# Load detailed content from the uploaded markdown files (parsed once by the content index)
 
-from pathlib import Path
 from typing import Optional
 import logging
 
-logger = logging.getLogger(__name__)
+from app.services.content_index import CONTENT_DIR, get_content_index
 
-CONTENT_DIR = Path(__file__).parent.parent.parent / "assets" / "content"
+logger = logging.getLogger(__name__)
 
 # Map normalized industry names to file names
 INDUSTRY_FILE_MAP = {
@@ -261,6 +260,22 @@ SEGMENT_FILE_MAP = {
 }
 
 
+def _load_content(kind: str, name: str, filename: Optional[str]) -> Optional[str]:
+    """Markdown for a mapped content file from the content index."""
+    if not filename:
+        logger.warning(f"No content file mapping for {kind}: {name}")
+        return None
+
+    content = get_content_index().text(filename)
+    if content is None:
+        logger.warning(f"{kind.capitalize()} content file not found: {CONTENT_DIR / filename}")
+    return content
+
+
+def _industry_file(industry: str) -> Optional[str]:
+    return INDUSTRY_FILE_MAP.get(industry.lower().replace(" ", "_").replace("-", "_"))
+
+
 def load_industry_content(industry: str) -> Optional[str]:
     """
     Load detailed industry content from markdown files.
@@ -271,23 +286,7 @@ def load_industry_content(industry: str) -> Optional[str]:
     Returns:
         Full markdown content or None if not found
     """
-    industry_normalized = industry.lower().replace(" ", "_").replace("-", "_")
-    filename = INDUSTRY_FILE_MAP.get(industry_normalized)
-
-    if not filename:
-        logger.warning(f"No content file mapping for industry: {industry}")
-        return None
-
-    filepath = CONTENT_DIR / filename
-    if not filepath.exists():
-        logger.warning(f"Industry content file not found: {filepath}")
-        return None
-
-    try:
-        return filepath.read_text(encoding="utf-8")
-    except Exception as e:
-        logger.error(f"Error reading industry content: {e}")
-        return None
+    return _load_content("industry", industry, _industry_file(industry))
 
 
 def load_job_function_content(job_function: str) -> Optional[str]:
@@ -300,23 +299,8 @@ def load_job_function_content(job_function: str) -> Optional[str]:
     Returns:
         Full markdown content or None if not found
     """
-    function_normalized = job_function.lower().replace(" ", "_")
-    filename = JOB_FUNCTION_FILE_MAP.get(function_normalized)
-
-    if not filename:
-        logger.warning(f"No content file mapping for job function: {job_function}")
-        return None
-
-    filepath = CONTENT_DIR / filename
-    if not filepath.exists():
-        logger.warning(f"Job function content file not found: {filepath}")
-        return None
-
-    try:
-        return filepath.read_text(encoding="utf-8")
-    except Exception as e:
-        logger.error(f"Error reading job function content: {e}")
-        return None
+    filename = JOB_FUNCTION_FILE_MAP.get(job_function.lower().replace(" ", "_"))
+    return _load_content("job function", job_function, filename)
 
 
 def load_segment_content(segment: str) -> Optional[str]:
@@ -329,23 +313,8 @@ def load_segment_content(segment: str) -> Optional[str]:
     Returns:
         Full markdown content or None if not found
     """
-    segment_normalized = segment.lower().replace(" ", "_").replace("-", "_")
-    filename = SEGMENT_FILE_MAP.get(segment_normalized)
-
-    if not filename:
-        logger.warning(f"No content file mapping for segment: {segment}")
-        return None
-
-    filepath = CONTENT_DIR / filename
-    if not filepath.exists():
-        logger.warning(f"Segment content file not found: {filepath}")
-        return None
-
-    try:
-        return filepath.read_text(encoding="utf-8")
-    except Exception as e:
-        logger.error(f"Error reading segment content: {e}")
-        return None
+    filename = SEGMENT_FILE_MAP.get(segment.lower().replace(" ", "_").replace("-", "_"))
+    return _load_content("segment", segment, filename)
 
 
 def extract_key_points(content: str, section: str = None, max_points: int = 5) -> list[str]:
@@ -406,8 +375,9 @@ def get_industry_key_insights(industry: str) -> dict:
     Returns:
         Dict with categorized insights
     """
-    content = load_industry_content(industry)
-    if not content:
+    filename = _industry_file(industry)
+    document = get_content_index().document(filename) if filename else None
+    if not document:
         return {
             "trends": [],
             "priorities": [],
@@ -416,8 +386,8 @@ def get_industry_key_insights(industry: str) -> dict:
         }
 
     return {
-        "trends": extract_key_points(content, "Major trends", 3),
-        "priorities": extract_key_points(content, "Technology Investment", 3),
-        "challenges": extract_key_points(content, "challenges", 3),
-        "messaging_tips": extract_key_points(content, "messaging", 3),
+        "trends": document.key_points("Major trends", 3),
+        "priorities": document.key_points("Technology Investment", 3),
+        "challenges": document.key_points("challenges", 3),
+        "messaging_tips": document.key_points("messaging", 3),
     }
@@ -0,0 +1,288 @@
+"""
+Structured ebook model and the reportlab renderer that consumes it.
+
+PDFService builds an EbookDocument from the values it already has (profile,
+personalized slots, case study, static sections) alongside the HTML, so the
+reportlab fallback never has to scrape them back out of the markup.
+Paragraph styles and the markup for static content are prepared once per
+process; each story builds its own Paragraph objects from them, because
+reportlab flowables keep layout state while wrapping and splitting and so
+can't be shared between concurrent renders.
+"""
+
+import io
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Tuple
+from xml.sax.saxutils import escape
+
+from app.services.compiled_template import freeze
+from app.services.ebook_content import EBOOK_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Static sections in story order: (section key, heading, heading style)
+STATIC_SECTIONS = (
+    ("intro_section", "Redefining the Data Center: AI Readiness in the Age of Acceleration", "heading"),
+    ("three_stages_intro", "Understanding the Three Stages of Data Center Modernization", "heading"),
+    ("leaders_section", "Data Center Leaders (26%)", "subheading"),
+    ("challengers_section", "Data Center Challengers (32%)", "subheading"),
+    ("observers_section", "Data Center Observers (42%)", "subheading"),
+    ("path_to_leadership", "The Path to Leadership: Moving Through the Stages", "heading"),
+    ("modernization_models", "Modernization Models", "heading"),
+)
+
+
+@dataclass
+class EbookDocument:
+    """Everything a backend needs to render one personalized ebook."""
+
+    first_name: str
+    company_name: str
+    industry: str = ""
+    persona: str = ""
+    buying_stage: str = ""
+    personalized_hook: str = ""
+    case_study_framing: str = ""
+    personalized_cta: str = ""
+    case_study: Dict[str, Any] = field(default_factory=dict)
+    sections: Mapping[str, str] = field(default_factory=lambda: EBOOK_SECTIONS)
+    # Rendered HTML for HTML-based backends (weasyprint)
+    html: str = ""
+
+
+def document_from_html(html_content: str) -> EbookDocument:
+    """
+    Recover ebook content from rendered HTML.
+    Only used when a caller passes bare HTML without its document.
+    """
+    def extract_text(pattern, default=""):
+        match = re.search(pattern, html_content, re.DOTALL)
+        if match:
+            text = match.group(1)
+            # Clean HTML tags
+            text = re.sub(r'<[^>]+>', ' ', text)
+            text = re.sub(r'\s+', ' ', text).strip()
+            return text
+        return default
+
+    sections = {
+        "intro_section": extract_text(r'<h2>Redefining the Data Center[^<]*</h2>\s*<p>([^<]+)</p>'),
+        "three_stages_intro": extract_text(r'<h2>Understanding the Three Stages[^<]*</h2>\s*<p>([^<]+)</p>'),
+        "leaders_section": extract_text(r'<h3>Data Center Leaders[^<]*</h3>\s*<p>([^<]+)</p>'),
+        "challengers_section": extract_text(r'<h3>Data Center Challengers[^<]*</h3>\s*<p>([^<]+)</p>'),
+        "observers_section": extract_text(r'<h3>Data Center Observers[^<]*</h3>\s*<p>([^<]+)</p>'),
+        "path_to_leadership": extract_text(r'<h2>The Path to Leadership[^<]*</h2>\s*<p>([^<]+)</p>'),
+        "modernization_models": extract_text(r'<h2>Modernization Models</h2>\s*<p>([^<]+)</p>'),
+        "why_amd": extract_text(r'<h2>Why AMD[^<]*</h2>\s*<p>([^<]+)</p>'),
+    }
+    case_study = {
+        "company": extract_text(r'<h3[^>]*>Customer Success: ([^<]+)</h3>'),
+        "challenge": extract_text(r'<strong>The Challenge:</strong>\s*([^<]+)</p>'),
+        "solution": extract_text(r'<strong>The Solution:</strong>\s*([^<]+)</p>'),
+        "quote": extract_text(r'<div class="quote-text">([^<]+)</div>'),
+        "result": extract_text(r'<strong>The Result:</strong>\s*([^<]+)</p>'),
+    }
+    return EbookDocument(
+        first_name=extract_text(r'Prepared for</p>\s*<p[^>]*>([^<]+)</p>', 'Reader'),
+        company_name=extract_text(r'at ([^<]+)</p>', 'your company'),
+        personalized_hook=extract_text(r'<h3>A Message For You</h3>\s*<p>([^<]+)</p>'),
+        case_study_framing=extract_text(r'<strong>Why this matters[^<]*</strong><br>\s*([^<]+)</div>'),
+        personalized_cta=extract_text(r'<div class="personalized-cta">\s*([^<]+)</div>'),
+        case_study=case_study,
+        sections=sections,
+        html=html_content
+    )
+
+
+def _markup(text: str) -> str:
+    """Escape plain text for a reportlab Paragraph, keeping line breaks."""
+    return escape(text.strip()).replace("\n", "<br/>")
+
+
+def _blocks(text: str) -> List[str]:
+    """Split section text into paragraphs on blank lines."""
+    return [_markup(block) for block in re.split(r"\n\s*\n", text or "") if block.strip()]
+
+
+@lru_cache(maxsize=1)
+def _styles() -> Dict[str, Any]:
+    """Paragraph styles, built once per process."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.enums import TA_CENTER
+
+    amd_red = HexColor('#ED1C24')
+    dark_blue = HexColor('#1a1a2e')
+    base = getSampleStyleSheet()
+
+    title = ParagraphStyle('CustomTitle', parent=base['Heading1'], fontSize=24,
+                           textColor=amd_red, spaceAfter=12, alignment=TA_CENTER)
+    body = ParagraphStyle('CustomBody', parent=base['Normal'], fontSize=11,
+                          leading=16, spaceAfter=10)
+    return {
+        "title": title,
+        "logo": ParagraphStyle('AMDLogo', parent=title, fontSize=28, textColor=amd_red),
+        "heading": ParagraphStyle('CustomHeading', parent=base['Heading2'], fontSize=16,
+                                  textColor=dark_blue, spaceBefore=20, spaceAfter=10),
+        "subheading": ParagraphStyle('CustomSubheading', parent=base['Heading3'], fontSize=14,
+                                     textColor=amd_red, spaceBefore=15, spaceAfter=8),
+        "body": body,
+        "highlight": ParagraphStyle('Highlight', parent=base['Normal'], fontSize=12, leading=18,
+                                    textColor=dark_blue, backColor=HexColor('#f5f5f5'),
+                                    borderPadding=10, spaceAfter=15),
+        "personalized": ParagraphStyle('Personalized', parent=body, alignment=TA_CENTER, fontSize=14),
+        "company": ParagraphStyle('Company', parent=body, alignment=TA_CENTER),
+        "quote": ParagraphStyle('Quote', parent=body, leftIndent=20, rightIndent=20),
+        "footer": ParagraphStyle('Footer', parent=body, alignment=TA_CENTER),
+    }
+
+
+def _paragraph(text: str, style: str):
+    from reportlab.platypus import Paragraph
+    return Paragraph(text, _styles()[style])
+
+
+# Cached story fragments are tuples of immutable specs, turned into fresh
+# flowables per story: (markup, style name), SPACER + height in inches, or PAGE_BREAK
+SPACER = "spacer"
+PAGE_BREAK = ("page_break",)
+
+
+def _flowables(specs) -> List[Any]:
+    """Build new flowables from cached specs."""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import PageBreak, Spacer
+
+    flowables = []
+    for spec in specs:
+        if spec is PAGE_BREAK:
+            flowables.append(PageBreak())
+        elif spec[0] == SPACER:
+            flowables.append(Spacer(1, spec[1]*inch))
+        else:
+            flowables.append(_paragraph(*spec))
+    return flowables
+
+
+@lru_cache(maxsize=8)
+def _static_specs(sections_key: Tuple[Tuple[str, str], ...]) -> Tuple[tuple, tuple, tuple]:
+    """
+    Specs for static content, split and escaped once per distinct section set.
+
+    Returns:
+        (cover, body sections, why AMD) spec tuples
+    """
+    sections = dict(sections_key)
+    cover = (
+        (SPACER, 2),
+        ("AMD", "logo"),
+        (SPACER, 0.3),
+        ("FROM OBSERVERS TO<br/>ENTERPRISE AI READINESS", "title"),
+        (SPACER, 0.2),
+        ("A Strategic Guide to Data Center Modernization", "body"),
+        (SPACER, 1),
+    )
+
+    body: List[tuple] = []
+    for key, heading, heading_style in STATIC_SECTIONS:
+        blocks = _blocks(sections.get(key, ""))
+        if not blocks:
+            continue
+        if key == "path_to_leadership":
+            body.append(PAGE_BREAK)
+        body.append((heading, heading_style))
+        body.extend((block, "body") for block in blocks)
+        if key == "intro_section":
+            body.append((SPACER, 0.2))
+
+    why_amd: List[tuple] = []
+    blocks = _blocks(sections.get("why_amd", ""))
+    if blocks:
+        why_amd.append(("Why AMD: Your Strategic Partner", "heading"))
+        why_amd.extend((block, "body") for block in blocks)
+
+    return cover, tuple(body), tuple(why_amd)
+
+
+@lru_cache(maxsize=64)
+def _case_study_specs(case_study_key: Tuple[Tuple[str, str], ...]) -> tuple:
+    """Challenge/solution/quote/result specs for one case study."""
+    case_study = dict(case_study_key)
+    specs = []
+    for label, key in (("The Challenge:", "challenge"), ("The Solution:", "solution")):
+        if case_study.get(key):
+            specs.append((f"<b>{label}</b> {_markup(case_study[key])}", "body"))
+    if case_study.get("quote"):
+        specs.append((f'<i>"{_markup(case_study["quote"])}"</i>', "quote"))
+    if case_study.get("result"):
+        specs.append((f"<b>The Result:</b> {_markup(case_study['result'])}", "body"))
+    return tuple(specs)
+
+
+def build_story(document: EbookDocument) -> List[Any]:
+    """Assemble the reportlab story: cached static specs plus personalized slots."""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import PageBreak, Spacer
+
+    cover, body, why_amd = _static_specs(freeze(dict(document.sections)))
+    first_name = _markup(document.first_name)
+    company_name = _markup(document.company_name)
+
+    story = _flowables(cover)
+    story.append(_paragraph(f"<b>Prepared for {first_name}</b>", "personalized"))
+    if document.company_name and document.company_name != 'your company':
+        story.append(_paragraph(f"at {company_name}", "company"))
+    story.append(PageBreak())
+
+    # Personalized Hook
+    if document.personalized_hook:
+        story.append(_paragraph("A Message For You", "subheading"))
+        story.append(_paragraph(_markup(document.personalized_hook), "highlight"))
+        story.append(Spacer(1, 0.3*inch))
+
+    story.extend(_flowables(body))
+
+    # Case Study
+    case_study = document.case_study
+    if case_study.get("company"):
+        story.append(PageBreak())
+        story.append(_paragraph(f"Customer Success: {_markup(case_study['company'])}", "heading"))
+        if document.case_study_framing:
+            story.append(_paragraph(
+                f"<i>Why this matters for {company_name}: {_markup(document.case_study_framing)}</i>",
+                "highlight"
+            ))
+        story.extend(_flowables(_case_study_specs(freeze(case_study))))
+
+    story.extend(_flowables(why_amd))
+
+    # CTA
+    story.append(PageBreak())
+    story.append(_paragraph("Ready to Take the Next Step?", "heading"))
+    if document.personalized_cta:
+        story.append(_paragraph(_markup(document.personalized_cta), "highlight"))
+    story.append(Spacer(1, 0.5*inch))
+    story.append(_paragraph(f"<b>This guide was personalized for {first_name}</b>", "footer"))
+    return story
+
+
+def render_reportlab(document: EbookDocument) -> bytes:
+    """Render an EbookDocument to PDF bytes with reportlab."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch
+    )
+    doc.build(build_story(document))
+    return buffer.getvalue()
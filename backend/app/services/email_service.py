@@ -4,21 +4,83 @@ Supports multiple providers: SMTP, SendGrid, Resend.
 Falls back gracefully if email delivery fails.
 """
 
+import asyncio
+import base64
+import json
 import logging
 import os
-import smtplib
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime
 
 import httpx
 
 from app.config import settings
+from app.services.enrichment_apis import parse_retry_after
+from app.services.smtp_pool import get_smtp_pool, close_smtp_pool
 
 logger = logging.getLogger(__name__)
 
+SENDGRID_MAIL_URL = "https://api.sendgrid.com/v3/mail/send"
+# SendGrid v3 accepts at most 1000 personalizations per mail/send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+# Statuses worth retrying; anything else fails the batch permanently
+SENDGRID_TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+# Permanent 4xx that concern the whole account, not one recipient
+SENDGRID_ACCOUNT_STATUSES = {401, 403}
+
+# Payload size and send latency per delivery mode ("link" / "attachment")
+_delivery_stats: Dict[str, Counter] = {"link": Counter(), "attachment": Counter()}
+
+
+def get_delivery_stats() -> Dict[str, Dict[str, Any]]:
+    """Average payload size and send latency for each delivery mode."""
+    stats = {}
+    for mode, counts in _delivery_stats.items():
+        sends = counts["sends"]
+        stats[mode] = {
+            "sends": sends,
+            "avg_payload_bytes": int(counts["payload_bytes"] / sends) if sends else None,
+            "avg_send_ms": round(counts["send_ms"] / sends, 1) if sends else None,
+        }
+    return stats
+
+
+# Shared HTTP client for SendGrid/Resend, bound to the running event loop
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client shared by the API-based email providers."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_email_transports() -> None:
+    """Flush batched sends, then close the shared HTTP client and SMTP pool (app shutdown)."""
+    global _http_client, _http_client_loop
+    if _batch_sender is not None:
+        await _batch_sender.flush()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _http_client_loop = None
+    await close_smtp_pool()
+
 
 class EmailService:
     """
@@ -29,11 +91,15 @@ class EmailService:
     - SendGrid API
     - Resend API
     - Mock mode for testing
+
+    By default the email carries a link to the stored PDF
+    (EMAIL_DELIVERY_MODE=link); attaching the PDF is opt-in.
     """
 
     def __init__(self):
         """Initialize email service based on available credentials."""
         self.provider = self._detect_provider()
+        self.delivery_mode = settings.EMAIL_DELIVERY_MODE
         self.from_email = os.getenv("EMAIL_FROM", "noreply@example.com")
         self.from_name = os.getenv("EMAIL_FROM_NAME", "Your Personalized Ebook")
         logger.info(f"Email service initialized with provider: {self.provider}")
@@ -52,33 +118,52 @@ class EmailService:
     async def send_ebook(
         self,
         to_email: str,
-        pdf_bytes: bytes,
+        pdf_bytes: Optional[bytes],
         profile: Dict[str, Any],
         intro_hook: str,
-        cta: str
+        cta: str,
+        pdf_url: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Send personalized ebook PDF via email.
+        Send personalized ebook via email, as a link or an attachment.
+
+        Link mode is used when a public pdf_url is available; otherwise (or
+        with EMAIL_DELIVERY_MODE=attachment) the PDF bytes are attached.
 
         Args:
             to_email: Recipient email address
-            pdf_bytes: PDF file content
+            pdf_bytes: PDF file content (not needed in link mode)
             profile: User profile data for personalization
             intro_hook: Personalized intro hook
             cta: Personalized CTA
+            pdf_url: Signed or short link to the stored PDF
 
         Returns:
-            Dict with success status, message_id, provider
+            Dict with success status, message_id, provider, delivery_mode,
+            payload_bytes and send_ms
         """
         first_name = profile.get("first_name", "there")
         company = profile.get("company_name", "your company")
 
         subject = f"{first_name}, your personalized ebook is ready!"
-        html_body = self._build_email_html(first_name, company, intro_hook, cta)
-        text_body = self._build_email_text(first_name, company, intro_hook, cta)
 
         try:
-            if self.provider == "sendgrid":
+            link = self._choose_link(pdf_url, pdf_bytes)
+            if link:
+                pdf_bytes = None
+            html_body = self._build_email_html(first_name, company, intro_hook, cta, link)
+            text_body = self._build_email_text(first_name, company, intro_hook, cta, link)
+            mode = "link" if link else "attachment"
+
+            start = time.perf_counter()
+            if self.provider == "sendgrid" and link and settings.SENDGRID_TEMPLATE_ID:
+                # Template sends are coalesced with other recipients into bulk requests
+                result = await self.send_template_email(
+                    to_email, self.ebook_template_data(profile, intro_hook, cta, link)
+                )
+                if not result.get("success"):
+                    return result
+            elif self.provider == "sendgrid":
                 result = await self._send_via_sendgrid(
                     to_email, subject, html_body, text_body, pdf_bytes
                 )
@@ -92,8 +177,22 @@ class EmailService:
                 )
             else:
                 result = self._send_mock(to_email, subject)
-
-            logger.info(f"Email sent to {to_email} via {self.provider}")
+                result["payload_bytes"] = len(html_body) + len(text_body) + (
+                    len(base64.b64encode(pdf_bytes)) if pdf_bytes else 0
+                )
+            send_ms = (time.perf_counter() - start) * 1000
+
+            result["delivery_mode"] = mode
+            result["send_ms"] = round(send_ms, 1)
+            counts = _delivery_stats[mode]
+            counts["sends"] += 1
+            counts["payload_bytes"] += result.get("payload_bytes", 0)
+            counts["send_ms"] += send_ms
+
+            logger.info(
+                f"Email sent to {to_email} via {self.provider} ({mode}, "
+                f"{result.get('payload_bytes', 0)} bytes, {send_ms:.0f}ms)"
+            )
             return result
 
         except Exception as e:
@@ -105,14 +204,118 @@ class EmailService:
                 "timestamp": datetime.utcnow().isoformat()
             }
 
+    @staticmethod
+    def ebook_template_data(
+        profile: Dict[str, Any],
+        intro_hook: str,
+        cta: str,
+        pdf_url: str
+    ) -> Dict[str, Any]:
+        """dynamic_template_data for the ebook email template."""
+        return {
+            "first_name": profile.get("first_name") or "there",
+            "company": profile.get("company_name") or "your company",
+            "intro_hook": intro_hook,
+            "cta": cta,
+            "pdf_url": pdf_url,
+        }
+
+    def _choose_link(self, pdf_url: Optional[str], pdf_bytes: Optional[bytes]) -> Optional[str]:
+        """Return the URL to send in link mode, or None to attach the PDF."""
+        # data: URLs (no storage configured) are not usable in an email
+        linkable = pdf_url if pdf_url and pdf_url.startswith(("https://", "http://")) else None
+        if self.delivery_mode == "attachment" and pdf_bytes:
+            return None
+        if linkable:
+            return linkable
+        if pdf_bytes:
+            return None
+        raise ValueError("Neither a public PDF link nor PDF bytes to attach")
+
+    async def send_template_email(
+        self,
+        to_email: str,
+        template_data: Dict[str, Any],
+        template_id: Optional[str] = None,
+        custom_args: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a dynamic-template email through the batching SendGrid sender.
+
+        Concurrent calls are coalesced into bulk requests, so campaign
+        re-sends cost one HTTP call per 1000 recipients rather than one each.
+
+        Args:
+            to_email: Recipient email address
+            template_data: dynamic_template_data (e.g. first_name, pdf_url)
+            template_id: SendGrid template (defaults to SENDGRID_TEMPLATE_ID)
+            custom_args: Per-recipient values echoed back in event webhooks
+
+        Returns:
+            Dict with success status, provider, message_id, batch_size
+        """
+        template_id = template_id or settings.SENDGRID_TEMPLATE_ID
+        if self.provider == "mock":
+            return self._send_mock(to_email, f"template {template_id}")
+        if self.provider != "sendgrid" or not template_id:
+            return {
+                "success": False,
+                "provider": self.provider,
+                "error": "Template sends require SendGrid and a template ID",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+
+        try:
+            return await get_batch_sender().send(to_email, template_id, template_data, custom_args)
+        except SendGridBatchError as e:
+            logger.error(f"Template email failed for {to_email}: {e}")
+            return {
+                "success": False,
+                "provider": self.provider,
+                "email": to_email,
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+
+    async def send_template_batch(
+        self,
+        recipients: List[Dict[str, Any]],
+        template_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send one template to many recipients.
+
+        Args:
+            recipients: Dicts with "email", "template_data" and optional "custom_args"
+            template_id: SendGrid template (defaults to SENDGRID_TEMPLATE_ID)
+
+        Returns:
+            Per-recipient results, in input order
+        """
+        return await asyncio.gather(*[
+            self.send_template_email(
+                r["email"], r.get("template_data", {}), template_id, r.get("custom_args")
+            )
+            for r in recipients
+        ])
+
     def _build_email_html(
         self,
         first_name: str,
         company: str,
         intro_hook: str,
-        cta: str
+        cta: str,
+        pdf_url: Optional[str] = None
     ) -> str:
-        """Build HTML email body."""
+        """Build HTML email body (with a download button in link mode)."""
+        if pdf_url:
+            delivery = f"""<p style="font-size: 16px;">Your personalized ebook is ready. We've customized it based on your role and industry to deliver maximum value.</p>
+
+    <p style="text-align: center; margin: 30px 0;">
+        <a href="{pdf_url}" style="background: #667eea; color: white; padding: 14px 28px; border-radius: 6px; text-decoration: none; font-weight: 600;">Download your ebook</a>
+    </p>"""
+        else:
+            delivery = """<p style="font-size: 16px;">Your personalized ebook is attached to this email. We've customized it based on your role and industry to deliver maximum value.</p>"""
         return f"""
 <!DOCTYPE html>
 <html>
@@ -134,7 +337,7 @@ class EmailService:
         <p style="margin: 0; font-weight: 600; color: #1a365d;">{cta}</p>
     </div>
 
-    <p style="font-size: 16px;">Your personalized ebook is attached to this email. We've customized it based on your role and industry to deliver maximum value.</p>
+    {delivery}
 
     <p style="font-size: 16px; margin-top: 30px;">
         Best regards,<br>
@@ -156,9 +359,15 @@ class EmailService:
         first_name: str,
         company: str,
         intro_hook: str,
-        cta: str
+        cta: str,
+        pdf_url: Optional[str] = None
     ) -> str:
         """Build plain text email body."""
+        value = "We've customized it based on your role and industry to deliver maximum value."
+        if pdf_url:
+            delivery = f"Your personalized ebook is ready. {value}\n\nDownload it here: {pdf_url}"
+        else:
+            delivery = f"Your personalized ebook is attached to this email. {value}"
         return f"""
 Your Personalized Ebook - Tailored for {company}
 
@@ -168,7 +377,7 @@ Hi {first_name},
 
 {cta}
 
-Your personalized ebook is attached to this email. We've customized it based on your role and industry to deliver maximum value.
+{delivery}
 
 Best regards,
 The Team
@@ -183,43 +392,44 @@ This email was sent because you requested a personalized ebook.
         subject: str,
         html_body: str,
         text_body: str,
-        pdf_bytes: bytes
+        pdf_bytes: Optional[bytes]
     ) -> Dict[str, Any]:
         """Send email via SendGrid API."""
-        import base64
-
         api_key = os.getenv("SENDGRID_API_KEY")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "personalizations": [{"to": [{"email": to_email}]}],
-                    "from": {"email": self.from_email, "name": self.from_name},
-                    "subject": subject,
-                    "content": [
-                        {"type": "text/plain", "value": text_body},
-                        {"type": "text/html", "value": html_body}
-                    ],
-                    "attachments": [{
-                        "content": base64.b64encode(pdf_bytes).decode(),
-                        "filename": "your-personalized-ebook.pdf",
-                        "type": "application/pdf",
-                        "disposition": "attachment"
-                    }]
-                },
-                timeout=30.0
-            )
+        payload: Dict[str, Any] = {
+            "personalizations": [{"to": [{"email": to_email}]}],
+            "from": {"email": self.from_email, "name": self.from_name},
+            "subject": subject,
+            "content": [
+                {"type": "text/plain", "value": text_body},
+                {"type": "text/html", "value": html_body}
+            ]
+        }
+        if pdf_bytes:
+            payload["attachments"] = [{
+                "content": base64.b64encode(pdf_bytes).decode(),
+                "filename": "your-personalized-ebook.pdf",
+                "type": "application/pdf",
+                "disposition": "attachment"
+            }]
+        body = json.dumps(payload).encode()
+
+        response = await get_http_client().post(
+            SENDGRID_MAIL_URL,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            content=body
+        )
 
         if response.status_code in (200, 202):
             return {
                 "success": True,
                 "provider": "sendgrid",
                 "message_id": response.headers.get("X-Message-Id", "unknown"),
+                "payload_bytes": len(body),
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
@@ -230,32 +440,32 @@ This email was sent because you requested a personalized ebook.
         to_email: str,
         subject: str,
         html_body: str,
-        pdf_bytes: bytes
+        pdf_bytes: Optional[bytes]
     ) -> Dict[str, Any]:
         """Send email via Resend API."""
-        import base64
-
         api_key = os.getenv("RESEND_API_KEY")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "from": f"{self.from_name} <{self.from_email}>",
-                    "to": [to_email],
-                    "subject": subject,
-                    "html": html_body,
-                    "attachments": [{
-                        "content": base64.b64encode(pdf_bytes).decode(),
-                        "filename": "your-personalized-ebook.pdf"
-                    }]
-                },
-                timeout=30.0
-            )
+        payload: Dict[str, Any] = {
+            "from": f"{self.from_name} <{self.from_email}>",
+            "to": [to_email],
+            "subject": subject,
+            "html": html_body
+        }
+        if pdf_bytes:
+            payload["attachments"] = [{
+                "content": base64.b64encode(pdf_bytes).decode(),
+                "filename": "your-personalized-ebook.pdf"
+            }]
+        body = json.dumps(payload).encode()
+
+        response = await get_http_client().post(
+            "https://api.resend.com/emails",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            content=body
+        )
 
         if response.status_code == 200:
             data = response.json()
@@ -263,6 +473,7 @@ This email was sent because you requested a personalized ebook.
                 "success": True,
                 "provider": "resend",
                 "message_id": data.get("id", "unknown"),
+                "payload_bytes": len(body),
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
@@ -274,15 +485,30 @@ This email was sent because you requested a personalized ebook.
         subject: str,
         html_body: str,
         text_body: str,
-        pdf_bytes: bytes
+        pdf_bytes: Optional[bytes]
     ) -> Dict[str, Any]:
-        """Send email via SMTP."""
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USER", "")
-        smtp_pass = os.getenv("SMTP_PASS", "")
-        use_tls = os.getenv("SMTP_TLS", "true").lower() == "true"
+        """Send email via SMTP on a pooled connection (off the event loop)."""
+        msg = self._build_mime_message(to_email, subject, html_body, text_body, pdf_bytes)
+
+        size = await get_smtp_pool().send(msg)
+
+        return {
+            "success": True,
+            "provider": "smtp",
+            "message_id": f"smtp-{datetime.utcnow().timestamp()}",
+            "payload_bytes": size,
+            "timestamp": datetime.utcnow().isoformat()
+        }
 
+    def _build_mime_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        text_body: str,
+        pdf_bytes: Optional[bytes]
+    ) -> MIMEMultipart:
+        """Build a multipart message with text/html bodies and, optionally, the PDF attached."""
         msg = MIMEMultipart("mixed")
         msg["From"] = f"{self.from_name} <{self.from_email}>"
         msg["To"] = to_email
@@ -294,29 +520,16 @@ This email was sent because you requested a personalized ebook.
         alt_part.attach(MIMEText(html_body, "html"))
         msg.attach(alt_part)
 
-        # Attach PDF
-        pdf_attachment = MIMEApplication(pdf_bytes, _subtype="pdf")
-        pdf_attachment.add_header(
-            "Content-Disposition",
-            "attachment",
-            filename="your-personalized-ebook.pdf"
-        )
-        msg.attach(pdf_attachment)
-
-        # Send via SMTP
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            if use_tls:
-                server.starttls()
-            if smtp_user and smtp_pass:
-                server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
-
-        return {
-            "success": True,
-            "provider": "smtp",
-            "message_id": f"smtp-{datetime.utcnow().timestamp()}",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        # Attach PDF (attachment mode only)
+        if pdf_bytes:
+            pdf_attachment = MIMEApplication(pdf_bytes, _subtype="pdf")
+            pdf_attachment.add_header(
+                "Content-Disposition",
+                "attachment",
+                filename="your-personalized-ebook.pdf"
+            )
+            msg.attach(pdf_attachment)
+        return msg
 
     def _send_mock(self, to_email: str, subject: str) -> Dict[str, Any]:
         """Mock email send for testing."""
@@ -328,3 +541,297 @@ This email was sent because you requested a personalized ebook.
             "timestamp": datetime.utcnow().isoformat(),
             "note": "Email delivery simulated (no email provider configured)"
         }
+
+
+class SendGridBatchError(Exception):
+    """A SendGrid mail/send request failed as a whole."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        """Network errors, 429 and 5xx are retried; other statuses are not."""
+        return self.status_code is None or self.status_code in SENDGRID_TRANSIENT_STATUSES
+
+    @property
+    def per_recipient(self) -> bool:
+        """Permanent 4xx that a single bad recipient (e.g. a malformed address) can cause."""
+        return (
+            self.status_code is not None and 400 <= self.status_code < 500
+            and not self.transient and self.status_code not in SENDGRID_ACCOUNT_STATUSES
+        )
+
+
+@dataclass
+class QueuedEmail:
+    """One recipient waiting for a batched SendGrid send."""
+
+    to_email: str
+    template_id: str
+    template_data: Dict[str, Any]
+    future: asyncio.Future
+    custom_args: Dict[str, str] = field(default_factory=dict)
+    attempts: int = 0
+
+
+class SendGridBatchSender:
+    """
+    Sends dynamic-template emails in bulk SendGrid requests.
+
+    Queued recipients are grouped by template and sent as one mail/send
+    call per 1000 personalizations, each carrying its own
+    dynamic_template_data. Each caller awaits the result for its own
+    recipient. Batches that fail transiently (network, 429, 5xx) go to a
+    retry queue with backoff (or Retry-After) until max_attempts. A batch
+    rejected with a per-recipient 4xx is bisected until the bad recipients
+    are isolated, so the rest are still delivered.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        from_email: str,
+        from_name: str,
+        flush_seconds: float = 2.0,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 2.0
+    ):
+        """
+        Initialize sender.
+
+        Args:
+            api_key: SendGrid API key
+            from_email: Sender address
+            from_name: Sender display name
+            flush_seconds: How long to collect recipients before sending
+            max_attempts: Send attempts per recipient before giving up
+            retry_base_seconds: Base delay for exponential retry backoff
+        """
+        self.api_key = api_key
+        self.from_email = from_email
+        self.from_name = from_name
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        # template_id -> recipients waiting to be sent
+        self._queue: Dict[str, List[QueuedEmail]] = {}
+        # backoff timer -> recipients it will re-queue
+        self._retries: Dict[asyncio.TimerHandle, List[QueuedEmail]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats: Counter = Counter()
+
+    async def send(
+        self,
+        to_email: str,
+        template_id: str,
+        template_data: Dict[str, Any],
+        custom_args: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue one recipient and wait for its batch to be accepted.
+
+        Args:
+            to_email: Recipient address
+            template_id: SendGrid dynamic template ID
+            template_data: dynamic_template_data for this recipient
+            custom_args: Per-recipient custom_args echoed back in event webhooks
+
+        Returns:
+            Per-recipient result (email, status, message_id, batch_size, attempts)
+
+        Raises:
+            SendGridBatchError: If the batch failed permanently or retries ran out
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(QueuedEmail(
+            to_email=to_email,
+            template_id=template_id,
+            template_data=template_data,
+            future=future,
+            custom_args=custom_args or {}
+        ))
+        self._stats["queued"] += 1
+        return await future
+
+    async def flush(self) -> None:
+        """Send everything queued now (including pending retries) and wait for it."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue or self._tasks or self._retries:
+            # Shutdown does not wait out backoff delays
+            for timer in list(self._retries):
+                timer.cancel()
+                self._requeue(timer)
+            await asyncio.gather(self._flush_queue(), *list(self._tasks), return_exceptions=True)
+
+    def _enqueue(self, item: QueuedEmail) -> None:
+        group = self._queue.setdefault(item.template_id, [])
+        group.append(item)
+        if len(group) >= SENDGRID_MAX_PERSONALIZATIONS:
+            self._start(self._flush_queue())
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._start(self._flush_queue())
+
+    def _start(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_queue(self) -> None:
+        """Send queued recipients, one request per template per 1000 recipients."""
+        pending, self._queue = self._queue, {}
+        for template_id, items in pending.items():
+            for start in range(0, len(items), SENDGRID_MAX_PERSONALIZATIONS):
+                await self._send_batch(template_id, items[start:start + SENDGRID_MAX_PERSONALIZATIONS])
+
+    async def _send_batch(self, template_id: str, items: List[QueuedEmail]) -> None:
+        # Drop recipients whose callers have gone away
+        items = [item for item in items if not item.future.done()]
+        if not items:
+            return
+        for item in items:
+            item.attempts += 1
+        await self._deliver(template_id, items)
+
+    async def _deliver(self, template_id: str, items: List[QueuedEmail]) -> None:
+        """Post one batch and settle its recipients' futures (same attempt when split)."""
+        try:
+            message_id = await self._post(template_id, items)
+        except SendGridBatchError as e:
+            if e.per_recipient and len(items) > 1:
+                self._stats["splits"] += 1
+                middle = len(items) // 2
+                logger.info(f"SendGrid rejected a batch of {len(items)} ({e.status_code}), splitting it")
+                await self._deliver(template_id, items[:middle])
+                await self._deliver(template_id, items[middle:])
+                return
+            self._handle_failure(items, e)
+            return
+
+        self._stats["requests"] += 1
+        self._stats["sent"] += len(items)
+        for item in items:
+            if not item.future.done():
+                item.future.set_result({
+                    "success": True,
+                    "provider": "sendgrid",
+                    "email": item.to_email,
+                    "status": "accepted",
+                    "message_id": message_id,
+                    "batch_size": len(items),
+                    "attempts": item.attempts,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+
+    async def _post(self, template_id: str, items: List[QueuedEmail]) -> str:
+        """Issue one mail/send request and return SendGrid's message ID."""
+        personalizations = []
+        for item in items:
+            personalization: Dict[str, Any] = {
+                "to": [{"email": item.to_email}],
+                "dynamic_template_data": item.template_data
+            }
+            if item.custom_args:
+                personalization["custom_args"] = item.custom_args
+            personalizations.append(personalization)
+
+        try:
+            response = await get_http_client().post(
+                SENDGRID_MAIL_URL,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "personalizations": personalizations,
+                    "from": {"email": self.from_email, "name": self.from_name},
+                    "template_id": template_id
+                }
+            )
+        except httpx.HTTPError as e:
+            raise SendGridBatchError(f"SendGrid request failed: {e}") from e
+
+        if response.status_code not in (200, 202):
+            raise SendGridBatchError(
+                f"SendGrid API error: {response.status_code} - {response.text}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        return response.headers.get("X-Message-Id", "unknown")
+
+    def _handle_failure(self, items: List[QueuedEmail], error: SendGridBatchError) -> None:
+        """Re-queue transient failures with backoff; fail the rest."""
+        retry = [item for item in items if error.transient and item.attempts < self.max_attempts]
+        for item in items:
+            if item not in retry and not item.future.done():
+                self._stats["failed"] += 1
+                item.future.set_exception(error)
+        if not retry:
+            logger.error(f"SendGrid batch of {len(items)} failed: {error}")
+            return
+
+        attempt = max(item.attempts for item in retry)
+        delay = error.retry_after
+        if delay is None:
+            delay = random.uniform(0, self.retry_base_seconds * 2 ** (attempt - 1))
+        logger.warning(f"SendGrid batch of {len(retry)} failed ({error}), retrying in {delay:.1f}s")
+        self._stats["retried"] += len(retry)
+        timer = asyncio.get_running_loop().call_later(delay, lambda: self._requeue(timer))
+        self._retries[timer] = retry
+
+    def _requeue(self, timer: asyncio.TimerHandle) -> None:
+        for item in self._retries.pop(timer, []):
+            self._enqueue(item)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return queued/sent/failed/split counts and HTTP requests saved by batching."""
+        return {
+            "queued": self._stats["queued"],
+            "sent": self._stats["sent"],
+            "failed": self._stats["failed"],
+            "retried": self._stats["retried"],
+            "splits": self._stats["splits"],
+            "requests": self._stats["requests"],
+            "pending": sum(len(items) for items in self._queue.values()),
+            "awaiting_retry": sum(len(items) for items in self._retries.values()),
+            "requests_saved": max(0, self._stats["sent"] - self._stats["requests"]),
+        }
+
+
+# Global batch sender (lazy-loaded; shared across EmailService instances)
+_batch_sender: Optional[SendGridBatchSender] = None
+
+
+def get_batch_sender() -> SendGridBatchSender:
+    """Get or create the SendGrid batch sender from environment settings."""
+    global _batch_sender
+    if _batch_sender is None:
+        _batch_sender = SendGridBatchSender(
+            api_key=os.getenv("SENDGRID_API_KEY", ""),
+            from_email=os.getenv("EMAIL_FROM", "noreply@example.com"),
+            from_name=os.getenv("EMAIL_FROM_NAME", "Your Personalized Ebook"),
+            flush_seconds=settings.EMAIL_BATCH_FLUSH_SECONDS,
+            max_attempts=settings.EMAIL_BATCH_MAX_ATTEMPTS
+        )
+    return _batch_sender
+
+
+# Singleton instance, built at startup (see app.main lifespan)
+_email_service: Optional[EmailService] = None
+
+
+def get_email_service() -> EmailService:
+    """Get or create the shared EmailService."""
+    global _email_service
+    if _email_service is None:
+        _email_service = EmailService()
+    return _email_service
@@ -7,7 +7,8 @@ All API keys loaded from environment variables.
 import logging
 import asyncio
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import httpx
 from abc import ABC, abstractmethod
 
@@ -25,17 +26,47 @@ DEEP_ENRICHMENT_TIMEOUT = 60.0
 class EnrichmentAPIError(Exception):
     """Base exception for enrichment API errors."""
 
-    def __init__(self, source: str, message: str, status_code: Optional[int] = None):
+    def __init__(
+        self,
+        source: str,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
         self.source = source
         self.message = message
         self.status_code = status_code
+        self.retry_after = retry_after
         super().__init__(f"{source}: {message}")
 
 
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 class BaseEnrichmentAPI(ABC):
     """Base class for enrichment API integrations."""
 
     source_name: str = "unknown"
+    # Rate-limit tokens consumed per enrich() call (vendor requests issued)
+    request_cost: int = 1
 
     @abstractmethod
     async def enrich(self, email: str, domain: Optional[str] = None) -> Dict[str, Any]:
@@ -48,7 +79,8 @@ class BaseEnrichmentAPI(ABC):
             raise EnrichmentAPIError(
                 source=self.source_name,
                 message=f"API returned {response.status_code}: {response.text[:200]}",
-                status_code=response.status_code
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
             )
 
 
@@ -426,6 +458,8 @@ class GNewsAPI(BaseEnrichmentAPI):
 
     source_name = "gnews"
     base_url = "https://gnews.io/api/v4"
+    # enrich() fans out to five search queries
+    request_cost = 5
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.GNEWS_API_KEY
@@ -524,6 +558,14 @@ class GNewsAPI(BaseEnrichmentAPI):
 
             responses = await asyncio.gather(*tasks, return_exceptions=True)
 
+            # Every query throttled: surface the 429 so the caller can back off
+            throttled = [
+                r for r in responses
+                if isinstance(r, httpx.Response) and r.status_code == 429
+            ]
+            if throttled and len(throttled) == len(responses):
+                self._handle_error(throttled[0])
+
             all_articles = []
             for i, response in enumerate(responses):
                 if isinstance(response, Exception):
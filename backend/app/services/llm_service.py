@@ -4,33 +4,32 @@ Multi-provider support with fallback: Anthropic → OpenAI → Gemini → mock.
 Implements structured output, validation, and retry logic.
 """
 
+import importlib.util
 import logging
 import json
 import time
 import re
 from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
-
-import anthropic
-from anthropic import APIError as AnthropicAPIError, APITimeoutError as AnthropicTimeoutError, RateLimitError as AnthropicRateLimitError
+from functools import lru_cache
 
 from app.config import settings
+from app.services.prompt_budget import PromptBuilder, estimate_tokens
+from app.services.tracing import Span, span
 
 logger = logging.getLogger(__name__)
 
-# Try to import optional providers
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# Provider SDKs are imported on first use (_provider_client): together they
+# dominate worker import time. Only check here that they are installed.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     logger.info("OpenAI not installed, skipping as fallback")
 
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
     GEMINI_AVAILABLE = False
+if not GEMINI_AVAILABLE:
     logger.info("Google Generative AI not installed, skipping as fallback")
 
 # Constants
@@ -43,6 +42,23 @@ ANTHROPIC_OPUS = "claude-opus-4-5-20251101"
 OPENAI_MODEL = "gpt-4o-mini"
 GEMINI_MODEL = "gemini-1.5-flash"
 
+# USD per million (input, output) tokens, for per-lead cost accounting
+MODEL_PRICING = {
+    ANTHROPIC_MODEL: (0.80, 4.00),
+    ANTHROPIC_OPUS: (5.00, 25.00),
+    OPENAI_MODEL: (0.15, 0.60),
+    GEMINI_MODEL: (0.075, 0.30),
+}
+
+# Cached prompt tokens as a fraction of the input price (Anthropic reads 0.1x and
+# writes 1.25x; OpenAI caches automatically at 0.5x with no write premium)
+CACHE_READ_RATE = {
+    ANTHROPIC_MODEL: 0.1,
+    ANTHROPIC_OPUS: 0.1,
+    OPENAI_MODEL: 0.5,
+}
+CACHE_WRITE_RATE = 1.25
+
 # Output constraints
 MAX_INTRO_LENGTH = 200  # characters
 MAX_CTA_LENGTH = 150  # characters
@@ -106,6 +122,272 @@ def get_company_size_info(size: str) -> Dict[str, str]:
     return COMPANY_SIZE_MAPPING.get(size, {"label": "company", "employee_range": "unknown", "segment": "unknown"})
 
 
+# ---------------------------------------------------------------------------
+# Static prompt content, built once per process. System prompts are the
+# cacheable prefix of every request (Anthropic cache_control, OpenAI
+# automatic prefix caching); per-lead data only goes in the user prompt.
+# ---------------------------------------------------------------------------
+
+SYSTEM_PROMPT = """You are a B2B marketing copywriter creating personalized content for ebook landing pages.
+
+Your task: Generate a personalized intro hook (1-2 sentences) and call-to-action (CTA) based on the prospect's profile.
+
+Rules:
+1. Be conversational and specific to their role/company
+2. Reference their industry or company context when available
+3. Keep intro under 200 characters
+4. Keep CTA under 150 characters
+5. Do NOT make unsubstantiated claims (no "guaranteed", "proven", "#1", etc.)
+6. Do NOT use superlatives without evidence
+7. Sound helpful, not salesy
+
+Output ONLY valid JSON in this exact format:
+{
+  "intro_hook": "Your personalized intro here",
+  "cta": "Your call to action here"
+}
+
+No other text before or after the JSON."""
+
+# Ebook case studies by INDUSTRY_TO_CASE_STUDY key. The whole library sits in
+# the cached system prompt; the user prompt only names the selected key.
+EBOOK_CASE_STUDIES: Dict[str, Dict[str, str]] = {
+    "healthcare": {
+        "name": "PQR",
+        "selected": "PQR + Healthcare angle - compliance, patient data, security",
+        "angles": "HIPAA compliance, secure AI, data governance",
+        "highlight": "Compliance, security, patient outcome improvements",
+        "metric": "40% faster threat detection, HIPAA compliance",
+    },
+    "financial": {
+        "name": "PQR",
+        "selected": "PQR + Financial angle - security, compliance, automation",
+        "angles": "regulatory compliance, fraud detection, risk management",
+        "highlight": "Compliance, processing speed, risk reduction",
+        "metric": "40% faster threat detection, regulatory compliance",
+    },
+    "manufacturing": {
+        "name": "Smurfit Westrock",
+        "selected": "SMURFIT WESTROCK - manufacturing, cost optimization, sustainability",
+        "angles": "25% cost reduction, carbon footprint, operational efficiency",
+        "highlight": "Cost savings, sustainability, operational uptime",
+        "metric": "25% cost reduction, 30% emissions reduction",
+    },
+    "telecom_tech": {
+        "name": "KT Cloud",
+        "selected": "KT CLOUD - AI/GPU cloud services, massive scale, innovation focus",
+        "angles": "cloud-native AI, GPU acceleration, developer platform",
+        "highlight": "Scale, performance, time-to-market",
+        "metric": "Massive scale AI/GPU deployment, cloud-native platform",
+    },
+    "general": {
+        "name": "PQR",
+        "selected": "PQR - IT services, security, automation",
+        "angles": "automation, security, operational excellence",
+        "highlight": "Efficiency, security posture, automation ROI",
+        "metric": "40% efficiency gains, security automation",
+    },
+}
+
+_CASE_STUDY_LIBRARY = "\n".join(
+    f"""[{key.upper()}] {study['selected']}
+  Name: {study['name']}
+  Key angles: {study['angles']}
+  Metrics to highlight: {study['highlight']}
+  Metric to cite: {study['metric']}"""
+    for key, study in EBOOK_CASE_STUDIES.items()
+)
+
+EBOOK_SYSTEM_PROMPT = """You are a B2B marketing expert creating DEEPLY personalized content for AMD's enterprise AI readiness ebook.
+
+CRITICAL REQUIREMENT: You MUST explicitly reference specific data points from the enrichment data. Generic content is UNACCEPTABLE.
+
+The ebook covers:
+- Three stages: Leaders (33% - fully modernized), Challengers (58% - in progress), Observers (9% - planning)
+- Modernization strategies: "modernize in place" vs "refactor and shift"
+- Case studies: KT Cloud (AI/GPU cloud), Smurfit Westrock (25% cost reduction), PQR (security/automation)
+
+YOUR TASK: Generate 3 sections with MANDATORY data references:
+
+1. PERSONALIZED_HOOK (2-3 sentences) - MUST include at least 2 of these:
+   ✓ Company name (REQUIRED - always use their actual company name)
+   ✓ A specific news headline or theme if provided (e.g., "With [Company]'s recent focus on [news theme]...")
+   ✓ Company size/employee count (e.g., "As a [X]-employee organization...")
+   ✓ Funding stage if known (e.g., "As a [Series B] company...")
+   ✓ Growth trajectory if known (e.g., "With [Company]'s [X%] growth...")
+   ✓ Their specific role/title (e.g., "As a [CTO]...")
+
+2. CASE_STUDY_FRAMING (2-3 sentences) - MUST include:
+   ✓ The case study company name (KT Cloud, Smurfit Westrock, or PQR)
+   ✓ A specific metric from the case study (e.g., "25% cost reduction", "40% faster deployment")
+   ✓ A direct comparison to THEIR company (e.g., "Like [Company], [Case Study] faced...")
+   ✓ Reference to their industry or company size for relevance
+
+3. PERSONALIZED_CTA (1-2 sentences) - MUST include:
+   ✓ Their company name
+   ✓ Language matching their buying stage:
+     - Awareness: "discover", "understand", "explore"
+     - Consideration: "compare", "evaluate", "see how"
+     - Decision: "get the data", "validate", "confirm"
+     - Implementation: "access the playbook", "accelerate"
+
+FAILURE CONDITIONS (will be rejected):
+✗ Using generic phrases like "organizations like yours" instead of actual company name
+✗ Not mentioning any specific news, funding, or growth data when it's provided
+✗ Not naming the case study company
+✗ Not including specific metrics
+
+RULES:
+- No unsubstantiated claims ("guaranteed", "proven", "#1")
+- Sound consultative, not salesy
+- If a data point is missing, skip it - but USE what's available
+
+CASE STUDY LIBRARY (the request names which one to highlight):
+""" + _CASE_STUDY_LIBRARY + """
+
+OUTPUT REQUIREMENTS - your JSON output MUST:
+1. personalized_hook: Start with the exact COMPANY NAME from the mandatory data, or reference their news/growth
+2. case_study_framing: Name the selected case study company AND cite its metric from the library
+3. personalized_cta: Include the exact COMPANY NAME and match the BUYING STAGE from the mandatory data
+
+Output ONLY valid JSON:
+{
+  "personalized_hook": "Your personalized opening with explicit data references...",
+  "case_study_framing": "Case study connection with specific metrics and company comparison...",
+  "personalized_cta": "Stage-appropriate CTA with company name..."
+}"""
+
+# Goal/buying stage mapping for more natural language
+GOAL_DESCRIPTIONS = {
+    "awareness": "just starting to research and explore options",
+    "consideration": "actively evaluating and comparing different solutions",
+    "decision": "ready to make a decision and need final validation",
+    "implementation": "already implementing and looking for guidance",
+    # Legacy values
+    "exploring": "exploring modernization options and doing early research",
+    "evaluating": "comparing different approaches for their organization",
+    "learning": "learning about best practices and industry trends",
+    "building_case": "building a business case to present internally"
+}
+
+# Persona/role mapping for richer context
+PERSONA_DESCRIPTIONS = {
+    "c_suite": "a C-suite executive (CEO, CTO, CIO, CFO) focused on strategic outcomes and ROI",
+    "vp_director": "a VP or Director level leader balancing strategy with execution",
+    "it_infrastructure": "an IT/Infrastructure manager overseeing technical operations",
+    "engineering": "an engineering or DevOps professional focused on implementation",
+    "data_ai": "a data science or AI/ML professional optimizing workloads",
+    "security": "a security or compliance professional protecting systems and data",
+    "procurement": "a procurement professional evaluating vendors and costs",
+    # Legacy values
+    "executive": "an executive leader (C-suite or VP level) focused on strategic decisions",
+    "sales_gtm": "a sales or GTM leader driving revenue growth",
+    "hr_people": "an HR/People Ops professional managing talent and culture",
+    "other": "a professional seeking industry insights"
+}
+
+# Industry-specific angles (expanded to match frontend)
+INDUSTRY_ANGLES = {
+    "technology": "innovation velocity, scalability, and technical excellence",
+    "financial_services": "risk management, regulatory compliance, and digital transformation",
+    "healthcare": "compliance, patient outcomes, and operational efficiency",
+    "retail_ecommerce": "customer experience, omnichannel strategy, and real-time inventory",
+    "manufacturing": "operational efficiency, supply chain optimization, and IoT",
+    "telecommunications": "network performance, 5G adoption, and content delivery",
+    "energy_utilities": "grid modernization, sustainability, and operational resilience",
+    "government": "security, compliance, and citizen services modernization",
+    "education": "research computing, student outcomes, and secure data management",
+    "professional_services": "client delivery efficiency, knowledge management, and scale",
+    # Legacy values
+    "gaming_media": "user engagement, content delivery, and real-time performance",
+    "retail": "customer experience, omnichannel strategy, and inventory management",
+    "energy": "grid modernization, sustainability, and operational resilience"
+}
+
+# Ebook buying-stage guidance
+EBOOK_STAGE_GUIDANCE = {
+    "awareness": "EARLY RESEARCH - just starting to explore, needs education and awareness",
+    "consideration": "ACTIVE EVALUATION - comparing solutions, needs differentiation and proof points",
+    "decision": "DECISION READY - needs final validation, ROI data, and confidence to proceed",
+    "implementation": "IMPLEMENTING NOW - already committed, needs best practices and guidance",
+    # Legacy values
+    "exploring": "EARLY RESEARCH - discovering what's possible with AI infrastructure",
+    "evaluating": "ACTIVE EVALUATION - comparing solutions and building a shortlist",
+    "learning": "LEARNING PHASE - deepening expertise on best practices",
+    "building_case": "BUILDING BUSINESS CASE - preparing internal proposal for investment"
+}
+
+# Ebook persona priorities
+EBOOK_PERSONA_PRIORITIES = {
+    # Executive Leadership
+    "ceo": "CEO/PRESIDENT - cares about: strategic vision, competitive advantage, shareholder value, market leadership",
+    "coo": "COO - cares about: operational excellence, efficiency, scalability, execution",
+    "c_suite_other": "C-SUITE EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage, board-level metrics",
+    # Technology Leadership
+    "cto": "CTO - cares about: technical strategy, innovation, architecture decisions, engineering excellence",
+    "cio": "CIO - cares about: IT strategy, digital transformation, system reliability, vendor management",
+    "vp_engineering": "VP ENGINEERING - cares about: technical roadmap, team productivity, platform scalability, build vs buy",
+    # Security & Compliance
+    "ciso": "CISO - cares about: security posture, threat mitigation, compliance frameworks, zero trust",
+    "vp_security": "VP SECURITY - cares about: security architecture, risk management, incident response",
+    "security_manager": "SECURITY MANAGER - cares about: implementation details, tooling, daily security operations",
+    # Data & AI
+    "cdo": "CHIEF DATA OFFICER - cares about: data strategy, AI governance, analytics maturity, data monetization",
+    "vp_data": "VP DATA/AI - cares about: ML platform, model performance, GPU utilization, MLOps",
+    "data_manager": "DATA SCIENCE MANAGER - cares about: team productivity, model deployment, compute costs, training efficiency",
+    # Finance
+    "cfo": "CFO - cares about: ROI, TCO, capex vs opex, financial risk, budget allocation",
+    "vp_finance": "VP FINANCE - cares about: cost optimization, vendor contracts, budget planning",
+    "finance_manager": "FINANCE MANAGER - cares about: cost tracking, procurement process, financial controls",
+    # IT & Infrastructure
+    "vp_it": "VP IT - cares about: infrastructure strategy, reliability, modernization roadmap",
+    "it_manager": "IT MANAGER - cares about: uptime, integration, operations, support burden, technical debt",
+    "sysadmin": "SYSTEMS ADMIN - cares about: deployment, monitoring, maintenance, documentation",
+    # Engineering & Development
+    "vp_eng": "VP ENGINEERING - cares about: technical roadmap, team productivity, architecture, delivery velocity",
+    "eng_manager": "ENGINEERING MANAGER - cares about: team efficiency, technical decisions, sprint delivery",
+    "senior_engineer": "SENIOR ENGINEER - cares about: code quality, performance, architecture patterns, best practices",
+    "engineer": "SOFTWARE ENGINEER - cares about: developer experience, tooling, learning opportunities",
+    # Operations & Procurement
+    "vp_ops": "VP OPERATIONS - cares about: operational efficiency, process optimization, cost control",
+    "ops_manager": "OPERATIONS MANAGER - cares about: day-to-day efficiency, workflows, team coordination",
+    "procurement": "PROCUREMENT MANAGER - cares about: TCO, vendor comparison, contract terms, risk mitigation",
+    # Other
+    "other": "PROFESSIONAL - cares about: relevant solutions for their specific challenges",
+    # Legacy values (backward compatibility)
+    "c_suite": "C-SUITE EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage, board-level metrics",
+    "vp_director": "VP/DIRECTOR - cares about: balancing strategy with execution, team enablement, measurable impact",
+    "it_infrastructure": "IT/INFRASTRUCTURE MANAGER - cares about: reliability, integration, operations, technical debt",
+    "engineering": "ENGINEERING/DEVOPS - cares about: architecture patterns, deployment, automation, developer experience",
+    "data_ai": "DATA/AI ENGINEER - cares about: model performance, GPU efficiency, training costs, inference latency",
+    "security": "SECURITY/COMPLIANCE - cares about: data protection, governance, audit trails, regulatory compliance",
+    "executive": "EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage",
+    "sales_gtm": "SALES/GTM LEADER - cares about: revenue impact, competitive differentiation",
+    "hr_people": "HR/PEOPLE OPS - cares about: workforce enablement, skill development"
+}
+
+# Map frontend industry values to case study categories
+INDUSTRY_TO_CASE_STUDY = {
+    # Healthcare -> PQR Healthcare
+    'healthcare': 'healthcare',
+    'life_sciences': 'healthcare',
+    # Financial -> PQR Financial
+    'financial_services': 'financial',
+    'banking': 'financial',
+    # Manufacturing/Retail/Energy -> Smurfit Westrock
+    'manufacturing': 'manufacturing',
+    'retail_ecommerce': 'manufacturing',
+    'energy_utilities': 'manufacturing',
+    # Telecom/Tech -> KT Cloud (only for explicitly tech companies)
+    'technology': 'telecom_tech',
+    'telecommunications': 'telecom_tech',
+    # Others -> PQR General
+    'government': 'general',
+    'education': 'general',
+    'professional_services': 'general',
+}
+
+
 @dataclass
 class PersonalizationResult:
     """Result from personalization generation."""
@@ -117,6 +399,154 @@ class PersonalizationResult:
     raw_response: Dict[str, Any]
 
 
+@dataclass
+class ProviderResponse:
+    """Text and token usage from one provider call (input_tokens includes cached tokens)."""
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model: str = ""
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cost_usd(self) -> float:
+        input_price, output_price = MODEL_PRICING.get(self.model, (0.0, 0.0))
+        uncached = self.input_tokens - self.cache_read_tokens - self.cache_write_tokens
+        input_cost = input_price * (
+            uncached
+            + self.cache_read_tokens * CACHE_READ_RATE.get(self.model, 1.0)
+            + self.cache_write_tokens * CACHE_WRITE_RATE
+        )
+        return (input_cost + self.output_tokens * output_price) / 1_000_000
+
+
+def summarize_usage(*results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-lead LLM usage from generate_* results, broken down by stage.
+
+    Mock and fallback results carry no usage and are skipped.
+    """
+    stages = {r["usage"]["stage"]: r["usage"] for r in results if r and r.get("usage")}
+    return {
+        "stages": stages,
+        "input_tokens": sum(u["input_tokens"] for u in stages.values()),
+        "output_tokens": sum(u["output_tokens"] for u in stages.values()),
+        "cost_usd": round(sum(u["cost_usd"] for u in stages.values()), 6),
+    }
+
+
+def _usage(name: str, response: Any) -> Tuple[int, int]:
+    """(input, output) tokens from the SDK response's usage fields."""
+    try:
+        if name == "anthropic":
+            # Anthropic reports cache reads/writes separately from input_tokens
+            cache_read, cache_write = _cache_usage(name, response)
+            return (response.usage.input_tokens or 0) + cache_read + cache_write, response.usage.output_tokens or 0
+        if name == "openai":
+            return response.usage.prompt_tokens or 0, response.usage.completion_tokens or 0
+        if name == "gemini":
+            metadata = response.usage_metadata
+            return metadata.prompt_token_count or 0, metadata.candidates_token_count or 0
+    except AttributeError:
+        pass
+    return 0, 0
+
+
+def _cache_usage(name: str, response: Any) -> Tuple[int, int]:
+    """(cache read, cache write) prompt tokens from the SDK response's usage fields."""
+    usage = getattr(response, "usage", None)
+    if name == "anthropic":
+        return (
+            getattr(usage, "cache_read_input_tokens", None) or 0,
+            getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
+    if name == "openai":
+        details = getattr(usage, "prompt_tokens_details", None)
+        return getattr(details, "cached_tokens", None) or 0, 0
+    return 0, 0
+
+
+@lru_cache(maxsize=8)
+def _anthropic_system(system_prompt: str) -> Tuple[Dict[str, Any], ...]:
+    """System prompt as a cache_control text block (built once per prompt per process)."""
+    return ({"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}},)
+
+
+def record_lead_usage(
+    supabase: Any,
+    email: str,
+    personalization: Dict[str, Any],
+    ebook_personalization: Dict[str, Any],
+    job_id: Optional[int] = None,
+    compliance_passed: bool = True
+) -> None:
+    """
+    Store a lead's personalization output with its per-stage token usage.
+
+    Outputs are keyed by email; ``job_id`` is only set when the lead has a
+    personalization_jobs row. Accounting only: failures are logged, never
+    raised into the pipeline.
+    """
+    usage = summarize_usage(personalization, ebook_personalization)
+    try:
+        supabase.store_personalization_output(
+            job_id=job_id,
+            output_json={"personalization": personalization, "ebook_personalization": ebook_personalization},
+            intro_hook=personalization.get("intro_hook"),
+            cta=personalization.get("cta"),
+            model_used=personalization.get("model_used"),
+            tokens_used=usage["input_tokens"] + usage["output_tokens"],
+            latency_ms=personalization.get("latency_ms", 0) + ebook_personalization.get("latency_ms", 0),
+            compliance_passed=compliance_passed,
+            email=email,
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            cost_usd=usage["cost_usd"],
+            usage_by_stage=usage["stages"]
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store LLM usage for {email}: {e}")
+
+
+@lru_cache(maxsize=None)
+def _provider_client(name: str, api_key: str) -> Any:
+    """
+    Import a provider SDK and build its client, once per process.
+
+    Clients are thread-safe and pool connections, so every LLMService shares them.
+    """
+    if name == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key)
+    if name == "openai":
+        import openai
+        return openai.OpenAI(api_key=api_key)
+    if name == "gemini":
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def warm_up_llm_clients() -> List[str]:
+    """
+    Import the configured provider SDKs and build their clients ahead of the
+    first request (called from the app lifespan).
+
+    Returns:
+        Names of the providers that initialized
+    """
+    start = time.perf_counter()
+    providers = [p["name"] for p in get_llm_service().providers]
+    logger.info(f"LLM clients warmed up in {(time.perf_counter() - start) * 1000:.0f}ms: {providers}")
+    return providers
+
+
 class LLMService:
     """
     Generates personalized intro hook and CTA using LLMs.
@@ -132,45 +562,27 @@ class LLMService:
         Providers are tried in order: Anthropic → OpenAI → Gemini.
         """
         self.providers: List[Dict[str, Any]] = []
-
-        # Initialize Anthropic
-        if settings.ANTHROPIC_API_KEY:
-            try:
-                client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-                self.providers.append({
-                    "name": "anthropic",
-                    "client": client,
-                    "model": ANTHROPIC_MODEL
-                })
-                logger.info("Anthropic provider initialized")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Anthropic: {e}")
-
-        # Initialize OpenAI
-        if OPENAI_AVAILABLE and settings.OPENAI_API_KEY:
-            try:
-                client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-                self.providers.append({
-                    "name": "openai",
-                    "client": client,
-                    "model": OPENAI_MODEL
-                })
-                logger.info("OpenAI provider initialized")
-            except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI: {e}")
-
-        # Initialize Gemini
-        if GEMINI_AVAILABLE and settings.GEMINI_API_KEY:
+        # Gemini models keyed by (model, system prompt); the system prompt is fixed per instance
+        self._gemini_models: Dict[Tuple[str, str], Any] = {}
+
+        # Anthropic → OpenAI → Gemini
+        candidates = [
+            ("anthropic", True, settings.ANTHROPIC_API_KEY, ANTHROPIC_MODEL),
+            ("openai", OPENAI_AVAILABLE, settings.OPENAI_API_KEY, OPENAI_MODEL),
+            ("gemini", GEMINI_AVAILABLE, settings.GEMINI_API_KEY, GEMINI_MODEL),
+        ]
+        for name, installed, api_key, model in candidates:
+            if not (installed and api_key):
+                continue
             try:
-                genai.configure(api_key=settings.GEMINI_API_KEY)
                 self.providers.append({
-                    "name": "gemini",
-                    "client": genai,
-                    "model": GEMINI_MODEL
+                    "name": name,
+                    "client": _provider_client(name, api_key),
+                    "model": model
                 })
-                logger.info("Gemini provider initialized")
+                logger.debug(f"{name} provider initialized")
             except Exception as e:
-                logger.warning(f"Failed to initialize Gemini: {e}")
+                logger.warning(f"Failed to initialize {name}: {e}")
 
         if not self.providers:
             logger.warning("No LLM providers available - will use mock responses")
@@ -183,9 +595,9 @@ class LLMService:
         system_prompt: str,
         user_prompt: str,
         max_tokens: int = 500
-    ) -> Optional[str]:
+    ) -> Optional[ProviderResponse]:
         """
-        Call a specific LLM provider and return the response text.
+        Call a specific LLM provider and return the response text and usage.
 
         Args:
             provider: Provider config dict with name, client, model
@@ -194,7 +606,7 @@ class LLMService:
             max_tokens: Max tokens for response
 
         Returns:
-            Response text or None if failed
+            ProviderResponse or None if failed
         """
         name = provider["name"]
         client = provider["client"]
@@ -206,11 +618,13 @@ class LLMService:
                     model=model,
                     max_tokens=max_tokens,
                     messages=[{"role": "user", "content": user_prompt}],
-                    system=system_prompt
+                    # Static system prompt marked as a cacheable prefix
+                    system=list(_anthropic_system(system_prompt)) if settings.LLM_PROMPT_CACHE else system_prompt
                 )
-                return response.content[0].text
+                text = response.content[0].text
 
             elif name == "openai":
+                # Static system message first: OpenAI caches repeated prefixes automatically
                 response = client.chat.completions.create(
                     model=model,
                     max_tokens=max_tokens,
@@ -219,27 +633,34 @@ class LLMService:
                         {"role": "user", "content": user_prompt}
                     ]
                 )
-                return response.choices[0].message.content
+                text = response.choices[0].message.content
 
             elif name == "gemini":
-                model_instance = client.GenerativeModel(model)
-                # Gemini combines system + user in one prompt
-                combined = f"{system_prompt}\n\n{user_prompt}"
-                response = model_instance.generate_content(combined)
-                return response.text
+                key = (model, system_prompt)
+                if key not in self._gemini_models:
+                    self._gemini_models[key] = client.GenerativeModel(model, system_instruction=system_prompt)
+                response = self._gemini_models[key].generate_content(user_prompt)
+                text = response.text
+
+            else:
+                return None
+
+            cache_read, cache_write = _cache_usage(name, response)
+            return ProviderResponse(
+                text, *_usage(name, response),
+                cache_read_tokens=cache_read, cache_write_tokens=cache_write
+            )
 
         except Exception as e:
             logger.warning(f"{name} provider failed: {type(e).__name__}: {e}")
             return None
 
-        return None
-
     def _call_with_fallback(
         self,
         system_prompt: str,
         user_prompt: str,
         max_tokens: int = 500
-    ) -> Tuple[Optional[str], str]:
+    ) -> Tuple[Optional[ProviderResponse], str]:
         """
         Try each provider in order until one succeeds.
 
@@ -249,18 +670,62 @@ class LLMService:
             max_tokens: Max tokens
 
         Returns:
-            Tuple of (response_text, provider_name) or (None, "none")
+            Tuple of (response, provider_name) or (None, "none")
         """
         for provider in self.providers:
             for attempt in range(MAX_RETRIES):
-                result = self._call_provider(provider, system_prompt, user_prompt, max_tokens)
-                if result:
+                with span(
+                    f"llm.{provider['name']}", model=provider["model"], attempt=attempt + 1
+                ) as attempt_span:
+                    result = self._call_provider(provider, system_prompt, user_prompt, max_tokens)
+                    if result and result.text:
+                        result.model = provider["model"]
+                        attempt_span.set_attribute("input_tokens", result.input_tokens)
+                        attempt_span.set_attribute("output_tokens", result.output_tokens)
+                        attempt_span.set_attribute("cache_read_tokens", result.cache_read_tokens)
+                        attempt_span.set_attribute("cache_write_tokens", result.cache_write_tokens)
+                        attempt_span.set_attribute("cost_usd", result.cost_usd)
+                    else:
+                        attempt_span.set_error("no response")
+                if result and result.text:
                     return result, provider["name"]
                 if attempt < MAX_RETRIES - 1:
                     time.sleep(RETRY_DELAY_SECONDS)
 
         return None, "none"
 
+    def _mark_fallback(self, generate_span: Span, provider_name: str) -> None:
+        """Tag a generation answered by anything but the first provider."""
+        if provider_name != self.providers[0]["name"]:
+            generate_span.set_attribute("fallback_to", provider_name)
+
+    def _usage(
+        self,
+        stage: str,
+        response: ProviderResponse,
+        provider_name: str,
+        prompt: str,
+        trimmed: List[str],
+        generate_span: Span
+    ) -> Dict[str, Any]:
+        """Usage record for one stage (stored per lead and exported to metrics)."""
+        usage = {
+            "stage": stage,
+            "provider": provider_name,
+            "model": response.model,
+            "input_tokens": response.input_tokens,
+            "output_tokens": response.output_tokens,
+            "cache_read_tokens": response.cache_read_tokens,
+            "cost_usd": round(response.cost_usd, 6),
+            "prompt_tokens_estimate": estimate_tokens(prompt),
+            "prompt_trimmed": trimmed,
+        }
+        for key in ("input_tokens", "output_tokens", "cost_usd", "prompt_tokens_estimate"):
+            generate_span.set_attribute(key, usage[key])
+        if trimmed:
+            generate_span.set_attribute("prompt_trimmed", trimmed)
+        return usage
+
     async def generate_personalization(
         self,
         normalized_profile: Dict[str, Any],
@@ -287,27 +752,31 @@ class LLMService:
         system_prompt = self._get_system_prompt()
 
         # Try with fallback
-        content, provider_name = self._call_with_fallback(system_prompt, prompt, max_tokens=500)
-
-        if content:
-            parsed = self._parse_response(content)
-
-            if parsed:
-                latency_ms = int((time.time() - start_time) * 1000)
-
-                result = {
-                    "intro_hook": parsed["intro_hook"],
-                    "cta": parsed["cta"],
-                    "model_used": provider_name,
-                    "tokens_used": 0,  # Not tracking across providers
-                    "latency_ms": latency_ms,
-                    "raw_response": {"content": content}
-                }
+        with span("llm.generate", task="personalization") as generate_span:
+            response, provider_name = self._call_with_fallback(system_prompt, prompt, max_tokens=500)
+            content = response.text if response else None
+            parsed = self._parse_response(content) if content else None
+            self._mark_fallback(generate_span, provider_name if parsed else "mock")
+            if response:
+                usage = self._usage("personalization", response, provider_name, prompt, [], generate_span)
+
+        if parsed:
+            latency_ms = int((time.time() - start_time) * 1000)
+
+            result = {
+                "intro_hook": parsed["intro_hook"],
+                "cta": parsed["cta"],
+                "model_used": provider_name,
+                "tokens_used": response.total_tokens,
+                "latency_ms": latency_ms,
+                "usage": usage,
+                "raw_response": {"content": content}
+            }
 
-                logger.info(
-                    f"Generated personalization: provider={provider_name}, latency={latency_ms}ms"
-                )
-                return result
+            logger.info(
+                f"Generated personalization: provider={provider_name}, latency={latency_ms}ms"
+            )
+            return result
 
         # All providers failed, return mock response
         logger.warning("All LLM providers failed, returning mock response")
@@ -315,26 +784,7 @@ class LLMService:
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for personalization."""
-        return """You are a B2B marketing copywriter creating personalized content for ebook landing pages.
-
-Your task: Generate a personalized intro hook (1-2 sentences) and call-to-action (CTA) based on the prospect's profile.
-
-Rules:
-1. Be conversational and specific to their role/company
-2. Reference their industry or company context when available
-3. Keep intro under 200 characters
-4. Keep CTA under 150 characters
-5. Do NOT make unsubstantiated claims (no "guaranteed", "proven", "#1", etc.)
-6. Do NOT use superlatives without evidence
-7. Sound helpful, not salesy
-
-Output ONLY valid JSON in this exact format:
-{
-  "intro_hook": "Your personalized intro here",
-  "cta": "Your call to action here"
-}
-
-No other text before or after the JSON."""
+        return SYSTEM_PROMPT
 
     def _build_prompt(self, profile: Dict[str, Any], user_context: Optional[Dict[str, Any]] = None) -> str:
         """Build the user prompt from profile data and user-provided context."""
@@ -355,53 +805,6 @@ No other text before or after the JSON."""
         user_persona = user_context.get("persona", "")
         user_industry = user_context.get("industry_input", "")
 
-        # Goal/buying stage mapping for more natural language
-        goal_descriptions = {
-            "awareness": "just starting to research and explore options",
-            "consideration": "actively evaluating and comparing different solutions",
-            "decision": "ready to make a decision and need final validation",
-            "implementation": "already implementing and looking for guidance",
-            # Legacy values
-            "exploring": "exploring modernization options and doing early research",
-            "evaluating": "comparing different approaches for their organization",
-            "learning": "learning about best practices and industry trends",
-            "building_case": "building a business case to present internally"
-        }
-
-        # Persona/role mapping for richer context
-        persona_descriptions = {
-            "c_suite": "a C-suite executive (CEO, CTO, CIO, CFO) focused on strategic outcomes and ROI",
-            "vp_director": "a VP or Director level leader balancing strategy with execution",
-            "it_infrastructure": "an IT/Infrastructure manager overseeing technical operations",
-            "engineering": "an engineering or DevOps professional focused on implementation",
-            "data_ai": "a data science or AI/ML professional optimizing workloads",
-            "security": "a security or compliance professional protecting systems and data",
-            "procurement": "a procurement professional evaluating vendors and costs",
-            # Legacy values
-            "executive": "an executive leader (C-suite or VP level) focused on strategic decisions",
-            "sales_gtm": "a sales or GTM leader driving revenue growth",
-            "hr_people": "an HR/People Ops professional managing talent and culture",
-            "other": "a professional seeking industry insights"
-        }
-
-        # Industry-specific angles (expanded to match frontend)
-        industry_angles = {
-            "technology": "innovation velocity, scalability, and technical excellence",
-            "financial_services": "risk management, regulatory compliance, and digital transformation",
-            "healthcare": "compliance, patient outcomes, and operational efficiency",
-            "retail_ecommerce": "customer experience, omnichannel strategy, and real-time inventory",
-            "manufacturing": "operational efficiency, supply chain optimization, and IoT",
-            "telecommunications": "network performance, 5G adoption, and content delivery",
-            "energy_utilities": "grid modernization, sustainability, and operational resilience",
-            "government": "security, compliance, and citizen services modernization",
-            "education": "research computing, student outcomes, and secure data management",
-            "professional_services": "client delivery efficiency, knowledge management, and scale",
-            # Legacy values
-            "gaming_media": "user engagement, content delivery, and real-time performance",
-            "retail": "customer experience, omnichannel strategy, and inventory management",
-            "energy": "grid modernization, sustainability, and operational resilience"
-        }
-
         parts.append(f"Create personalized content for this prospect:\n")
         parts.append(f"- First Name: {first_name}")
         parts.append(f"- Company: {company}")
@@ -419,15 +822,15 @@ No other text before or after the JSON."""
 
         # Add user-provided context for better personalization
         if user_goal:
-            goal_desc = goal_descriptions.get(user_goal, user_goal)
+            goal_desc = GOAL_DESCRIPTIONS.get(user_goal, user_goal)
             parts.append(f"\nThis person is currently {goal_desc}.")
 
         if user_persona:
-            persona_desc = persona_descriptions.get(user_persona, user_persona)
+            persona_desc = PERSONA_DESCRIPTIONS.get(user_persona, user_persona)
             parts.append(f"They are {persona_desc}.")
 
-        if effective_industry in industry_angles:
-            parts.append(f"In their industry, key concerns include {industry_angles[effective_industry]}.")
+        if effective_industry in INDUSTRY_ANGLES:
+            parts.append(f"In their industry, key concerns include {INDUSTRY_ANGLES[effective_industry]}.")
 
         if company_context:
             parts.append(f"\nRecent company context: {company_context[:500]}")
@@ -654,22 +1057,34 @@ No other text."""
         user_context = user_context or {}
         start_time = time.time()
 
-        prompt = self._build_ebook_prompt(profile, user_context, company_news)
+        # Enrichment dumps can be large: pack the most relevant sections into the budget
+        packed = self._ebook_prompt_sections(profile, user_context, company_news).pack(
+            settings.LLM_PROMPT_TOKEN_BUDGET, user_context.get('persona'), user_context.get('goal')
+        )
+        prompt, trimmed = packed.text, packed.trimmed
+        if trimmed:
+            logger.info(f"Ebook prompt packed to ~{packed.tokens} tokens, trimmed: {trimmed}")
         system_prompt = self._get_ebook_system_prompt()
 
         # Try with fallback
-        content, provider_name = self._call_with_fallback(system_prompt, prompt, max_tokens=1000)
-
-        if content:
-            parsed = self._parse_ebook_response(content)
+        with span("llm.generate", task="ebook_personalization") as generate_span:
+            response, provider_name = self._call_with_fallback(system_prompt, prompt, max_tokens=1000)
+            content = response.text if response else None
+            parsed = self._parse_ebook_response(content) if content else None
+            self._mark_fallback(generate_span, provider_name if parsed else "mock")
+            if response:
+                usage = self._usage(
+                    "ebook_personalization", response, provider_name, prompt, trimmed, generate_span
+                )
 
-            if parsed:
-                latency_ms = int((time.time() - start_time) * 1000)
-                parsed["model_used"] = provider_name
-                parsed["tokens_used"] = 0
-                parsed["latency_ms"] = latency_ms
-                logger.info(f"Generated ebook personalization: provider={provider_name}, latency={latency_ms}ms")
-                return parsed
+        if parsed:
+            latency_ms = int((time.time() - start_time) * 1000)
+            parsed["model_used"] = provider_name
+            parsed["tokens_used"] = response.total_tokens
+            parsed["latency_ms"] = latency_ms
+            parsed["usage"] = usage
+            logger.info(f"Generated ebook personalization: provider={provider_name}, latency={latency_ms}ms")
+            return parsed
 
         # All providers failed
         logger.warning("All LLM providers failed for ebook personalization, using mock")
@@ -677,167 +1092,143 @@ No other text."""
 
     def _get_ebook_system_prompt(self) -> str:
         """System prompt for AMD ebook personalization."""
-        return """You are a B2B marketing expert creating DEEPLY personalized content for AMD's enterprise AI readiness ebook.
-
-CRITICAL REQUIREMENT: You MUST explicitly reference specific data points from the enrichment data. Generic content is UNACCEPTABLE.
-
-The ebook covers:
-- Three stages: Leaders (33% - fully modernized), Challengers (58% - in progress), Observers (9% - planning)
-- Modernization strategies: "modernize in place" vs "refactor and shift"
-- Case studies: KT Cloud (AI/GPU cloud), Smurfit Westrock (25% cost reduction), PQR (security/automation)
-
-YOUR TASK: Generate 3 sections with MANDATORY data references:
-
-1. PERSONALIZED_HOOK (2-3 sentences) - MUST include at least 2 of these:
-   ✓ Company name (REQUIRED - always use their actual company name)
-   ✓ A specific news headline or theme if provided (e.g., "With [Company]'s recent focus on [news theme]...")
-   ✓ Company size/employee count (e.g., "As a [X]-employee organization...")
-   ✓ Funding stage if known (e.g., "As a [Series B] company...")
-   ✓ Growth trajectory if known (e.g., "With [Company]'s [X%] growth...")
-   ✓ Their specific role/title (e.g., "As a [CTO]...")
-
-2. CASE_STUDY_FRAMING (2-3 sentences) - MUST include:
-   ✓ The case study company name (KT Cloud, Smurfit Westrock, or PQR)
-   ✓ A specific metric from the case study (e.g., "25% cost reduction", "40% faster deployment")
-   ✓ A direct comparison to THEIR company (e.g., "Like [Company], [Case Study] faced...")
-   ✓ Reference to their industry or company size for relevance
-
-3. PERSONALIZED_CTA (1-2 sentences) - MUST include:
-   ✓ Their company name
-   ✓ Language matching their buying stage:
-     - Awareness: "discover", "understand", "explore"
-     - Consideration: "compare", "evaluate", "see how"
-     - Decision: "get the data", "validate", "confirm"
-     - Implementation: "access the playbook", "accelerate"
-
-FAILURE CONDITIONS (will be rejected):
-✗ Using generic phrases like "organizations like yours" instead of actual company name
-✗ Not mentioning any specific news, funding, or growth data when it's provided
-✗ Not naming the case study company
-✗ Not including specific metrics
-
-RULES:
-- No unsubstantiated claims ("guaranteed", "proven", "#1")
-- Sound consultative, not salesy
-- If a data point is missing, skip it - but USE what's available
-
-Output ONLY valid JSON:
-{
-  "personalized_hook": "Your personalized opening with explicit data references...",
-  "case_study_framing": "Case study connection with specific metrics and company comparison...",
-  "personalized_cta": "Stage-appropriate CTA with company name..."
-}"""
+        return EBOOK_SYSTEM_PROMPT
 
     def _build_ebook_prompt(
         self,
         profile: Dict[str, Any],
         user_context: Dict[str, Any],
-        company_news: Optional[str]
+        company_news: Optional[str],
+        max_tokens: int = 0
     ) -> str:
-        """Build prompt for ebook personalization with deep enrichment data from all APIs."""
-        parts = ["Generate DEEPLY personalized AMD ebook content for this prospect.\n"]
-        parts.append("IMPORTANT: You have access to comprehensive enrichment data. USE ALL OF IT to create highly specific, relevant content.\n")
+        """Build prompt for ebook personalization, packed to max_tokens (0 = everything)."""
+        return self._ebook_prompt_sections(profile, user_context, company_news).pack(
+            max_tokens, user_context.get('persona'), user_context.get('goal')
+        ).text
+
+    def _ebook_prompt_sections(
+        self,
+        profile: Dict[str, Any],
+        user_context: Dict[str, Any],
+        company_news: Optional[str]
+    ) -> PromptBuilder:
+        """Collect the ebook prompt as scored sections with deep enrichment data from all APIs."""
+        prompt = PromptBuilder()
+        prompt.add("Generate DEEPLY personalized AMD ebook content for this prospect.\n")
+        prompt.add("IMPORTANT: You have access to comprehensive enrichment data. USE ALL OF IT to create highly specific, relevant content.\n")
 
         # === PERSON DATA ===
-        parts.append("=== PERSON PROFILE ===")
-        parts.append(f"Name: {profile.get('first_name', 'Reader')} {profile.get('last_name', '')}")
-        parts.append(f"Title: {profile.get('title', 'Professional')}")
+        prompt.section("person", required=True)
+        prompt.add("=== PERSON PROFILE ===")
+        prompt.add(f"Name: {profile.get('first_name', 'Reader')} {profile.get('last_name', '')}")
+        prompt.add(f"Title: {profile.get('title', 'Professional')}")
 
         if profile.get('seniority'):
-            parts.append(f"Seniority Level: {profile.get('seniority')}")
+            prompt.add(f"Seniority Level: {profile.get('seniority')}")
 
+        prompt.section("person_skills")
         if profile.get('skills'):
             skills = profile.get('skills', [])
             if isinstance(skills, list) and skills:
-                parts.append(f"Technical Skills: {', '.join(skills[:10])}")
+                prompt.add(f"Technical Skills: {', '.join(skills[:10])}")
                 # Use skills to identify technical depth
                 tech_skills = [s for s in skills if s and any(k in s.lower() for k in ['python', 'java', 'cloud', 'aws', 'azure', 'kubernetes', 'docker', 'ai', 'ml', 'data'])]
                 if tech_skills:
-                    parts.append(f"(IMPORTANT: This person has technical background in: {', '.join(tech_skills[:5])})")
+                    prompt.add(f"(IMPORTANT: This person has technical background in: {', '.join(tech_skills[:5])})")
 
+        prompt.section("person_interests")
         if profile.get('interests'):
             interests = profile.get('interests', [])
             if isinstance(interests, list) and interests:
-                parts.append(f"Professional Interests: {', '.join(interests[:8])}")
+                prompt.add(f"Professional Interests: {', '.join(interests[:8])}")
 
+        prompt.section("career_history", min_lines=2)
         if profile.get('experience'):
             experience = profile.get('experience', [])
             if isinstance(experience, list) and experience:
-                parts.append("Career History:")
+                prompt.add("Career History:")
                 for exp in experience[:3]:
                     if isinstance(exp, dict):
                         exp_title = exp.get('title', {}).get('name', '') if isinstance(exp.get('title'), dict) else exp.get('title', '')
                         exp_company = exp.get('company', {}).get('name', '') if isinstance(exp.get('company'), dict) else exp.get('company', '')
                         if exp_title or exp_company:
-                            parts.append(f"  - {exp_title} at {exp_company}")
+                            prompt.add(f"  - {exp_title} at {exp_company}")
 
+        prompt.section("person_links")
         if profile.get('linkedin_url'):
-            parts.append(f"LinkedIn: {profile.get('linkedin_url')}")
+            prompt.add(f"LinkedIn: {profile.get('linkedin_url')}")
 
         # === COMPANY DATA (Enhanced with PDL Company API) ===
-        parts.append("\n=== COMPANY PROFILE (Deep Enrichment) ===")
+        prompt.section("company", required=True)
+        prompt.add("\n=== COMPANY PROFILE (Deep Enrichment) ===")
         company_name = profile.get('company_name') or profile.get('company_display_name') or user_context.get('company', 'their company')
-        parts.append(f"Company: {company_name}")
-        parts.append(f"Industry: {user_context.get('industry_input') or profile.get('industry', 'Technology')}")
+        prompt.add(f"Company: {company_name}")
+        prompt.add(f"Industry: {user_context.get('industry_input') or profile.get('industry', 'Technology')}")
 
         # Company size context - multiple data points
+        prompt.section("company_scale")
         if profile.get('employee_count'):
-            parts.append(f"Employee Count: {profile.get('employee_count')}")
+            prompt.add(f"Employee Count: {profile.get('employee_count')}")
         if profile.get('employee_count_range'):
-            parts.append(f"Size Range: {profile.get('employee_count_range')}")
+            prompt.add(f"Size Range: {profile.get('employee_count_range')}")
         elif profile.get('company_size'):
-            parts.append(f"Company Size: {profile.get('company_size')}")
+            prompt.add(f"Company Size: {profile.get('company_size')}")
 
         # Company type and status
         if profile.get('company_type'):
-            parts.append(f"Company Type: {profile.get('company_type')}")
+            prompt.add(f"Company Type: {profile.get('company_type')}")
         if profile.get('ticker'):
-            parts.append(f"Stock Ticker: {profile.get('ticker')} (PUBLIC COMPANY)")
+            prompt.add(f"Stock Ticker: {profile.get('ticker')} (PUBLIC COMPANY)")
 
         # Founding and maturity
         if profile.get('founded_year'):
             years_old = 2025 - int(profile.get('founded_year'))
-            parts.append(f"Founded: {profile.get('founded_year')} ({years_old} years old)")
+            prompt.add(f"Founded: {profile.get('founded_year')} ({years_old} years old)")
 
         # Funding context (important for understanding investment capacity)
+        prompt.section("company_funding")
         if profile.get('total_funding'):
-            parts.append(f"Total Funding Raised: ${profile.get('total_funding'):,}")
+            prompt.add(f"Total Funding Raised: ${profile.get('total_funding'):,}")
         if profile.get('latest_funding_stage'):
-            parts.append(f"Funding Stage: {profile.get('latest_funding_stage')}")
+            prompt.add(f"Funding Stage: {profile.get('latest_funding_stage')}")
         if profile.get('inferred_revenue'):
-            parts.append(f"Inferred Revenue: {profile.get('inferred_revenue')}")
+            prompt.add(f"Inferred Revenue: {profile.get('inferred_revenue')}")
 
         # Growth indicators
         if profile.get('employee_growth_rate'):
             growth = profile.get('employee_growth_rate')
             growth_desc = "rapidly growing" if growth > 0.2 else "growing steadily" if growth > 0 else "stable or contracting"
-            parts.append(f"Employee Growth Rate: {growth:.1%} ({growth_desc})")
+            prompt.add(f"Employee Growth Rate: {growth:.1%} ({growth_desc})")
 
         # Company description
+        prompt.section("company_description")
         if profile.get('company_summary'):
-            parts.append(f"Company Summary: {profile.get('company_summary')[:400]}")
+            prompt.add(f"Company Summary: {profile.get('company_summary')[:400]}")
         elif profile.get('company_headline'):
-            parts.append(f"Company Headline: {profile.get('company_headline')}")
+            prompt.add(f"Company Headline: {profile.get('company_headline')}")
         elif profile.get('company_description'):
-            parts.append(f"Company Description: {profile.get('company_description')[:300]}")
+            prompt.add(f"Company Description: {profile.get('company_description')[:300]}")
 
         # Company tags (industry signals)
+        prompt.section("company_tags")
         if profile.get('company_tags'):
             tags = profile.get('company_tags', [])
             if isinstance(tags, list) and tags:
-                parts.append(f"Industry Tags: {', '.join(tags[:10])}")
+                prompt.add(f"Industry Tags: {', '.join(tags[:10])}")
                 # Identify AI/tech readiness from tags
                 ai_tags = [t for t in tags if t and any(k in t.lower() for k in ['ai', 'machine learning', 'cloud', 'data', 'saas', 'technology'])]
                 if ai_tags:
-                    parts.append(f"(AI/TECH SIGNALS: Company is associated with: {', '.join(ai_tags)})")
+                    prompt.add(f"(AI/TECH SIGNALS: Company is associated with: {', '.join(ai_tags)})")
 
         # NAICS/SIC codes for industry precision
+        prompt.section("company_codes")
         if profile.get('naics_codes'):
-            parts.append(f"NAICS Codes: {profile.get('naics_codes')}")
+            prompt.add(f"NAICS Codes: {profile.get('naics_codes')}")
         if profile.get('sic_codes'):
-            parts.append(f"SIC Codes: {profile.get('sic_codes')}")
+            prompt.add(f"SIC Codes: {profile.get('sic_codes')}")
 
         # Location context
+        prompt.section("company_location")
         location_parts = []
         if profile.get('city'):
             location_parts.append(profile.get('city'))
@@ -846,116 +1237,62 @@ Output ONLY valid JSON:
         if profile.get('country'):
             location_parts.append(profile.get('country'))
         if location_parts:
-            parts.append(f"Location: {', '.join(location_parts)}")
+            prompt.add(f"Location: {', '.join(location_parts)}")
 
         # Social presence
+        prompt.section("company_links")
         if profile.get('company_linkedin'):
-            parts.append(f"Company LinkedIn: {profile.get('company_linkedin')}")
+            prompt.add(f"Company LinkedIn: {profile.get('company_linkedin')}")
 
         # === EMAIL VERIFICATION (Hunter) ===
+        prompt.section("email_verification", min_lines=2)
         if profile.get('email_verified') is not None:
-            parts.append("\n=== EMAIL VERIFICATION ===")
-            parts.append(f"Email Verified: {profile.get('email_verified')}")
+            prompt.add("\n=== EMAIL VERIFICATION ===")
+            prompt.add(f"Email Verified: {profile.get('email_verified')}")
             if profile.get('email_score'):
-                parts.append(f"Email Score: {profile.get('email_score')}")
+                prompt.add(f"Email Score: {profile.get('email_score')}")
             if profile.get('email_deliverable'):
-                parts.append(f"Deliverable: {profile.get('email_deliverable')}")
+                prompt.add(f"Deliverable: {profile.get('email_deliverable')}")
 
         # === USER CONTEXT ===
-        parts.append("\n=== BUYER CONTEXT ===")
+        prompt.section("buyer_context", required=True)
+        prompt.add("\n=== BUYER CONTEXT ===")
         goal = user_context.get('goal', '')
         persona = user_context.get('persona', '')
 
-        goal_map = {
-            "awareness": "EARLY RESEARCH - just starting to explore, needs education and awareness",
-            "consideration": "ACTIVE EVALUATION - comparing solutions, needs differentiation and proof points",
-            "decision": "DECISION READY - needs final validation, ROI data, and confidence to proceed",
-            "implementation": "IMPLEMENTING NOW - already committed, needs best practices and guidance",
-            # Legacy values
-            "exploring": "EARLY RESEARCH - discovering what's possible with AI infrastructure",
-            "evaluating": "ACTIVE EVALUATION - comparing solutions and building a shortlist",
-            "learning": "LEARNING PHASE - deepening expertise on best practices",
-            "building_case": "BUILDING BUSINESS CASE - preparing internal proposal for investment"
-        }
-
-        persona_map = {
-            # Executive Leadership
-            "ceo": "CEO/PRESIDENT - cares about: strategic vision, competitive advantage, shareholder value, market leadership",
-            "coo": "COO - cares about: operational excellence, efficiency, scalability, execution",
-            "c_suite_other": "C-SUITE EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage, board-level metrics",
-            # Technology Leadership
-            "cto": "CTO - cares about: technical strategy, innovation, architecture decisions, engineering excellence",
-            "cio": "CIO - cares about: IT strategy, digital transformation, system reliability, vendor management",
-            "vp_engineering": "VP ENGINEERING - cares about: technical roadmap, team productivity, platform scalability, build vs buy",
-            # Security & Compliance
-            "ciso": "CISO - cares about: security posture, threat mitigation, compliance frameworks, zero trust",
-            "vp_security": "VP SECURITY - cares about: security architecture, risk management, incident response",
-            "security_manager": "SECURITY MANAGER - cares about: implementation details, tooling, daily security operations",
-            # Data & AI
-            "cdo": "CHIEF DATA OFFICER - cares about: data strategy, AI governance, analytics maturity, data monetization",
-            "vp_data": "VP DATA/AI - cares about: ML platform, model performance, GPU utilization, MLOps",
-            "data_manager": "DATA SCIENCE MANAGER - cares about: team productivity, model deployment, compute costs, training efficiency",
-            # Finance
-            "cfo": "CFO - cares about: ROI, TCO, capex vs opex, financial risk, budget allocation",
-            "vp_finance": "VP FINANCE - cares about: cost optimization, vendor contracts, budget planning",
-            "finance_manager": "FINANCE MANAGER - cares about: cost tracking, procurement process, financial controls",
-            # IT & Infrastructure
-            "vp_it": "VP IT - cares about: infrastructure strategy, reliability, modernization roadmap",
-            "it_manager": "IT MANAGER - cares about: uptime, integration, operations, support burden, technical debt",
-            "sysadmin": "SYSTEMS ADMIN - cares about: deployment, monitoring, maintenance, documentation",
-            # Engineering & Development
-            "vp_eng": "VP ENGINEERING - cares about: technical roadmap, team productivity, architecture, delivery velocity",
-            "eng_manager": "ENGINEERING MANAGER - cares about: team efficiency, technical decisions, sprint delivery",
-            "senior_engineer": "SENIOR ENGINEER - cares about: code quality, performance, architecture patterns, best practices",
-            "engineer": "SOFTWARE ENGINEER - cares about: developer experience, tooling, learning opportunities",
-            # Operations & Procurement
-            "vp_ops": "VP OPERATIONS - cares about: operational efficiency, process optimization, cost control",
-            "ops_manager": "OPERATIONS MANAGER - cares about: day-to-day efficiency, workflows, team coordination",
-            "procurement": "PROCUREMENT MANAGER - cares about: TCO, vendor comparison, contract terms, risk mitigation",
-            # Other
-            "other": "PROFESSIONAL - cares about: relevant solutions for their specific challenges",
-            # Legacy values (backward compatibility)
-            "c_suite": "C-SUITE EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage, board-level metrics",
-            "vp_director": "VP/DIRECTOR - cares about: balancing strategy with execution, team enablement, measurable impact",
-            "it_infrastructure": "IT/INFRASTRUCTURE MANAGER - cares about: reliability, integration, operations, technical debt",
-            "engineering": "ENGINEERING/DEVOPS - cares about: architecture patterns, deployment, automation, developer experience",
-            "data_ai": "DATA/AI ENGINEER - cares about: model performance, GPU efficiency, training costs, inference latency",
-            "security": "SECURITY/COMPLIANCE - cares about: data protection, governance, audit trails, regulatory compliance",
-            "executive": "EXECUTIVE - cares about: strategic outcomes, ROI, competitive advantage",
-            "sales_gtm": "SALES/GTM LEADER - cares about: revenue impact, competitive differentiation",
-            "hr_people": "HR/PEOPLE OPS - cares about: workforce enablement, skill development"
-        }
-
         if goal:
-            parts.append(f"Buying Stage: {goal_map.get(goal, goal)}")
+            prompt.add(f"Buying Stage: {EBOOK_STAGE_GUIDANCE.get(goal, goal)}")
         if persona:
-            parts.append(f"Role & Priorities: {persona_map.get(persona, persona)}")
+            prompt.add(f"Role & Priorities: {EBOOK_PERSONA_PRIORITIES.get(persona, persona)}")
 
         # Company size context from user input
         company_size = user_context.get('company_size', '')
         if company_size:
             size_info = get_company_size_info(company_size)
-            parts.append(f"Company Segment: {size_info['label'].upper()} ({size_info['employee_range']} employees)")
+            prompt.add(f"Company Segment: {size_info['label'].upper()} ({size_info['employee_range']} employees)")
             if size_info['segment'] == 'enterprise':
-                parts.append("(ENTERPRISE CONTEXT: Focus on scale, compliance, integration with existing systems)")
+                prompt.add("(ENTERPRISE CONTEXT: Focus on scale, compliance, integration with existing systems)")
             elif size_info['segment'] == 'mid_market':
-                parts.append("(MID-MARKET CONTEXT: Balance cost efficiency with capability, growth-focused)")
+                prompt.add("(MID-MARKET CONTEXT: Balance cost efficiency with capability, growth-focused)")
             elif size_info['segment'] == 'smb':
-                parts.append("(SMB CONTEXT: Focus on simplicity, time-to-value, cost-effectiveness)")
+                prompt.add("(SMB CONTEXT: Focus on simplicity, time-to-value, cost-effectiveness)")
 
         # === COMPANY NEWS (Enhanced GNews with multi-query analysis) ===
-        parts.append("\n=== COMPANY NEWS & MARKET INTELLIGENCE ===")
+        prompt.section("news", required=True)
+        prompt.add("\n=== COMPANY NEWS & MARKET INTELLIGENCE ===")
+        prompt.section("news_summary")
         if company_news and company_news.strip():
-            parts.append(f"News Summary: {company_news[:700]}")
+            prompt.add(f"News Summary: {company_news[:700]}")
 
         # News themes detected
+        prompt.section("news_signals")
         news_themes = profile.get('news_themes', [])
         if news_themes and isinstance(news_themes, list):
-            parts.append(f"Detected Themes: {', '.join(news_themes)}")
+            prompt.add(f"Detected Themes: {', '.join(news_themes)}")
             # Highlight relevant themes for AMD positioning
             ai_themes = [t for t in news_themes if t and ('ai' in t.lower() or 'cloud' in t.lower() or 'digital' in t.lower())]
             if ai_themes:
-                parts.append(f"(IMPORTANT - AI/CLOUD THEMES DETECTED: {', '.join(ai_themes)})")
+                prompt.add(f"(IMPORTANT - AI/CLOUD THEMES DETECTED: {', '.join(ai_themes)})")
 
         # News sentiment analysis
         sentiment = profile.get('news_sentiment', {})
@@ -963,71 +1300,57 @@ Output ONLY valid JSON:
             pos = sentiment.get('positive', 0)
             neg = sentiment.get('negative', 0)
             if pos > neg + 2:
-                parts.append(f"Sentiment: POSITIVE ({pos} positive indicators, {neg} negative)")
+                prompt.add(f"Sentiment: POSITIVE ({pos} positive indicators, {neg} negative)")
             elif neg > pos + 2:
-                parts.append(f"Sentiment: CHALLENGING ({neg} negative indicators, {pos} positive)")
+                prompt.add(f"Sentiment: CHALLENGING ({neg} negative indicators, {pos} positive)")
             else:
-                parts.append(f"Sentiment: NEUTRAL/MIXED")
+                prompt.add(f"Sentiment: NEUTRAL/MIXED")
 
         # Categorized news by topic
         news_by_category = profile.get('news_by_category', {})
         if news_by_category and isinstance(news_by_category, dict):
             if news_by_category.get('ai_technology'):
-                parts.append("AI/Tech News: Company has recent AI/technology coverage")
+                prompt.add("AI/Tech News: Company has recent AI/technology coverage")
             if news_by_category.get('growth'):
-                parts.append("Growth News: Company has recent growth/expansion coverage")
+                prompt.add("Growth News: Company has recent growth/expansion coverage")
             if news_by_category.get('leadership'):
-                parts.append("Leadership News: Company has recent leadership/strategy coverage")
+                prompt.add("Leadership News: Company has recent leadership/strategy coverage")
 
-        # Recent news headlines with source
+        # Recent news headlines with source (newest first, repeated stories once)
+        prompt.section("news_headlines", min_lines=2)
         recent_news = profile.get('recent_news', [])
         if recent_news and isinstance(recent_news, list):
-            parts.append("\nRecent Headlines:")
-            for i, article in enumerate(recent_news[:5]):
+            prompt.add("\nRecent Headlines:")
+            articles = {}
+            for article in recent_news:
+                if isinstance(article, dict) and article.get('title'):
+                    articles.setdefault(article['title'].strip().lower(), article)
+            for i, article in enumerate(list(articles.values())[:5]):
                 if isinstance(article, dict):
                     title = article.get('title', '')
                     source = article.get('source', '')
                     content = article.get('content', '')[:200] if article.get('content') else ''
                     category = article.get('query_category', '')
                     if title:
-                        parts.append(f"  {i+1}. [{category.upper()}] {title}")
+                        prompt.add(f"  {i+1}. [{category.upper()}] {title}")
                         if source:
-                            parts.append(f"     Source: {source}")
+                            prompt.add(f"     Source: {source}")
                         if content:
-                            parts.append(f"     Summary: {content}...")
+                            prompt.add(f"     Summary: {content}...")
 
+        prompt.section("news_fallback", required=True)
         if not recent_news and not company_news:
-            parts.append("No recent news found - use industry trends instead")
+            prompt.add("No recent news found - use industry trends instead")
 
         # === CASE STUDY SELECTION ===
-        parts.append("\n=== CASE STUDY TO HIGHLIGHT ===")
+        prompt.section("case_study", required=True)
+        prompt.add("\n=== CASE STUDY TO HIGHLIGHT ===")
         # IMPORTANT: Prioritize user-selected industry from form over API-derived data
         user_industry = (user_context.get('industry_input') or '').lower()
         api_industry = (profile.get('industry') or '').lower()
 
-        # Map frontend industry values to case study categories
-        industry_to_case_study = {
-            # Healthcare -> PQR Healthcare
-            'healthcare': 'healthcare',
-            'life_sciences': 'healthcare',
-            # Financial -> PQR Financial
-            'financial_services': 'financial',
-            'banking': 'financial',
-            # Manufacturing/Retail/Energy -> Smurfit Westrock
-            'manufacturing': 'manufacturing',
-            'retail_ecommerce': 'manufacturing',
-            'energy_utilities': 'manufacturing',
-            # Telecom/Tech -> KT Cloud (only for explicitly tech companies)
-            'technology': 'telecom_tech',
-            'telecommunications': 'telecom_tech',
-            # Others -> PQR General
-            'government': 'general',
-            'education': 'general',
-            'professional_services': 'general',
-        }
-
         # Determine case study based on USER-SELECTED industry first
-        case_study = industry_to_case_study.get(user_industry, None)
+        case_study = INDUSTRY_TO_CASE_STUDY.get(user_industry, None)
 
         # If no user industry match, check API industry (but be more selective)
         if not case_study:
@@ -1045,32 +1368,14 @@ Output ONLY valid JSON:
             else:
                 case_study = 'general'
 
-        # Output the selected case study
-        if case_study == 'healthcare':
-            parts.append("Selected: PQR + Healthcare angle - compliance, patient data, security")
-            parts.append("Key angles: HIPAA compliance, secure AI, data governance")
-            parts.append("Metrics to highlight: Compliance, security, patient outcome improvements")
-        elif case_study == 'financial':
-            parts.append("Selected: PQR + Financial angle - security, compliance, automation")
-            parts.append("Key angles: regulatory compliance, fraud detection, risk management")
-            parts.append("Metrics to highlight: Compliance, processing speed, risk reduction")
-        elif case_study == 'manufacturing':
-            parts.append("Selected: SMURFIT WESTROCK - manufacturing, cost optimization, sustainability")
-            parts.append("Key angles: 25% cost reduction, carbon footprint, operational efficiency")
-            parts.append("Metrics to highlight: Cost savings, sustainability, operational uptime")
-        elif case_study == 'telecom_tech':
-            parts.append("Selected: KT CLOUD - AI/GPU cloud services, massive scale, innovation focus")
-            parts.append("Key angles: cloud-native AI, GPU acceleration, developer platform")
-            parts.append("Metrics to highlight: Scale, performance, time-to-market")
-        else:
-            parts.append("Selected: PQR - IT services, security, automation")
-            parts.append("Key angles: automation, security, operational excellence")
-            parts.append("Metrics to highlight: Efficiency, security posture, automation ROI")
+        # Output the selected case study (angles and metrics are in the system prompt)
+        selected_study = EBOOK_CASE_STUDIES[case_study]
+        prompt.add(f"Selected: [{case_study.upper()}] {selected_study['name']} from the case study library")
 
         # === BUILD MANDATORY DATA SUMMARY ===
         # This tells the LLM exactly what data points it MUST use
-        parts.append("\n=== MANDATORY DATA TO REFERENCE ===")
-        parts.append("You MUST use these data points in your output:\n")
+        prompt.add("\n=== MANDATORY DATA TO REFERENCE ===")
+        prompt.add("You MUST use these data points in your output:\n")
 
         mandatory_items = []
         mandatory_items.append(f"✓ COMPANY NAME: \"{company_name}\" (USE THIS EXACT NAME)")
@@ -1116,34 +1421,16 @@ Output ONLY valid JSON:
             mandatory_items.append(f"✓ BUYING STAGE: {goal.upper()} - MATCH CTA TO THIS STAGE")
 
         for item in mandatory_items:
-            parts.append(item)
+            prompt.add(item)
 
         # Case study specifics
-        parts.append(f"\n✓ CASE STUDY TO REFERENCE: Use the case study selected above")
-        if case_study == 'healthcare':
-            parts.append("   - Name: PQR")
-            parts.append("   - Metric to cite: 40% faster threat detection, HIPAA compliance")
-        elif case_study == 'financial':
-            parts.append("   - Name: PQR")
-            parts.append("   - Metric to cite: 40% faster threat detection, regulatory compliance")
-        elif case_study == 'manufacturing':
-            parts.append("   - Name: Smurfit Westrock")
-            parts.append("   - Metric to cite: 25% cost reduction, 30% emissions reduction")
-        elif case_study == 'telecom_tech':
-            parts.append("   - Name: KT Cloud")
-            parts.append("   - Metric to cite: Massive scale AI/GPU deployment, cloud-native platform")
-        else:
-            parts.append("   - Name: PQR")
-            parts.append("   - Metric to cite: 40% efficiency gains, security automation")
+        prompt.add(f"\n✓ CASE STUDY TO REFERENCE: {selected_study['name']} - cite: {selected_study['metric']}")
 
-        parts.append("\n=== OUTPUT REQUIREMENTS ===")
-        parts.append("Your JSON output MUST:")
-        parts.append(f"1. personalized_hook: Start with \"{company_name}\" or reference their news/growth")
-        parts.append("2. case_study_framing: Name the case study company AND cite a specific metric")
-        parts.append(f"3. personalized_cta: Include \"{company_name}\" and match the {goal or 'awareness'} stage")
-        parts.append("\nGENERATE THE JSON NOW:")
+        prompt.add("\n=== OUTPUT REQUIREMENTS ===")
+        prompt.add(f"Company: \"{company_name}\"; buying stage: {goal or 'awareness'} (rules in the system prompt)")
+        prompt.add("\nGENERATE THE JSON NOW:")
 
-        return "\n".join(parts)
+        return prompt
 
     def _parse_ebook_response(self, content: str) -> Optional[Dict[str, str]]:
         """Parse ebook personalization response."""
@@ -1270,31 +1557,10 @@ Output ONLY valid JSON:
         }
 
         # Case study framing based on USER-SELECTED industry (not API tags which are often wrong)
-        # Map frontend industry values to case study categories
         user_industry = (user_context.get('industry_input') or '').lower()
 
-        industry_to_case_study = {
-            # Healthcare -> PQR Healthcare
-            'healthcare': 'healthcare',
-            'life_sciences': 'healthcare',
-            # Financial -> PQR Financial
-            'financial_services': 'financial',
-            'banking': 'financial',
-            # Manufacturing/Retail/Energy -> Smurfit Westrock
-            'manufacturing': 'manufacturing',
-            'retail_ecommerce': 'manufacturing',
-            'energy_utilities': 'manufacturing',
-            # Telecom/Tech -> KT Cloud (only for explicitly tech companies)
-            'technology': 'telecom_tech',
-            'telecommunications': 'telecom_tech',
-            # Others -> PQR General
-            'government': 'general',
-            'education': 'general',
-            'professional_services': 'general',
-        }
-
         # Determine case study based on USER-SELECTED industry first
-        case_study = industry_to_case_study.get(user_industry, None)
+        case_study = INDUSTRY_TO_CASE_STUDY.get(user_industry, None)
 
         # If no user industry match, check API industry (but be more selective)
         if not case_study:
@@ -1345,3 +1611,15 @@ Output ONLY valid JSON:
                 "news_article_count": len(recent_news)
             }
         }
+
+
+# Singleton instance, built at startup (see app.main lifespan)
+_llm_service: Optional[LLMService] = None
+
+
+def get_llm_service() -> LLMService:
+    """Get or create the shared LLMService."""
+    global _llm_service
+    if _llm_service is None:
+        _llm_service = LLMService()
+    return _llm_service
@@ -6,22 +6,87 @@ Handles:
   - Smart Campaign triggering for transactional emails
 """
 
+import asyncio
 import httpx
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.config import settings
+from app.services.rate_limiter import SlidingWindowLimiter
 
 logger = logging.getLogger(__name__)
 
+# Marketo error codes returned with HTTP 200 and success=false
+ACCESS_TOKEN_INVALID = {"601", "602"}
+RATE_LIMIT_EXCEEDED = "606"
+DAILY_QUOTA_REACHED = "607"
+
+# Retries for 601/602/606 responses before giving up
+MAX_API_RETRIES = 3
+
+# Marketo batch limits
+LEAD_BATCH_SIZE = 300  # leads.json input records per call
+TRIGGER_BATCH_SIZE = 100  # leads per campaign trigger call
+
+# Per-lead statuses from leads.json that count as success
+LEAD_SUCCESS_STATUSES = {"updated", "created"}
+
+# Marketo resets the daily quota at midnight US Central time
+try:
+    QUOTA_TIMEZONE = ZoneInfo("America/Chicago")
+except ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = timezone.utc
+
+
+class DailyQuotaExceeded(ValueError):
+    """Raised when the Marketo daily API quota is used up."""
+
+
+class DailyQuotaCounter:
+    """Counts REST calls against Marketo's daily quota."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.day = self._today()
+        self.used = 0
+
+    @staticmethod
+    def _today():
+        return datetime.now(QUOTA_TIMEZONE).date()
+
+    def _roll(self) -> None:
+        today = self._today()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def consume(self) -> None:
+        """Record one call, raising if the quota is exhausted."""
+        self._roll()
+        if self.used >= self.limit:
+            raise DailyQuotaExceeded(f"Marketo daily API quota of {self.limit} calls reached")
+        self.used += 1
+
+    def exhaust(self) -> None:
+        """Mark the quota used up (Marketo returned 607)."""
+        self._roll()
+        self.used = max(self.used, self.limit)
+
+    @property
+    def remaining(self) -> int:
+        self._roll()
+        return max(0, self.limit - self.used)
+
 
 class MarketoService:
     """
     Client for Marketo REST API.
 
     Authentication: 2-legged OAuth 2.0
-    Rate limits: 100 calls/20 seconds, 50,000 calls/day
+    Rate limits: 100 calls/20 seconds, 50,000 calls/day (enforced client-side)
     """
 
     def __init__(self):
@@ -34,6 +99,53 @@ class MarketoService:
         self.client_secret = settings.MARKETO_CLIENT_SECRET
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[datetime] = None
+        self.token_refreshes = 0
+
+        # Pooled HTTP client and token lock, bound to the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox: Optional["MarketoOutbox"] = None
+
+        self.window = SlidingWindowLimiter(
+            settings.MARKETO_RATE_LIMIT_CALLS,
+            settings.MARKETO_RATE_LIMIT_WINDOW
+        )
+        self.daily_quota = DailyQuotaCounter(settings.MARKETO_DAILY_QUOTA)
+
+    def _bind_loop(self) -> None:
+        """Create the pooled client and lock for the current event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A client from a previous loop cannot be reused; drop it
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+            )
+            self._token_lock = asyncio.Lock()
+            self._outbox = MarketoOutbox(self, settings.MARKETO_OUTBOX_FLUSH_SECONDS)
+            self._loop = loop
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all Marketo calls on this loop."""
+        self._bind_loop()
+        return self._client
+
+    @property
+    def outbox(self) -> "MarketoOutbox":
+        """Coalescing outbox for batched lead updates and campaign triggers."""
+        self._bind_loop()
+        return self._outbox
+
+    async def aclose(self) -> None:
+        """Flush the outbox and close the pooled HTTP client."""
+        if self._outbox is not None:
+            await self._outbox.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
 
     def is_configured(self) -> bool:
         """Check if Marketo credentials are configured."""
@@ -56,17 +168,21 @@ class MarketoService:
         Raises:
             httpx.HTTPError: If token request fails
         """
-        if self._access_token and self._token_expires_at:
-            if datetime.utcnow() < self._token_expires_at - timedelta(minutes=5):
-                return self._access_token
+        if self._token_is_fresh():
+            return self._access_token
 
         if not self.is_configured():
             raise ValueError("Marketo credentials not configured")
 
-        logger.info("Fetching new Marketo access token")
+        self._bind_loop()
+        async with self._token_lock:
+            # Another task may have refreshed while we waited for the lock
+            if self._token_is_fresh():
+                return self._access_token
+
+            logger.info("Fetching new Marketo access token")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
+            response = await self.client.get(
                 f"{self.identity_url}/oauth/token",
                 params={
                     "grant_type": "client_credentials",
@@ -85,9 +201,96 @@ class MarketoService:
             self._token_expires_at = datetime.utcnow() + timedelta(
                 seconds=data.get("expires_in", 3600)
             )
+            self.token_refreshes += 1
             logger.info("Marketo access token obtained successfully")
             return self._access_token
 
+    def _token_is_fresh(self) -> bool:
+        """True if the cached token is valid for at least 5 more minutes."""
+        return bool(
+            self._access_token and self._token_expires_at and
+            datetime.utcnow() < self._token_expires_at - timedelta(minutes=5)
+        )
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Call a Marketo REST endpoint within the rate limits.
+
+        Waits for a slot in the 20-second window and counts the call against
+        the daily quota. Retries on expired tokens (601/602) and on Marketo's
+        own rate-limit error (606).
+
+        Args:
+            method: "GET" or "POST"
+            path: Path under the base URL, e.g. "/rest/v1/leads.json"
+            payload: JSON body for POST requests
+
+        Returns:
+            Parsed Marketo response (success may be false)
+
+        Raises:
+            DailyQuotaExceeded: If the daily quota is used up
+            httpx.HTTPError: If the HTTP request fails
+        """
+        for attempt in range(MAX_API_RETRIES + 1):
+            token = await self._get_access_token()
+            self.daily_quota.consume()
+            await self.window.acquire()
+
+            url = f"{self.base_url}{path}"
+            if method == "GET":
+                response = await self.client.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
+            else:
+                response = await self.client.post(
+                    url,
+                    headers={
+                        "Authorization": f"Bearer {token}",
+                        "Content-Type": "application/json"
+                    },
+                    json=payload
+                )
+            response.raise_for_status()
+            data = response.json()
+
+            codes = {str(e.get("code")) for e in data.get("errors", []) if isinstance(e, dict)}
+            if data.get("success") or not codes or attempt == MAX_API_RETRIES:
+                break
+            if DAILY_QUOTA_REACHED in codes:
+                self.daily_quota.exhaust()
+                raise DailyQuotaExceeded("Marketo reported daily API quota reached (607)")
+            if codes & ACCESS_TOKEN_INVALID:
+                logger.info("Marketo access token rejected, refreshing")
+                self._access_token = None
+            elif RATE_LIMIT_EXCEEDED in codes:
+                logger.warning("Marketo rate limit hit (606), backing off")
+                await asyncio.sleep(self.window.window_seconds / 4)
+            else:
+                break
+
+        return data
+
+    def get_usage(self) -> Dict[str, Any]:
+        """Return quota and rate-limit counters for status reporting."""
+        return {
+            "daily_quota": self.daily_quota.limit,
+            "calls_today": self.daily_quota.used,
+            "remaining_today": self.daily_quota.remaining,
+            "quota_day": self.daily_quota.day.isoformat(),
+            "window_calls": self.window.in_window(),
+            "window_limit": self.window.max_calls,
+            "window_seconds": self.window.window_seconds,
+            "throttled": self.window.throttled,
+            "token_refreshes": self.token_refreshes,
+            "outbox": self._outbox.get_stats() if self._outbox else None,
+        }
+
     async def update_lead(self, lead_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update lead record with new field values.
@@ -102,8 +305,6 @@ class MarketoService:
         Raises:
             httpx.HTTPError: If API call fails
         """
-        token = await self._get_access_token()
-
         payload = {
             "action": "updateOnly",
             "lookupField": "id",
@@ -115,25 +316,15 @@ class MarketoService:
 
         logger.info(f"Updating Marketo lead {lead_id} with fields: {list(fields.keys())}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}/rest/v1/leads.json",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._request("POST", "/rest/v1/leads.json", payload)
 
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                logger.error(f"Marketo lead update failed: {errors}")
-                raise ValueError(f"Marketo update failed: {errors}")
+        if not data.get("success"):
+            errors = data.get("errors", [])
+            logger.error(f"Marketo lead update failed: {errors}")
+            raise ValueError(f"Marketo update failed: {errors}")
 
-            logger.info(f"Successfully updated Marketo lead {lead_id}")
-            return data
+        logger.info(f"Successfully updated Marketo lead {lead_id}")
+        return data
 
     async def trigger_campaign(
         self,
@@ -158,8 +349,6 @@ class MarketoService:
         Raises:
             httpx.HTTPError: If API call fails
         """
-        token = await self._get_access_token()
-
         payload: Dict[str, Any] = {
             "input": {
                 "leads": [{"id": int(lead_id)}]
@@ -174,25 +363,100 @@ class MarketoService:
 
         logger.info(f"Triggering Marketo campaign {campaign_id} for lead {lead_id}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.base_url}/rest/v1/campaigns/{campaign_id}/trigger.json",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._request(
+            "POST", f"/rest/v1/campaigns/{campaign_id}/trigger.json", payload
+        )
+
+        if not data.get("success"):
+            errors = data.get("errors", [])
+            logger.error(f"Marketo campaign trigger failed: {errors}")
+            raise ValueError(f"Marketo campaign trigger failed: {errors}")
+
+        logger.info(f"Successfully triggered campaign {campaign_id} for lead {lead_id}")
+        return data
+
+    async def update_leads(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Update up to 300 lead records in one leads.json call.
+
+        Args:
+            records: Input records, each with "id" and field values
+
+        Returns:
+            Marketo API response; "result" holds per-lead statuses in input order
+
+        Raises:
+            ValueError: If the call as a whole fails
+        """
+        if len(records) > LEAD_BATCH_SIZE:
+            raise ValueError(f"leads.json accepts at most {LEAD_BATCH_SIZE} records")
+
+        payload = {
+            "action": "updateOnly",
+            "lookupField": "id",
+            "input": records
+        }
+
+        logger.info(f"Updating {len(records)} Marketo leads in one batch")
 
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                logger.error(f"Marketo campaign trigger failed: {errors}")
-                raise ValueError(f"Marketo campaign trigger failed: {errors}")
+        data = await self._request("POST", "/rest/v1/leads.json", payload)
 
-            logger.info(f"Successfully triggered campaign {campaign_id} for lead {lead_id}")
-            return data
+        if not data.get("success"):
+            errors = data.get("errors", [])
+            logger.error(f"Marketo batch lead update failed: {errors}")
+            raise ValueError(f"Marketo update failed: {errors}")
+
+        return data
+
+    async def trigger_campaign_batch(
+        self,
+        campaign_id: str,
+        lead_ids: List[str],
+        tokens: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Trigger a Smart Campaign for up to 100 leads in one call.
+
+        Tokens apply to every lead in the call.
+
+        Args:
+            campaign_id: Marketo campaign ID
+            lead_ids: Lead IDs to add to campaign
+            tokens: Optional dict of my.token overrides
+
+        Returns:
+            Marketo API response
+
+        Raises:
+            ValueError: If the trigger fails
+        """
+        if len(lead_ids) > TRIGGER_BATCH_SIZE:
+            raise ValueError(f"Campaign trigger accepts at most {TRIGGER_BATCH_SIZE} leads")
+
+        payload: Dict[str, Any] = {
+            "input": {
+                "leads": [{"id": int(lead_id)} for lead_id in lead_ids]
+            }
+        }
+
+        if tokens:
+            payload["input"]["tokens"] = [
+                {"name": f"{{{{my.{k}}}}}", "value": v}
+                for k, v in tokens.items()
+            ]
+
+        logger.info(f"Triggering Marketo campaign {campaign_id} for {len(lead_ids)} leads")
+
+        data = await self._request(
+            "POST", f"/rest/v1/campaigns/{campaign_id}/trigger.json", payload
+        )
+
+        if not data.get("success"):
+            errors = data.get("errors", [])
+            logger.error(f"Marketo batch campaign trigger failed: {errors}")
+            raise ValueError(f"Marketo campaign trigger failed: {errors}")
+
+        return data
 
     async def get_lead(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -204,21 +468,198 @@ class MarketoService:
         Returns:
             Lead record or None if not found
         """
-        token = await self._get_access_token()
+        data = await self._request("GET", f"/rest/v1/lead/{lead_id}.json")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/rest/v1/lead/{lead_id}.json",
-                headers={
-                    "Authorization": f"Bearer {token}"
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
+        if data.get("success") and data.get("result"):
+            return data["result"][0]
+        return None
 
-            if data.get("success") and data.get("result"):
-                return data["result"][0]
-            return None
+
+class MarketoOutbox:
+    """
+    Coalesces lead updates and campaign triggers into batch REST calls.
+
+    Requests are held for up to flush_seconds (or until a batch is full) and
+    sent as one leads.json call per 300 leads and one trigger call per 100
+    leads sharing a (campaign, tokens) pair. Each caller awaits the result
+    for its own lead.
+    """
+
+    def __init__(self, service: MarketoService, flush_seconds: float):
+        """
+        Initialize outbox.
+
+        Args:
+            service: Marketo client used to send batches
+            flush_seconds: How long to collect requests before sending
+        """
+        self.service = service
+        self.flush_seconds = flush_seconds
+        # lead_id -> (merged fields, waiting futures)
+        self._updates: Dict[int, Tuple[Dict[str, Any], List[asyncio.Future]]] = {}
+        # (campaign_id, tokens) -> lead_id -> waiting futures
+        self._triggers: Dict[Tuple[str, Tuple], Dict[int, List[asyncio.Future]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats: Counter = Counter()
+
+    async def update_lead(self, lead_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a lead update and wait for its batch to be sent.
+
+        Returns:
+            Per-lead result from leads.json (id, status, batch_size)
+
+        Raises:
+            ValueError: If Marketo skipped the lead or the batch failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        key = int(lead_id)
+        if key in self._updates:
+            # Later values win; both callers receive the same result
+            self._updates[key][0].update(fields)
+            self._updates[key][1].append(future)
+        else:
+            self._updates[key] = (dict(fields), [future])
+        self._stats["lead_updates_queued"] += 1
+
+        if len(self._updates) >= LEAD_BATCH_SIZE:
+            self._start(self._flush_updates())
+        else:
+            self._schedule()
+        return await future
+
+    async def trigger_campaign(
+        self,
+        campaign_id: str,
+        lead_id: str,
+        tokens: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a campaign trigger and wait for its batch to be sent.
+        Only leads with identical tokens can share a trigger call.
+
+        Returns:
+            Per-lead result (id, status, batch_size)
+
+        Raises:
+            ValueError: If the trigger failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        group_key = (str(campaign_id), tuple(sorted((tokens or {}).items())))
+        group = self._triggers.setdefault(group_key, {})
+        group.setdefault(int(lead_id), []).append(future)
+        self._stats["triggers_queued"] += 1
+
+        if len(group) >= TRIGGER_BATCH_SIZE:
+            self._start(self._flush_triggers())
+        else:
+            self._schedule()
+        return await future
+
+    async def flush(self) -> None:
+        """Send everything queued now and wait for in-flight batches."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await asyncio.gather(
+            self._flush_updates(), self._flush_triggers(), *list(self._tasks),
+            return_exceptions=True
+        )
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._start(self._flush_updates())
+        self._start(self._flush_triggers())
+
+    def _start(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_updates(self) -> None:
+        """Send queued lead updates in chunks of LEAD_BATCH_SIZE."""
+        pending, self._updates = list(self._updates.items()), {}
+        for start in range(0, len(pending), LEAD_BATCH_SIZE):
+            chunk = pending[start:start + LEAD_BATCH_SIZE]
+            records = [{"id": lead_id, **fields} for lead_id, (fields, _) in chunk]
+            try:
+                data = await self.service.update_leads(records)
+            except Exception as e:
+                for _, (_, futures) in chunk:
+                    _settle(futures, error=e)
+                continue
+
+            self._stats["lead_update_calls"] += 1
+            self._stats["leads_updated"] += len(chunk)
+            results = data.get("result", [])
+            for i, (lead_id, (_, futures)) in enumerate(chunk):
+                result = results[i] if i < len(results) else {"id": lead_id, "status": "unknown"}
+                result = {**result, "batch_size": len(chunk)}
+                if result.get("status") in LEAD_SUCCESS_STATUSES:
+                    _settle(futures, result=result)
+                else:
+                    _settle(futures, error=ValueError(
+                        f"Marketo skipped lead {lead_id}: {result.get('reasons', result.get('status'))}"
+                    ))
+
+    async def _flush_triggers(self) -> None:
+        """Send queued triggers, one call per (campaign, tokens) per TRIGGER_BATCH_SIZE leads."""
+        pending, self._triggers = self._triggers, {}
+        for (campaign_id, token_items), leads in pending.items():
+            lead_items = list(leads.items())
+            for start in range(0, len(lead_items), TRIGGER_BATCH_SIZE):
+                chunk = lead_items[start:start + TRIGGER_BATCH_SIZE]
+                try:
+                    await self.service.trigger_campaign_batch(
+                        campaign_id,
+                        [str(lead_id) for lead_id, _ in chunk],
+                        tokens=dict(token_items) or None
+                    )
+                except Exception as e:
+                    for _, futures in chunk:
+                        _settle(futures, error=e)
+                    continue
+
+                self._stats["trigger_calls"] += 1
+                self._stats["leads_triggered"] += len(chunk)
+                for lead_id, futures in chunk:
+                    _settle(futures, result={
+                        "id": lead_id, "status": "triggered", "batch_size": len(chunk)
+                    })
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return queued/sent counts and REST calls saved by batching."""
+        calls = self._stats["lead_update_calls"] + self._stats["trigger_calls"]
+        leads = self._stats["leads_updated"] + self._stats["leads_triggered"]
+        return {
+            "lead_updates_queued": self._stats["lead_updates_queued"],
+            "triggers_queued": self._stats["triggers_queued"],
+            "lead_update_calls": self._stats["lead_update_calls"],
+            "trigger_calls": self._stats["trigger_calls"],
+            "pending_updates": len(self._updates),
+            "pending_triggers": sum(len(leads) for leads in self._triggers.values()),
+            "calls_saved": max(0, leads - calls),
+        }
+
+
+def _settle(
+    futures: List[asyncio.Future],
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[BaseException] = None
+) -> None:
+    """Resolve waiting callers, skipping any that were cancelled."""
+    for future in futures:
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
 
 
 # Singleton instance for reuse
@@ -231,3 +672,9 @@ def get_marketo_service() -> MarketoService:
     if _marketo_service is None:
         _marketo_service = MarketoService()
     return _marketo_service
+
+
+async def close_marketo_service() -> None:
+    """Close the singleton's pooled HTTP client (app shutdown)."""
+    if _marketo_service is not None:
+        await _marketo_service.aclose()
@@ -0,0 +1,182 @@
+"""
+Prometheus metrics for the personalization pipeline, served at /metrics.
+
+Metrics are derived from the tracing spans (app/services/tracing.py), so
+every instrumented stage is counted without a second set of timers:
+
+- vendor.<source>   -> enrichment_vendor_requests_total{source,outcome}
+                       (success, error, mock, timeout) + latency histogram
+- llm.<provider>    -> llm_request_seconds, llm_requests_total, llm_retries_total,
+                       llm_tokens_total{direction} (input, output, cache_read and
+                       cache_write, from the SDK usage fields)
+- llm.generate      -> llm_fallbacks_total{to} (a later provider or mock answered),
+                       llm_stage_tokens_total{task,direction}, llm_cost_usd_total{task},
+                       llm_prompt_tokens{task}, llm_prompt_trimmed_total{section,action}
+- compliance        -> compliance_checks_total{outcome} (pass, corrected, fallback)
+- pdf.render        -> pdf_render_seconds{backend,outcome}
+- storage.upload    -> storage_upload_seconds
+- webhook           -> webhook_processing_seconds, webhook_queue_wait_seconds
+
+Values are updated when spans finish; a scrape only serializes them. With
+several gunicorn/uvicorn workers set PROMETHEUS_MULTIPROC_DIR (an empty
+directory, cleared on deploy) so each worker writes its values to shared
+files and /metrics aggregates them; call mark_process_dead(pid) from the
+gunicorn child_exit hook. prometheus_client is optional: without it spans
+are still recorded and /metrics reports 503.
+"""
+
+import logging
+import os
+from typing import Optional, Tuple
+
+from app.services import tracing
+from app.services.tracing import Span
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds): vendor/LLM calls run 0.1s-30s, renders 10ms-10s
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+if PROMETHEUS_AVAILABLE:
+    VENDOR_REQUESTS = Counter(
+        "enrichment_vendor_requests_total", "Enrichment source fetches by outcome",
+        ["source", "outcome"]
+    )
+    VENDOR_SECONDS = Histogram(
+        "enrichment_vendor_request_seconds", "Enrichment source fetch latency",
+        ["source"], buckets=SLOW_BUCKETS
+    )
+    LLM_REQUESTS = Counter(
+        "llm_requests_total", "LLM provider attempts by outcome", ["provider", "outcome"]
+    )
+    LLM_SECONDS = Histogram(
+        "llm_request_seconds", "LLM provider attempt latency", ["provider"], buckets=SLOW_BUCKETS
+    )
+    LLM_RETRIES = Counter("llm_retries_total", "LLM retries of the same provider", ["provider"])
+    LLM_FALLBACKS = Counter(
+        "llm_fallbacks_total", "Generations answered by a fallback provider (or mock)", ["to"]
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total", "Tokens reported by the provider SDK", ["provider", "direction"]
+    )
+    LLM_STAGE_TOKENS = Counter(
+        "llm_stage_tokens_total", "Tokens per pipeline stage", ["task", "direction"]
+    )
+    LLM_COST = Counter("llm_cost_usd_total", "Estimated LLM spend in USD", ["task"])
+    LLM_PROMPT_TOKENS = Histogram(
+        "llm_prompt_tokens", "Estimated prompt size after budget trimming", ["task"],
+        buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000)
+    )
+    LLM_PROMPT_TRIMMED = Counter(
+        "llm_prompt_trimmed_total", "Prompt sections dropped or truncated by the token budget",
+        ["section", "action"]
+    )
+    COMPLIANCE_CHECKS = Counter(
+        "compliance_checks_total", "Compliance checks by outcome", ["outcome"]
+    )
+    PDF_RENDER_SECONDS = Histogram(
+        "pdf_render_seconds", "PDF render time by backend", ["backend", "outcome"],
+        buckets=FAST_BUCKETS
+    )
+    STORAGE_UPLOAD_SECONDS = Histogram(
+        "storage_upload_seconds", "Supabase Storage upload time", buckets=FAST_BUCKETS
+    )
+    WEBHOOK_SECONDS = Histogram(
+        "webhook_processing_seconds", "Webhook pipeline time", ["status"], buckets=SLOW_BUCKETS
+    )
+    WEBHOOK_QUEUE_WAIT_SECONDS = Histogram(
+        "webhook_queue_wait_seconds", "Time a queued webhook waited to be claimed",
+        buckets=SLOW_BUCKETS
+    )
+
+
+def _split(name: str) -> Tuple[str, Optional[str]]:
+    """'vendor.apollo' -> ('vendor', 'apollo'); 'compliance' -> ('compliance', None)."""
+    kind, _, rest = name.partition(".")
+    return kind, rest or None
+
+
+class MetricsExporter:
+    """Span exporter that updates the Prometheus metrics."""
+
+    def export(self, span: Span) -> None:
+        kind, detail = _split(span.name)
+        seconds = span.duration_ms / 1000
+        attributes = span.attributes
+
+        if kind == "vendor":
+            outcome = attributes.get("outcome") or ("error" if span.status == "error" else "success")
+            VENDOR_REQUESTS.labels(detail, outcome).inc()
+            VENDOR_SECONDS.labels(detail).observe(seconds)
+        elif kind == "llm" and detail == "generate":
+            if attributes.get("fallback_to"):
+                LLM_FALLBACKS.labels(attributes["fallback_to"]).inc()
+            task = attributes.get("task", "unknown")
+            for direction in ("input", "output"):
+                tokens = attributes.get(f"{direction}_tokens")
+                if tokens:
+                    LLM_STAGE_TOKENS.labels(task, direction).inc(tokens)
+            if attributes.get("cost_usd"):
+                LLM_COST.labels(task).inc(attributes["cost_usd"])
+            if attributes.get("prompt_tokens_estimate") is not None:
+                LLM_PROMPT_TOKENS.labels(task).observe(attributes["prompt_tokens_estimate"])
+            for trimmed in attributes.get("prompt_trimmed", ()):
+                section, _, action = trimmed.partition(":")
+                LLM_PROMPT_TRIMMED.labels(section, action or "dropped").inc()
+        elif kind == "llm":
+            LLM_REQUESTS.labels(detail, "error" if span.status == "error" else "success").inc()
+            LLM_SECONDS.labels(detail).observe(seconds)
+            if attributes.get("attempt", 1) > 1:
+                LLM_RETRIES.labels(detail).inc()
+            for direction in ("input", "output", "cache_read", "cache_write"):
+                tokens = attributes.get(f"{direction}_tokens")
+                if tokens:
+                    LLM_TOKENS.labels(detail, direction).inc(tokens)
+        elif kind == "compliance":
+            COMPLIANCE_CHECKS.labels(attributes.get("outcome", "pass")).inc()
+        elif span.name == "pdf.render":
+            PDF_RENDER_SECONDS.labels(
+                attributes.get("backend", "unknown"), "error" if span.status == "error" else "success"
+            ).observe(seconds)
+        elif span.name == "storage.upload":
+            STORAGE_UPLOAD_SECONDS.observe(seconds)
+        elif span.name == "webhook":
+            WEBHOOK_SECONDS.labels(span.status).observe(seconds)
+            if attributes.get("queue_wait_s") is not None:
+                WEBHOOK_QUEUE_WAIT_SECONDS.observe(attributes["queue_wait_s"])
+
+
+def render_metrics() -> bytes:
+    """Serialize current metrics (aggregated across workers in multiprocess mode)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_process_dead(pid: int) -> None:
+    """gunicorn child_exit hook: drop a dead worker's live-value files."""
+    if PROMETHEUS_AVAILABLE and os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+if PROMETHEUS_AVAILABLE:
+    tracing.add_exporter(MetricsExporter())
+else:
+    logger.info("prometheus_client not installed; /metrics disabled")
@@ -0,0 +1,227 @@
+"""
+On-disk cache of rendered PDFs keyed by personalization fingerprint.
+
+The fingerprint hashes everything that feeds the render (personalization,
+render mode and configured backends). Each cached file is stored under the
+fingerprint plus the backend that produced it, and that key doubles as the
+download ETag: a repeat open can be answered with 304 (or served from disk)
+without re-rendering. Also holds the HTTP Range helpers used to stream
+cached files to PDF viewers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when template or renderer changes should invalidate cached PDFs
+RENDER_VERSION = "2"
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def pdf_fingerprint(
+    profile: Dict[str, Any],
+    intro_hook: str,
+    cta: str,
+    backends: Sequence[str] = ()
+) -> str:
+    """
+    Hash the inputs of a download render.
+
+    Args:
+        profile: Normalized profile (includes ebook_personalization/user_context)
+        intro_hook: Personalization intro
+        cta: Personalization CTA
+        backends: Configured rendering backends, in preference order
+
+    Returns:
+        Hex digest, stable across processes
+    """
+    payload = json.dumps(
+        {
+            "v": RENDER_VERSION,
+            "mode": settings.PDF_RENDER_MODE,
+            "backends": list(backends),
+            "profile": profile,
+            "intro": intro_hook,
+            "cta": cta,
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def variant_key(fingerprint: str, backend: str) -> str:
+    """Cache key (and ETag) of the PDF one backend rendered for a fingerprint."""
+    return f"{fingerprint}-{backend}"
+
+
+class PDFArtifactCache:
+    """
+    Directory of rendered PDFs named by fingerprint.
+
+    Writes are atomic (temp file + rename) so concurrent readers never see
+    a partial file. When the directory grows past max_bytes the least
+    recently used files are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Size limit before old entries are evicted
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+
+    def path_for(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.pdf"
+
+    def get(self, fingerprint: str) -> Optional[Path]:
+        """Return the cached file for a fingerprint, or None."""
+        path = self.path_for(fingerprint)
+        try:
+            # Touch for LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return path
+
+    def open_any(self, keys: List[str]) -> Optional[Tuple[str, BinaryIO]]:
+        """
+        Open the first cached file among ``keys``.
+
+        The file is opened here, so an eviction after this call can't make
+        it disappear while it is being served.
+
+        Returns:
+            (key, open binary file), or None if none is cached
+        """
+        for key in keys:
+            path = self.path_for(key)
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            try:
+                # Touch for LRU eviction
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            self._hits += 1
+            return key, f
+        self._misses += 1
+        return None
+
+    def put(self, fingerprint: str, pdf_bytes: bytes) -> Path:
+        """Store rendered bytes and return the cached file path."""
+        path = self.path_for(fingerprint)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._evict()
+        return path
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self.directory.glob("*.pdf"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted cached PDF {entry.name}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts."""
+        return {"directory": str(self.directory), "hits": self._hits, "misses": self._misses}
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header.
+
+    Returns:
+        Inclusive (start, end), or None to serve the whole file (no header,
+        other units, or multiple ranges)
+
+    Raises:
+        ValueError: If the range cannot be satisfied (respond 416)
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, end
+
+
+def iter_file(f: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of an open file in chunks, then close it."""
+    with f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# Global instance (lazy-loaded)
+_pdf_cache: Optional[PDFArtifactCache] = None
+
+
+def get_pdf_cache() -> PDFArtifactCache:
+    """Get or create the PDF artifact cache from settings."""
+    global _pdf_cache
+    if _pdf_cache is None:
+        _pdf_cache = PDFArtifactCache(
+            settings.PDF_CACHE_DIR,
+            max_bytes=settings.PDF_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _pdf_cache
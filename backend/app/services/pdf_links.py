@@ -0,0 +1,114 @@
+"""
+Signed, deterministic PDF links issued before rendering completes.
+
+A link names the webhook (or lead) ID, not the file, so it can be handed to
+Marketo immediately. The storage filename is derived from the same ID. When
+the link is opened, the redirect endpoint sends the visitor to the stored PDF
+or, if it is not there yet, joins the in-flight render (or starts one).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Set
+from urllib.parse import urlencode
+
+from app.config import settings
+from app.services.pdf_service import PDFService
+from app.services.single_flight import get_single_flight
+from app.services.supabase_client import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+# Renderer runs the pipeline for a key and returns the signed storage URL
+PDFRenderer = Callable[[str, SupabaseClient], Awaitable[str]]
+
+_renderer: Optional[PDFRenderer] = None
+_background: Set[asyncio.Task] = set()
+
+
+def _secret() -> bytes:
+    # Never fall back to another credential: an empty key makes links forgeable
+    if not settings.PDF_LINK_SECRET:
+        raise RuntimeError("PDF_LINK_SECRET is not configured")
+    return settings.PDF_LINK_SECRET.encode()
+
+
+def pdf_filename(key: str) -> str:
+    """Deterministic storage filename for a webhook or lead ID."""
+    return f"ebook_{hashlib.sha256(key.encode()).hexdigest()[:24]}.pdf"
+
+
+def _signature(key: str, expires: int) -> str:
+    return hmac.new(_secret(), f"{key}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign_pdf_link(key: str, ttl_seconds: Optional[int] = None) -> str:
+    """
+    Build the public, signed redirect URL for a key.
+
+    Args:
+        key: Webhook or lead ID
+        ttl_seconds: Link lifetime (defaults to PDF_LINK_TTL_HOURS)
+
+    Returns:
+        Absolute URL of the redirect endpoint
+    """
+    ttl = ttl_seconds if ttl_seconds is not None else settings.PDF_LINK_TTL_HOURS * 3600
+    expires = int(time.time()) + ttl
+    query = urlencode({"expires": expires, "sig": _signature(key, expires)})
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/rad/marketo/pdf/{key}?{query}"
+
+
+def verify_pdf_link(key: str, expires: int, sig: str) -> bool:
+    """Check a link's signature and expiry (always False without a secret)."""
+    if expires < time.time() or not settings.PDF_LINK_SECRET:
+        return False
+    return hmac.compare_digest(_signature(key, expires), sig)
+
+
+def register_pdf_renderer(renderer: PDFRenderer) -> None:
+    """Set the coroutine that renders the PDF for a key."""
+    global _renderer
+    _renderer = renderer
+
+
+async def render_pdf(key: str, supabase: SupabaseClient) -> str:
+    """
+    Run the registered renderer for a key, at most once at a time.
+
+    The webhook's background render, the queue worker and early link clicks
+    all go through here, so they share one in-flight render.
+    """
+    if _renderer is None:
+        raise RuntimeError("No PDF renderer registered")
+    return await get_single_flight().do(("pdf", key), lambda: _renderer(key, supabase))
+
+
+def start_pdf_render(key: str, supabase: SupabaseClient) -> None:
+    """Begin rendering in the background (called when the link is issued)."""
+    task = asyncio.get_running_loop().create_task(render_pdf(key, supabase))
+    _background.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _background.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.error(f"Background PDF render for {key} failed: {t.exception()}")
+
+    task.add_done_callback(_done)
+
+
+async def resolve_pdf(key: str, supabase: SupabaseClient) -> str:
+    """
+    Get the signed storage URL for a key, rendering if necessary.
+
+    Returns the stored PDF if it exists; otherwise waits for the in-flight
+    render, or renders now (e.g. after a restart lost the background task).
+    """
+    stored = await PDFService(supabase_client=supabase).get_stored_pdf_url(pdf_filename(key))
+    if stored:
+        return stored
+    logger.info(f"PDF for {key} not stored yet, waiting for render")
+    return await render_pdf(key, supabase)
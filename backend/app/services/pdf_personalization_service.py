@@ -25,11 +25,19 @@ Usage:
 """
 
 import io
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Tuple
 
 import pypdf
 
+# Content loaders live in ebook_content (re-exported here for existing imports)
+from app.services.ebook_content import (  # noqa: F401
+    load_industry_content,
+    load_job_function_content,
+    load_segment_content,
+)
+
 # Template paths
 TEMPLATE_DIR = Path(__file__).parent.parent.parent / "assets"
 TEMPLATE_WITH_FIELDS = TEMPLATE_DIR / "amdtemplate_with_fields.pdf"
@@ -43,6 +51,15 @@ FIELD_CASE_STUDY_3 = "case_study_3_framing"
 FIELD_CTA_ASSESSMENT = "personalized_cta_assessment"
 FIELD_CTA_FOOTER = "personalized_cta_footer"
 
+REQUIRED_FIELDS = frozenset({
+    FIELD_HOOK,
+    FIELD_CASE_STUDY_1,
+    FIELD_CASE_STUDY_2,
+    FIELD_CASE_STUDY_3,
+    FIELD_CTA_ASSESSMENT,
+    FIELD_CTA_FOOTER,
+})
+
 # Industry to case study mapping
 INDUSTRY_CASE_STUDY_MAP = {
     # Cloud/GPU focus -> KT Cloud (case study 1)
@@ -66,6 +83,24 @@ INDUSTRY_CASE_STUDY_MAP = {
 }
 
 
+@lru_cache(maxsize=2)
+def _read_template(path: str, mtime: float) -> Tuple[bytes, frozenset]:
+    """Template bytes and field names, cached until the file changes."""
+    data = Path(path).read_bytes()
+    fields = pypdf.PdfReader(io.BytesIO(data)).get_fields() or {}
+    return data, frozenset(fields)
+
+
+def _load_template() -> Tuple[bytes, frozenset]:
+    """Cached template bytes and field names (re-read when the file is replaced)."""
+    if not TEMPLATE_WITH_FIELDS.exists():
+        raise FileNotFoundError(
+            f"Template not found: {TEMPLATE_WITH_FIELDS}. "
+            "Designer must create template with AcroForm fields."
+        )
+    return _read_template(str(TEMPLATE_WITH_FIELDS), TEMPLATE_WITH_FIELDS.stat().st_mtime)
+
+
 def get_template_fields() -> dict:
     """
     Get all form fields from the template PDF.
@@ -98,14 +133,7 @@ def validate_template() -> dict:
     Returns:
         dict: Validation result with 'valid' bool and 'missing' list
     """
-    required_fields = {
-        FIELD_HOOK,
-        FIELD_CASE_STUDY_1,
-        FIELD_CASE_STUDY_2,
-        FIELD_CASE_STUDY_3,
-        FIELD_CTA_ASSESSMENT,
-        FIELD_CTA_FOOTER,
-    }
+    required_fields = REQUIRED_FIELDS
 
     try:
         fields = get_template_fields()
@@ -166,13 +194,13 @@ def fill_personalization_fields(
     Returns:
         bytes: PDF with filled fields (not yet flattened)
     """
-    if not TEMPLATE_WITH_FIELDS.exists():
-        raise FileNotFoundError(
-            f"Template not found: {TEMPLATE_WITH_FIELDS}. "
-            "Designer must create template with AcroForm fields."
-        )
+    return _write(_filled_writer(personalized_content, industry))
 
-    reader = pypdf.PdfReader(str(TEMPLATE_WITH_FIELDS))
+
+def _filled_writer(personalized_content: dict, industry: str) -> pypdf.PdfWriter:
+    """Clone the cached template and fill its fields."""
+    template_bytes, _ = _load_template()
+    reader = pypdf.PdfReader(io.BytesIO(template_bytes))
     writer = pypdf.PdfWriter()
 
     # Clone entire document (preserves AcroForm structure)
@@ -194,18 +222,21 @@ def fill_personalization_fields(
     # Fill form fields on ALL pages (fields are on pages 0, 10, 11, 12, 13, 15)
     # update_page_form_field_values needs to be called for each page with fields
     for page in writer.pages:
-        writer.update_page_form_field_values(page, field_values)
+        # Pages without widget annotations have nothing to fill
+        if "/Annots" in page:
+            writer.update_page_form_field_values(page, field_values)
 
     # Set NeedAppearances flag to ensure PDF readers render the field content
     if "/AcroForm" in writer._root_object:
         writer._root_object["/AcroForm"][pypdf.generic.NameObject("/NeedAppearances")] = pypdf.generic.BooleanObject(True)
 
-    # Write to bytes
+    return writer
+
+
+def _write(writer: pypdf.PdfWriter) -> bytes:
     output = io.BytesIO()
     writer.write(output)
-    output.seek(0)
-
-    return output.read()
+    return output.getvalue()
 
 
 def flatten_pdf(pdf_bytes: bytes) -> bytes:
@@ -272,93 +303,19 @@ def personalize_ebook(
         FileNotFoundError: If template doesn't exist
         ValueError: If template is missing required fields
     """
-    # Validate template first
-    validation = validate_template()
-    if not validation["valid"]:
-        if "error" in validation:
-            raise FileNotFoundError(validation["error"])
-        raise ValueError(f"Template missing required fields: {validation['missing']}")
+    # Validate template first (fields are cached with the template bytes)
+    _, fields = _load_template()
+    missing = REQUIRED_FIELDS - fields
+    if missing:
+        raise ValueError(f"Template missing required fields: {list(missing)}")
 
     # Fill the fields
-    filled_pdf = fill_personalization_fields(
-        personalized_content=personalized_content,
-        industry=industry,
-    )
-
-    # Flatten if requested
-    if flatten:
-        return flatten_pdf(filled_pdf)
-
-    return filled_pdf
-
-
-# Content loading utilities
-
-def load_industry_content(industry: str) -> Optional[str]:
-    """Load industry-specific content from markdown files."""
-    content_dir = TEMPLATE_DIR / "content"
-
-    # Map industry names to file names
-    industry_files = {
-        "healthcare": "KP_Industry_Healthcare.md",
-        "financial_services": "KP_Industry_Financial Services.md",
-        "manufacturing": "KP_Industry_Manufacturing.md",
-        "energy": "KP_Industry_Energy.md",
-        "retail": "KP_Industry_Retail.md",
-        "education": "KP_Industry_Education.md",
-        "consumer_goods": "KP_Industry_Consumer Goods.md",
-        "media": "KP_Industry_Media and Ent.md",
-        "non_profit": "KP_Industry_Non-Profit.md",
-    }
-
-    filename = industry_files.get(industry.lower().replace(" ", "_"))
-    if not filename:
-        return None
-
-    filepath = content_dir / filename
-    if not filepath.exists():
-        return None
-
-    return filepath.read_text()
-
+    writer = _filled_writer(personalized_content, industry)
 
-def load_job_function_content(job_function: str) -> Optional[str]:
-    """Load job function content from markdown files."""
-    content_dir = TEMPLATE_DIR / "content"
-
-    function_files = {
-        "bdm": "KP_Job Function_BDM.md",
-        "itdm": "KP_Job Function_ITDM.md",
-    }
-
-    filename = function_files.get(job_function.lower())
-    if not filename:
-        return None
-
-    filepath = content_dir / filename
-    if not filepath.exists():
-        return None
-
-    return filepath.read_text()
-
-
-def load_segment_content(segment: str) -> Optional[str]:
-    """Load segment content from markdown files."""
-    content_dir = TEMPLATE_DIR / "content"
-
-    segment_files = {
-        "enterprise": "KP_Segment_Enterprise.md",
-        "government": "KP_Segment_Government.md",
-        "mid_market": "KP_Segment_Mid-Market.md",
-        "smb": "KP_Segment_SMB.md",
-    }
-
-    filename = segment_files.get(segment.lower().replace("-", "_").replace(" ", "_"))
-    if not filename:
-        return None
+    # Flatten if requested: drop the AcroForm from the same writer rather
+    # than serializing and re-parsing the filled PDF
+    if flatten and "/AcroForm" in writer._root_object:
+        del writer._root_object["/AcroForm"]
 
-    filepath = content_dir / filename
-    if not filepath.exists():
-        return None
+    return _write(writer)
 
-    return filepath.read_text()
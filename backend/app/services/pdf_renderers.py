@@ -0,0 +1,340 @@
+"""
+PDF rendering backends, probed once and chosen per render.
+
+Backends:
+- weasyprint: renders the ebook HTML
+- reportlab: renders the structured EbookDocument directly
+- acroform: fills the designer's AcroForm template (pdf_personalization_service)
+
+Each backend is probed once at startup; unavailable ones are skipped
+instead of failing on every request. With WARM_UP_ON_STARTUP each available
+backend also renders a sample document so the first request after a deploy
+does not pay for imports, fonts and template loading. PDF_RENDER_MODE=acroform puts the
+AcroForm fill first. PDF_RENDERER_SELECTION=ordered tries
+backends in PDF_RENDERERS order; "latency" prefers the backend with the
+lowest recent median latency among those within the error budget. Render
+timings and output sizes are kept per backend for /rad/status.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.ebook_document import EbookDocument, document_from_html, render_reportlab
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+PROBE_HTML = "<html><body><p>probe</p></body></html>"
+
+
+class RenderError(Exception):
+    """Every eligible backend failed (or none is available)."""
+
+
+@dataclass
+class RenderRequest:
+    """One render: the HTML and, when the caller has it, the structured document."""
+
+    html: str
+    document: Optional[EbookDocument] = None
+
+
+# Rendered once per backend at startup (RendererRegistry.warm_up); never stored
+WARM_UP_DOCUMENT = EbookDocument(
+    first_name="Warm",
+    company_name="Warm-up",
+    industry="technology",
+    persona="cto",
+    buying_stage="awareness",
+    personalized_hook="Warm-up render.",
+    case_study_framing="Warm-up render.",
+    personalized_cta="Warm-up render.",
+)
+
+
+class PDFRenderer(ABC):
+    """Base class for rendering backends."""
+
+    name: str = "unknown"
+
+    @abstractmethod
+    def probe(self) -> None:
+        """Raise if the backend cannot render in this environment."""
+
+    def supports(self, request: RenderRequest) -> bool:
+        """Whether this backend can render the request."""
+        return True
+
+    @abstractmethod
+    def render(self, request: RenderRequest) -> bytes:
+        """Render PDF bytes (blocking; called in a worker thread)."""
+
+    def warm_up(self) -> None:
+        """Pay one-off first-render costs (imports, fonts, caches) before traffic."""
+
+
+class WeasyPrintRenderer(PDFRenderer):
+    """HTML to PDF with weasyprint (needs pango/cairo system libraries)."""
+
+    name = "weasyprint"
+
+    def probe(self) -> None:
+        from weasyprint import HTML
+        HTML(string=PROBE_HTML).write_pdf()
+
+    def render(self, request: RenderRequest) -> bytes:
+        from weasyprint import HTML
+        return HTML(string=request.html).write_pdf()
+
+
+class ReportlabRenderer(PDFRenderer):
+    """Structured document to PDF with reportlab (no HTML parsing)."""
+
+    name = "reportlab"
+
+    def probe(self) -> None:
+        import reportlab  # noqa: F401
+
+    def render(self, request: RenderRequest) -> bytes:
+        # Bare-HTML callers still work via extraction
+        document = request.document or document_from_html(request.html)
+        return render_reportlab(document)
+
+    def warm_up(self) -> None:
+        # Imports the platypus modules and builds the cached styles and static flowables
+        render_reportlab(WARM_UP_DOCUMENT)
+
+
+class AcroFormRenderer(PDFRenderer):
+    """Fills the AcroForm fields of the designer's PDF template."""
+
+    name = "acroform"
+
+    def probe(self) -> None:
+        from app.services.pdf_personalization_service import validate_template
+        validation = validate_template()
+        if not validation["valid"]:
+            raise RuntimeError(validation.get("error") or f"Template missing fields: {validation['missing']}")
+
+    def supports(self, request: RenderRequest) -> bool:
+        # Needs the personalized slots, which only the structured document carries
+        return request.document is not None
+
+    def warm_up(self) -> None:
+        # Loads and caches the template bytes and its field map
+        self.render(RenderRequest(html="", document=WARM_UP_DOCUMENT))
+
+    def render(self, request: RenderRequest) -> bytes:
+        from app.services.pdf_personalization_service import personalize_ebook
+        document = request.document
+        return personalize_ebook(
+            persona=document.persona,
+            industry=document.industry,
+            buying_stage=document.buying_stage,
+            company_name=document.company_name,
+            personalized_content={
+                "hook": document.personalized_hook,
+                "case_study_framing": document.case_study_framing,
+                "cta_assessment": document.personalized_cta,
+                "cta_footer": document.personalized_cta,
+            }
+        )
+
+
+class _BackendStats:
+    """Rolling window of (ok, latency ms, output bytes) for one backend."""
+
+    def __init__(self, window: int):
+        self.samples: Deque[Tuple[bool, float, int]] = deque(maxlen=window)
+        self.renders = 0
+        self.errors = 0
+
+    def record(self, ok: bool, ms: float, size: int = 0) -> None:
+        self.samples.append((ok, ms, size))
+        self.renders += ok
+        self.errors += not ok
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for ok, _, _ in self.samples if not ok) / len(self.samples)
+
+    def latencies(self) -> List[float]:
+        return [ms for ok, ms, _ in self.samples if ok]
+
+    def median_ms(self) -> float:
+        latencies = self.latencies()
+        # Untried backends sort first so they get measured
+        return statistics.median(latencies) if latencies else 0.0
+
+
+class RendererRegistry:
+    """Probes backends once and renders with the best available one."""
+
+    def __init__(
+        self,
+        renderers: List[PDFRenderer],
+        selection: str = "ordered",
+        error_budget: float = 0.2,
+        window: int = 50
+    ):
+        """
+        Initialize registry.
+
+        Args:
+            renderers: Backends in preference order
+            selection: "ordered" (configured order) or "latency" (fastest within budget)
+            error_budget: Max recent error rate before a backend is demoted
+            window: Renders kept per backend for rolling stats
+        """
+        self.renderers = renderers
+        self.selection = selection
+        self.error_budget = error_budget
+        self._available: Dict[str, bool] = {}
+        self._probe_errors: Dict[str, str] = {}
+        self._stats = {r.name: _BackendStats(window) for r in renderers}
+
+    def probe(self) -> Dict[str, bool]:
+        """Check each backend once (blocking). Returns availability by name."""
+        for renderer in self.renderers:
+            try:
+                renderer.probe()
+                self._available[renderer.name] = True
+                logger.info(f"PDF renderer '{renderer.name}' available")
+            except Exception as e:
+                self._available[renderer.name] = False
+                self._probe_errors[renderer.name] = f"{type(e).__name__}: {e}"
+                logger.warning(f"PDF renderer '{renderer.name}' unavailable: {e}")
+        return dict(self._available)
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Render a sample with each available backend (blocking), so the first
+        real request does not pay for imports, fonts and template loading.
+        Warm-up renders are not counted in the backend stats.
+
+        Returns:
+            Warm-up time in ms by backend
+        """
+        if not self.probed:
+            self.probe()
+        timings = {}
+        for renderer in self.renderers:
+            if not self._available.get(renderer.name):
+                continue
+            start = time.perf_counter()
+            try:
+                renderer.warm_up()
+            except Exception as e:
+                logger.warning(f"PDF renderer '{renderer.name}' warm-up failed: {e}")
+                continue
+            timings[renderer.name] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"PDF renderers warmed up: {timings}")
+        return timings
+
+    @property
+    def probed(self) -> bool:
+        return len(self._available) == len(self.renderers)
+
+    def candidates(self, request: RenderRequest) -> List[PDFRenderer]:
+        """Available backends for a request, best first."""
+        eligible = [
+            r for r in self.renderers
+            if self._available.get(r.name) and r.supports(request)
+        ]
+        if self.selection != "latency":
+            return eligible
+        within = [r for r in eligible if self._stats[r.name].error_rate() <= self.error_budget]
+        over = [r for r in eligible if r not in within]
+        # Over-budget backends stay as a last resort
+        return sorted(within, key=lambda r: self._stats[r.name].median_ms()) + over
+
+    async def render(self, request: RenderRequest) -> Tuple[bytes, str]:
+        """
+        Render with the first backend that succeeds.
+
+        Returns:
+            (PDF bytes, backend name)
+
+        Raises:
+            RenderError: If no backend could render
+        """
+        if not self.probed:
+            await asyncio.to_thread(self.probe)
+
+        errors = []
+        for renderer in self.candidates(request):
+            start = time.perf_counter()
+            try:
+                with span("pdf.render", backend=renderer.name) as render_span:
+                    pdf_bytes = await asyncio.to_thread(renderer.render, request)
+                    if not pdf_bytes:
+                        raise ValueError("empty output")
+                    render_span.set_attribute("bytes", len(pdf_bytes))
+            except Exception as e:
+                self._stats[renderer.name].record(False, (time.perf_counter() - start) * 1000)
+                logger.warning(f"PDF renderer '{renderer.name}' failed: {e}")
+                errors.append(f"{renderer.name}: {e}")
+                continue
+            ms = (time.perf_counter() - start) * 1000
+            self._stats[renderer.name].record(True, ms, len(pdf_bytes))
+            logger.info(f"Generated PDF using {renderer.name} in {ms:.0f}ms ({len(pdf_bytes)} bytes)")
+            return pdf_bytes, renderer.name
+
+        raise RenderError("; ".join(errors) or "No PDF renderer available")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-backend availability, render counts, latency and output size."""
+        backends = {}
+        for renderer in self.renderers:
+            stats = self._stats[renderer.name]
+            latencies = sorted(stats.latencies())
+            sizes = [size for ok, _, size in stats.samples if ok]
+            backends[renderer.name] = {
+                "available": self._available.get(renderer.name),
+                "probe_error": self._probe_errors.get(renderer.name),
+                "renders": stats.renders,
+                "errors": stats.errors,
+                "error_rate": round(stats.error_rate(), 3),
+                "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+                "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+                "avg_bytes": int(sum(sizes) / len(sizes)) if sizes else None,
+            }
+        return {"selection": self.selection, "backends": backends}
+
+
+RENDERERS = {
+    "weasyprint": WeasyPrintRenderer,
+    "reportlab": ReportlabRenderer,
+    "acroform": AcroFormRenderer,
+}
+
+# Global instance (lazy-loaded; probed at app startup)
+_registry: Optional[RendererRegistry] = None
+
+
+def get_renderer_registry() -> RendererRegistry:
+    """Get or create the renderer registry from PDF_RENDERERS settings."""
+    global _registry
+    if _registry is None:
+        names = [n.strip() for n in settings.PDF_RENDERERS.split(",") if n.strip()]
+        if settings.PDF_RENDER_MODE == "acroform":
+            # Production mode: fill the template's six fields instead of laying out HTML
+            names = ["acroform"] + [n for n in names if n != "acroform"]
+        unknown = [n for n in names if n not in RENDERERS]
+        if unknown:
+            logger.warning(f"Ignoring unknown PDF renderers: {unknown}")
+        _registry = RendererRegistry(
+            [RENDERERS[n]() for n in names if n in RENDERERS],
+            selection=settings.PDF_RENDERER_SELECTION,
+            error_budget=settings.PDF_RENDERER_ERROR_BUDGET,
+            window=settings.PDF_RENDERER_WINDOW
+        )
+    return _registry
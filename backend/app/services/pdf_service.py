@@ -5,13 +5,16 @@ Stores PDFs in Supabase Storage, returns signed URLs.
 """
 
 import logging
-import io
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from string import Template
+from typing import Dict, Any, Optional, Tuple
 
 from app.config import settings
+from app.services.compiled_template import CompiledTemplate, freeze
+from app.services.ebook_document import EbookDocument
+from app.services.pdf_renderers import RenderError, RenderRequest, get_renderer_registry
+from app.services.supabase_client import get_supabase_client
+from app.services.tracing import span
 from app.services.ebook_content import (
     EBOOK_SECTIONS,
     CASE_STUDIES,
@@ -30,6 +33,25 @@ MAX_HOOK_LENGTH = 500
 MAX_CASE_STUDY_FRAMING_LENGTH = 400
 MAX_CTA_LENGTH = 350
 
+# Static ebook sections folded into the AMD template at compile time
+STATIC_SECTION_SLOTS = (
+    "intro_section",
+    "three_stages_intro",
+    "leaders_section",
+    "challengers_section",
+    "observers_section",
+    "path_to_leadership",
+    "modernization_models",
+    "why_amd",
+    "assessment_questions",
+)
+
+# Compiled templates, built on first use (template sources are constants)
+_compiled_templates: Dict[str, CompiledTemplate] = {}
+# AMD ebook pre-joined per case study: only per-lead slots remain open
+_case_study_variants: Dict[Tuple, CompiledTemplate] = {}
+MAX_CASE_STUDY_VARIANTS = 64
+
 
 def truncate_text(text: str, max_length: int) -> str:
     """
@@ -104,7 +126,8 @@ class PDFService:
         """
         try:
             # Generate HTML content
-            html_content = self._render_template(profile, intro_hook, cta)
+            with span("pdf.template", template="ebook"):
+                html_content = self._render_template(profile, intro_hook, cta)
 
             # Convert to PDF
             pdf_bytes = await self._html_to_pdf(html_content)
@@ -147,7 +170,8 @@ class PDFService:
         job_id: int,
         profile: Dict[str, Any],
         personalization: Dict[str, Any],
-        user_context: Optional[Dict[str, Any]] = None
+        user_context: Optional[Dict[str, Any]] = None,
+        filename: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate personalized AMD ebook with 3 personalization points.
@@ -157,6 +181,8 @@ class PDFService:
             profile: Normalized profile data
             personalization: Dict with personalized_hook, case_study_framing, personalized_cta
             user_context: User-provided context (goal, persona, industry)
+            filename: Fixed storage filename (overwritten if present); a unique
+                name is generated when omitted
 
         Returns:
             Dict with pdf_url, storage_path, file_size
@@ -168,29 +194,32 @@ class PDFService:
             industry = user_context.get("industry_input") or profile.get("industry", "technology")
             case_study = get_case_study_for_industry(industry)
 
-            # Generate HTML content with AMD ebook template
-            html_content = self._render_amd_ebook_template(
-                profile=profile,
-                personalized_hook=personalization.get("personalized_hook", ""),
-                case_study=case_study,
-                case_study_framing=personalization.get("case_study_framing", ""),
-                personalized_cta=personalization.get("personalized_cta", ""),
-                user_context=user_context
-            )
+            # Build the document (HTML plus structured content) with the AMD ebook template
+            with span("pdf.template", template="amd_ebook"):
+                document = self._build_amd_ebook_document(
+                    profile=profile,
+                    personalized_hook=personalization.get("personalized_hook", ""),
+                    case_study=case_study,
+                    case_study_framing=personalization.get("case_study_framing", ""),
+                    personalized_cta=personalization.get("personalized_cta", ""),
+                    user_context=user_context
+                )
 
             # Convert to PDF
-            pdf_bytes = await self._html_to_pdf(html_content)
+            pdf_bytes = await self._html_to_pdf(document.html, document=document)
 
             if not pdf_bytes:
                 raise ValueError("PDF generation returned empty content")
 
-            # Generate unique filename
-            email = profile.get("email", "unknown")
-            filename = self._generate_filename(email, job_id)
+            # Generate unique filename unless the caller fixed one
+            upsert = filename is not None
+            if filename is None:
+                email = profile.get("email", "unknown")
+                filename = self._generate_filename(email, job_id)
 
             # Store in Supabase Storage (if available)
             if self.supabase:
-                storage_path, pdf_url = await self._store_pdf(pdf_bytes, filename)
+                storage_path, pdf_url = await self._store_pdf(pdf_bytes, filename, upsert=upsert)
             else:
                 import base64
                 storage_path = f"local/{filename}"
@@ -222,7 +251,24 @@ class PDFService:
         user_context: Dict[str, Any]
     ) -> str:
         """Render AMD ebook HTML template with personalization."""
-        template = Template(self._get_amd_ebook_template())
+        return self._build_amd_ebook_document(
+            profile, personalized_hook, case_study, case_study_framing, personalized_cta, user_context
+        ).html
+
+    def _build_amd_ebook_document(
+        self,
+        profile: Dict[str, Any],
+        personalized_hook: str,
+        case_study: Dict[str, Any],
+        case_study_framing: str,
+        personalized_cta: str,
+        user_context: Dict[str, Any]
+    ) -> EbookDocument:
+        """
+        Build the AMD ebook as a structured document with its rendered HTML.
+        PDF backends that do not need HTML read the fields directly.
+        """
+        template = self._get_amd_ebook_variant(case_study)
 
         # Truncate personalized content to fit PDF text boxes
         hook_truncated = truncate_text(personalized_hook, MAX_HOOK_LENGTH)
@@ -240,7 +286,29 @@ class PDFService:
             "personalized_hook": hook_truncated,
             "case_study_framing": framing_truncated,
             "personalized_cta": cta_truncated,
-            # Case study content
+            # Case study and static content are already joined into the variant
+        }
+
+        return EbookDocument(
+            first_name=variables["first_name"],
+            company_name=variables["company_name"],
+            industry=variables["industry"],
+            persona=user_context.get("persona", ""),
+            buying_stage=user_context.get("goal", ""),
+            personalized_hook=hook_truncated,
+            case_study_framing=framing_truncated,
+            personalized_cta=cta_truncated,
+            case_study=case_study,
+            sections=EBOOK_SECTIONS,
+            html=template.render(variables)
+        )
+
+    def _get_amd_ebook_variant(self, case_study: Dict[str, Any]) -> CompiledTemplate:
+        """
+        Get the AMD ebook template with static sections and a case study
+        pre-joined, compiling it on first use.
+        """
+        case_study_values = {
             "case_study_title": case_study["title"],
             "case_study_company": case_study["company"],
             "case_study_industry": case_study["industry"],
@@ -249,19 +317,20 @@ class PDFService:
             "case_study_quote": case_study["quote"],
             "case_study_quote_author": case_study["quote_author"],
             "case_study_result": case_study["result"],
-            # Static content
-            "intro_section": EBOOK_SECTIONS["intro_section"],
-            "three_stages_intro": EBOOK_SECTIONS["three_stages_intro"],
-            "leaders_section": EBOOK_SECTIONS["leaders_section"],
-            "challengers_section": EBOOK_SECTIONS["challengers_section"],
-            "observers_section": EBOOK_SECTIONS["observers_section"],
-            "path_to_leadership": EBOOK_SECTIONS["path_to_leadership"],
-            "modernization_models": EBOOK_SECTIONS["modernization_models"],
-            "why_amd": EBOOK_SECTIONS["why_amd"],
-            "assessment_questions": EBOOK_SECTIONS["assessment_questions"],
         }
-
-        return template.safe_substitute(variables)
+        key = freeze(case_study_values)
+        variant = _case_study_variants.get(key)
+        if variant is None:
+            base = _compiled_templates.get("amd_ebook")
+            if base is None:
+                base = CompiledTemplate.compile(self._get_amd_ebook_template()).bind(
+                    {slot: EBOOK_SECTIONS[slot] for slot in STATIC_SECTION_SLOTS}
+                )
+                _compiled_templates["amd_ebook"] = base
+            if len(_case_study_variants) >= MAX_CASE_STUDY_VARIANTS:
+                _case_study_variants.clear()
+            variant = _case_study_variants[key] = base.bind(case_study_values)
+        return variant
 
     def _get_amd_ebook_template(self) -> str:
         """Get the AMD ebook HTML template - matching official AMD design."""
@@ -1373,7 +1442,9 @@ class PDFService:
         Returns:
             Rendered HTML string
         """
-        template = Template(self._get_ebook_template())
+        template = _compiled_templates.get("ebook")
+        if template is None:
+            template = _compiled_templates["ebook"] = CompiledTemplate.compile(self._get_ebook_template())
 
         # Prepare template variables
         variables = {
@@ -1386,7 +1457,7 @@ class PDFService:
             "generated_date": datetime.utcnow().strftime("%B %d, %Y"),
         }
 
-        return template.safe_substitute(variables)
+        return template.render(variables)
 
     def _get_ebook_template(self) -> str:
         """Get the HTML ebook template."""
@@ -1579,242 +1650,53 @@ class PDFService:
 </html>
 """
 
-    async def _html_to_pdf(self, html_content: str) -> bytes:
+    async def _render_pdf(
+        self,
+        html_content: str,
+        document: Optional[EbookDocument] = None
+    ) -> Tuple[bytes, str]:
+        """
+        Render through the registry without the minimal-PDF fallback.
+
+        Returns:
+            (PDF bytes, name of the backend that rendered them)
+
+        Raises:
+            RenderError: If no backend could render
+        """
+        return await get_renderer_registry().render(
+            RenderRequest(html=html_content, document=document)
+        )
+
+    async def _html_to_pdf(
+        self,
+        html_content: str,
+        document: Optional[EbookDocument] = None
+    ) -> bytes:
         """
         Convert HTML to PDF.
 
-        Uses weasyprint if available, otherwise uses reportlab with extracted content.
+        Uses the renderer registry (weasyprint, reportlab, AcroForm fill),
+        which skips backends that failed their startup probe. The reportlab
+        backend renders the structured document when one is given.
 
         Args:
             html_content: HTML string to convert
+            document: Structured content behind the HTML
 
         Returns:
             PDF bytes
         """
         try:
-            # Try weasyprint first (preferred for production)
-            from weasyprint import HTML
-            pdf_bytes = HTML(string=html_content).write_pdf()
-            logger.info("Generated PDF using weasyprint")
+            pdf_bytes, _ = await self._render_pdf(html_content, document)
             return pdf_bytes
-        except ImportError:
-            logger.warning("weasyprint not available, using reportlab fallback")
-        except Exception as e:
-            logger.warning(f"weasyprint failed: {e}, using reportlab fallback")
-
-        # Fallback: Generate PDF using reportlab with actual content
-        try:
-            return self._generate_reportlab_pdf(html_content)
-        except Exception as e:
-            logger.error(f"reportlab PDF generation failed: {e}")
+        except RenderError as e:
+            logger.error(f"PDF rendering failed: {e}")
 
         # Ultimate fallback: Return a minimal valid PDF
         logger.warning("No PDF library available, returning minimal PDF")
         return self._minimal_pdf()
 
-    def _generate_reportlab_pdf(self, html_content: str) -> bytes:
-        """Generate PDF using reportlab with content extracted from HTML."""
-        import re
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.colors import HexColor, white, black
-        from reportlab.lib.units import inch
-        from reportlab.platypus import (
-            SimpleDocTemplate, Paragraph, Spacer, PageBreak,
-            Table, TableStyle, FrameBreak
-        )
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
-        )
-
-        # Define colors
-        amd_red = HexColor('#ED1C24')
-        dark_blue = HexColor('#1a1a2e')
-
-        # Create styles
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=amd_red,
-            spaceAfter=12,
-            alignment=TA_CENTER
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=dark_blue,
-            spaceBefore=20,
-            spaceAfter=10
-        )
-
-        subheading_style = ParagraphStyle(
-            'CustomSubheading',
-            parent=styles['Heading3'],
-            fontSize=14,
-            textColor=amd_red,
-            spaceBefore=15,
-            spaceAfter=8
-        )
-
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            spaceAfter=10
-        )
-
-        highlight_style = ParagraphStyle(
-            'Highlight',
-            parent=styles['Normal'],
-            fontSize=12,
-            leading=18,
-            textColor=dark_blue,
-            backColor=HexColor('#f5f5f5'),
-            borderPadding=10,
-            spaceAfter=15
-        )
-
-        # Extract content from HTML using regex
-        def extract_text(pattern, default=""):
-            match = re.search(pattern, html_content, re.DOTALL)
-            if match:
-                text = match.group(1)
-                # Clean HTML tags
-                text = re.sub(r'<[^>]+>', ' ', text)
-                text = re.sub(r'\s+', ' ', text).strip()
-                return text
-            return default
-
-        # Extract personalization variables
-        first_name = extract_text(r'Prepared for</p>\s*<p[^>]*>([^<]+)</p>', 'Reader')
-        company_name = extract_text(r'at ([^<]+)</p>', 'your company')
-        personalized_hook = extract_text(r'<h3>A Message For You</h3>\s*<p>([^<]+)</p>', '')
-
-        # Extract sections
-        intro_section = extract_text(r'<h2>Redefining the Data Center[^<]*</h2>\s*<p>([^<]+)</p>', '')
-        three_stages = extract_text(r'<h2>Understanding the Three Stages[^<]*</h2>\s*<p>([^<]+)</p>', '')
-        leaders = extract_text(r'<h3>Data Center Leaders[^<]*</h3>\s*<p>([^<]+)</p>', '')
-        challengers = extract_text(r'<h3>Data Center Challengers[^<]*</h3>\s*<p>([^<]+)</p>', '')
-        observers = extract_text(r'<h3>Data Center Observers[^<]*</h3>\s*<p>([^<]+)</p>', '')
-        path_to_leadership = extract_text(r'<h2>The Path to Leadership[^<]*</h2>\s*<p>([^<]+)</p>', '')
-        modernization = extract_text(r'<h2>Modernization Models</h2>\s*<p>([^<]+)</p>', '')
-        why_amd = extract_text(r'<h2>Why AMD[^<]*</h2>\s*<p>([^<]+)</p>', '')
-
-        # Extract case study
-        case_company = extract_text(r'<h3[^>]*>Customer Success: ([^<]+)</h3>', '')
-        case_framing = extract_text(r'<strong>Why this matters[^<]*</strong><br>\s*([^<]+)</div>', '')
-        case_challenge = extract_text(r'<strong>The Challenge:</strong>\s*([^<]+)</p>', '')
-        case_solution = extract_text(r'<strong>The Solution:</strong>\s*([^<]+)</p>', '')
-        case_quote = extract_text(r'"([^"]+)"', '')
-        case_result = extract_text(r'<strong>The Result:</strong>\s*([^<]+)</p>', '')
-
-        # Extract CTA
-        personalized_cta = extract_text(r'<div class="personalized-cta">\s*([^<]+)</div>', '')
-
-        # Build document
-        story = []
-
-        # Cover page
-        story.append(Spacer(1, 2*inch))
-        story.append(Paragraph("AMD", ParagraphStyle('AMDLogo', parent=title_style, fontSize=28, textColor=amd_red)))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("FROM OBSERVERS TO<br/>ENTERPRISE AI READINESS", title_style))
-        story.append(Spacer(1, 0.2*inch))
-        story.append(Paragraph("A Strategic Guide to Data Center Modernization", body_style))
-        story.append(Spacer(1, 1*inch))
-        story.append(Paragraph(f"<b>Prepared for {first_name}</b>", ParagraphStyle('Personalized', parent=body_style, alignment=TA_CENTER, fontSize=14)))
-        if company_name and company_name != 'your company':
-            story.append(Paragraph(f"at {company_name}", ParagraphStyle('Company', parent=body_style, alignment=TA_CENTER)))
-        story.append(PageBreak())
-
-        # Personalized Hook
-        if personalized_hook:
-            story.append(Paragraph("A Message For You", subheading_style))
-            story.append(Paragraph(personalized_hook, highlight_style))
-            story.append(Spacer(1, 0.3*inch))
-
-        # Intro section
-        if intro_section:
-            story.append(Paragraph("Redefining the Data Center: AI Readiness in the Age of Acceleration", heading_style))
-            story.append(Paragraph(intro_section, body_style))
-            story.append(Spacer(1, 0.2*inch))
-
-        # Three Stages
-        if three_stages:
-            story.append(Paragraph("Understanding the Three Stages of Data Center Modernization", heading_style))
-            story.append(Paragraph(three_stages, body_style))
-
-        if leaders:
-            story.append(Paragraph("Data Center Leaders (26%)", subheading_style))
-            story.append(Paragraph(leaders, body_style))
-
-        if challengers:
-            story.append(Paragraph("Data Center Challengers (32%)", subheading_style))
-            story.append(Paragraph(challengers, body_style))
-
-        if observers:
-            story.append(Paragraph("Data Center Observers (42%)", subheading_style))
-            story.append(Paragraph(observers, body_style))
-
-        # Path to Leadership
-        if path_to_leadership:
-            story.append(PageBreak())
-            story.append(Paragraph("The Path to Leadership: Moving Through the Stages", heading_style))
-            story.append(Paragraph(path_to_leadership, body_style))
-
-        # Modernization Models
-        if modernization:
-            story.append(Paragraph("Modernization Models", heading_style))
-            story.append(Paragraph(modernization, body_style))
-
-        # Case Study
-        if case_company:
-            story.append(PageBreak())
-            story.append(Paragraph(f"Customer Success: {case_company}", heading_style))
-            if case_framing:
-                story.append(Paragraph(f"<i>Why this matters for {company_name}: {case_framing}</i>", highlight_style))
-            if case_challenge:
-                story.append(Paragraph(f"<b>The Challenge:</b> {case_challenge}", body_style))
-            if case_solution:
-                story.append(Paragraph(f"<b>The Solution:</b> {case_solution}", body_style))
-            if case_quote:
-                story.append(Paragraph(f'<i>"{case_quote}"</i>', ParagraphStyle('Quote', parent=body_style, leftIndent=20, rightIndent=20)))
-            if case_result:
-                story.append(Paragraph(f"<b>The Result:</b> {case_result}", body_style))
-
-        # Why AMD
-        if why_amd:
-            story.append(Paragraph("Why AMD: Your Strategic Partner", heading_style))
-            story.append(Paragraph(why_amd, body_style))
-
-        # CTA
-        story.append(PageBreak())
-        story.append(Paragraph("Ready to Take the Next Step?", heading_style))
-        if personalized_cta:
-            story.append(Paragraph(personalized_cta, highlight_style))
-        story.append(Spacer(1, 0.5*inch))
-        story.append(Paragraph(f"<b>This guide was personalized for {first_name}</b>", ParagraphStyle('Footer', parent=body_style, alignment=TA_CENTER)))
-
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        logger.info("Generated PDF using reportlab fallback")
-        return buffer.read()
-
     def _minimal_pdf(self) -> bytes:
         """Generate a minimal valid PDF file."""
         # Minimal PDF structure
@@ -1858,7 +1740,8 @@ startxref
     async def _store_pdf(
         self,
         pdf_bytes: bytes,
-        filename: str
+        filename: str,
+        upsert: bool = False
     ) -> tuple[str, str]:
         """
         Store PDF in Supabase Storage.
@@ -1866,6 +1749,7 @@ startxref
         Args:
             pdf_bytes: PDF content
             filename: Target filename
+            upsert: Overwrite an existing object (deterministic filenames)
 
         Returns:
             Tuple of (storage_path, signed_url)
@@ -1874,19 +1758,35 @@ startxref
             raise ValueError("Supabase client not configured")
 
         storage_path = f"{self.storage_bucket}/{filename}"
+        with span("storage.upload", bytes=len(pdf_bytes)):
+            return self._upload_pdf(pdf_bytes, filename, storage_path, upsert)
 
+    def _upload_pdf(
+        self,
+        pdf_bytes: bytes,
+        filename: str,
+        storage_path: str,
+        upsert: bool
+    ) -> tuple[str, str]:
+        """Upload to the storage bucket and sign the object URL."""
         # Handle mock mode - return mock URL without actual storage
         if getattr(self.supabase, 'mock_mode', False) or self.supabase.client is None:
             logger.info(f"[MOCK] Would store PDF at {storage_path}")
+            mock_storage = getattr(self.supabase, "_mock_storage", None)
+            if mock_storage is not None:
+                mock_storage[filename] = pdf_bytes
             mock_url = f"https://mock-storage.example.com/{storage_path}?token=mock-signed-url"
             return storage_path, mock_url
 
         try:
             # Upload to Supabase Storage
+            file_options = {"content-type": "application/pdf"}
+            if upsert:
+                file_options["upsert"] = "true"
             self.supabase.client.storage.from_(self.storage_bucket).upload(
                 filename,
                 pdf_bytes,
-                {"content-type": "application/pdf"}
+                file_options
             )
 
             # Generate signed URL
@@ -1903,6 +1803,38 @@ startxref
             logger.error(f"Failed to store PDF: {e}")
             raise
 
+    async def get_stored_pdf_url(self, filename: str) -> Optional[str]:
+        """
+        Get a signed URL for a PDF only if it has already been stored.
+
+        Args:
+            filename: Filename within the storage bucket
+
+        Returns:
+            Signed URL, or None if the object does not exist yet
+        """
+        if not self.supabase:
+            return None
+
+        if getattr(self.supabase, 'mock_mode', False) or self.supabase.client is None:
+            if filename not in getattr(self.supabase, "_mock_storage", {}):
+                return None
+            return f"https://mock-storage.example.com/{self.storage_bucket}/{filename}?token=mock-signed-url"
+
+        try:
+            matches = self.supabase.client.storage.from_(self.storage_bucket).list(
+                "", {"search": filename, "limit": 1}
+            )
+            if not any(m.get("name") == filename for m in matches or []):
+                return None
+            signed_url = self.supabase.client.storage.from_(
+                self.storage_bucket
+            ).create_signed_url(filename, PDF_EXPIRY_HOURS * 3600)
+            return signed_url.get("signedURL")
+        except Exception as e:
+            logger.error(f"Failed to look up stored PDF {filename}: {e}")
+            return None
+
     async def get_pdf_url(self, storage_path: str) -> Optional[str]:
         """
         Get signed URL for existing PDF.
@@ -1932,3 +1864,15 @@ startxref
         except Exception as e:
             logger.error(f"Failed to get PDF URL: {e}")
             return None
+
+
+# Singleton instance, built at startup (see app.main lifespan)
+_pdf_service: Optional[PDFService] = None
+
+
+def get_pdf_service() -> PDFService:
+    """Get or create the shared PDFService, storing to the global Supabase client."""
+    global _pdf_service
+    if _pdf_service is None:
+        _pdf_service = PDFService(get_supabase_client())
+    return _pdf_service
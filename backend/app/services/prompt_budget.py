@@ -0,0 +1,233 @@
+"""
+Token-budgeted packing for the ebook personalization prompt.
+
+_build_ebook_prompt records its content as named sections (person skills,
+funding, headlines, ...). Each optional section is scored for relevance to
+the reader's persona and buying stage, then sections are packed greedily,
+highest score first, into the token budget. A section that does not fit
+whole is truncated to its leading lines (written most important first,
+the last one clipped at a word if need be) before any lower-scored
+section is considered. Once a section cannot keep even its minimum lines,
+every less relevant section is dropped too, so a lower-scored section is
+never kept in place of a higher-scored one. Lines already emitted by
+another section are dropped as duplicates. Required sections (buyer context, case study, mandatory data,
+output requirements) are always kept, and the packed prompt keeps the
+original section order.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Rough size estimate: ~4 characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+# Base relevance of optional sections (0-1)
+SECTION_WEIGHTS: Dict[str, float] = {
+    "news_summary": 0.6,
+    "news_headlines": 0.55,
+    "company_scale": 0.5,
+    "company_funding": 0.45,
+    "news_signals": 0.4,
+    "company_description": 0.35,
+    "person_skills": 0.3,
+    "company_tags": 0.25,
+    "career_history": 0.2,
+    "person_interests": 0.15,
+    "company_location": 0.15,
+    "company_codes": 0.05,
+    "person_links": 0.05,
+    "company_links": 0.05,
+    "email_verification": 0.0,
+}
+
+TECHNICAL_PERSONAS = {
+    "cto", "cio", "vp_engineering", "vp_eng", "eng_manager", "senior_engineer", "engineer",
+    "cdo", "vp_data", "data_manager", "vp_it", "it_manager", "sysadmin",
+    "it_infrastructure", "engineering", "data_ai",
+}
+FINANCIAL_PERSONAS = {
+    "ceo", "coo", "c_suite", "c_suite_other", "executive", "cfo", "vp_finance",
+    "finance_manager", "procurement", "vp_ops",
+}
+EARLY_STAGES = {"awareness", "exploring", "learning"}
+LATE_STAGES = {"consideration", "evaluating", "decision", "building_case", "implementation"}
+
+# (section, personas or None, stages or None, boost)
+RELEVANCE_BOOSTS: Tuple[Tuple[str, Optional[set], Optional[set], float], ...] = (
+    ("person_skills", TECHNICAL_PERSONAS, None, 0.3),
+    ("company_tags", TECHNICAL_PERSONAS, None, 0.15),
+    ("career_history", TECHNICAL_PERSONAS, None, 0.1),
+    ("company_funding", FINANCIAL_PERSONAS, None, 0.3),
+    ("company_scale", FINANCIAL_PERSONAS, None, 0.1),
+    ("company_funding", None, LATE_STAGES, 0.15),
+    ("company_scale", None, LATE_STAGES, 0.1),
+    ("news_summary", None, EARLY_STAGES, 0.2),
+    ("news_signals", None, EARLY_STAGES, 0.15),
+    ("company_description", None, EARLY_STAGES, 0.1),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (no tokenizer dependency)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def score_section(name: str, persona: Optional[str], stage: Optional[str]) -> float:
+    """Relevance of an optional section to this reader."""
+    score = SECTION_WEIGHTS.get(name, 0.1)
+    for section, personas, stages, boost in RELEVANCE_BOOSTS:
+        if section != name:
+            continue
+        if personas is not None and persona not in personas:
+            continue
+        if stages is not None and stage not in stages:
+            continue
+        score += boost
+    return score
+
+
+@dataclass
+class PromptSection:
+    """Named block of prompt lines, most important line first."""
+    name: str
+    required: bool = False
+    min_lines: int = 1
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PackedPrompt:
+    """Prompt text plus what the budget left out."""
+    text: str
+    tokens: int
+    dropped: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    duplicates: int = 0
+
+    @property
+    def trimmed(self) -> List[str]:
+        return self.dropped + [f"{name}:truncated" for name in self.truncated]
+
+
+# Only lines at least this long are deduplicated (short labels like "Source: Reuters" repeat legitimately)
+MIN_DEDUPE_CHARS = 40
+
+
+def _dedupe_key(line: str) -> Optional[str]:
+    key = " ".join(line.split()).lower()
+    return key if len(key) >= MIN_DEDUPE_CHARS else None
+
+
+def _line_chars(line: str) -> int:
+    """Characters of one line plus its newline (budgets are tracked in characters)."""
+    return len(line) + 1
+
+
+# A line is clipped to the space left only if at least this much of it survives
+MIN_CLIP_CHARS = 40
+
+
+def _clip(line: str, room: int) -> Optional[str]:
+    """Leading words of a line within ``room`` characters (newline included), or None."""
+    if room - 1 < MIN_CLIP_CHARS:
+        return None
+    clipped = line[:room - 4].rsplit(" ", 1)[0].rstrip()
+    return f"{clipped}..." if len(clipped) >= MIN_CLIP_CHARS else None
+
+
+class PromptBuilder:
+    """Collects prompt lines into sections; pack() fits them to a budget."""
+
+    def __init__(self):
+        self.sections: List[PromptSection] = []
+        self.section("preamble", required=True)
+
+    def section(self, name: str, required: bool = False, min_lines: int = 1) -> None:
+        """Start a section; following add() calls append to it."""
+        self.sections.append(PromptSection(name, required, min_lines))
+
+    def add(self, line: str) -> None:
+        self.sections[-1].lines.append(line)
+
+    def pack(
+        self,
+        max_tokens: int = 0,
+        persona: Optional[str] = None,
+        stage: Optional[str] = None
+    ) -> PackedPrompt:
+        """
+        Pack sections into the budget.
+
+        Args:
+            max_tokens: Estimated-token budget (0 keeps everything)
+            persona: Reader persona key (scores optional sections)
+            stage: Buying stage key (scores optional sections)
+
+        Returns:
+            PackedPrompt
+        """
+        seen: set = set()
+        result = PackedPrompt(text="", tokens=0)
+
+        def unique(lines: List[str]) -> List[str]:
+            kept = []
+            for line in lines:
+                key = _dedupe_key(line)
+                if key is not None and key in seen:
+                    result.duplicates += 1
+                    continue
+                if key is not None:
+                    seen.add(key)
+                kept.append(line)
+            return kept
+
+        # Required sections first, so their lines win deduplication and count toward the budget
+        chosen: Dict[int, List[str]] = {}
+        for index, section in enumerate(self.sections):
+            if section.required:
+                chosen[index] = unique(section.lines)
+        used = sum(_line_chars(line) for lines in chosen.values() for line in lines)
+        budget = max_tokens * CHARS_PER_TOKEN
+
+        optional = sorted(
+            (i for i, s in enumerate(self.sections) if not s.required and s.lines),
+            key=lambda i: -score_section(self.sections[i].name, persona, stage)
+        )
+        candidates = {index: unique(self.sections[index].lines) for index in optional}
+
+        # Most relevant first: whole if it fits, otherwise its leading lines
+        full = False
+        for index in optional:
+            section = self.sections[index]
+            if full:
+                result.dropped.append(section.name)
+                continue
+            cost = sum(_line_chars(line) for line in candidates[index])
+            if not budget or used + cost <= budget:
+                chosen[index] = candidates[index]
+                used += cost
+                continue
+
+            kept = []
+            for line in candidates[index]:
+                if used + _line_chars(line) > budget:
+                    clipped = _clip(line, budget - used)
+                    if clipped is not None:
+                        kept.append(clipped)
+                        used += _line_chars(clipped)
+                    break
+                kept.append(line)
+                used += _line_chars(line)
+            if kept and len(kept) >= section.min_lines:
+                chosen[index] = kept
+                result.truncated.append(section.name)
+            else:
+                # No room for this section, so none for anything less relevant
+                used -= sum(_line_chars(line) for line in kept)
+                result.dropped.append(section.name)
+                full = True
+
+        result.text = "\n".join(line for index in sorted(chosen) for line in chosen[index])
+        result.tokens = estimate_tokens(result.text)
+        return result
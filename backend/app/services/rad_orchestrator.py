@@ -7,11 +7,16 @@ RAD Orchestrator: Coordinates enrichment workflow.
 
 import logging
 import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Awaitable, Callable
 
 from app.config import settings
-from app.services.supabase_client import SupabaseClient
+from app.services.supabase_client import SupabaseClient, get_supabase_client
+from app.services.single_flight import SingleFlight, get_single_flight
+from app.services.rate_limiter import get_rate_limiter
+from app.services.tracing import span
 from app.services.enrichment_apis import (
     get_enrichment_apis,
     EnrichmentAPIError,
@@ -34,29 +39,220 @@ SOURCE_PRIORITY = {
     "gnews": 1
 }
 
+# Normalized profile field -> (source, source_field) candidates.
+# Enhanced to include PDL company data for richer company insights.
+FIELD_MAPPINGS: Dict[str, List[Tuple[str, str]]] = {
+    "first_name": [
+        ("apollo", "first_name"),
+        ("pdl", "first_name"),
+    ],
+    "last_name": [
+        ("apollo", "last_name"),
+        ("pdl", "last_name"),
+    ],
+    "full_name": [
+        ("pdl", "full_name"),
+    ],
+    "title": [
+        ("apollo", "title"),
+        ("pdl", "job_title"),
+    ],
+    "company_name": [
+        ("pdl_company", "name"),
+        ("apollo", "company_name"),
+        ("zoominfo", "company_name"),
+        ("pdl", "job_company_name"),
+    ],
+    "company_display_name": [
+        ("pdl_company", "display_name"),
+    ],
+    "industry": [
+        ("pdl_company", "industry"),
+        ("apollo", "industry"),
+        ("zoominfo", "industry"),
+        ("pdl", "job_company_industry"),
+    ],
+    "company_size": [
+        ("pdl_company", "size"),
+        ("apollo", "company_size"),
+        ("pdl", "job_company_size"),
+    ],
+    "employee_count": [
+        ("pdl_company", "employee_count"),
+        ("zoominfo", "employee_count"),
+    ],
+    "employee_count_range": [
+        ("pdl_company", "employee_count_range"),
+    ],
+    "linkedin_url": [
+        ("apollo", "linkedin_url"),
+        ("pdl", "linkedin_url"),
+    ],
+    "city": [
+        ("pdl_company", "locality"),
+        ("apollo", "city"),
+        ("zoominfo", "city"),
+        ("pdl", "location_locality"),
+    ],
+    "state": [
+        ("pdl_company", "region"),
+        ("apollo", "state"),
+        ("zoominfo", "state"),
+        ("pdl", "location_region"),
+    ],
+    "country": [
+        ("pdl_company", "country"),
+        ("apollo", "country"),
+        ("zoominfo", "country"),
+        ("pdl", "location_country"),
+    ],
+    "seniority": [
+        ("apollo", "seniority"),
+    ],
+    "skills": [
+        ("pdl", "skills"),
+    ],
+    "interests": [
+        ("pdl", "interests"),
+    ],
+    "experience": [
+        ("pdl", "experience"),
+    ],
+    "company_description": [
+        ("pdl_company", "summary"),
+        ("zoominfo", "description"),
+    ],
+    "founded_year": [
+        ("pdl_company", "founded"),
+        ("zoominfo", "founded_year"),
+    ],
+    "company_type": [
+        ("pdl_company", "type"),
+    ],
+    "ticker": [
+        ("pdl_company", "ticker"),
+    ],
+    "naics_codes": [
+        ("pdl_company", "naics"),
+    ],
+    "sic_codes": [
+        ("pdl_company", "sic"),
+    ],
+}
+
+# Compiled resolution plan: (field, candidates sorted by SOURCE_PRIORITY)
+ResolutionPlan = Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...]
+
+
+def _by_priority(sources: List[Tuple[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    """Candidates highest priority first (stable, so ties keep mapping order)."""
+    return tuple(sorted(sources, key=lambda s: SOURCE_PRIORITY.get(s[0], 0), reverse=True))
+
+
+def compile_resolution_plan(mappings: Dict[str, List[Tuple[str, str]]]) -> ResolutionPlan:
+    """
+    Pre-sort each field's candidate sources by priority, so resolution
+    takes the first non-empty value instead of sorting per lead.
+    """
+    return tuple((name, _by_priority(sources)) for name, sources in mappings.items())
+
+
+RESOLUTION_PLAN: ResolutionPlan = compile_resolution_plan(FIELD_MAPPINGS)
+
+# user_context key -> profile field. Form input is more reliable than vendor
+# data, so these replace the resolved values whenever the lead supplied them.
+USER_CONTEXT_OVERRIDES: Tuple[Tuple[str, str], ...] = (
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("company", "company_name"),
+    ("company_size", "company_size"),
+    ("industry_input", "industry"),
+    ("persona", "title"),  # Specific role the lead selected
+)
+
+
+def apply_user_context(profile: Dict[str, Any], user_context: Dict[str, Any]) -> None:
+    """Override resolved profile fields with the values the lead provided."""
+    for context_key, profile_field in USER_CONTEXT_OVERRIDES:
+        if user_context.get(context_key):
+            profile[profile_field] = user_context[context_key]
+
+# Sources whose response depends only on the person (keyed by email)
+PERSON_SOURCES = ["apollo", "pdl", "hunter"]
+
+# Sources whose response depends only on the company (keyed by domain).
+# In batch mode these are fetched once per domain and shared across leads.
+COMPANY_SOURCES = ["gnews", "zoominfo", "pdl_company"]
+
+
+def _outcome(result: Dict[str, Any]) -> str:
+    """Vendor outcome label for a returned payload: success, mock or error."""
+    if not result or result.get("_error"):
+        return "error"
+    return "mock" if result.get("_mock") else "success"
+
+
+def _error_outcome(error: Exception) -> str:
+    """Vendor outcome label for a raised error: timeout or error."""
+    if isinstance(error, asyncio.TimeoutError) or "timeout" in str(error).lower():
+        return "timeout"
+    return "error"
+
+
+@dataclass
+class EnrichmentContext:
+    """
+    Per-call enrichment state.
+
+    The orchestrator is shared by every request, so anything that belongs to
+    a single enrich() or enrich_batch() call lives here instead of on it.
+    """
+    email: Optional[str] = None
+    domain: Optional[str] = None
+    job_id: Optional[int] = None
+    # Sources that returned usable data for this lead
+    data_sources: List[str] = field(default_factory=list)
+    # Vendor calls issued on behalf of this call, keyed by source
+    vendor_calls: Counter = field(default_factory=Counter)
+    # Source that won each resolved profile field (provenance, for debugging)
+    field_sources: Dict[str, str] = field(default_factory=dict)
+    # Set by enrich_batch
+    batch_report: Optional[Dict[str, Any]] = None
+
 
 class RADOrchestrator:
     """
     Orchestrates the full enrichment pipeline for a given email.
     Fetches from multiple APIs in parallel, merges data with conflict resolution.
+    Holds no per-request state, so one instance is shared across requests.
     """
 
-    def __init__(self, supabase_client: SupabaseClient):
+    def __init__(
+        self,
+        supabase_client: SupabaseClient,
+        single_flight: Optional[SingleFlight] = None
+    ):
         """
         Initialize orchestrator.
 
         Args:
             supabase_client: Supabase data access layer
+            single_flight: Coalescing group for vendor fetches (process-wide by default)
         """
         self.supabase = supabase_client
-        self.data_sources: List[str] = []
         self.apis = get_enrichment_apis()
+        self.single_flight = single_flight or get_single_flight()
+        self.rate_limiter = get_rate_limiter()
+        # Vendor calls issued by this orchestrator (all callers), keyed by source
+        self.vendor_calls: Counter = Counter()
 
     async def enrich(
         self,
         email: str,
         domain: Optional[str] = None,
-        job_id: Optional[int] = None
+        job_id: Optional[int] = None,
+        company_data: Optional[Awaitable[Dict[str, Dict[str, Any]]]] = None,
+        context: Optional[EnrichmentContext] = None
     ) -> Dict[str, Any]:
         """
         Execute full enrichment pipeline for an email.
@@ -71,38 +267,49 @@ class RADOrchestrator:
             email: Email address to enrich
             domain: Company domain (optional, extracted from email if not provided)
             job_id: Optional job ID for tracking
+            company_data: Optional shared awaitable with company-level source
+                data for the domain (used by enrich_batch to fetch once per domain)
+            context: Optional per-call context; filled with the sources used
+                and vendor calls made (a fresh one is used when omitted)
 
         Returns:
             Normalized profile dict with metadata
         """
         try:
             logger.info(f"Starting enrichment for {email}")
-            self.data_sources = []
 
             # Extract domain from email if not provided
             if not domain:
                 domain = email.split("@")[1]
 
+            if context is None:
+                context = EnrichmentContext()
+            context.email, context.domain, context.job_id = email, domain, job_id
+            context.data_sources = []
+            context.field_sources = {}
+
             # Step 1: Fetch raw data from all APIs in parallel
-            raw_data = await self._fetch_all_sources(email, domain)
+            raw_data = await self._fetch_all_sources(email, domain, company_data, context)
 
             # Step 2: Store raw data in Supabase
             for source, data in raw_data.items():
                 if data and not data.get("_error"):
                     self.supabase.store_raw_data(email, source, data)
-                    self.data_sources.append(source)
+                    context.data_sources.append(source)
 
             # Step 3: Apply resolution logic
-            normalized = self._resolve_profile(email, domain, raw_data)
+            with span("profile.resolve", sources=len(context.data_sources)):
+                normalized = self._resolve_profile(email, domain, raw_data, context.field_sources)
 
             # Add metadata
             normalized["email"] = email
             normalized["domain"] = domain
             normalized["resolved_at"] = datetime.utcnow().isoformat()
-            normalized["data_sources"] = self.data_sources
+            normalized["data_sources"] = context.data_sources
+            normalized["field_sources"] = context.field_sources
             normalized["data_quality_score"] = self._calculate_quality_score(raw_data)
 
-            logger.info(f"Enrichment complete for {email}: {len(self.data_sources)} sources")
+            logger.info(f"Enrichment complete for {email}: {len(context.data_sources)} sources")
             return normalized
 
         except Exception as e:
@@ -112,61 +319,127 @@ class RADOrchestrator:
     async def _fetch_all_sources(
         self,
         email: str,
-        domain: str
+        domain: str,
+        company_data: Optional[Awaitable[Dict[str, Dict[str, Any]]]] = None,
+        context: Optional[EnrichmentContext] = None
     ) -> Dict[str, Dict[str, Any]]:
         """
         Fetch data from all sources in parallel.
-        Enhanced to include PDL company enrichment for deeper company insights.
+        Person-level sources run alongside the company-level fetch
+        (GNews, ZoomInfo, PDL company enrichment).
 
         Args:
             email: Email address
             domain: Company domain
+            company_data: Optional shared awaitable for the company-level data.
+                When omitted, company sources are fetched for this email only.
+            context: Per-call context that vendor calls are counted on
 
         Returns:
             Dict mapping source name to response data
         """
-        # Phase 1: Fetch person data and news in parallel
+        if company_data is None:
+            company_data = self._fetch_company_sources(email, domain, context)
+
         person_tasks = [
-            self._fetch_with_fallback("apollo", email, domain),
-            self._fetch_with_fallback("pdl", email, domain),
-            self._fetch_with_fallback("hunter", email, domain),
-            self._fetch_with_fallback("gnews", email, domain),
-            self._fetch_with_fallback("zoominfo", email, domain),
+            self._fetch_with_fallback(source, email, domain, context)
+            for source in PERSON_SOURCES
         ]
 
-        results = await asyncio.gather(*person_tasks, return_exceptions=True)
+        # Shield the company fetch: in batch mode it is shared by every lead
+        # at this domain, so one lead's cancellation must not cancel it.
+        results = await asyncio.gather(
+            *person_tasks,
+            asyncio.shield(company_data),
+            return_exceptions=True
+        )
 
         raw_data = {}
-        source_names = ["apollo", "pdl", "hunter", "gnews", "zoominfo"]
-
-        for source_name, result in zip(source_names, results):
+        for source_name, result in zip(PERSON_SOURCES, results[:-1]):
             if isinstance(result, Exception):
                 logger.warning(f"{source_name} failed: {result}")
                 raw_data[source_name] = {"_error": str(result)}
             else:
                 raw_data[source_name] = result
 
-        # Phase 2: Fetch deep company data from PDL
-        # This provides much richer company context
-        try:
-            pdl_api = self.apis.get("pdl")
-            if pdl_api and hasattr(pdl_api, 'enrich_company'):
-                logger.info(f"Fetching deep company enrichment for {domain}")
-                company_data = await pdl_api.enrich_company(domain)
-                raw_data["pdl_company"] = company_data
-                if not company_data.get("_error"):
-                    self.data_sources.append("pdl_company")
-        except Exception as e:
-            logger.warning(f"PDL company enrichment failed: {e}")
-            raw_data["pdl_company"] = {"_error": str(e)}
+        company_result = results[-1]
+        if isinstance(company_result, Exception):
+            logger.warning(f"Company enrichment failed for {domain}: {company_result}")
+            company_result = {
+                source: {"_error": str(company_result)} for source in COMPANY_SOURCES
+            }
+        raw_data.update(company_result)
 
         return raw_data
 
+    async def _fetch_company_sources(
+        self,
+        email: str,
+        domain: str,
+        context: Optional[EnrichmentContext] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch company-level data for a domain (GNews, ZoomInfo, PDL company).
+
+        The responses depend only on the domain, so callers can share a
+        single result across every lead at the same company.
+
+        Args:
+            email: Representative email (used for logging and mock data)
+            domain: Company domain
+            context: Per-call context that vendor calls are counted on
+
+        Returns:
+            Dict mapping company source name to response data
+        """
+        news, zoominfo, pdl_company = await asyncio.gather(
+            self._fetch_with_fallback("gnews", email, domain, context),
+            self._fetch_with_fallback("zoominfo", email, domain, context),
+            self._fetch_pdl_company(domain, context),
+        )
+        return {"gnews": news, "zoominfo": zoominfo, "pdl_company": pdl_company}
+
+    async def _fetch_pdl_company(
+        self,
+        domain: str,
+        context: Optional[EnrichmentContext] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch deep company data from the PDL Company API.
+
+        Args:
+            domain: Company domain
+            context: Per-call context that the vendor call is counted on
+
+        Returns:
+            Company data or error dict
+        """
+        pdl_api = self.apis.get("pdl")
+        if not pdl_api or not hasattr(pdl_api, "enrich_company"):
+            return {"_error": "PDL company enrichment unavailable"}
+
+        async def fetch() -> Dict[str, Any]:
+            logger.info(f"Fetching deep company enrichment for {domain}")
+            self._count_call("pdl_company", context)
+            return await self._call_vendor(pdl_api, lambda: pdl_api.enrich_company(domain))
+
+        with span("vendor.pdl_company") as vendor_span:
+            try:
+                result = await self.single_flight.do(("pdl_company", domain), fetch)
+                vendor_span.set_attribute("outcome", _outcome(result))
+                return result
+            except Exception as e:
+                logger.warning(f"PDL company enrichment failed: {e}")
+                vendor_span.set_error(e)
+                vendor_span.set_attribute("outcome", _error_outcome(e))
+                return {"_error": str(e)}
+
     async def _fetch_with_fallback(
         self,
         source: str,
         email: str,
-        domain: str
+        domain: str,
+        context: Optional[EnrichmentContext] = None
     ) -> Dict[str, Any]:
         """
         Fetch from a single source with error handling.
@@ -175,6 +448,7 @@ class RADOrchestrator:
             source: Source name
             email: Email address
             domain: Company domain
+            context: Per-call context that the vendor call is counted on
 
         Returns:
             Response data or error dict
@@ -183,20 +457,62 @@ class RADOrchestrator:
         if not api:
             return {"_error": f"Unknown source: {source}"}
 
-        try:
-            return await api.enrich(email, domain)
-        except EnrichmentAPIError as e:
-            logger.warning(f"{source} API error: {e}")
-            return {"_error": str(e)}
-        except Exception as e:
-            logger.error(f"{source} unexpected error: {e}")
-            return {"_error": str(e)}
+        async def fetch() -> Dict[str, Any]:
+            self._count_call(source, context)
+            return await self._call_vendor(api, lambda: api.enrich(email, domain))
+
+        # Company-level sources coalesce per domain, person-level per email
+        subject = domain if source in COMPANY_SOURCES else email
+        with span(f"vendor.{source}") as vendor_span:
+            try:
+                result = await self.single_flight.do((source, subject), fetch)
+                vendor_span.set_attribute("outcome", _outcome(result))
+                return result
+            except EnrichmentAPIError as e:
+                logger.warning(f"{source} API error: {e}")
+                vendor_span.set_error(e)
+                vendor_span.set_attribute("outcome", _error_outcome(e))
+                return {"_error": str(e)}
+            except Exception as e:
+                logger.error(f"{source} unexpected error: {e}")
+                vendor_span.set_error(e)
+                vendor_span.set_attribute("outcome", _error_outcome(e))
+                return {"_error": str(e)}
+
+    def _count_call(self, source: str, context: Optional[EnrichmentContext]) -> None:
+        """Count one issued vendor call (coalesced waiters are not counted)."""
+        self.vendor_calls[source] += 1
+        if context is not None:
+            context.vendor_calls[source] += 1
+
+    async def _call_vendor(
+        self,
+        api: Any,
+        call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Run a vendor call behind the vendor's token bucket.
+        Mock-mode clients (no API key) make no network calls and skip the limiter.
+
+        Args:
+            api: Enrichment API client
+            call: Zero-argument coroutine factory performing the request
+
+        Returns:
+            Response data
+        """
+        if not getattr(api, "api_key", None):
+            return await call()
+        return await self.rate_limiter.run(
+            api.source_name, call, cost=getattr(api, "request_cost", 1)
+        )
 
     def _resolve_profile(
         self,
         email: str,
         domain: str,
-        raw_data: Dict[str, Dict[str, Any]]
+        raw_data: Dict[str, Dict[str, Any]],
+        provenance: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Apply resolution logic to normalize and merge profile data.
@@ -211,21 +527,49 @@ class RADOrchestrator:
             email: Email address
             domain: Company domain
             raw_data: Aggregated raw data from APIs
+            provenance: Optional dict filled with the source that won each field
 
         Returns:
             Normalized profile dict
         """
         normalized = {}
+        if provenance is None:
+            provenance = {}
+
+        # Sources with usable data, checked once rather than per field
+        usable = {
+            source: data for source, data in raw_data.items()
+            if data and not data.get("_error")
+        }
 
-        # Define field mappings from each source
-        field_mappings = self._get_field_mappings()
+        # Walk the compiled plan: candidates are already in priority order
+        for field, sources in RESOLUTION_PLAN:
+            winner = self._first_value(sources, usable)
+            if winner is not None:
+                provenance[field], normalized[field] = winner
 
-        # Process each field
-        for field, sources in field_mappings.items():
-            value = self._resolve_field(field, sources, raw_data)
-            if value is not None:
-                normalized[field] = value
+        self._apply_source_fields(normalized, raw_data, provenance)
+
+        # Lazy formatting: this runs for every lead in a batch
+        logger.debug("Field provenance for %s: %s", email, provenance)
+
+        return normalized
+
+    def _apply_source_fields(
+        self,
+        normalized: Dict[str, Any],
+        raw_data: Dict[str, Dict[str, Any]],
+        provenance: Dict[str, str]
+    ) -> None:
+        """
+        Copy single-source fields (Hunter verification, GNews context, PDL
+        company depth) onto a profile whose mapped fields are resolved.
 
+        Args:
+            normalized: Profile with RESOLUTION_PLAN fields already set (updated in place)
+            raw_data: Raw data from all sources
+            provenance: Field provenance (updated in place)
+        """
         # Email verification from Hunter
         hunter_data = raw_data.get("hunter", {})
         if hunter_data and not hunter_data.get("_error"):
@@ -257,115 +601,17 @@ class RADOrchestrator:
             # Merge employee count if not already set
             if not normalized.get("employee_count") and pdl_company.get("employee_count"):
                 normalized["employee_count"] = pdl_company.get("employee_count")
-
-        return normalized
+                provenance["employee_count"] = "pdl_company"
 
     def _get_field_mappings(self) -> Dict[str, List[Tuple[str, str]]]:
         """
-        Define field mappings from source fields to normalized fields.
-        Enhanced to include PDL company data for richer company insights.
+        Field mappings from source fields to normalized fields
+        (compiled into RESOLUTION_PLAN at import).
 
         Returns:
             Dict mapping normalized field to list of (source, source_field) tuples
         """
-        return {
-            "first_name": [
-                ("apollo", "first_name"),
-                ("pdl", "first_name"),
-            ],
-            "last_name": [
-                ("apollo", "last_name"),
-                ("pdl", "last_name"),
-            ],
-            "full_name": [
-                ("pdl", "full_name"),
-            ],
-            "title": [
-                ("apollo", "title"),
-                ("pdl", "job_title"),
-            ],
-            "company_name": [
-                ("pdl_company", "name"),
-                ("apollo", "company_name"),
-                ("zoominfo", "company_name"),
-                ("pdl", "job_company_name"),
-            ],
-            "company_display_name": [
-                ("pdl_company", "display_name"),
-            ],
-            "industry": [
-                ("pdl_company", "industry"),
-                ("apollo", "industry"),
-                ("zoominfo", "industry"),
-                ("pdl", "job_company_industry"),
-            ],
-            "company_size": [
-                ("pdl_company", "size"),
-                ("apollo", "company_size"),
-                ("pdl", "job_company_size"),
-            ],
-            "employee_count": [
-                ("pdl_company", "employee_count"),
-                ("zoominfo", "employee_count"),
-            ],
-            "employee_count_range": [
-                ("pdl_company", "employee_count_range"),
-            ],
-            "linkedin_url": [
-                ("apollo", "linkedin_url"),
-                ("pdl", "linkedin_url"),
-            ],
-            "city": [
-                ("pdl_company", "locality"),
-                ("apollo", "city"),
-                ("zoominfo", "city"),
-                ("pdl", "location_locality"),
-            ],
-            "state": [
-                ("pdl_company", "region"),
-                ("apollo", "state"),
-                ("zoominfo", "state"),
-                ("pdl", "location_region"),
-            ],
-            "country": [
-                ("pdl_company", "country"),
-                ("apollo", "country"),
-                ("zoominfo", "country"),
-                ("pdl", "location_country"),
-            ],
-            "seniority": [
-                ("apollo", "seniority"),
-            ],
-            "skills": [
-                ("pdl", "skills"),
-            ],
-            "interests": [
-                ("pdl", "interests"),
-            ],
-            "experience": [
-                ("pdl", "experience"),
-            ],
-            "company_description": [
-                ("pdl_company", "summary"),
-                ("zoominfo", "description"),
-            ],
-            "founded_year": [
-                ("pdl_company", "founded"),
-                ("zoominfo", "founded_year"),
-            ],
-            "company_type": [
-                ("pdl_company", "type"),
-            ],
-            "ticker": [
-                ("pdl_company", "ticker"),
-            ],
-            "naics_codes": [
-                ("pdl_company", "naics"),
-            ],
-            "sic_codes": [
-                ("pdl_company", "sic"),
-            ],
-        }
+        return FIELD_MAPPINGS
 
     def _resolve_field(
         self,
@@ -376,7 +622,8 @@ class RADOrchestrator:
         """
         Resolve a single field value from multiple sources.
 
-        Uses source priority to pick the best value.
+        Uses source priority to pick the best value. _resolve_profile uses
+        the pre-sorted RESOLUTION_PLAN instead; this sorts ad hoc lists.
 
         Args:
             field: Normalized field name
@@ -386,22 +633,35 @@ class RADOrchestrator:
         Returns:
             Resolved field value or None
         """
-        candidates = []
+        usable = {
+            source: data for source, data in raw_data.items()
+            if data and not data.get("_error")
+        }
+        winner = self._first_value(_by_priority(sources), usable)
+        return winner[1] if winner else None
+
+    @staticmethod
+    def _first_value(
+        sources: Tuple[Tuple[str, str], ...],
+        usable: Dict[str, Dict[str, Any]]
+    ) -> Optional[Tuple[str, Any]]:
+        """
+        First non-empty value from priority-ordered candidates.
+
+        Args:
+            sources: (source, source_field) tuples, highest priority first
+            usable: Raw data of the sources without errors
 
+        Returns:
+            (winning source, value) or None
+        """
         for source_name, source_field in sources:
-            source_data = raw_data.get(source_name, {})
-            if source_data and not source_data.get("_error"):
+            source_data = usable.get(source_name)
+            if source_data:
                 value = source_data.get(source_field)
                 if value is not None and value != "":
-                    priority = SOURCE_PRIORITY.get(source_name, 0)
-                    candidates.append((priority, value))
-
-        if not candidates:
-            return None
-
-        # Sort by priority (descending) and return highest priority value
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        return candidates[0][1]
+                    return source_name, value
+        return None
 
     def _calculate_quality_score(self, raw_data: Dict[str, Dict[str, Any]]) -> float:
         """
@@ -447,28 +707,93 @@ class RADOrchestrator:
     async def enrich_batch(
         self,
         emails: List[str],
-        concurrency: int = 5
+        concurrency: int = 5,
+        context: Optional[EnrichmentContext] = None
     ) -> List[Dict[str, Any]]:
         """
         Enrich multiple emails with controlled concurrency.
 
+        Leads are grouped by domain first. Company-level data (GNews,
+        ZoomInfo, PDL company) is fetched once per domain and shared by
+        every lead at that company; person-level lookups still run per email.
+        A summary of vendor calls is stored on ``context.batch_report``.
+
         Args:
             emails: List of email addresses
             concurrency: Max concurrent enrichments
+            context: Optional per-call context for the batch report
 
         Returns:
-            List of enrichment results
+            List of enrichment results (same order as ``emails``)
         """
+        if context is None:
+            context = EnrichmentContext()
         semaphore = asyncio.Semaphore(concurrency)
+        # Every lead's context shares the batch's vendor call counter
+        batch_calls = context.vendor_calls
+
+        # Group leads by domain so company lookups are planned once per domain
+        leads_by_domain: Dict[str, List[str]] = {}
+        for email in emails:
+            domain = email.split("@")[-1].lower()
+            leads_by_domain.setdefault(domain, []).append(email)
+
+        # One shared company fetch per domain, started on first use
+        company_tasks: Dict[str, asyncio.Task] = {}
+
+        def company_data_for(email: str, domain: str) -> asyncio.Task:
+            task = company_tasks.get(domain)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_company_sources(email, domain, context))
+                company_tasks[domain] = task
+            return task
 
         async def enrich_with_semaphore(email: str) -> Dict[str, Any]:
             async with semaphore:
+                domain = email.split("@")[-1].lower()
                 try:
-                    return await self.enrich(email)
+                    return await self.enrich(
+                        email,
+                        domain,
+                        company_data=company_data_for(email, domain),
+                        context=EnrichmentContext(vendor_calls=batch_calls)
+                    )
                 except Exception as e:
                     logger.error(f"Batch enrichment failed for {email}: {e}")
                     return {"email": email, "_error": str(e)}
 
-        return await asyncio.gather(*[
-            enrich_with_semaphore(email) for email in emails
-        ])
+        try:
+            results = await asyncio.gather(*[
+                enrich_with_semaphore(email) for email in emails
+            ])
+        finally:
+            for task in company_tasks.values():
+                if not task.done():
+                    task.cancel()
+
+        vendor_calls = dict(batch_calls)
+        context.batch_report = {
+            "leads": len(emails),
+            "domains": len(leads_by_domain),
+            "vendor_calls": vendor_calls,
+            "total_vendor_calls": sum(vendor_calls.values()),
+            "company_fetches_saved": (len(emails) - len(leads_by_domain)) * len(COMPANY_SOURCES),
+        }
+        logger.info(
+            f"Batch enrichment complete: {len(emails)} leads across "
+            f"{len(leads_by_domain)} domains, vendor calls: {vendor_calls}"
+        )
+
+        return results
+
+
+# Singleton instance, built at startup (see app.main lifespan)
+_rad_orchestrator: Optional[RADOrchestrator] = None
+
+
+def get_rad_orchestrator() -> RADOrchestrator:
+    """Get or create the shared RADOrchestrator."""
+    global _rad_orchestrator
+    if _rad_orchestrator is None:
+        _rad_orchestrator = RADOrchestrator(get_supabase_client())
+    return _rad_orchestrator
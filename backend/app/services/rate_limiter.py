@@ -0,0 +1,293 @@
+"""
+Rate limiting for outbound vendor APIs.
+  - Per-vendor token buckets for enrichment APIs: bursts are queued (up to a
+    maximum wait) instead of failing, 429 responses are retried with jittered
+    backoff, and Retry-After pauses the whole vendor.
+  - Sliding-window limiter for fixed-window quotas such as Marketo's
+    100 calls per 20 seconds.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.enrichment_apis import EnrichmentAPIError
+
+logger = logging.getLogger(__name__)
+
+# Base delay for exponential backoff when a 429 carries no Retry-After
+BACKOFF_BASE_SECONDS = 0.5
+
+
+class RateLimitExceeded(EnrichmentAPIError):
+    """Raised when a call would wait longer than the configured maximum."""
+
+    def __init__(self, source: str, wait_seconds: float):
+        self.wait_seconds = wait_seconds
+        super().__init__(
+            source,
+            f"Rate limited, dropped after needing {wait_seconds:.1f}s wait",
+            status_code=429
+        )
+
+
+class TokenBucket:
+    """
+    Token bucket with FIFO reservations.
+
+    Callers reserve tokens up front; the balance may go negative, and each
+    caller sleeps until its reservation is covered. This queues bursts in
+    arrival order without a lock (all access happens on the event loop).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (calls allowed back-to-back)
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until a call of the given cost could proceed."""
+        now = time.monotonic()
+        self._refill(now)
+        pause = max(0.0, self._paused_until - now)
+        deficit = cost - self._tokens
+        return pause + (deficit / self.rate if deficit > 0 else 0.0)
+
+    def reserve(self, cost: float, max_wait: float) -> Optional[float]:
+        """
+        Reserve tokens if they become available within max_wait.
+
+        Returns:
+            Seconds to wait before the call may proceed, or None if too long
+        """
+        wait = self.wait_time(cost)
+        if wait > max_wait:
+            return None
+        self._tokens -= cost
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Block new admissions for the given time (Retry-After)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class VendorRateLimiter:
+    """
+    Registry of per-vendor token buckets with queueing and 429 retry.
+    """
+
+    def __init__(
+        self,
+        default_rate: float,
+        default_burst: int,
+        max_wait: float,
+        max_retries: int,
+        overrides: Optional[Dict[str, Tuple[float, int]]] = None
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            default_rate: Requests per second for vendors without an override
+            default_burst: Bucket capacity for vendors without an override
+            max_wait: Longest a call may queue (including backoff) before it is dropped
+            max_retries: 429 retries per call
+            overrides: Per-vendor (rate, burst)
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.overrides = overrides or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Counter] = {}
+
+    def bucket(self, source: str) -> TokenBucket:
+        """Get or create the bucket for a vendor."""
+        if source not in self._buckets:
+            rate, burst = self.overrides.get(source, (self.default_rate, self.default_burst))
+            self._buckets[source] = TokenBucket(rate, burst)
+            self._stats[source] = Counter()
+        return self._buckets[source]
+
+    async def run(
+        self,
+        source: str,
+        fn: Callable[[], Awaitable[Any]],
+        cost: int = 1
+    ) -> Any:
+        """
+        Run a vendor call under the vendor's rate limit.
+
+        Args:
+            source: Vendor name (bucket key)
+            fn: Zero-argument coroutine factory performing the call
+            cost: Tokens the call consumes
+
+        Returns:
+            The call's result
+
+        Raises:
+            RateLimitExceeded: If the call would wait longer than max_wait
+            EnrichmentAPIError: If the vendor keeps returning 429 or fails otherwise
+        """
+        bucket = self.bucket(source)
+        stats = self._stats[source]
+        deadline = time.monotonic() + self.max_wait
+        attempt = 0
+
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            wait = bucket.reserve(cost, remaining)
+            if wait is None:
+                stats["dropped"] += 1
+                needed = bucket.wait_time(cost)
+                logger.warning(f"{source}: dropped call, queue wait {needed:.1f}s > {remaining:.1f}s")
+                raise RateLimitExceeded(source, needed)
+
+            if wait > 0:
+                stats["throttled"] += 1
+                stats["wait_ms"] += int(wait * 1000)
+                await asyncio.sleep(wait)
+            stats["admitted"] += 1
+
+            try:
+                return await fn()
+            except EnrichmentAPIError as e:
+                if e.status_code != 429 or attempt >= self.max_retries:
+                    if e.status_code == 429:
+                        stats["dropped"] += 1
+                    raise
+
+                delay = self._backoff(attempt, e.retry_after)
+                if time.monotonic() + delay > deadline:
+                    stats["dropped"] += 1
+                    raise
+                attempt += 1
+                stats["retried"] += 1
+                logger.info(f"{source}: 429, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                # Pause the vendor so queued callers back off too
+                bucket.pause(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before a retry: Retry-After as a floor, else full-jitter exponential."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, min(1.0, retry_after * 0.1))
+        return random.uniform(0, BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-vendor admitted/throttled/retried/dropped counts."""
+        return {
+            source: {
+                "rate_per_sec": self._buckets[source].rate,
+                "burst": self._buckets[source].burst,
+                "admitted": stats["admitted"],
+                "throttled": stats["throttled"],
+                "retried": stats["retried"],
+                "dropped": stats["dropped"],
+                "total_wait_ms": stats["wait_ms"],
+            }
+            for source, stats in self._stats.items()
+        }
+
+
+class SlidingWindowLimiter:
+    """
+    Admits at most max_calls in any rolling window of window_seconds.
+    Callers over the limit sleep until the oldest call leaves the window.
+    """
+
+    def __init__(self, max_calls: int, window_seconds: float):
+        """
+        Initialize limiter.
+
+        Args:
+            max_calls: Calls allowed per window
+            window_seconds: Window length in seconds
+        """
+        self.max_calls = max_calls
+        self.window_seconds = window_seconds
+        self._calls: deque = deque()
+        self.throttled = 0
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0] <= now - self.window_seconds:
+            self._calls.popleft()
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot in the window and record the call.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._calls) < self.max_calls:
+                self._calls.append(now)
+                return waited
+            delay = self._calls[0] + self.window_seconds - now
+            if waited == 0.0:
+                self.throttled += 1
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def in_window(self) -> int:
+        """Number of calls in the current window."""
+        self._prune(time.monotonic())
+        return len(self._calls)
+
+
+def parse_vendor_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """
+    Parse per-vendor overrides, e.g. "apollo=1.5/5,gnews=0.2/10".
+
+    Returns:
+        Dict mapping vendor to (rate per second, burst)
+    """
+    overrides: Dict[str, Tuple[float, int]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            source, limits = item.split("=", 1)
+            rate, burst = limits.split("/", 1)
+            overrides[source.strip().lower()] = (float(rate), int(burst))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit override: {item!r}")
+    return overrides
+
+
+# Global instance (lazy-loaded)
+_rate_limiter: Optional[VendorRateLimiter] = None
+
+
+def get_rate_limiter() -> VendorRateLimiter:
+    """Get or create the process-wide vendor rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = VendorRateLimiter(
+            default_rate=settings.ENRICHMENT_RATE_LIMIT_PER_SEC,
+            default_burst=settings.ENRICHMENT_RATE_LIMIT_BURST,
+            max_wait=settings.ENRICHMENT_RATE_LIMIT_MAX_WAIT,
+            max_retries=settings.ENRICHMENT_RATE_LIMIT_MAX_RETRIES,
+            overrides=parse_vendor_limits(settings.ENRICHMENT_RATE_LIMITS)
+        )
+    return _rate_limiter
@@ -0,0 +1,267 @@
+"""
+Single-flight request coalescing for enrichment fetches.
+Concurrent callers asking for the same key share one in-flight call:
+  - (source, email) for person-level vendors (Apollo, PDL, Hunter)
+  - (source, domain) for company-level vendors (GNews, ZoomInfo, PDL company)
+
+Optional cross-worker coordination uses an advisory-lock table in a local
+SQLite file, so uvicorn/gunicorn workers on the same host also coalesce.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from collections import Counter
+from contextlib import closing
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting worker polls the lock table for the leader's result
+LOCK_POLL_INTERVAL_SECONDS = 0.1
+
+# How long a published result stays readable for late followers
+RESULT_RETENTION_SECONDS = 5.0
+
+_MISSING = object()
+
+
+class AdvisoryLockTable:
+    """
+    Advisory locks in a local SQLite table, shared by workers on one host.
+
+    The worker that inserts the row for a key is the leader: it performs
+    the fetch and publishes the JSON result into the row. Other workers poll
+    the row and reuse the result. Rows expire after ``ttl_seconds`` so a
+    crashed leader never blocks a key forever, and are deleted by the next
+    acquisition of any key.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 90.0):
+        """
+        Initialize the lock table.
+
+        Args:
+            path: SQLite database file path
+            ttl_seconds: Lock lifetime before other workers may take over
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS single_flight_locks ("
+                " key TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " result TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; try_acquire manages its own transaction
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def try_acquire(self, key: str, owner: str) -> bool:
+        """
+        Try to become the leader for a key.
+
+        Expired rows for every key are purged first, so published vendor
+        payloads never outlive their retention window on disk.
+
+        Returns:
+            True if this owner now holds the lock
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM single_flight_locks WHERE expires_at < ?", (now,))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO single_flight_locks (key, owner, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, owner, now + self.ttl_seconds)
+            )
+            conn.execute("COMMIT")
+            return cursor.rowcount == 1
+
+    def publish(self, key: str, owner: str, result: Any) -> None:
+        """Store the leader's result so waiting workers can reuse it."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE single_flight_locks SET result = ?, expires_at = ? "
+                "WHERE key = ? AND owner = ?",
+                (json.dumps(result), time.time() + RESULT_RETENTION_SECONDS, key, owner)
+            )
+
+    def release(self, key: str, owner: str) -> None:
+        """Drop the lock without a result (leader failed)."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "DELETE FROM single_flight_locks WHERE key = ? AND owner = ?",
+                (key, owner)
+            )
+
+    def read(self, key: str) -> Tuple[bool, Any]:
+        """
+        Read the lock row for a key.
+
+        Returns:
+            Tuple of (lock_held, result). result is _MISSING until published.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT expires_at, result FROM single_flight_locks WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None or row[0] < time.time():
+            return False, _MISSING
+        if row[1] is None:
+            return True, _MISSING
+        return True, json.loads(row[1])
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical fetches into one in-flight call.
+
+    Every caller (the first included) awaits the same shielded task, so
+    a cancelled caller never cancels the fetch for the others.
+    """
+
+    def __init__(self, lock_table: Optional[AdvisoryLockTable] = None):
+        """
+        Initialize single-flight group.
+
+        Args:
+            lock_table: Optional advisory-lock table for cross-worker coalescing
+        """
+        self.lock_table = lock_table
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._stats: Counter = Counter()
+
+    async def do(
+        self,
+        key: Tuple[str, str],
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: (source, email) or (source, domain)
+            fn: Zero-argument coroutine factory performing the real fetch
+
+        Returns:
+            The shared result (do not mutate it)
+        """
+        self._stats["calls"] += 1
+        loop = asyncio.get_running_loop()
+
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self._stats["coalesced"] += 1
+            logger.debug(f"Coalesced in-flight fetch for {key}")
+            return await asyncio.shield(task)
+
+        task = loop.create_task(self._execute(key, fn))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark exceptions as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _execute(
+        self,
+        key: Tuple[str, str],
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Execute the fetch, coordinating with other workers if configured."""
+        if self.lock_table is None:
+            self._stats["executed"] += 1
+            return await fn()
+
+        lock_key = f"{key[0]}:{key[1]}"
+        try:
+            acquired = await asyncio.to_thread(self.lock_table.try_acquire, lock_key, self.owner)
+        except sqlite3.Error as e:
+            logger.warning(f"Advisory lock unavailable for {lock_key}: {e}")
+            self._stats["executed"] += 1
+            return await fn()
+
+        if not acquired:
+            result = await self._wait_for_peer(lock_key)
+            if result is not _MISSING:
+                self._stats["coalesced_cross_worker"] += 1
+                return result
+            logger.info(f"Peer worker did not publish {lock_key}, fetching locally")
+            self._stats["executed"] += 1
+            return await fn()
+
+        self._stats["executed"] += 1
+        try:
+            result = await fn()
+        except BaseException:
+            await asyncio.to_thread(self.lock_table.release, lock_key, self.owner)
+            raise
+
+        try:
+            await asyncio.to_thread(self.lock_table.publish, lock_key, self.owner, result)
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            logger.warning(f"Could not publish {lock_key} to peers: {e}")
+            await asyncio.to_thread(self.lock_table.release, lock_key, self.owner)
+        return result
+
+    async def _wait_for_peer(self, lock_key: str) -> Any:
+        """Poll the lock table until the leader publishes or the lock lapses."""
+        deadline = time.monotonic() + self.lock_table.ttl_seconds
+        while time.monotonic() < deadline:
+            held, result = await asyncio.to_thread(self.lock_table.read, lock_key)
+            if result is not _MISSING:
+                return result
+            if not held:
+                return _MISSING
+            await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+        return _MISSING
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return call counters (calls, executed, coalesced, cross-worker)."""
+        return {
+            "calls": self._stats["calls"],
+            "executed": self._stats["executed"],
+            "coalesced": self._stats["coalesced"],
+            "coalesced_cross_worker": self._stats["coalesced_cross_worker"],
+            "in_flight": len(self._inflight),
+            "cross_worker_enabled": self.lock_table is not None,
+        }
+
+
+# Global instance (lazy-loaded)
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the process-wide single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        lock_table = None
+        if settings.SINGLE_FLIGHT_LOCK_DB:
+            try:
+                lock_table = AdvisoryLockTable(
+                    settings.SINGLE_FLIGHT_LOCK_DB,
+                    ttl_seconds=settings.SINGLE_FLIGHT_LOCK_TTL
+                )
+                logger.info(f"Single-flight advisory locks at {settings.SINGLE_FLIGHT_LOCK_DB}")
+            except sqlite3.Error as e:
+                logger.warning(f"Advisory lock table unavailable, in-process only: {e}")
+        _single_flight = SingleFlight(lock_table)
+    return _single_flight
@@ -0,0 +1,269 @@
+"""
+Pool of persistent, authenticated SMTP connections.
+
+smtplib is blocking, so each SMTP conversation runs in a worker thread
+(asyncio.to_thread) and never stalls the event loop. Connections are opened
+once (EHLO, STARTTLS, AUTH) and reused across messages; a semaphore bounds
+how many conversations run at once.
+"""
+
+import asyncio
+import copy
+import io
+import logging
+import os
+import smtplib
+import socket
+import ssl
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from email.generator import BytesGenerator
+from email.message import Message
+from email.utils import getaddresses
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the connection itself is unusable. Other SMTPExceptions
+# (refused sender or recipients, DATA errors) are answers from a live server.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout, ssl.SSLError)
+
+
+def serialize_message(message: Message) -> Tuple[str, List[str], bytes]:
+    """
+    Envelope and wire bytes of a message, serialized once.
+
+    Mirrors smtplib's send_message (sender from Sender/From, recipients from
+    To/Cc/Bcc, Bcc stripped, CRLF line endings), so the bytes that are sent
+    are also the ones measured.
+
+    Returns:
+        (from address, recipient addresses, message bytes)
+    """
+    from_addr = message["Sender"] or message["From"]
+    to_addrs = [
+        address for _, address in getaddresses(
+            message.get_all("To", []) + message.get_all("Cc", []) + message.get_all("Bcc", [])
+        )
+    ]
+    if message["Bcc"] is not None:
+        message = copy.copy(message)
+        del message["Bcc"]
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, policy=message.policy.clone(linesep="\r\n")).flatten(message, linesep="\r\n")
+    return from_addr, to_addrs, buffer.getvalue()
+
+
+def _is_rejection(error: BaseException) -> bool:
+    """Whether the server refused the message (as opposed to dropping the connection)."""
+    return isinstance(error, smtplib.SMTPException) and not isinstance(error, CONNECTION_ERRORS)
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of reusable SMTP connections.
+
+    Idle connections older than max_idle_seconds are checked with NOOP
+    before reuse; a connection that fails mid-send is discarded and the
+    message is retried once on a fresh connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        size: int = 4,
+        max_idle_seconds: float = 60.0,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize pool (connections are opened lazily).
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            username: Login user (empty to skip AUTH)
+            password: Login password
+            use_tls: Upgrade with STARTTLS
+            size: Maximum concurrent connections
+            max_idle_seconds: Verify connections idle longer than this
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        # (connection, last used monotonic time); LIFO keeps hot connections hot
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: Counter = Counter()
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a connection (runs in a worker thread)."""
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.use_tls:
+            conn.starttls()
+            conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        self._stats["connections_opened"] += 1
+        return conn
+
+    @staticmethod
+    def _is_alive(conn: smtplib.SMTP) -> bool:
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        """Take an idle connection or open a new one (runs in a worker thread)."""
+        while self._idle:
+            conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.max_idle_seconds or self._is_alive(conn):
+                self._stats["connections_reused"] += 1
+                return conn
+            self._quit(conn)
+        return self._connect()
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.size)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[smtplib.SMTP]:
+        """
+        Borrow a connection; it is returned to the pool on a clean exit or
+        when the server rejected the message but kept the connection open.
+
+        On any other error, and in particular on cancellation (when the
+        worker thread may still be mid-conversation on it), the connection
+        is closed instead so no other sender can pick it up.
+        """
+        async with self._bind_loop():
+            conn = await asyncio.to_thread(self._checkout)
+            try:
+                yield conn
+            except BaseException as e:
+                if _is_rejection(e) and conn.sock is not None:
+                    self._idle.append((conn, time.monotonic()))
+                else:
+                    conn.close()
+                    self._stats["connections_discarded"] += 1
+                raise
+            self._idle.append((conn, time.monotonic()))
+
+    async def send(self, message: Message) -> int:
+        """
+        Send one message on a pooled connection.
+
+        Returns:
+            Size of the message on the wire, in bytes
+
+        A dropped connection is retried once on a new one; a rejection is
+        raised as is, without a second attempt.
+
+        Raises:
+            smtplib.SMTPException: If the server rejects the message
+        """
+        def transmit(conn: smtplib.SMTP) -> int:
+            from_addr, to_addrs, data = serialize_message(message)
+            conn.sendmail(from_addr, to_addrs, data)
+            return len(data)
+
+        for attempt in range(2):
+            try:
+                async with self.connection() as conn:
+                    size = await asyncio.to_thread(transmit, conn)
+                self._stats["messages_sent"] += 1
+                return size
+            except CONNECTION_ERRORS as e:
+                if attempt == 1:
+                    raise
+                logger.info(f"SMTP connection dropped ({e}), retrying on a new connection")
+
+    async def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send several messages back-to-back over one connection in one thread hop.
+
+        Returns:
+            Per-message error (None on success), in input order
+        """
+        def send_all(conn: smtplib.SMTP) -> List[Optional[Exception]]:
+            errors: List[Optional[Exception]] = []
+            for message in messages:
+                try:
+                    conn.sendmail(*serialize_message(message))
+                    errors.append(None)
+                except smtplib.SMTPRecipientsRefused as e:
+                    errors.append(e)
+                except smtplib.SMTPDataError as e:
+                    errors.append(e)
+            return errors
+
+        async with self.connection() as conn:
+            errors = await asyncio.to_thread(send_all, conn)
+        self._stats["messages_sent"] += sum(1 for e in errors if e is None)
+        return errors
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            await asyncio.to_thread(self._quit, conn)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return connection and message counters."""
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connections_opened": self._stats["connections_opened"],
+            "connections_reused": self._stats["connections_reused"],
+            "connections_discarded": self._stats["connections_discarded"],
+            "messages_sent": self._stats["messages_sent"],
+        }
+
+
+# Global instance (lazy-loaded)
+_smtp_pool: Optional[SMTPConnectionPool] = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get or create the SMTP pool from SMTP_* environment variables."""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPConnectionPool(
+            host=os.getenv("SMTP_HOST", ""),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            username=os.getenv("SMTP_USER", ""),
+            password=os.getenv("SMTP_PASS", ""),
+            use_tls=os.getenv("SMTP_TLS", "true").lower() == "true",
+            size=int(os.getenv("SMTP_POOL_SIZE", "4"))
+        )
+    return _smtp_pool
+
+
+async def close_smtp_pool() -> None:
+    """Close pooled SMTP connections (app shutdown)."""
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
@@ -4,12 +4,13 @@ Abstracts database operations for:
   - raw_data, staging_normalized, finalize_data (enrichment pipeline)
   - personalization_jobs, personalization_outputs (job tracking)
   - pdf_deliveries (PDF generation tracking)
+  - marketo_webhooks (durable queue for fast-ack webhook mode)
 """
 
 import json
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import logging
 
@@ -47,6 +48,8 @@ class SupabaseClient:
             self._mock_jobs: List[Dict[str, Any]] = []
             self._mock_outputs: List[Dict[str, Any]] = []
             self._mock_pdfs: List[Dict[str, Any]] = []
+            self._mock_webhooks: List[Dict[str, Any]] = []
+            self._mock_storage: Dict[str, bytes] = {}  # storage bucket objects by filename
             self.client = None
         else:
             from supabase import create_client, Client
@@ -118,6 +121,69 @@ class SupabaseClient:
             logger.error(f"Error fetching raw_data for {email}: {e}")
             return []
 
+    def get_raw_data_records(self, email: str) -> List[Dict[str, Any]]:
+        """
+        All raw_data records for one email, in page layout.
+
+        Unlike get_raw_data_for_email, errors are raised rather than
+        returned as an empty list.
+
+        Args:
+            email: User email
+
+        Returns:
+            raw_data records ordered by fetched_at
+        """
+        if self.mock_mode:
+            return sorted(
+                (r for r in self._mock_raw_data if r["email"] == email),
+                key=lambda r: r["fetched_at"]
+            )
+
+        try:
+            result = self.client.table("raw_data").select(
+                "email, source, payload, fetched_at"
+            ).eq("email", email).order("fetched_at").execute()
+            return result.data if result.data else []
+        except Exception as e:
+            logger.error(f"Error fetching raw_data records for {email}: {e}")
+            raise
+
+    def get_raw_data_page(
+        self,
+        after_email: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Page through raw_data ordered by email (keyset pagination).
+
+        A page may end part-way through an email's records; callers that
+        need whole leads resume from the last complete email.
+
+        Args:
+            after_email: Return records with email greater than this
+            limit: Maximum records per page
+
+        Returns:
+            raw_data records ordered by email, then fetched_at
+        """
+        if self.mock_mode:
+            records = sorted(
+                (r for r in self._mock_raw_data if after_email is None or r["email"] > after_email),
+                key=lambda r: (r["email"], r["fetched_at"])
+            )
+            return records[:limit]
+
+        try:
+            query = self.client.table("raw_data").select("email, source, payload, fetched_at")
+            if after_email is not None:
+                query = query.gt("email", after_email)
+            result = query.order("email").order("fetched_at").limit(limit).execute()
+            return result.data if result.data else []
+        except Exception as e:
+            logger.error(f"Error paging raw_data after {after_email}: {e}")
+            raise
+
     # ========================================================================
     # STAGING_NORMALIZED TABLE (Resolution in progress)
     # ========================================================================
@@ -270,6 +336,65 @@ class SupabaseClient:
             logger.error(f"Error fetching finalize_data for {email}: {e}")
             return None
 
+    def get_finalize_data_for_emails(self, emails: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve the latest finalized profile for each of several emails.
+
+        Args:
+            emails: User emails
+
+        Returns:
+            Dict mapping email to finalize_data record (missing emails omitted)
+        """
+        if not emails:
+            return {}
+
+        if self.mock_mode:
+            wanted = set(emails)
+            return {r["email"]: r for r in self._mock_finalize if r["email"] in wanted}
+
+        try:
+            result = self.client.table("finalize_data").select("*").in_(
+                "email", emails
+            ).order("resolved_at").execute()
+            # Ascending order: the latest record per email wins
+            return {r["email"]: r for r in result.data or []}
+        except Exception as e:
+            logger.error(f"Error fetching finalize_data for {len(emails)} emails: {e}")
+            raise
+
+    def upsert_finalize_data_batch(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Upsert many finalized profiles in one request.
+
+        Args:
+            records: finalize_data rows (email, normalized_data,
+                personalization_intro, personalization_cta, data_sources)
+
+        Returns:
+            Number of records written
+        """
+        if not records:
+            return 0
+
+        resolved_at = datetime.utcnow().isoformat()
+        rows = [{**record, "resolved_at": resolved_at} for record in records]
+
+        if self.mock_mode:
+            emails = {row["email"] for row in rows}
+            self._mock_finalize = [r for r in self._mock_finalize if r["email"] not in emails]
+            self._mock_finalize.extend(rows)
+            logger.info(f"[MOCK] Upserted {len(rows)} finalize_data records")
+            return len(rows)
+
+        try:
+            self.client.table("finalize_data").upsert(rows, on_conflict="email").execute()
+            logger.info(f"Upserted {len(rows)} finalize_data records")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error upserting {len(rows)} finalize_data records: {e}")
+            raise
+
     def upsert_finalize_data(
         self,
         email: str,
@@ -381,7 +506,8 @@ class SupabaseClient:
         self,
         job_id: str,
         status: str,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        stage_timings: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Update job status.
@@ -390,11 +516,14 @@ class SupabaseClient:
             job_id: Job ID
             status: New status (pending, processing, completed, failed)
             error_message: Error message if failed
+            stage_timings: Trace summary of the pipeline stages (tracing.Trace.summary)
 
         Returns:
             Updated job record
         """
         data = {"status": status}
+        if stage_timings is not None:
+            data["stage_timings"] = stage_timings
 
         if status == "processing":
             data["started_at"] = datetime.utcnow().isoformat()
@@ -480,13 +609,18 @@ class SupabaseClient:
         tokens_used: Optional[int] = None,
         latency_ms: Optional[int] = None,
         compliance_passed: bool = True,
-        compliance_issues: Optional[List[str]] = None
+        compliance_issues: Optional[List[str]] = None,
+        email: Optional[str] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        cost_usd: Optional[float] = None,
+        usage_by_stage: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Store LLM personalization output.
 
         Args:
-            job_id: Associated job ID
+            job_id: Associated job ID (None for webhook-driven leads)
             output_json: Full LLM response
             intro_hook: Extracted intro hook
             cta: Extracted CTA
@@ -495,17 +629,27 @@ class SupabaseClient:
             latency_ms: LLM call latency
             compliance_passed: Whether output passed compliance
             compliance_issues: List of compliance issues if any
+            email: Lead email the usage is attributed to
+            input_tokens: Prompt tokens across all LLM stages
+            output_tokens: Completion tokens across all LLM stages
+            cost_usd: Estimated spend across all LLM stages
+            usage_by_stage: Per-stage usage (provider, model, tokens, cost)
 
         Returns:
             Stored output record
         """
         data = {
             "job_id": job_id,
+            "email": email,
             "output_json": output_json,
             "intro_hook": intro_hook,
             "cta": cta,
             "model_used": model_used,
             "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost_usd,
+            "usage_by_stage": usage_by_stage or {},
             "latency_ms": latency_ms,
             "compliance_passed": compliance_passed,
             "compliance_issues": compliance_issues or [],
@@ -639,6 +783,176 @@ class SupabaseClient:
             logger.error(f"Error updating PDF delivery {delivery_id}: {e}")
             raise
 
+    # ========================================================================
+    # MARKETO_WEBHOOKS TABLE (Durable webhook queue)
+    # ========================================================================
+
+    def enqueue_webhook(
+        self,
+        webhook_id: str,
+        lead_id: str,
+        email: str,
+        payload: Dict[str, Any],
+        status: str = "queued"
+    ) -> Dict[str, Any]:
+        """
+        Persist a webhook with status 'queued' for a worker to process.
+
+        Args:
+            webhook_id: Webhook ID
+            lead_id: Marketo lead ID
+            email: Lead email
+            payload: Full webhook payload
+            status: Initial status ('processing' when handled in-process)
+
+        Returns:
+            Stored webhook record
+        """
+        data = {
+            "id": webhook_id,
+            "lead_id": lead_id,
+            "email": email,
+            "payload": payload,
+            "status": status,
+            "attempts": 0,
+            "claimed_at": None,
+            "created_at": datetime.utcnow().isoformat()
+        }
+
+        if self.mock_mode:
+            self._mock_webhooks.append(data)
+            logger.info(f"[MOCK] Stored webhook {webhook_id} ({status})")
+            return data
+
+        try:
+            result = self.client.table("marketo_webhooks").insert(data).execute()
+            return result.data[0] if result.data else data
+        except Exception as e:
+            logger.error(f"Error storing webhook {webhook_id}: {e}")
+            raise
+
+    def get_webhook(self, webhook_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get webhook record by ID.
+
+        Args:
+            webhook_id: Webhook ID
+
+        Returns:
+            Webhook record or None
+        """
+        if self.mock_mode:
+            for webhook in self._mock_webhooks:
+                if webhook["id"] == webhook_id:
+                    return webhook
+            return None
+
+        try:
+            result = self.client.table("marketo_webhooks").select("*").eq("id", webhook_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching webhook {webhook_id}: {e}")
+            return None
+
+    def claim_webhooks(self, limit: int = 1, stale_after_seconds: int = 300) -> List[Dict[str, Any]]:
+        """
+        Claim the oldest queued webhooks (and stale processing ones) for processing.
+
+        Args:
+            limit: Maximum number of webhooks to claim
+            stale_after_seconds: Reclaim processing rows claimed longer ago than this
+
+        Returns:
+            Claimed webhook records (status 'processing', attempts incremented)
+        """
+        if self.mock_mode:
+            now = datetime.utcnow()
+            stale_before = (now - timedelta(seconds=stale_after_seconds)).isoformat()
+            claimable = [
+                w for w in sorted(self._mock_webhooks, key=lambda w: w["created_at"])
+                if w["status"] == "queued" or (
+                    w["status"] == "processing" and w.get("claimed_at") and
+                    w["claimed_at"] < stale_before
+                )
+            ][:limit]
+            for webhook in claimable:
+                webhook.update({
+                    "status": "processing",
+                    "attempts": webhook.get("attempts", 0) + 1,
+                    "claimed_at": now.isoformat()
+                })
+            return claimable
+
+        try:
+            result = self.client.rpc("claim_marketo_webhooks", {
+                "batch_size": limit,
+                "stale_after_seconds": stale_after_seconds
+            }).execute()
+            return result.data if result.data else []
+        except Exception as e:
+            logger.error(f"Error claiming webhooks: {e}")
+            return []
+
+    def update_webhook(self, webhook_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Update a webhook record (status, pdf_url, error_message, ...).
+
+        Args:
+            webhook_id: Webhook ID
+            **fields: Columns to update
+
+        Returns:
+            Updated webhook record
+        """
+        if fields.get("status") in ("completed", "failed"):
+            fields.setdefault("completed_at", datetime.utcnow().isoformat())
+
+        if self.mock_mode:
+            for webhook in self._mock_webhooks:
+                if webhook["id"] == webhook_id:
+                    webhook.update(fields)
+                    return webhook
+            return fields
+
+        try:
+            result = self.client.table("marketo_webhooks").update(fields).eq("id", webhook_id).execute()
+            return result.data[0] if result.data else fields
+        except Exception as e:
+            logger.error(f"Error updating webhook {webhook_id}: {e}")
+            raise
+
+    def get_webhook_queue_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and the age of the oldest queued webhook.
+
+        Returns:
+            Dict with queued, processing, oldest_queued_at
+        """
+        if self.mock_mode:
+            queued = [w for w in self._mock_webhooks if w["status"] == "queued"]
+            processing = [w for w in self._mock_webhooks if w["status"] == "processing"]
+            return {
+                "queued": len(queued),
+                "processing": len(processing),
+                "oldest_queued_at": min((w["created_at"] for w in queued), default=None)
+            }
+
+        try:
+            queued = self.client.table("marketo_webhooks").select(
+                "created_at", count="exact"
+            ).eq("status", "queued").order("created_at").limit(1).execute()
+            processing = self.client.table("marketo_webhooks").select(
+                "id", count="exact"
+            ).eq("status", "processing").limit(1).execute()
+            return {
+                "queued": queued.count or 0,
+                "processing": processing.count or 0,
+                "oldest_queued_at": queued.data[0]["created_at"] if queued.data else None
+            }
+        except Exception as e:
+            logger.error(f"Error fetching webhook queue stats: {e}")
+            return {"queued": None, "processing": None, "oldest_queued_at": None}
+
     # ========================================================================
     # HEALTH CHECK
     # ========================================================================
@@ -0,0 +1,211 @@
+"""
+Span-based stage timing for the personalization pipeline.
+
+A trace is opened per unit of work (a webhook, an enrichment request) and
+every instrumented stage records a span into it: vendor fetches, profile
+resolution, LLM provider attempts, compliance, template render, PDF render,
+Storage upload and the Marketo callback. Trace.summary() is the JSON that
+gets persisted as stage_timings on marketo_webhooks / personalization_jobs.
+
+The active trace and parent span live in contextvars, so spans recorded in
+asyncio tasks and asyncio.to_thread workers land in the right trace.
+When opentelemetry is installed each span is mirrored to the global OTel
+tracer (a no-op until an SDK and exporter are configured). Finished spans
+also go to any in-process exporters, which is what the tests use.
+"""
+
+import logging
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode
+    _otel_tracer = otel_trace.get_tracer("amd1-1.personalization")
+except ImportError:
+    _otel_tracer = None
+
+logger = logging.getLogger(__name__)
+
+# Spans kept per trace (a batch can fan out to many vendor calls)
+MAX_SPANS_PER_TRACE = 200
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed stage."""
+
+    name: str
+    span_id: str
+    trace_id: Optional[str] = None
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    _otel: Any = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value)
+
+    def set_error(self, error: Any) -> None:
+        """Mark the span failed (for stages that catch their own errors)."""
+        self.status = "error"
+        self.error = str(error)
+        if self._otel is not None:
+            self._otel.set_status(Status(StatusCode.ERROR, self.error))
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+
+class Trace:
+    """Spans recorded for one unit of work."""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.start = time.perf_counter()
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            self.dropped += 1
+            return
+        self.spans.append(span)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Total milliseconds per span name (repeated stages are summed)."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return {name: round(ms, 1) for name, ms in totals.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serializable timings: total, per-stage totals and the span list."""
+        # Trace start to the last finished span (a re-activated trace extends it)
+        end = max((span.end for span in self.spans if span.end is not None), default=time.perf_counter())
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "total_ms": round((end - self.start) * 1000, 1),
+            "stages": self.stage_totals(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "offset_ms": round((span.start - self.start) * 1000, 1),
+                    "duration_ms": round(span.duration_ms, 1),
+                    "status": span.status,
+                    **({"error": span.error} if span.error else {}),
+                    **({"attributes": span.attributes} if span.attributes else {}),
+                }
+                for span in self.spans
+            ],
+            "dropped_spans": self.dropped,
+        }
+
+
+class InMemoryExporter:
+    """Collects finished spans in process (tests, local debugging)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def names(self) -> List[str]:
+        return [span.name for span in self.spans]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+_exporters: List[Any] = []
+
+
+def add_exporter(exporter: Any) -> None:
+    """Register an object with export(span), called for every finished span."""
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Any) -> None:
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def activate(trace: Trace) -> Iterator[Trace]:
+    """Make an existing trace current (e.g. for a follow-up background task)."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Trace]:
+    """Open a new trace for one unit of work and make it current."""
+    trace = Trace(name, **attributes)
+    with activate(trace), span(name, **attributes):
+        yield trace
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a stage. Exceptions mark the span failed and propagate.
+
+    Outside a trace the span is still exported, just not summarized.
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        span_id=uuid.uuid4().hex[:16],
+        trace_id=trace.trace_id if trace else None,
+        parent_id=parent.span_id if parent else None,
+        attributes=dict(attributes),
+    )
+    with ExitStack() as stack:
+        if _otel_tracer is not None:
+            current._otel = stack.enter_context(
+                _otel_tracer.start_as_current_span(name, attributes=attributes)
+            )
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            current.end = time.perf_counter()
+            _current_span.reset(token)
+            if trace is not None:
+                trace.add(current)
+            for exporter in list(_exporters):
+                try:
+                    exporter.export(current)
+                except Exception as e:
+                    logger.warning(f"Span exporter failed: {e}")
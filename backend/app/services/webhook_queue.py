@@ -0,0 +1,224 @@
+"""
+Worker pool for fast-ack Marketo webhooks.
+The webhook route persists the payload to marketo_webhooks with status
+'queued' and returns immediately; workers here claim rows, run the
+personalization pipeline and record the result. Because the queue lives in
+the database, anything queued or mid-flight when the process stops is
+picked up again on the next start.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.supabase_client import SupabaseClient
+from app.services.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# Handler runs the pipeline for one claimed webhook and returns the PDF URL
+WebhookHandler = Callable[[Dict[str, Any], SupabaseClient], Awaitable[Optional[str]]]
+
+
+def _age_seconds(created_at: Optional[str]) -> Optional[float]:
+    """Seconds since an ISO timestamp (naive timestamps are UTC)."""
+    if not created_at:
+        return None
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - created).total_seconds())
+
+
+class WebhookQueue:
+    """
+    Pool of asyncio workers draining the marketo_webhooks queue.
+
+    Workers sleep on an event that the route sets after enqueueing, and
+    fall back to polling so rows queued by other instances (or before a
+    restart) are still picked up.
+    """
+
+    def __init__(
+        self,
+        supabase: SupabaseClient,
+        handler: WebhookHandler,
+        workers: int = 4,
+        poll_interval: float = 2.0,
+        max_attempts: int = 3,
+        stale_after_seconds: int = 300
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            supabase: Database client holding the queue
+            handler: Coroutine that processes one webhook record
+            workers: Number of concurrent workers
+            poll_interval: Seconds between polls when idle
+            max_attempts: Attempts before a webhook is marked failed
+            stale_after_seconds: Reclaim rows a dead worker left in processing
+        """
+        self.supabase = supabase
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.stale_after_seconds = stale_after_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stats: Dict[str, float] = {
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "queue_wait_total_s": 0.0,
+            "queue_wait_max_s": 0.0,
+            "processing_total_s": 0.0,
+        }
+
+    def start(self) -> None:
+        """Start the worker tasks on the running loop."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"webhook-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} webhook queue workers")
+
+    async def stop(self) -> None:
+        """Cancel workers. In-flight webhooks stay 'processing' and are reclaimed later."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Stopped webhook queue workers")
+
+    def notify(self) -> None:
+        """Wake idle workers after a webhook is enqueued."""
+        self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(
+                    self.supabase.claim_webhooks, 1, self.stale_after_seconds
+                )
+            except Exception as e:
+                logger.error(f"Webhook worker {index} failed to claim: {e}")
+                claimed = []
+
+            if not claimed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.process(claimed[0])
+            except Exception as e:
+                # The row stays 'processing' and is reclaimed once stale
+                logger.error(f"Webhook worker {index} failed on {claimed[0].get('id')}: {e}")
+
+    async def process(self, webhook: Dict[str, Any]) -> None:
+        """
+        Run the handler for one claimed webhook and record the outcome.
+
+        Failures are re-queued until max_attempts, then marked failed.
+        Status updates run in a thread so a slow database never blocks the loop.
+        """
+        webhook_id = webhook["id"]
+        wait = _age_seconds(webhook.get("created_at")) or 0.0
+        self._stats["queue_wait_total_s"] += wait
+        self._stats["queue_wait_max_s"] = max(self._stats["queue_wait_max_s"], wait)
+        logger.info(f"[{webhook_id}] Claimed after {wait:.1f}s in queue (attempt {webhook.get('attempts', 1)})")
+
+        start = time.time()
+        try:
+            with start_trace("webhook", webhook_id=webhook_id, queue_wait_s=round(wait, 3)) as trace:
+                pdf_url = await self.handler(webhook, self.supabase)
+        except Exception as e:
+            processing_ms = int((time.time() - start) * 1000)
+            if webhook.get("attempts", 1) < self.max_attempts:
+                self._stats["retried"] += 1
+                logger.warning(f"[{webhook_id}] Pipeline failed, re-queueing: {e}")
+                await asyncio.to_thread(
+                    self.supabase.update_webhook,
+                    webhook_id, status="queued", claimed_at=None, error_message=str(e),
+                    stage_timings=trace.summary()
+                )
+            else:
+                self._stats["failed"] += 1
+                logger.error(f"[{webhook_id}] Pipeline failed after {webhook.get('attempts')} attempts: {e}")
+                await asyncio.to_thread(
+                    self.supabase.update_webhook,
+                    webhook_id, status="failed", error_message=str(e),
+                    processing_time_ms=processing_ms, stage_timings=trace.summary()
+                )
+            return
+
+        self._stats["completed"] += 1
+        self._stats["processing_total_s"] += time.time() - start
+        await asyncio.to_thread(
+            self.supabase.update_webhook,
+            webhook_id, status="completed", pdf_url=pdf_url,
+            processing_time_ms=int((time.time() - start) * 1000),
+            stage_timings=trace.summary()
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return worker counters plus current backlog and oldest queued age."""
+        depth = self.supabase.get_webhook_queue_stats()
+        handled = self._stats["completed"] + self._stats["failed"] + self._stats["retried"]
+        return {
+            "workers": len(self._tasks),
+            "queued": depth["queued"],
+            "processing": depth["processing"],
+            "oldest_queued_age_s": _age_seconds(depth["oldest_queued_at"]),
+            "completed": int(self._stats["completed"]),
+            "failed": int(self._stats["failed"]),
+            "retried": int(self._stats["retried"]),
+            "avg_queue_wait_s": round(self._stats["queue_wait_total_s"] / handled, 2) if handled else None,
+            "max_queue_wait_s": round(self._stats["queue_wait_max_s"], 2),
+            "avg_processing_s": (
+                round(self._stats["processing_total_s"] / self._stats["completed"], 2)
+                if self._stats["completed"] else None
+            ),
+        }
+
+
+# Global instance (created at app startup when fast-ack mode is on)
+_webhook_queue: Optional[WebhookQueue] = None
+
+
+def start_webhook_queue(supabase: SupabaseClient, handler: WebhookHandler) -> WebhookQueue:
+    """Create and start the global webhook queue."""
+    global _webhook_queue
+    _webhook_queue = WebhookQueue(
+        supabase,
+        handler,
+        workers=settings.WEBHOOK_QUEUE_WORKERS,
+        poll_interval=settings.WEBHOOK_QUEUE_POLL_SECONDS,
+        max_attempts=settings.WEBHOOK_QUEUE_MAX_ATTEMPTS,
+        stale_after_seconds=settings.WEBHOOK_QUEUE_STALE_SECONDS
+    )
+    _webhook_queue.start()
+    return _webhook_queue
+
+
+async def stop_webhook_queue() -> None:
+    """Stop the global webhook queue if it was started."""
+    global _webhook_queue
+    if _webhook_queue is not None:
+        await _webhook_queue.stop()
+        _webhook_queue = None
+
+
+def get_webhook_queue() -> Optional[WebhookQueue]:
+    """Get the running webhook queue (None when fast-ack mode is off)."""
+    return _webhook_queue
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker cold start (app import) and first-request latency.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+- import app.main (provider SDKs are now imported lazily)
+- the eager SDK imports the app used to pay at import time
+- the first request's LLM client setup + PDF render, with and without the
+  startup warm-up (WARM_UP_ON_STARTUP), and a second request for reference
+
+No network calls are made; PDF renders use the configured local backends.
+Run: python scripts/benchmark_cold_start.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+IMPORT_APP = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+IMPORT_SDKS = """
+import time
+start = time.perf_counter()
+import anthropic, openai
+try:
+    import google.generativeai
+except ImportError:
+    pass
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUEST = """
+import asyncio, json, time
+from app.services.llm_service import LLMService, warm_up_llm_clients
+from app.services.pdf_renderers import WARM_UP_DOCUMENT, RenderRequest, get_renderer_registry
+
+registry = get_renderer_registry()
+registry.probe()
+start = time.perf_counter()
+if {warm}:
+    registry.warm_up()
+    warm_up_llm_clients()
+warm_up_s = time.perf_counter() - start
+
+def request():
+    start = time.perf_counter()
+    LLMService()
+    asyncio.run(registry.render(RenderRequest(html="", document=WARM_UP_DOCUMENT)))
+    return time.perf_counter() - start
+
+print(json.dumps({{"warm_up": warm_up_s, "first": request(), "second": request()}}))
+"""
+
+
+def run(code: str) -> str:
+    env = {**os.environ, "MOCK_SUPABASE": "true", "PYTHONWARNINGS": "ignore"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def median_ms(values) -> str:
+    return f"{statistics.median(values) * 1000:8.1f} ms"
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    app_import = [float(run(IMPORT_APP)) for _ in range(runs)]
+    sdk_import = [float(run(IMPORT_SDKS)) for _ in range(runs)]
+    print(f"import app.main (lazy SDKs)          {median_ms(app_import)}")
+    print(f"eager anthropic+openai+gemini import {median_ms(sdk_import)}  (no longer paid at import)")
+
+    for warm in (False, True):
+        samples = [json.loads(run(FIRST_REQUEST.format(warm=warm))) for _ in range(runs)]
+        label = "with warm-up   " if warm else "without warm-up"
+        print(f"{label}: startup warm-up {median_ms([s['warm_up'] for s in samples])}, "
+              f"first request {median_ms([s['first'] for s in samples])}, "
+              f"second request {median_ms([s['second'] for s in samples])}")
+    print(f"(median of {runs} fresh interpreters; LLM calls not included)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: industry insight lookups, read-and-scan vs the content index.
+
+The old path read the KP markdown on every call and scanned it line by
+line once per insight category (four times). The index parses each file
+once and memoizes key points, re-reading only when the file's mtime changes.
+
+Run: python scripts/benchmark_content_index.py [iterations]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.content_index import CONTENT_DIR, ContentIndex
+from app.services.ebook_content import INDUSTRY_FILE_MAP, extract_key_points, get_industry_key_insights
+
+INDUSTRIES = sorted(set(INDUSTRY_FILE_MAP) - {"media_and_ent"})
+
+
+def read_and_scan(industry: str) -> dict:
+    """The pre-index implementation of get_industry_key_insights."""
+    content = (CONTENT_DIR / INDUSTRY_FILE_MAP[industry]).read_text(encoding="utf-8")
+    return {
+        "trends": extract_key_points(content, "Major trends", 3),
+        "priorities": extract_key_points(content, "Technology Investment", 3),
+        "challenges": extract_key_points(content, "challenges", 3),
+        "messaging_tips": extract_key_points(content, "messaging", 3),
+    }
+
+
+def per_call_us(fn, iterations: int) -> float:
+    def run():
+        for industry in INDUSTRIES:
+            fn(industry)
+    return timeit.timeit(run, number=iterations) / (iterations * len(INDUSTRIES)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    for industry in INDUSTRIES:
+        assert read_and_scan(industry) == get_industry_key_insights(industry), industry
+
+    cold_load_ms = timeit.timeit(lambda: ContentIndex().load(), number=5) / 5 * 1000
+    scan_us = per_call_us(read_and_scan, iterations)
+    index_us = per_call_us(get_industry_key_insights, iterations)
+
+    print(f"index build (all KP files)     {cold_load_ms:8.1f} ms  (once at startup)")
+    print(f"read-and-scan per lookup       {scan_us:8.1f} us")
+    print(f"content index per lookup       {index_us:8.1f} us  ({scan_us / index_us:.0f}x faster)")
+    print(f"({len(INDUSTRIES)} industries x {iterations} iterations; results verified identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Per-PDF CPU time for each rendering backend: weasyprint (HTML), reportlab
+(structured document) and acroform (fill the designer template).
+
+Uses assets/amdtemplate_with_fields.pdf when present; otherwise a
+synthetic two-page template with the six personalization fields is
+generated so the fill path can still be measured.
+Run: python scripts/benchmark_pdf_backends.py [iterations]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import pdf_personalization_service
+from app.services.ebook_content import CASE_STUDIES, EBOOK_SECTIONS
+from app.services.ebook_document import EbookDocument
+from app.services.pdf_renderers import RENDERERS, RenderRequest
+from app.services.pdf_service import PDFService
+
+
+def write_synthetic_template(path: Path) -> None:
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(path))
+    for i, name in enumerate(sorted(pdf_personalization_service.REQUIRED_FIELDS)):
+        c.acroForm.textfield(name=name, x=50, y=700 - 60 * i, width=500, height=50)
+    c.showPage()
+    c.drawString(50, 700, "AMD ebook body")
+    c.showPage()
+    c.save()
+
+
+def build_request() -> RenderRequest:
+    service = PDFService()
+    case_study = next(iter(CASE_STUDIES.values()))
+    profile = {
+        "first_name": "John",
+        "last_name": "Smith",
+        "title": "VP of Infrastructure",
+        "company_name": "Acme Healthcare Systems",
+    }
+    hook = "As Acme scales its clinical AI workloads, infrastructure readiness decides the pace."
+    framing = "Like Acme, this organization needed to modernize without disrupting operations."
+    cta = "Start with an infrastructure assessment."
+    html = service._render_amd_ebook_template(
+        profile, hook, case_study, framing, cta, {"industry_input": "Healthcare"}
+    )
+    document = EbookDocument(
+        first_name=profile["first_name"],
+        company_name=profile["company_name"],
+        industry="healthcare",
+        persona="it_infrastructure",
+        buying_stage="evaluating",
+        personalized_hook=hook,
+        case_study_framing=framing,
+        personalized_cta=cta,
+        case_study=case_study,
+        sections=EBOOK_SECTIONS,
+        html=html,
+    )
+    return RenderRequest(html=html, document=document)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    request = build_request()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not pdf_personalization_service.TEMPLATE_WITH_FIELDS.exists():
+            synthetic = Path(tmp) / "amdtemplate_with_fields.pdf"
+            write_synthetic_template(synthetic)
+            pdf_personalization_service.TEMPLATE_WITH_FIELDS = synthetic
+            print(f"Designer template missing; using synthetic template {synthetic.name}")
+
+        print(f"{'backend':<12} {'cpu ms/pdf':>11} {'wall ms/pdf':>12} {'bytes':>9}")
+        for name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            try:
+                renderer.probe()
+                size = len(renderer.render(request))  # warm caches outside the timed loop
+            except Exception as e:
+                print(f"{name:<12} unavailable ({type(e).__name__}: {e})")
+                continue
+            cpu, wall = [], []
+            for _ in range(iterations):
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                renderer.render(request)
+                cpu.append((time.process_time() - cpu_start) * 1000)
+                wall.append((time.perf_counter() - wall_start) * 1000)
+            print(f"{name:<12} {statistics.median(cpu):11.2f} {statistics.median(wall):12.2f} {size:9,}")
+
+
+if __name__ == "__main__":
+    main()
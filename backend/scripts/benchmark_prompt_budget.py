@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Harness: ebook prompt size, latency and output quality vs token budget.
+
+Offline (default) it packs the prompt for a few sample leads at each budget
+and reports estimated tokens, packing time and which sections were dropped
+or truncated. With --live and an LLM key configured it also calls the
+provider chain per budget and scores the output: parsed JSON, company
+named, case study named, headline referenced, compliance passed.
+
+Run: python scripts/benchmark_prompt_budget.py [--live] [--budgets 0,1000,800,600]
+"""
+
+import argparse
+import sys
+import time
+import timeit
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.compliance import ComplianceService
+from app.services.llm_service import LLMService
+
+HEADLINES = [
+    {"title": "Acme raises $50M to expand AI logistics platform", "source": "Reuters",
+     "content": "Acme will use the funding to scale GPU inference across its routing engine. " * 3,
+     "query_category": "growth"},
+    {"title": "Acme names new CTO to lead cloud migration", "source": "TechCrunch",
+     "content": "The new CTO joins from a hyperscaler and will consolidate data centers. " * 3,
+     "query_category": "leadership"},
+    {"title": "Acme partners with regional carriers on predictive routing", "source": "Bloomberg",
+     "content": "The partnership relies on machine learning models trained on fleet telemetry. " * 3,
+     "query_category": "ai_technology"},
+]
+
+PROFILE = {
+    "first_name": "Dana", "last_name": "Lee", "title": "VP Engineering", "seniority": "vp",
+    "company_name": "Acme Logistics", "industry": "technology", "employee_count": 4200,
+    "employee_count_range": "1001-5000", "founded_year": 2009, "total_funding": 180000000,
+    "latest_funding_stage": "series_d", "employee_growth_rate": 0.24,
+    "company_summary": "Acme Logistics builds routing and fleet optimization software for "
+                       "mid-size carriers across North America. " * 4,
+    "skills": ["python", "kubernetes", "aws", "distributed systems", "ml", "leadership"] * 2,
+    "interests": ["ai infrastructure", "open source", "sustainability"],
+    "experience": [{"title": "Director of Platform", "company": "Initech"},
+                   {"title": "Staff Engineer", "company": "Globex"}],
+    "company_tags": ["saas", "logistics", "machine learning", "cloud"],
+    "naics_codes": ["541511"], "sic_codes": ["7372"],
+    "city": "Austin", "state": "TX", "country": "United States",
+    "linkedin_url": "https://linkedin.com/in/danalee",
+    "company_linkedin": "https://linkedin.com/company/acme-logistics",
+    "recent_news": HEADLINES + HEADLINES[:1],  # one syndicated duplicate
+    "news_themes": ["AI", "growth", "cloud migration"],
+    "news_sentiment": {"positive": 6, "negative": 1},
+    "news_by_category": {"ai_technology": [1], "growth": [1], "leadership": [1]},
+    "email_verified": True, "email_score": 94,
+}
+NEWS = "Acme Logistics is investing in AI-driven routing and migrating workloads to the cloud. " * 6
+
+LEADS = [
+    ("cto/awareness", {"persona": "cto", "goal": "awareness"}),
+    ("cfo/decision", {"persona": "cfo", "goal": "decision"}),
+    ("it_manager/consideration", {"persona": "it_manager", "goal": "consideration"}),
+]
+CASE_STUDY_NAMES = ("KT Cloud", "PQR", "Smurfit Westrock")
+
+
+def score_output(parsed, company_name):
+    """Quality checks on one ebook response (each 0 or 1)."""
+    if not parsed:
+        return {"parsed": 0, "company": 0, "case_study": 0, "news": 0, "compliance": 0}
+    text = " ".join(parsed.values())
+    compliance = ComplianceService().check(parsed["personalized_hook"], parsed["personalized_cta"])
+    news_words = {w.lower() for a in HEADLINES for w in a["title"].split() if len(w) > 5}
+    return {
+        "parsed": 1,
+        "company": int(company_name.split()[0] in text),
+        "case_study": int(any(name in text for name in CASE_STUDY_NAMES)),
+        "news": int(any(w in text.lower() for w in news_words)),
+        "compliance": int(compliance.passed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--budgets", default="0,1200,1000,800,600",
+                        help="comma-separated token budgets (0 = no budget)")
+    parser.add_argument("--live", action="store_true", help="call the configured LLM providers")
+    parser.add_argument("--iterations", type=int, default=200, help="packing timing iterations")
+    args = parser.parse_args()
+    budgets = [int(b) for b in args.budgets.split(",")]
+
+    service = LLMService()
+    if args.live and not service.providers:
+        sys.exit("--live needs ANTHROPIC_API_KEY, OPENAI_API_KEY or GEMINI_API_KEY")
+    system_prompt = service._get_ebook_system_prompt()
+
+    header = f"{'lead':<26} {'budget':>6} {'tokens':>6} {'pack ms':>8}"
+    if args.live:
+        header += f" {'latency':>8} {'in/out tok':>11} {'quality':>7}"
+    print(header + "  trimmed")
+
+    for label, context in LEADS:
+        user_context = {**context, "industry_input": "technology", "company_size": "enterprise"}
+        for budget in budgets:
+            def pack():
+                return service._ebook_prompt_sections(PROFILE, user_context, NEWS).pack(
+                    budget, context["persona"], context["goal"]
+                )
+
+            packed = pack()
+            pack_ms = timeit.timeit(pack, number=args.iterations) / args.iterations * 1000
+            row = f"{label:<26} {budget or '-':>6} {packed.tokens:>6} {pack_ms:>8.2f}"
+            if args.live:
+                start = time.perf_counter()
+                response, _ = service._call_with_fallback(system_prompt, packed.text, max_tokens=1000)
+                latency = time.perf_counter() - start
+                parsed = service._parse_ebook_response(response.text) if response else None
+                scores = score_output(parsed, PROFILE["company_name"])
+                usage = f"{response.input_tokens}/{response.output_tokens}" if response else "-"
+                row += f" {latency:>7.2f}s {usage:>11} {sum(scores.values())}/{len(scores):<5}"
+            print(f"{row}  {', '.join(packed.trimmed) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
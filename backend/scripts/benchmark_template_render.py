@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: string.Template.safe_substitute vs CompiledTemplate.render
+for the AMD ebook HTML.
+Run: python scripts/benchmark_template_render.py [iterations]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+from string import Template
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ebook_content import CASE_STUDIES, EBOOK_SECTIONS
+from app.services.pdf_service import PDFService
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    service = PDFService()
+    case_study = next(iter(CASE_STUDIES.values()))
+    profile = {
+        "first_name": "John",
+        "last_name": "Smith",
+        "title": "VP of Infrastructure",
+        "company_name": "Acme Healthcare Systems",
+    }
+    variables = {
+        **profile,
+        "industry": "Healthcare",
+        "generated_date": "January 01, 2026",
+        "personalized_hook": "As Acme scales its clinical AI workloads...",
+        "case_study_framing": "Like Acme, this organization needed...",
+        "personalized_cta": "Start with an infrastructure assessment.",
+        **{f"case_study_{k}": case_study[k] for k in (
+            "title", "company", "industry", "challenge", "solution", "quote", "quote_author", "result"
+        )},
+        **EBOOK_SECTIONS,
+    }
+
+    def baseline():
+        # Previous behaviour: build and scan the full template on every call
+        return Template(service._get_amd_ebook_template()).safe_substitute(variables)
+
+    def compiled():
+        return service._render_amd_ebook_template(
+            profile, variables["personalized_hook"], case_study,
+            variables["case_study_framing"], variables["personalized_cta"],
+            {"industry_input": "Healthcare"}
+        )
+
+    compiled()  # compile and cache the variant outside the timed loop
+    variant = service._get_amd_ebook_variant(case_study)
+
+    print(f"Template: {len(service._get_amd_ebook_template()):,} chars, "
+          f"{len(variant.slot_names)} open slots in {len(variant)} parts")
+    results = {}
+    for name, fn in (("string.Template", baseline), ("CompiledTemplate", compiled)):
+        seconds = min(timeit.repeat(fn, number=iterations, repeat=5))
+        results[name] = seconds / iterations * 1e6
+        print(f"{name:<18} {results[name]:8.1f} us/render")
+    print(f"Speedup: {results['string.Template'] / results['CompiledTemplate']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Re-resolve every stored lead after a SOURCE_PRIORITY or field mapping change.
+
+Reads raw_data in pages, resolves them column-wise and upserts
+finalize_data per page. Progress goes to a checkpoint file after every
+page; rerunning the same command resumes after the last completed lead.
+
+Run: python scripts/reresolve_raw_data.py [--page-size 1000]
+        [--checkpoint reresolve.checkpoint.json] [--restart] [--dry-run] [--max-pages N]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.bulk_resolution import DEFAULT_PAGE_SIZE, BulkResolutionJob
+from app.services.supabase_client import get_supabase_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="raw_data records read per page")
+    parser.add_argument("--checkpoint", default="reresolve.checkpoint.json",
+                        help="progress file used to resume an interrupted run")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="resolve without writing finalize_data")
+    parser.add_argument("--max-pages", type=int, default=None, help="stop after this many pages")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    job = BulkResolutionJob(
+        get_supabase_client(),
+        page_size=args.page_size,
+        checkpoint_path=args.checkpoint,
+        dry_run=args.dry_run
+    )
+    checkpoint = job.run(max_pages=args.max_pages, restart=args.restart)
+    print(json.dumps(checkpoint.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,13 @@ from fastapi.testclient import TestClient
 os.environ["MOCK_SUPABASE"] = "true"
 os.environ["SUPABASE_URL"] = "http://localhost:54321"
 os.environ["SUPABASE_KEY"] = "mock-test-key"
+os.environ["PDF_LINK_SECRET"] = "test-pdf-link-secret"
 
 # Import app and services
 from app.main import app
 from app.services.supabase_client import SupabaseClient, get_supabase_client
-from app.services.rad_orchestrator import RADOrchestrator
+from app.services.rad_orchestrator import RADOrchestrator, get_rad_orchestrator
+from app.services.pdf_service import PDFService, get_pdf_service
 from app.services.llm_service import LLMService
 
 
@@ -50,6 +52,9 @@ def test_client(mock_supabase):
         return mock_supabase
 
     app.dependency_overrides[get_supabase_client] = mock_get_supabase
+    # Shared services that write through Supabase use the mock client too
+    app.dependency_overrides[get_rad_orchestrator] = lambda: RADOrchestrator(mock_supabase)
+    app.dependency_overrides[get_pdf_service] = lambda: PDFService(mock_supabase)
 
     client = TestClient(app)
 
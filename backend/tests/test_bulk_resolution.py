@@ -0,0 +1,229 @@
+"""
+Tests for columnar bulk re-resolution of stored raw_data.
+"""
+
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+from app.services.bulk_resolution import (
+    BulkResolutionJob,
+    ColumnarPage,
+    ResolutionCheckpoint,
+    plan_version,
+    resolve_columns,
+)
+from app.services.rad_orchestrator import FIELD_MAPPINGS, RADOrchestrator
+
+LEADS = {
+    "ann@acme.com": {
+        "apollo": {"first_name": "Ann", "title": "CTO", "company_name": "Acme"},
+        "pdl": {"first_name": "Annie", "job_company_size": "1001-5000", "location_country": "US"},
+        "pdl_company": {"name": "Acme Corp", "employee_count": 1200, "summary": "Logistics software"},
+    },
+    "bob@globex.com": {
+        "pdl": {"first_name": "Bob", "job_title": "Engineer", "job_company_name": "Globex"},
+        "zoominfo": {"company_name": "", "city": "Austin"},
+        "hunter": {"status": "valid", "score": 90, "result": "deliverable"},
+    },
+    "cat@initech.com": {
+        "zoominfo": {"company_name": "Initech", "employee_count": 300},
+        "gnews": {"answer": "Initech expands", "results": [{"title": "Initech expands"}]},
+    },
+}
+
+
+def seed(supabase, leads=LEADS, finalize=True):
+    for email, sources in leads.items():
+        for source, payload in sources.items():
+            supabase.store_raw_data(email, source, payload)
+        if finalize:
+            supabase.upsert_finalize_data(
+                email=email,
+                normalized_data={
+                    "first_name": "Stale",
+                    "ebook_personalization": {"personalized_hook": "Hook"},
+                    "user_context": {},
+                },
+                intro="Intro",
+                cta="CTA"
+            )
+
+
+@pytest.fixture
+def orchestrator(mock_supabase):
+    return RADOrchestrator(mock_supabase)
+
+
+class TestColumnarResolution:
+    """Tests for page layout and vectorized priority selection."""
+
+    def test_columns_match_per_lead_resolution(self, mock_supabase, orchestrator):
+        seed(mock_supabase, finalize=False)
+        page = ColumnarPage.from_records(mock_supabase.get_raw_data_page())
+
+        values, winners = resolve_columns(page)
+
+        for index, email in enumerate(page.emails):
+            provenance = {}
+            expected = orchestrator._resolve_profile(email, "", LEADS[email], provenance)
+            for field in FIELD_MAPPINGS:
+                assert values[field][index] == expected.get(field), (email, field)
+                if field in provenance and field != "employee_count":
+                    assert winners[field][index] == provenance[field]
+
+    def test_latest_payload_wins(self, mock_supabase):
+        mock_supabase.store_raw_data("ann@acme.com", "apollo", {"first_name": "Old"})
+        mock_supabase.store_raw_data("ann@acme.com", "apollo", {"first_name": "New"})
+
+        page = ColumnarPage.from_records(mock_supabase.get_raw_data_page())
+        values, winners = resolve_columns(page)
+
+        assert values["first_name"] == ["New"]
+        assert winners["first_name"] == ["apollo"]
+
+    def test_empty_values_fall_through(self, mock_supabase):
+        seed(mock_supabase, finalize=False)
+        page = ColumnarPage.from_records(mock_supabase.get_raw_data_page())
+
+        values, winners = resolve_columns(page)
+        bob = page.emails.index("bob@globex.com")
+
+        # ZoomInfo's empty company name loses to PDL despite higher priority
+        assert values["company_name"][bob] == "Globex"
+        assert winners["company_name"][bob] == "pdl"
+
+
+class TestBulkResolutionJob:
+    """Tests for the paged job, batched writes and checkpoints."""
+
+    def test_rewrites_finalize_data(self, mock_supabase, orchestrator):
+        seed(mock_supabase)
+
+        checkpoint = BulkResolutionJob(mock_supabase, orchestrator).run()
+
+        assert checkpoint.done
+        assert checkpoint.leads == 3
+        assert checkpoint.written == 3
+        ann = mock_supabase.get_finalize_data("ann@acme.com")
+        assert ann["normalized_data"]["first_name"] == "Ann"
+        assert ann["normalized_data"]["company_name"] == "Acme"
+        assert ann["normalized_data"]["field_sources"]["company_name"] == "apollo"
+        assert ann["normalized_data"]["field_sources"]["employee_count"] == "pdl_company"
+        assert ann["normalized_data"]["ebook_personalization"] == {"personalized_hook": "Hook"}
+        assert ann["personalization_intro"] == "Intro"
+        assert sorted(ann["data_sources"]) == ["apollo", "pdl", "pdl_company"]
+        bob = mock_supabase.get_finalize_data("bob@globex.com")
+        assert bob["normalized_data"]["email_verified"] is True
+
+    def test_user_context_overrides_kept(self, mock_supabase, orchestrator):
+        seed(mock_supabase)
+        mock_supabase.upsert_finalize_data(
+            email="ann@acme.com",
+            normalized_data={"user_context": {"first_name": "Anna", "company": "Acme Labs"}}
+        )
+
+        BulkResolutionJob(mock_supabase, orchestrator).run()
+
+        profile = mock_supabase.get_finalize_data("ann@acme.com")["normalized_data"]
+        assert profile["first_name"] == "Anna"
+        assert profile["company_name"] == "Acme Labs"
+
+    def test_company_size_and_persona_overrides_kept(self, mock_supabase, orchestrator):
+        """
+        run: A lead's companySize and persona from /rad/enrich survive
+        re-resolution, as company_size and title.
+        """
+        seed(mock_supabase)
+        mock_supabase.upsert_finalize_data(
+            email="ann@acme.com",
+            normalized_data={"user_context": {"company_size": "51-200", "persona": "VP Engineering"}}
+        )
+
+        BulkResolutionJob(mock_supabase, orchestrator).run()
+
+        profile = mock_supabase.get_finalize_data("ann@acme.com")["normalized_data"]
+        assert profile["company_size"] == "51-200"
+        assert profile["title"] == "VP Engineering"
+
+    def test_failed_single_lead_read_keeps_checkpoint(self, mock_supabase, orchestrator, tmp_path):
+        """
+        run: If the records of a lead that fills a whole page can't be read,
+        the run fails without checkpointing past that lead.
+        """
+        seed(mock_supabase)
+        path = str(tmp_path / "checkpoint.json")
+        job = BulkResolutionJob(mock_supabase, orchestrator, page_size=2, checkpoint_path=path)
+
+        with patch.object(mock_supabase, "get_raw_data_records", side_effect=RuntimeError("db down")):
+            with pytest.raises(RuntimeError):
+                job.run()
+
+        assert not os.path.exists(path)
+        assert BulkResolutionJob(mock_supabase, orchestrator, page_size=2, checkpoint_path=path).run().leads == 3
+
+    def test_leads_without_finalize_data_skipped(self, mock_supabase, orchestrator):
+        seed(mock_supabase, finalize=False)
+
+        checkpoint = BulkResolutionJob(mock_supabase, orchestrator).run()
+
+        assert checkpoint.skipped == 3
+        assert checkpoint.written == 0
+        assert mock_supabase.get_finalize_data("ann@acme.com") is None
+
+    def test_small_pages_keep_leads_whole(self, mock_supabase, orchestrator):
+        """
+        run: Pages never split one lead's records, even when a lead has more
+        records than fit on a page.
+        """
+        seed(mock_supabase)
+
+        checkpoint = BulkResolutionJob(mock_supabase, orchestrator, page_size=2).run()
+
+        assert checkpoint.leads == 3
+        assert checkpoint.written == 3
+        ann = mock_supabase.get_finalize_data("ann@acme.com")["normalized_data"]
+        assert ann["company_description"] == "Logistics software"
+        assert ann["title"] == "CTO"
+
+    def test_resumes_from_checkpoint(self, mock_supabase, orchestrator, tmp_path):
+        seed(mock_supabase)
+        path = str(tmp_path / "checkpoint.json")
+
+        first = BulkResolutionJob(mock_supabase, orchestrator, page_size=3, checkpoint_path=path).run(max_pages=1)
+        assert not first.done
+        assert first.last_email == "ann@acme.com"
+
+        second = BulkResolutionJob(mock_supabase, orchestrator, page_size=3, checkpoint_path=path).run()
+
+        assert second.done
+        assert second.leads == 3
+        assert second.pages == 3
+        assert json.load(open(path))["done"] is True
+
+    def test_checkpoint_for_other_plan_ignored(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        path.write_text(json.dumps({"plan_version": "old", "last_email": "z@z.com", "done": True}))
+
+        checkpoint = ResolutionCheckpoint.load(str(path), plan_version())
+
+        assert checkpoint.last_email is None
+        assert not checkpoint.done
+
+    def test_dry_run_writes_nothing(self, mock_supabase, orchestrator):
+        seed(mock_supabase)
+
+        checkpoint = BulkResolutionJob(mock_supabase, orchestrator, dry_run=True).run()
+
+        assert checkpoint.leads == 3
+        assert checkpoint.written == 0
+        assert mock_supabase.get_finalize_data("ann@acme.com")["normalized_data"]["first_name"] == "Stale"
+
+    def test_reports_throughput(self, mock_supabase, orchestrator):
+        seed(mock_supabase)
+
+        summary = BulkResolutionJob(mock_supabase, orchestrator).run().summary()
+
+        assert summary["leads_per_second"] > 0
+        assert summary["elapsed_seconds"] >= 0
@@ -0,0 +1,93 @@
+"""
+Tests for precompiled templates and the PDFService render paths that use them.
+"""
+
+from string import Template
+from unittest.mock import patch
+
+from app.services.compiled_template import CompiledTemplate
+from app.services.ebook_content import CASE_STUDIES, EBOOK_SECTIONS
+from app.services.pdf_service import PDFService
+
+
+class TestCompiledTemplate:
+    """Tests for CompiledTemplate."""
+
+    def test_matches_safe_substitute(self):
+        source = "Hi $name, ${company} costs $$5. $missing stays; $ alone too; ${unclosed"
+        values = {"name": "Jane", "company": "Acme"}
+
+        assert CompiledTemplate.compile(source).render(values) == Template(source).safe_substitute(values)
+
+    def test_values_are_not_rescanned(self):
+        template = CompiledTemplate.compile("Hook: $hook")
+
+        assert template.render({"hook": "$name is here"}) == "Hook: $name is here"
+
+    def test_bind_folds_static_slots(self):
+        template = CompiledTemplate.compile("<h1>$title</h1><p>$body</p><b>$name</b>")
+        bound = template.bind({"title": "T", "body": "B"})
+
+        assert bound.slot_names == ["name"]
+        assert len(bound) == 3
+        assert bound.render({"name": "Jane"}) == "<h1>T</h1><p>B</p><b>Jane</b>"
+
+    def test_repeated_slot_filled_everywhere(self):
+        template = CompiledTemplate.compile("$a-$a-$b")
+
+        assert template.render({"a": 1, "b": 2}) == "1-1-2"
+
+
+class TestPDFServiceRendering:
+    """Compiled rendering must produce the same HTML as string.Template."""
+
+    PROFILE = {"first_name": "Jane", "last_name": "Doe", "company_name": "Acme", "title": "CTO"}
+
+    def test_amd_ebook_matches_string_template(self):
+        service = PDFService()
+        case_study = next(iter(CASE_STUDIES.values()))
+        variables = {
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "company_name": "Acme",
+            "title": "CTO",
+            "industry": "your industry",
+            "generated_date": "January 01, 2026",
+            "personalized_hook": "hook",
+            "case_study_framing": "framing",
+            "personalized_cta": "cta",
+            **{f"case_study_{k}": case_study[k] for k in (
+                "title", "company", "industry", "challenge", "solution", "quote", "quote_author", "result"
+            )},
+            **EBOOK_SECTIONS,
+        }
+        expected = Template(service._get_amd_ebook_template()).safe_substitute(variables)
+
+        with patch("app.services.pdf_service.datetime") as mock_datetime:
+            mock_datetime.utcnow.return_value.strftime.return_value = "January 01, 2026"
+            rendered = service._render_amd_ebook_template(
+                self.PROFILE, "hook", case_study, "framing", "cta", {}
+            )
+
+        assert rendered == expected
+
+    def test_case_study_variants_cached(self):
+        service = PDFService()
+        first, second = list(CASE_STUDIES.values())[:2]
+
+        assert service._get_amd_ebook_variant(first) is service._get_amd_ebook_variant(dict(first))
+        assert service._get_amd_ebook_variant(first) is not service._get_amd_ebook_variant(second)
+
+    def test_basic_template_matches_string_template(self):
+        service = PDFService()
+        profile = {**self.PROFILE, "industry": "Health"}
+
+        with patch("app.services.pdf_service.datetime") as mock_datetime:
+            mock_datetime.utcnow.return_value.strftime.return_value = "January 01, 2026"
+            rendered = service._render_template(profile, "intro", "cta")
+
+        expected = Template(service._get_ebook_template()).safe_substitute({
+            "first_name": "Jane", "company_name": "Acme", "title": "CTO", "industry": "Health",
+            "intro_hook": "intro", "cta": "cta", "generated_date": "January 01, 2026",
+        })
+        assert rendered == expected
@@ -0,0 +1,94 @@
+"""
+Tests for the knowledge-pack content index.
+"""
+
+import os
+import pytest
+
+from app.services.content_index import CONTENT_DIR, ContentIndex
+from app.services.ebook_content import extract_key_points, get_industry_key_insights
+
+KP_MARKDOWN = """## Overview
+- Preamble bullet that is long enough
+## Major trends in the market
+- AI adoption is accelerating everywhere
+- short
+* Cloud spend keeps growing each year
+## Major trends, continued
+- Edge computing reaches the factory floor
+## Technology Investment Priorities
+- Security modernization comes first
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "KP_Industry_Test.md").write_text(KP_MARKDOWN, encoding="utf-8")
+    return ContentIndex(tmp_path)
+
+
+class TestContentIndex:
+    """Tests for parsing, lookups and reloads."""
+
+    def test_key_points_match_scan(self, index):
+        document = index.document("KP_Industry_Test.md")
+
+        for section in (None, "major trends", "Technology Investment", "missing"):
+            for max_points in (1, 2, 5):
+                assert document.key_points(section, max_points) == \
+                    extract_key_points(KP_MARKDOWN, section, max_points)
+
+    def test_matching_headers_are_merged(self, index):
+        points = index.document("KP_Industry_Test.md").key_points("major trends", 5)
+
+        assert points == [
+            "AI adoption is accelerating everywhere",
+            "Cloud spend keeps growing each year",
+            "Edge computing reaches the factory floor",
+        ]
+
+    def test_file_read_once(self, index):
+        index.document("KP_Industry_Test.md")
+        index.document("KP_Industry_Test.md")
+
+        assert index.get_stats()["loads"] == 1
+        assert index.get_stats()["hits"] == 1
+
+    def test_reloads_on_mtime_change(self, index, tmp_path):
+        path = tmp_path / "KP_Industry_Test.md"
+        assert index.document(path.name).key_points("technology investment", 1) == [
+            "Security modernization comes first"
+        ]
+
+        path.write_text("## Technology Investment\n- Updated priority for this year\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert index.document(path.name).key_points("technology investment", 1) == [
+            "Updated priority for this year"
+        ]
+        assert index.get_stats()["loads"] == 2
+
+    def test_missing_file_returns_none(self, index):
+        assert index.document("KP_Industry_Missing.md") is None
+        assert index.text("KP_Industry_Missing.md") is None
+
+    def test_load_parses_content_dir(self, index):
+        assert index.load() == 1
+
+
+class TestIndustryInsights:
+    """get_industry_key_insights served from the index."""
+
+    def test_matches_read_and_scan(self):
+        content = (CONTENT_DIR / "KP_Industry_Healthcare.md").read_text(encoding="utf-8")
+
+        insights = get_industry_key_insights("healthcare")
+
+        assert insights["trends"] == extract_key_points(content, "Major trends", 3)
+        assert insights["priorities"] == extract_key_points(content, "Technology Investment", 3)
+
+    def test_unknown_industry_is_empty(self):
+        assert get_industry_key_insights("unknown") == {
+            "trends": [], "priorities": [], "challenges": [], "messaging_tips": []
+        }
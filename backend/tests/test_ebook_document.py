@@ -0,0 +1,114 @@
+"""
+Tests for the structured ebook model and its reportlab renderer.
+"""
+
+import io
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+pypdf = pytest.importorskip("pypdf")
+pytest.importorskip("reportlab")
+
+from app.services.ebook_content import CASE_STUDIES
+from app.services.ebook_document import (
+    EbookDocument,
+    _styles,
+    build_story,
+    document_from_html,
+    render_reportlab,
+)
+from app.services.pdf_service import PDFService
+
+
+def _text(pdf_bytes: bytes) -> str:
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    return " ".join(page.extract_text() for page in reader.pages)
+
+
+def _document(**overrides) -> EbookDocument:
+    case_study = next(iter(CASE_STUDIES.values()))
+    fields = dict(
+        first_name="Jane",
+        company_name="Acme & Sons",
+        personalized_hook="Acme's <AI> roadmap starts here.",
+        case_study_framing="Similar scale to Acme.",
+        personalized_cta="Book an assessment.",
+        case_study=case_study,
+    )
+    fields.update(overrides)
+    return EbookDocument(**fields)
+
+
+class TestReportlabRenderer:
+    """Tests for render_reportlab."""
+
+    def test_renders_personalized_and_static_content(self):
+        document = _document()
+
+        text = _text(render_reportlab(document))
+
+        assert "Prepared for Jane" in text
+        assert "Acme & Sons" in text
+        assert "<AI>" in text
+        assert document.case_study["company"] in text
+        assert "Why AMD" in text
+
+    def test_each_story_gets_fresh_flowables(self):
+        first = build_story(_document())
+        second = build_story(_document(first_name="Raj"))
+
+        static_first = [f for f in first if getattr(f, "text", "").startswith("AI is a business imperative")]
+        static_second = [f for f in second if getattr(f, "text", "").startswith("AI is a business imperative")]
+        assert static_first and static_second
+        # No layout state (fragments, wrapped lines) is shared between stories
+        assert static_first[0] is not static_second[0]
+        assert static_first[0].frags is not static_second[0].frags
+
+    def test_concurrent_renders_match_sequential(self):
+        documents = [_document(first_name=name) for name in ("Jane", "Raj", "Ana", "Li") * 2]
+        expected = [_text(render_reportlab(document)) for document in documents]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            rendered = list(pool.map(render_reportlab, documents))
+
+        assert [_text(pdf_bytes) for pdf_bytes in rendered] == expected
+
+    def test_repeat_renders_are_consistent(self):
+        first = render_reportlab(_document())
+        second = render_reportlab(_document())
+
+        assert _text(first) == _text(second)
+
+    def test_styles_built_once(self):
+        assert _styles() is _styles()
+
+
+class TestPDFServiceFallback:
+    """The reportlab fallback should use the document, not parse HTML."""
+
+    async def test_generate_amd_ebook_skips_html_parsing(self):
+        service = PDFService()
+
+        with patch("app.services.pdf_renderers.document_from_html") as from_html:
+            result = await service.generate_amd_ebook(
+                job_id=1,
+                profile={"email": "jane@acme.com", "first_name": "Jane", "company_name": "Acme"},
+                personalization={"personalized_hook": "Hello Jane", "personalized_cta": "Talk to us"}
+            )
+
+        from_html.assert_not_called()
+        assert result["file_size_bytes"] > 0
+
+    def test_bare_html_still_supported(self):
+        service = PDFService()
+        html = service._render_amd_ebook_template(
+            {"first_name": "Jane", "company_name": "Acme"}, "Hello Jane",
+            next(iter(CASE_STUDIES.values())), "", "Talk to us", {}
+        )
+
+        document = document_from_html(html)
+        pdf_bytes = render_reportlab(document)
+
+        assert pdf_bytes.startswith(b"%PDF")
+        assert document.case_study["quote"] == next(iter(CASE_STUDIES.values()))["quote"]
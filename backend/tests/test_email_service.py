@@ -0,0 +1,546 @@
+"""
+Tests for email delivery transports.
+SMTP tests run against a local aiosmtpd server; SendGrid calls are mocked.
+"""
+
+import asyncio
+import smtplib
+import socket
+import pytest
+from email.message import EmailMessage
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.email_service import (
+    EmailService,
+    SendGridBatchError,
+    SendGridBatchSender,
+    SENDGRID_MAX_PERSONALIZATIONS,
+)
+from app.services.smtp_pool import SMTPConnectionPool
+
+try:
+    from aiosmtpd import controller as aiosmtpd_controller
+except ImportError:  # pragma: no cover - optional dev dependency
+    aiosmtpd_controller = None
+
+requires_aiosmtpd = pytest.mark.skipif(aiosmtpd_controller is None, reason="aiosmtpd not installed")
+
+
+class RecordingHandler:
+    """aiosmtpd handler that records delivered messages."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 Message accepted for delivery"
+
+
+class RejectingHandler(RecordingHandler):
+    """Refuses recipients at bad.example.com, counting every RCPT."""
+
+    def __init__(self):
+        super().__init__()
+        self.rcpts = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpts.append(address)
+        if address.endswith("@bad.example.com"):
+            return "550 No such user here"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Local SMTP server on a free port."""
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Your ebook"
+    msg.set_content("Hello")
+    return msg
+
+
+def _pool(controller, size=2) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        host=controller.hostname, port=controller.port, use_tls=False, size=size
+    )
+
+
+@requires_aiosmtpd
+@pytest.mark.asyncio
+class TestSMTPConnectionPool:
+    """Tests for SMTPConnectionPool."""
+
+    async def test_connections_reused_across_messages(self, smtp_server):
+        """
+        send: Sequential messages should share one connection.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller)
+
+        for i in range(3):
+            await pool.send(_message(f"lead{i}@acme.com"))
+        await pool.close()
+
+        assert len(handler.messages) == 3
+        assert len(handler.sessions) == 1
+        stats = pool.get_stats()
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 2
+
+    async def test_concurrency_bounded_by_pool_size(self, smtp_server):
+        """
+        send: Concurrent sends should open at most `size` connections.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller, size=2)
+
+        await asyncio.gather(*[pool.send(_message(f"lead{i}@acme.com")) for i in range(6)])
+        await pool.close()
+
+        assert len(handler.messages) == 6
+        assert pool.get_stats()["connections_opened"] <= 2
+
+    async def test_send_many_uses_one_connection(self, smtp_server):
+        """
+        send_many: A batch should go out over a single connection.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller)
+
+        errors = await pool.send_many([_message(f"lead{i}@acme.com") for i in range(4)])
+        await pool.close()
+
+        assert errors == [None] * 4
+        assert len(handler.sessions) == 1
+
+    async def test_dropped_connection_is_replaced(self, smtp_server):
+        """
+        send: A connection closed by the server should be replaced transparently.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller)
+        await pool.send(_message("first@acme.com"))
+        pool._idle[0][0].close()
+
+        await pool.send(_message("second@acme.com"))
+        await pool.close()
+
+        assert len(handler.messages) == 2
+        assert pool.get_stats()["connections_opened"] == 2
+
+    async def test_message_serialized_once(self, smtp_server):
+        """
+        send: The reported size is that of the bytes actually sent, and the
+        message is not serialized a second time to measure it.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller)
+        message = _message("lead@acme.com")
+        message["Bcc"] = "audit@example.com"
+
+        with patch.object(EmailMessage, "as_bytes", side_effect=AssertionError("serialized twice")):
+            size = await pool.send(message)
+        await pool.close()
+
+        envelope = handler.messages[0]
+        assert size == len(envelope.original_content)
+        assert envelope.rcpt_tos == ["lead@acme.com", "audit@example.com"]
+        assert b"audit@example.com" not in envelope.original_content
+
+    async def test_rejected_recipient_not_retried(self):
+        """
+        send: A refused recipient is raised after one attempt and the
+        connection stays in the pool.
+        """
+        handler = RejectingHandler()
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        try:
+            pool = _pool(controller)
+            with pytest.raises(smtplib.SMTPRecipientsRefused):
+                await pool.send(_message("nobody@bad.example.com"))
+            await pool.send(_message("lead@acme.com"))
+            await pool.close()
+        finally:
+            controller.stop()
+
+        assert handler.rcpts == ["nobody@bad.example.com", "lead@acme.com"]
+        assert len(handler.messages) == 1
+        assert pool.get_stats()["connections_discarded"] == 0
+        assert pool.get_stats()["connections_opened"] == 1
+
+    async def test_cancelled_send_does_not_recycle_connection(self, smtp_server):
+        """
+        connection: A connection whose send was cancelled mid-thread must not
+        be handed to the next sender.
+        """
+        controller, handler = smtp_server
+        pool = _pool(controller)
+        await pool.send(_message("first@acme.com"))
+        used = pool._idle[0][0]
+
+        async def cancelled_send():
+            async with pool.connection() as conn:
+                assert conn is used
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(cancelled_send())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert pool._idle == []
+        await pool.send(_message("second@acme.com"))
+        await pool.close()
+
+        assert len(handler.messages) == 2
+        assert pool.get_stats()["connections_opened"] == 2
+        assert pool.get_stats()["connections_discarded"] == 1
+
+
+@requires_aiosmtpd
+@pytest.mark.asyncio
+class TestEmailServiceSMTP:
+    """Tests for EmailService over SMTP."""
+
+    async def test_send_ebook_via_smtp(self, smtp_server, monkeypatch):
+        """
+        send_ebook: Should deliver the ebook through the pooled SMTP transport.
+        """
+        controller, handler = smtp_server
+        monkeypatch.setattr("app.services.email_service.get_smtp_pool", lambda: _pool(controller))
+        service = EmailService()
+        service.provider = "smtp"
+
+        result = await service.send_ebook(
+            "jane@acme.com", b"%PDF-1.4", {"first_name": "Jane"}, "hook", "cta"
+        )
+
+        assert result["success"] is True
+        assert handler.messages[0].rcpt_tos == ["jane@acme.com"]
+
+
+def _sendgrid_response(status_code=202, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {"X-Message-Id": "sg-1"}, text="")
+
+
+@pytest.fixture
+def sender():
+    """Fixture: SendGridBatchSender with fast flush and retry."""
+    return SendGridBatchSender(
+        api_key="SG.test", from_email="noreply@example.com", from_name="Ebooks",
+        flush_seconds=0.01, max_attempts=3, retry_base_seconds=0.01
+    )
+
+
+@pytest.mark.asyncio
+class TestSendGridBatchSender:
+    """Tests for SendGridBatchSender."""
+
+    async def test_recipients_grouped_by_template(self, sender):
+        """
+        send: Concurrent sends should go out as one request per template.
+        """
+        post = AsyncMock(return_value=_sendgrid_response())
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                sender.send("a@acme.com", "d-ebook", {"first_name": "A"}),
+                sender.send("b@acme.com", "d-ebook", {"first_name": "B"}),
+                sender.send("c@acme.com", "d-reminder", {"first_name": "C"}),
+            )
+
+        assert post.await_count == 2
+        bodies = {call.kwargs["json"]["template_id"]: call.kwargs["json"] for call in post.await_args_list}
+        assert [p["dynamic_template_data"]["first_name"] for p in bodies["d-ebook"]["personalizations"]] == ["A", "B"]
+        assert [r["batch_size"] for r in results] == [2, 2, 1]
+        assert all(r["status"] == "accepted" and r["message_id"] == "sg-1" for r in results)
+        assert sender.get_stats()["requests_saved"] == 1
+
+    async def test_batches_capped_at_max_personalizations(self, sender):
+        """
+        send: More than 1000 recipients should be split across requests.
+        """
+        post = AsyncMock(return_value=_sendgrid_response())
+        with patch("httpx.AsyncClient.post", new=post):
+            await asyncio.gather(*[
+                sender.send(f"lead{i}@acme.com", "d-ebook", {})
+                for i in range(SENDGRID_MAX_PERSONALIZATIONS + 5)
+            ])
+
+        sizes = sorted(len(call.kwargs["json"]["personalizations"]) for call in post.await_args_list)
+        assert sizes == [5, SENDGRID_MAX_PERSONALIZATIONS]
+
+    async def test_transient_failure_retried(self, sender):
+        """
+        send: A 429 should re-queue the batch and succeed on retry.
+        """
+        post = AsyncMock(side_effect=[
+            _sendgrid_response(429, {"Retry-After": "0"}),
+            _sendgrid_response(202),
+        ])
+        with patch("httpx.AsyncClient.post", new=post):
+            result = await sender.send("a@acme.com", "d-ebook", {})
+
+        assert result["success"] is True
+        assert result["attempts"] == 2
+        assert sender.get_stats()["retried"] == 1
+
+    async def test_permanent_failure_not_retried(self, sender):
+        """
+        send: A 400 for every recipient should fail each of them once the
+        batch is split, without retrying.
+        """
+        post = AsyncMock(return_value=_sendgrid_response(400))
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                sender.send("a@acme.com", "d-ebook", {}),
+                sender.send("b@acme.com", "d-ebook", {}),
+                return_exceptions=True
+            )
+
+        assert post.await_count == 3
+        assert all(isinstance(r, SendGridBatchError) and r.status_code == 400 for r in results)
+        assert sender.get_stats()["failed"] == 2
+        assert sender.get_stats()["retried"] == 0
+
+    async def test_invalid_recipient_isolated(self, sender):
+        """
+        send: A batch rejected because of one bad address is bisected; the
+        other recipients are delivered and only the bad one fails.
+        """
+        async def post(url, headers=None, json=None):
+            emails = [p["to"][0]["email"] for p in json["personalizations"]]
+            return _sendgrid_response(400 if "not-an-email" in emails else 202)
+
+        emails = [f"lead{i}@acme.com" for i in range(7)] + ["not-an-email"]
+        with patch("httpx.AsyncClient.post", new=AsyncMock(side_effect=post)) as mock_post:
+            results = await asyncio.gather(
+                *[sender.send(email, "d-ebook", {}) for email in emails],
+                return_exceptions=True
+            )
+
+        assert all(r["status"] == "accepted" and r["attempts"] == 1 for r in results[:7])
+        assert isinstance(results[7], SendGridBatchError) and results[7].status_code == 400
+        assert mock_post.await_count == 7  # 1 + 2 + 2 + 2 down to the bad recipient
+        assert sender.get_stats()["failed"] == 1
+        assert sender.get_stats()["sent"] == 7
+
+    async def test_auth_failure_not_split(self, sender):
+        """
+        send: A 401 concerns the account, not a recipient, so the batch isn't split.
+        """
+        post = AsyncMock(return_value=_sendgrid_response(401))
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                sender.send("a@acme.com", "d-ebook", {}),
+                sender.send("b@acme.com", "d-ebook", {}),
+                return_exceptions=True
+            )
+
+        assert post.await_count == 1
+        assert all(isinstance(r, SendGridBatchError) for r in results)
+
+    async def test_retries_exhausted(self, sender):
+        """
+        send: Transient failures should give up after max_attempts.
+        """
+        post = AsyncMock(return_value=_sendgrid_response(503))
+        with patch("httpx.AsyncClient.post", new=post):
+            with pytest.raises(SendGridBatchError):
+                await sender.send("a@acme.com", "d-ebook", {})
+
+        assert post.await_count == 3
+
+    async def test_service_returns_per_recipient_results(self, sender, monkeypatch):
+        """
+        send_template_batch: Should return one result per recipient in order.
+        """
+        monkeypatch.setattr("app.services.email_service.get_batch_sender", lambda: sender)
+        service = EmailService()
+        service.provider = "sendgrid"
+        post = AsyncMock(return_value=_sendgrid_response())
+
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await service.send_template_batch(
+                [{"email": "a@acme.com", "template_data": {"pdf_url": "https://x/a.pdf"}},
+                 {"email": "b@acme.com", "custom_args": {"job_id": "7"}}],
+                template_id="d-ebook"
+            )
+
+        assert [r["email"] for r in results] == ["a@acme.com", "b@acme.com"]
+        assert post.await_args.kwargs["json"]["personalizations"][1]["custom_args"] == {"job_id": "7"}
+
+    async def test_link_delivery_uses_template_batches(self, sender, monkeypatch):
+        """
+        send_ebook: With a template configured, concurrent link-mode
+        deliveries should share one bulk request.
+        """
+        monkeypatch.setattr("app.services.email_service.get_batch_sender", lambda: sender)
+        monkeypatch.setattr("app.services.email_service.settings.SENDGRID_TEMPLATE_ID", "d-ebook")
+        service = EmailService()
+        service.provider = "sendgrid"
+        service.delivery_mode = "link"
+        post = AsyncMock(return_value=_sendgrid_response())
+
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(*[
+                service.send_ebook(
+                    f"lead{i}@acme.com", None, {"first_name": f"Lead{i}"}, "hook", "cta",
+                    pdf_url=f"https://storage.example.com/{i}.pdf"
+                )
+                for i in range(3)
+            ])
+
+        assert post.await_count == 1
+        personalizations = post.await_args.kwargs["json"]["personalizations"]
+        assert [p["dynamic_template_data"]["pdf_url"] for p in personalizations] == [
+            f"https://storage.example.com/{i}.pdf" for i in range(3)
+        ]
+        assert all(r["success"] and r["batch_size"] == 3 for r in results)
+
+
+class TestCampaignResend:
+    """Tests for POST /rad/resend through the batching sender."""
+
+    def test_resend_batches_recipients(self, test_client, mock_supabase, sender, monkeypatch):
+        """
+        POST /rad/resend: Leads with profiles should go out in one bulk request;
+        leads without one are reported, not sent.
+        """
+        from app.main import app
+        from app.services.email_service import get_email_service
+
+        for name in ("ann", "bob"):
+            mock_supabase.upsert_finalize_data(
+                email=f"{name}@acme.com",
+                normalized_data={
+                    "first_name": name.title(),
+                    "company_name": "Acme",
+                    "ebook_personalization": {"personalized_hook": f"Hook for {name}"},
+                },
+                intro="Intro",
+                cta="CTA"
+            )
+        service = EmailService()
+        service.provider = "sendgrid"
+        app.dependency_overrides[get_email_service] = lambda: service
+        monkeypatch.setattr("app.services.email_service.get_batch_sender", lambda: sender)
+        monkeypatch.setattr("app.routes.enrichment.get_batch_sender", lambda: sender)
+        post = AsyncMock(return_value=_sendgrid_response())
+
+        with patch("httpx.AsyncClient.post", new=post):
+            response = test_client.post(
+                "/rad/resend",
+                json={"emails": ["ann@acme.com", "missing@acme.com", "Bob@acme.com"], "template_id": "d-ebook"}
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["requested"], body["sent"], body["failed"]) == (3, 2, 1)
+        assert [r["email"] for r in body["results"]] == ["ann@acme.com", "missing@acme.com", "bob@acme.com"]
+        assert body["results"][1]["success"] is False
+        assert post.await_count == 1
+        request = post.await_args.kwargs["json"]
+        assert request["template_id"] == "d-ebook"
+        data = request["personalizations"][0]["dynamic_template_data"]
+        assert data["intro_hook"] == "Hook for ann"
+        assert data["cta"] == "CTA"
+        assert data["pdf_url"].endswith("/rad/download/ann%40acme.com")
+        assert body["batching"]["requests_saved"] == 1
+
+
+PDF_BYTES = b"%PDF-1.4" + b"\x00" * 200_000
+PDF_URL = "https://storage.example.com/ebook_abc.pdf?token=signed"
+
+
+@pytest.mark.asyncio
+class TestDeliveryModes:
+    """Tests for link vs attachment delivery."""
+
+    async def test_link_mode_sends_url_without_attachment(self):
+        """
+        send_ebook: Link mode should send the URL and no attachment.
+        """
+        service = EmailService()
+        service.provider = "sendgrid"
+        service.delivery_mode = "link"
+        post = AsyncMock(return_value=_sendgrid_response())
+
+        with patch("httpx.AsyncClient.post", new=post):
+            result = await service.send_ebook(
+                "jane@acme.com", PDF_BYTES, {"first_name": "Jane"}, "hook", "cta", pdf_url=PDF_URL
+            )
+
+        body = post.await_args.kwargs["content"]
+        assert result["delivery_mode"] == "link"
+        assert b"attachments" not in body
+        assert PDF_URL.encode() in body
+        assert result["payload_bytes"] == len(body) < 20_000
+
+    async def test_attachment_mode_is_opt_in(self):
+        """
+        send_ebook: Attachment mode should base64-encode the PDF into the payload.
+        """
+        service = EmailService()
+        service.provider = "sendgrid"
+        service.delivery_mode = "attachment"
+        post = AsyncMock(return_value=_sendgrid_response())
+
+        with patch("httpx.AsyncClient.post", new=post):
+            result = await service.send_ebook(
+                "jane@acme.com", PDF_BYTES, {"first_name": "Jane"}, "hook", "cta", pdf_url=PDF_URL
+            )
+
+        assert result["delivery_mode"] == "attachment"
+        assert result["payload_bytes"] > len(PDF_BYTES) * 4 // 3
+
+    async def test_non_public_url_falls_back_to_attachment(self):
+        """
+        send_ebook: A data: URL cannot be linked, so the PDF is attached.
+        """
+        service = EmailService()
+        service.delivery_mode = "link"
+
+        result = await service.send_ebook(
+            "jane@acme.com", PDF_BYTES, {}, "hook", "cta", pdf_url="data:application/pdf;base64,AAAA"
+        )
+
+        assert result["delivery_mode"] == "attachment"
+
+    async def test_delivery_stats_recorded_per_mode(self):
+        """
+        get_delivery_stats: Should report payload size and latency per mode.
+        """
+        from app.services.email_service import get_delivery_stats
+
+        service = EmailService()
+        service.delivery_mode = "link"
+        before = get_delivery_stats()["link"]["sends"]
+
+        await service.send_ebook("jane@acme.com", None, {}, "hook", "cta", pdf_url=PDF_URL)
+
+        stats = get_delivery_stats()["link"]
+        assert stats["sends"] == before + 1
+        assert stats["avg_payload_bytes"] > 0
+        assert stats["avg_send_ms"] is not None
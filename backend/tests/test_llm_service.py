@@ -374,3 +374,97 @@ class TestPromptBuilding:
         assert "JSON" in system_prompt
         assert "intro_hook" in system_prompt
         assert "cta" in system_prompt
+
+
+class TestPromptCaching:
+    """Static system prompts are sent as cacheable prefixes."""
+
+    def test_static_case_study_guidance_in_system_prompt(self):
+        """
+        The case study library and output rules are part of the cached
+        prefix; the user prompt only names the selected case study.
+        """
+        from app.services.llm_service import EBOOK_CASE_STUDIES, EBOOK_SYSTEM_PROMPT
+
+        user_prompt = LLMService()._build_ebook_prompt(
+            {"company_name": "Acme", "industry": "manufacturing"}, {"goal": "decision"}, None
+        )
+
+        for study in EBOOK_CASE_STUDIES.values():
+            assert study["metric"] in EBOOK_SYSTEM_PROMPT
+        assert "Key angles:" not in user_prompt and "Key angles:" in EBOOK_SYSTEM_PROMPT
+        assert "OUTPUT REQUIREMENTS" in EBOOK_SYSTEM_PROMPT
+        assert "[MANUFACTURING] Smurfit Westrock" in user_prompt
+        assert "25% cost reduction" in user_prompt  # metric to cite, for the selected study only
+
+    @patch('app.services.llm_service.settings')
+    def test_anthropic_system_prompt_cache_control(self, mock_settings):
+        from types import SimpleNamespace
+        from app.services.llm_service import ANTHROPIC_MODEL, EBOOK_SYSTEM_PROMPT
+
+        mock_settings.LLM_PROMPT_CACHE = True
+        calls = []
+        usage = SimpleNamespace(input_tokens=200, output_tokens=50,
+                                cache_read_input_tokens=1800, cache_creation_input_tokens=0)
+        response = SimpleNamespace(content=[SimpleNamespace(text="{}")], usage=usage)
+        client = SimpleNamespace(messages=SimpleNamespace(create=lambda **kw: calls.append(kw) or response))
+        service = LLMService()
+        provider = {"name": "anthropic", "client": client, "model": ANTHROPIC_MODEL}
+
+        result = service._call_provider(provider, service._get_ebook_system_prompt(), "lead data")
+        service._call_provider(provider, service._get_ebook_system_prompt(), "other lead")
+
+        system = calls[0]["system"]
+        assert system[0]["text"] is EBOOK_SYSTEM_PROMPT
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+        assert calls[1]["system"][0] is system[0]  # built once per process
+        assert (result.input_tokens, result.cache_read_tokens) == (2000, 1800)
+        result.model = ANTHROPIC_MODEL
+        assert result.cost_usd == pytest.approx((200 * 0.80 + 1800 * 0.08 + 50 * 4.00) / 1_000_000)
+
+    def test_gemini_model_built_once_with_system_instruction(self):
+        from types import SimpleNamespace
+
+        created = []
+
+        class FakeModel:
+            def __init__(self, model, system_instruction=None):
+                created.append(system_instruction)
+
+            def generate_content(self, prompt):
+                return SimpleNamespace(text=prompt, usage_metadata=None)
+
+        service = LLMService()
+        provider = {"name": "gemini", "client": SimpleNamespace(GenerativeModel=FakeModel), "model": "gemini"}
+
+        first = service._call_provider(provider, "static rules", "lead one")
+        second = service._call_provider(provider, "static rules", "lead two")
+
+        assert created == ["static rules"]
+        assert (first.text, second.text) == ("lead one", "lead two")
+
+
+class TestLazySDKImports:
+    """Provider SDKs stay out of the import path until a client is built."""
+
+    def test_module_import_skips_sdks(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys; import app.services.llm_service; "
+            "print(any(m in sys.modules for m in ('anthropic', 'openai', 'google.generativeai')))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "False"
+
+    @patch('app.services.llm_service.settings')
+    def test_clients_shared_across_instances(self, mock_settings):
+        mock_settings.ANTHROPIC_API_KEY = "mock-key-123"
+        mock_settings.OPENAI_API_KEY = None
+        mock_settings.GEMINI_API_KEY = None
+
+        first, second = LLMService(), LLMService()
+
+        assert first.providers[0]["client"] is second.providers[0]["client"]
@@ -0,0 +1,216 @@
+"""
+Tests for the Marketo REST client.
+Covers pooled connections, token refresh locking and client-side quotas.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.marketo_service import MarketoService, DailyQuotaExceeded
+from app.services.rate_limiter import SlidingWindowLimiter
+
+
+def _response(payload):
+    return MagicMock(status_code=200, json=lambda: payload, raise_for_status=lambda: None)
+
+
+@pytest.fixture
+def marketo():
+    """Fixture: MarketoService with test credentials."""
+    service = MarketoService()
+    service.base_url = "https://123-ABC-456.mktorest.com"
+    service.identity_url = "https://123-ABC-456.mktorest.com/identity"
+    service.client_id = "test-client"
+    service.client_secret = "test-secret"
+    return service
+
+
+@pytest.fixture
+def token_endpoint():
+    """Mock Marketo OAuth endpoint with a slow response."""
+    async def slow_token(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return _response({"access_token": "mock-access-token", "expires_in": 3600})
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=slow_token)) as mock:
+        yield mock
+
+
+@pytest.mark.asyncio
+class TestMarketoService:
+    """Tests for MarketoService."""
+
+    async def test_concurrent_calls_refresh_token_once(self, marketo, token_endpoint):
+        """
+        _get_access_token: Concurrent callers with no token should share one refresh.
+        """
+        tokens = await asyncio.gather(*[marketo._get_access_token() for _ in range(5)])
+
+        assert tokens == ["mock-access-token"] * 5
+        assert token_endpoint.call_count == 1
+        assert marketo.token_refreshes == 1
+
+    async def test_calls_reuse_pooled_client(self, marketo, token_endpoint):
+        """
+        update_lead: Repeated calls should go through the same HTTP client.
+        """
+        with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=_response({"success": True}))):
+            client = marketo.client
+            await marketo.update_lead("1", {"Enrichment_Status": "completed"})
+            await marketo.update_lead("2", {"Enrichment_Status": "completed"})
+
+        assert marketo.client is client
+        await marketo.aclose()
+
+    async def test_calls_counted_against_daily_quota(self, marketo, token_endpoint):
+        """
+        _request: Each REST call should count against the daily quota.
+        """
+        marketo.daily_quota.limit = 2
+
+        with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=_response({"success": True}))):
+            await marketo.update_lead("1", {"a": 1})
+            await marketo.update_lead("2", {"a": 1})
+            with pytest.raises(DailyQuotaExceeded):
+                await marketo.update_lead("3", {"a": 1})
+
+        usage = marketo.get_usage()
+        assert usage["calls_today"] == 2
+        assert usage["remaining_today"] == 0
+
+    async def test_expired_token_error_triggers_refresh(self, marketo, token_endpoint):
+        """
+        _request: A 601/602 response should refresh the token and retry.
+        """
+        post = AsyncMock(side_effect=[
+            _response({"success": False, "errors": [{"code": "602", "message": "Access token expired"}]}),
+            _response({"success": True}),
+        ])
+
+        with patch("httpx.AsyncClient.post", new=post):
+            await marketo.update_lead("1", {"a": 1})
+
+        assert post.call_count == 2
+        assert token_endpoint.call_count == 2
+
+    async def test_daily_quota_error_marks_quota_exhausted(self, marketo, token_endpoint):
+        """
+        _request: A 607 response should stop further calls for the day.
+        """
+        post = AsyncMock(return_value=_response(
+            {"success": False, "errors": [{"code": "607", "message": "Daily quota reached"}]}
+        ))
+
+        with patch("httpx.AsyncClient.post", new=post):
+            with pytest.raises(DailyQuotaExceeded):
+                await marketo.update_lead("1", {"a": 1})
+
+        assert marketo.daily_quota.remaining == 0
+
+
+@pytest.mark.asyncio
+class TestSlidingWindowLimiter:
+    """Tests for the sliding-window limiter."""
+
+    async def test_calls_beyond_window_wait(self):
+        """
+        acquire: The call after max_calls should wait for the window to slide.
+        """
+        limiter = SlidingWindowLimiter(max_calls=2, window_seconds=0.1)
+
+        assert await limiter.acquire() == 0.0
+        assert await limiter.acquire() == 0.0
+        waited = await limiter.acquire()
+
+        assert waited == pytest.approx(0.1, abs=0.03)
+        assert limiter.throttled == 1
+        assert limiter.in_window() <= 2
+
+
+@pytest.mark.asyncio
+class TestMarketoOutbox:
+    """Tests for batched lead updates and campaign triggers."""
+
+    async def test_concurrent_updates_sent_as_one_batch(self, marketo, token_endpoint):
+        """
+        update_lead: Updates queued in the same window should share one leads.json call.
+        """
+        post = AsyncMock(return_value=_response({
+            "success": True,
+            "result": [{"id": 1, "status": "updated"}, {"id": 2, "status": "updated"}]
+        }))
+        outbox = marketo.outbox
+        outbox.flush_seconds = 0.01
+
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                outbox.update_lead("1", {"Custom_PDF_URL": "https://x/1.pdf"}),
+                outbox.update_lead("2", {"Custom_PDF_URL": "https://x/2.pdf"}),
+            )
+
+        assert post.call_count == 1
+        sent = post.call_args.kwargs["json"]["input"]
+        assert [r["id"] for r in sent] == [1, 2]
+        assert [r["status"] for r in results] == ["updated", "updated"]
+        assert results[0]["batch_size"] == 2
+        assert outbox.get_stats()["calls_saved"] == 1
+
+    async def test_skipped_lead_fails_only_that_caller(self, marketo, token_endpoint):
+        """
+        update_lead: A skipped lead should raise for its caller only.
+        """
+        post = AsyncMock(return_value=_response({
+            "success": True,
+            "result": [
+                {"id": 1, "status": "updated"},
+                {"status": "skipped", "reasons": [{"code": "1004", "message": "Lead not found"}]}
+            ]
+        }))
+        outbox = marketo.outbox
+        outbox.flush_seconds = 0.01
+
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                outbox.update_lead("1", {"a": 1}),
+                outbox.update_lead("999", {"a": 1}),
+                return_exceptions=True
+            )
+
+        assert results[0]["status"] == "updated"
+        assert isinstance(results[1], ValueError)
+
+    async def test_triggers_grouped_by_tokens(self, marketo, token_endpoint):
+        """
+        trigger_campaign: Leads with identical tokens share a call; different tokens do not.
+        """
+        post = AsyncMock(return_value=_response({"success": True, "result": [{"id": 1001}]}))
+        outbox = marketo.outbox
+        outbox.flush_seconds = 0.01
+
+        with patch("httpx.AsyncClient.post", new=post):
+            results = await asyncio.gather(
+                outbox.trigger_campaign("1001", "1"),
+                outbox.trigger_campaign("1001", "2"),
+                outbox.trigger_campaign("1001", "3", tokens={"pdfUrl": "https://x/3.pdf"}),
+            )
+
+        assert post.call_count == 2
+        assert [r["batch_size"] for r in results] == [2, 2, 1]
+        assert all(r["status"] == "triggered" for r in results)
+
+    async def test_flush_sends_pending_immediately(self, marketo, token_endpoint):
+        """
+        flush: Pending requests should be sent without waiting for the window.
+        """
+        post = AsyncMock(return_value=_response({"success": True, "result": [{"id": 1, "status": "updated"}]}))
+        outbox = marketo.outbox
+        outbox.flush_seconds = 60
+
+        with patch("httpx.AsyncClient.post", new=post):
+            pending = asyncio.create_task(outbox.update_lead("1", {"a": 1}))
+            await asyncio.sleep(0)
+            await outbox.flush()
+            result = await pending
+
+        assert result["status"] == "updated"
@@ -239,33 +239,39 @@ def client():
 @pytest.fixture
 def mock_enrichment():
     """Mock the enrichment orchestrator."""
-    with patch("app.routes.marketo.RADOrchestrator") as mock:
-        mock_instance = MagicMock()
-        mock_instance.enrich = AsyncMock(return_value={
-            "email": "john@acme.com",
-            "first_name": "John",
-            "last_name": "Doe",
-            "company": "Acme Corp",
-            "data_quality_score": 0.8
-        })
-        mock.return_value = mock_instance
-        yield mock
+    from app.main import app
+    from app.services.rad_orchestrator import get_rad_orchestrator
+
+    mock_instance = MagicMock()
+    mock_instance.enrich = AsyncMock(return_value={
+        "email": "john@acme.com",
+        "first_name": "John",
+        "last_name": "Doe",
+        "company": "Acme Corp",
+        "data_quality_score": 0.8
+    })
+    app.dependency_overrides[get_rad_orchestrator] = lambda: mock_instance
+    yield mock_instance
+    app.dependency_overrides.pop(get_rad_orchestrator, None)
 
 
 @pytest.fixture
 def mock_pdf_service():
     """Mock PDF generation service."""
-    with patch("app.routes.marketo.PDFService") as mock:
-        mock_instance = MagicMock()
-        mock_instance.generate_amd_ebook = AsyncMock(
-            return_value={
-                "pdf_url": "https://storage.example.com/pdfs/test.pdf",
-                "storage_path": "personalized-pdfs/test.pdf",
-                "file_size_bytes": 12345
-            }
-        )
-        mock.return_value = mock_instance
-        yield mock
+    from app.main import app
+    from app.services.pdf_service import get_pdf_service
+
+    mock_instance = MagicMock()
+    mock_instance.generate_amd_ebook = AsyncMock(
+        return_value={
+            "pdf_url": "https://storage.example.com/pdfs/test.pdf",
+            "storage_path": "personalized-pdfs/test.pdf",
+            "file_size_bytes": 12345
+        }
+    )
+    app.dependency_overrides[get_pdf_service] = lambda: mock_instance
+    yield mock_instance
+    app.dependency_overrides.pop(get_pdf_service, None)
 
 
 @pytest.fixture
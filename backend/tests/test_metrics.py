@@ -0,0 +1,115 @@
+"""
+Tests for the Prometheus metrics derived from pipeline spans.
+"""
+
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.metrics import PROMETHEUS_AVAILABLE
+from app.services.tracing import span
+
+pytestmark = pytest.mark.skipif(not PROMETHEUS_AVAILABLE, reason="prometheus_client not installed")
+
+
+def _sample(name, **labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _failing_client(**kwargs):
+    raise RuntimeError("overloaded")
+
+
+def _openai_client(text, prompt_tokens, completion_tokens):
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    )
+    completions = SimpleNamespace(create=lambda **kwargs: response)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class TestSpanMetrics:
+    """Spans are translated into counters and histograms."""
+
+    def test_vendor_outcomes_counted(self):
+        before = _sample("enrichment_vendor_requests_total", source="hunter", outcome="timeout")
+
+        with span("vendor.hunter") as vendor_span:
+            vendor_span.set_attribute("outcome", "timeout")
+
+        assert _sample("enrichment_vendor_requests_total", source="hunter", outcome="timeout") == before + 1
+        assert _sample("enrichment_vendor_request_seconds_count", source="hunter") >= 1
+
+    def test_pdf_render_and_compliance(self):
+        renders = _sample("pdf_render_seconds_count", backend="reportlab", outcome="error")
+        fallbacks = _sample("compliance_checks_total", outcome="fallback")
+
+        with pytest.raises(ValueError):
+            with span("pdf.render", backend="reportlab"):
+                raise ValueError("empty output")
+        with span("compliance") as compliance_span:
+            compliance_span.set_attribute("outcome", "fallback")
+
+        assert _sample("pdf_render_seconds_count", backend="reportlab", outcome="error") == renders + 1
+        assert _sample("compliance_checks_total", outcome="fallback") == fallbacks + 1
+
+
+class TestLLMTokenUsage:
+    """Token counts come from the SDK usage fields."""
+
+    @pytest.mark.asyncio
+    @patch('app.services.llm_service.settings')
+    async def test_tokens_and_fallback_recorded(self, mock_settings):
+        from app.services.llm_service import LLMService
+
+        mock_settings.ANTHROPIC_API_KEY = None
+        mock_settings.OPENAI_API_KEY = None
+        mock_settings.GEMINI_API_KEY = None
+        service = LLMService()
+        body = json.dumps({"intro_hook": "Hi John, scaling AI at Acme?", "cta": "Book a call."})
+        service.providers = [
+            {"name": "anthropic", "client": SimpleNamespace(messages=SimpleNamespace(create=_failing_client)),
+             "model": "primary"},
+            {"name": "openai", "client": _openai_client(body, 120, 40), "model": "backup"},
+        ]
+        tokens = _sample("llm_tokens_total", provider="openai", direction="input")
+        fallbacks = _sample("llm_fallbacks_total", to="openai")
+        retries = _sample("llm_retries_total", provider="anthropic")
+
+        with patch('app.services.llm_service.time.sleep'):
+            result = await service.generate_personalization({"first_name": "John"})
+
+        assert result["model_used"] == "openai"
+        assert result["tokens_used"] == 160
+        assert _sample("llm_tokens_total", provider="openai", direction="input") == tokens + 120
+        assert _sample("llm_fallbacks_total", to="openai") == fallbacks + 1
+        assert _sample("llm_retries_total", provider="anthropic") == retries + 1
+
+    def test_usage_parsed_per_sdk(self):
+        from app.services.llm_service import _usage
+
+        anthropic = SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+        openai = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=7, completion_tokens=3))
+        gemini = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=4, candidates_token_count=2))
+
+        assert _usage("anthropic", anthropic) == (10, 5)
+        assert _usage("openai", openai) == (7, 3)
+        assert _usage("gemini", gemini) == (4, 2)
+        assert _usage("openai", SimpleNamespace()) == (0, 0)
+
+
+class TestMetricsEndpoint:
+    """GET /metrics."""
+
+    def test_metrics_exposition(self, test_client):
+        with span("storage.upload"):
+            pass
+
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "storage_upload_seconds_bucket" in response.text
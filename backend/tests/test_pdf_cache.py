@@ -0,0 +1,193 @@
+"""
+Tests for the PDF artifact cache and the cached, range-aware download endpoint.
+"""
+
+import os
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.pdf_cache import PDFArtifactCache, iter_file, parse_range, pdf_fingerprint
+from app.services.pdf_renderers import RenderError
+
+PDF_BYTES = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+class TestParseRange:
+    """Tests for Range header parsing."""
+
+    def test_no_header_serves_whole_file(self):
+        assert parse_range(None, 100) is None
+
+    def test_bounded_range(self):
+        assert parse_range("bytes=10-19", 100) == (10, 19)
+
+    def test_open_ended_range(self):
+        assert parse_range("bytes=90-", 100) == (90, 99)
+
+    def test_suffix_range(self):
+        assert parse_range("bytes=-10", 100) == (90, 99)
+
+    def test_end_clamped_to_size(self):
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+
+    def test_multiple_ranges_serve_whole_file(self):
+        assert parse_range("bytes=0-1,5-6", 100) is None
+
+    def test_unsatisfiable_range(self):
+        with pytest.raises(ValueError):
+            parse_range("bytes=200-", 100)
+
+
+class TestPDFArtifactCache:
+    """Tests for PDFArtifactCache."""
+
+    def test_put_then_get(self, tmp_path):
+        cache = PDFArtifactCache(str(tmp_path), max_bytes=10_000_000)
+
+        assert cache.get("abc") is None
+        cache.put("abc", PDF_BYTES)
+
+        assert cache.get("abc").read_bytes() == PDF_BYTES
+        assert cache.get_stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = PDFArtifactCache(str(tmp_path), max_bytes=len(PDF_BYTES) * 2)
+        cache.put("old", PDF_BYTES)
+        cache.put("mid", PDF_BYTES)
+        os.utime(cache.path_for("old"), (0, 0))
+
+        cache.put("new", PDF_BYTES)
+
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
+
+    def test_fingerprint_changes_with_personalization(self):
+        profile = {"first_name": "Jane", "ebook_personalization": {"personalized_hook": "a"}}
+        changed = {"first_name": "Jane", "ebook_personalization": {"personalized_hook": "b"}}
+
+        assert pdf_fingerprint(profile, "i", "c") == pdf_fingerprint(dict(profile), "i", "c")
+        assert pdf_fingerprint(profile, "i", "c") != pdf_fingerprint(changed, "i", "c")
+
+    def test_fingerprint_changes_with_mode_and_backends(self):
+        profile = {"first_name": "Jane"}
+        html = pdf_fingerprint(profile, "i", "c", ["weasyprint", "reportlab"])
+
+        with patch("app.services.pdf_cache.settings.PDF_RENDER_MODE", "acroform"):
+            assert pdf_fingerprint(profile, "i", "c", ["weasyprint", "reportlab"]) != html
+        assert pdf_fingerprint(profile, "i", "c", ["reportlab"]) != html
+
+    def test_open_any_returns_first_cached_key(self, tmp_path):
+        cache = PDFArtifactCache(str(tmp_path), max_bytes=10_000_000)
+        cache.put("fp-reportlab", PDF_BYTES)
+
+        key, f = cache.open_any(["fp-weasyprint", "fp-reportlab"])
+
+        assert key == "fp-reportlab"
+        assert b"".join(iter_file(f, 0, len(PDF_BYTES) - 1)) == PDF_BYTES
+        assert cache.open_any(["fp-acroform"]) is None
+        assert cache.get_stats() == {"directory": str(tmp_path), "hits": 1, "misses": 1}
+
+    def test_opened_file_survives_eviction(self, tmp_path):
+        cache = PDFArtifactCache(str(tmp_path), max_bytes=10_000_000)
+        cache.put("fp-weasyprint", PDF_BYTES)
+
+        _, f = cache.open_any(["fp-weasyprint"])
+        cache.path_for("fp-weasyprint").unlink()
+
+        assert b"".join(iter_file(f, 0, 9)) == PDF_BYTES[:10]
+
+
+@pytest.fixture
+def download_client(test_client, mock_supabase, tmp_path):
+    """TestClient with a stored profile, temp PDF cache and counted renders."""
+    mock_supabase.write_finalize_data(
+        email="jane@acme.com",
+        normalized_data={"email": "jane@acme.com", "first_name": "Jane"},
+        intro="hook",
+        cta="cta"
+    )
+    render = AsyncMock(return_value=(PDF_BYTES, "weasyprint"))
+    cache = PDFArtifactCache(str(tmp_path), max_bytes=10_000_000)
+    with patch("app.routes.enrichment.get_pdf_cache", lambda: cache), \
+         patch("app.services.pdf_service.PDFService._render_pdf", render):
+        yield test_client, render
+
+
+class TestCachedDownload:
+    """Tests for GET /rad/download/{email}."""
+
+    def test_repeat_download_served_from_cache(self, download_client):
+        client, render = download_client
+
+        first = client.get("/rad/download/jane@acme.com")
+        second = client.get("/rad/download/jane@acme.com")
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content == PDF_BYTES
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["accept-ranges"] == "bytes"
+        assert render.await_count == 1
+
+    def test_if_none_match_returns_304(self, download_client):
+        client, render = download_client
+        etag = client.get("/rad/download/jane@acme.com").headers["etag"]
+
+        response = client.get("/rad/download/jane@acme.com", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert render.await_count == 1
+
+    def test_range_request_returns_partial_content(self, download_client):
+        client, _ = download_client
+
+        response = client.get("/rad/download/jane@acme.com", headers={"Range": "bytes=100-199"})
+
+        assert response.status_code == 206
+        assert response.content == PDF_BYTES[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(PDF_BYTES)}"
+
+    def test_stale_if_range_serves_full_file(self, download_client):
+        client, _ = download_client
+
+        response = client.get(
+            "/rad/download/jane@acme.com",
+            headers={"Range": "bytes=100-199", "If-Range": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == PDF_BYTES
+
+    def test_unsatisfiable_range_returns_416(self, download_client):
+        client, _ = download_client
+
+        response = client.get("/rad/download/jane@acme.com", headers={"Range": "bytes=999999-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(PDF_BYTES)}"
+
+    def test_etag_names_the_rendering_backend(self, download_client):
+        client, render = download_client
+        render.return_value = (PDF_BYTES, "reportlab")
+
+        etag = client.get("/rad/download/jane@acme.com").headers["etag"]
+
+        assert etag.endswith('-reportlab"')
+        assert client.get("/rad/download/jane@acme.com").headers["etag"] == etag
+        assert render.await_count == 1
+
+    def test_failed_render_is_not_cached(self, download_client):
+        """
+        A renderer failure should fail the download, not cache a placeholder
+        PDF under the real fingerprint.
+        """
+        client, render = download_client
+        render.side_effect = [RenderError("weasyprint: boom"), (PDF_BYTES, "weasyprint")]
+
+        failed = client.get("/rad/download/jane@acme.com")
+        recovered = client.get("/rad/download/jane@acme.com")
+
+        assert failed.status_code == 500
+        assert recovered.status_code == 200
+        assert recovered.content == PDF_BYTES
+        assert render.await_count == 2
@@ -0,0 +1,160 @@
+"""
+Tests for signed deterministic PDF links (deferred PDF mode).
+"""
+
+import asyncio
+import time
+import pytest
+from urllib.parse import urlparse, parse_qs
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import pdf_links
+from app.services.pdf_links import pdf_filename, sign_pdf_link, verify_pdf_link, resolve_pdf
+from app.services.supabase_client import get_supabase_client
+
+
+def _link_params(url: str):
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    return parsed.path, int(query["expires"][0]), query["sig"][0]
+
+
+class TestSignedLinks:
+    """Tests for link signing and deterministic filenames."""
+
+    def test_filename_is_deterministic(self):
+        assert pdf_filename("wh-1") == pdf_filename("wh-1")
+        assert pdf_filename("wh-1") != pdf_filename("wh-2")
+
+    def test_signed_link_verifies(self):
+        path, expires, sig = _link_params(sign_pdf_link("wh-1"))
+
+        assert path == "/rad/marketo/pdf/wh-1"
+        assert verify_pdf_link("wh-1", expires, sig)
+
+    def test_link_rejected_for_other_key(self):
+        _, expires, sig = _link_params(sign_pdf_link("wh-1"))
+
+        assert not verify_pdf_link("wh-2", expires, sig)
+
+    def test_expired_link_rejected(self):
+        _, expires, sig = _link_params(sign_pdf_link("wh-1", ttl_seconds=-10))
+
+        assert not verify_pdf_link("wh-1", expires, sig)
+
+    def test_no_secret_refuses_to_sign_or_verify(self):
+        _, expires, sig = _link_params(sign_pdf_link("wh-1"))
+
+        with patch.object(pdf_links.settings, "PDF_LINK_SECRET", ""):
+            with pytest.raises(RuntimeError):
+                sign_pdf_link("wh-1")
+            assert not verify_pdf_link("wh-1", expires, sig)
+
+
+@pytest.mark.asyncio
+class TestResolvePdf:
+    """Tests for resolving a link to the stored PDF."""
+
+    async def test_returns_stored_pdf_without_rendering(self, mock_supabase):
+        """
+        resolve_pdf: An already-stored PDF should not be rendered again.
+        """
+        mock_supabase._mock_storage[pdf_filename("wh-1")] = b"%PDF"
+        calls = []
+
+        async def renderer(key, supabase):
+            calls.append(key)
+            return "rendered"
+
+        with patch.object(pdf_links, "_renderer", renderer):
+            url = await resolve_pdf("wh-1", mock_supabase)
+
+        assert pdf_filename("wh-1") in url
+        assert calls == []
+
+    async def test_waits_for_in_flight_render(self, mock_supabase):
+        """
+        resolve_pdf: A click during the background render should join it.
+        """
+        calls = []
+
+        async def renderer(key, supabase):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return "https://storage.example.com/rendered.pdf"
+
+        with patch.object(pdf_links, "_renderer", renderer):
+            pdf_links.start_pdf_render("wh-2", mock_supabase)
+            await asyncio.sleep(0)
+            url = await resolve_pdf("wh-2", mock_supabase)
+
+        assert url == "https://storage.example.com/rendered.pdf"
+        assert calls == ["wh-2"]
+
+    async def test_queue_worker_joins_link_render(self, mock_supabase):
+        """
+        process_queued_webhook: With deferred links the worker and an early
+        click share one render.
+        """
+        from app.routes.marketo import process_queued_webhook
+        calls = []
+
+        async def renderer(key, supabase):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return "https://storage.example.com/rendered.pdf"
+
+        webhook = {"id": "wh-3", "payload": {"leadId": "12345", "email": "john@acme.com"}}
+        with patch.object(pdf_links, "_renderer", renderer), \
+             patch("app.routes.marketo.settings.MARKETO_DEFERRED_PDF", True):
+            clicked = asyncio.ensure_future(resolve_pdf("wh-3", mock_supabase))
+            await asyncio.sleep(0)
+            lead_url = await process_queued_webhook(webhook, mock_supabase)
+            url = await clicked
+
+        assert calls == ["wh-3"]
+        assert url == "https://storage.example.com/rendered.pdf"
+        assert "/rad/marketo/pdf/wh-3?" in lead_url
+
+
+class TestDeferredWebhook:
+    """Tests for the deferred PDF webhook flow."""
+
+    def test_webhook_returns_link_then_link_redirects(self, mock_supabase):
+        """
+        POST /rad/marketo/webhook: Deferred mode should return a signed link that
+        redirects to the stored PDF once rendered.
+        """
+        async def fake_pipeline(payload, webhook_id, supabase, filename=None, services=None):
+            supabase._mock_storage[filename] = b"%PDF"
+            return {"email": payload.email}, f"https://mock-storage.example.com/{filename}"
+
+        app.dependency_overrides[get_supabase_client] = lambda: mock_supabase
+        try:
+            with patch("app.routes.marketo.settings.MARKETO_DEFERRED_PDF", True), \
+                 patch("app.routes.marketo.settings.MARKETO_WEBHOOK_SECRET", "test-webhook-secret"), \
+                 patch("app.routes.marketo._run_webhook_pipeline", fake_pipeline):
+                client = TestClient(app)
+                response = client.post(
+                    "/rad/marketo/webhook",
+                    json={"leadId": "12345", "email": "john@acme.com"},
+                    headers={"X-Marketo-Secret": "test-webhook-secret"}
+                )
+                body = response.json()
+                path, expires, sig = _link_params(body["pdfUrl"])
+                redirect = client.get(
+                    path, params={"expires": expires, "sig": sig}, follow_redirects=False
+                )
+                forbidden = client.get(
+                    path, params={"expires": expires, "sig": "bad"}, follow_redirects=False
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert body["status"] == "processing"
+        assert redirect.status_code == 307
+        assert pdf_filename(body["webhookId"]) in redirect.headers["location"]
+        assert forbidden.status_code == 403
@@ -0,0 +1,235 @@
+"""
+Tests for the PDF renderer registry: startup probing, selection and stats.
+"""
+
+import io
+import os
+import time
+import pytest
+
+from app.services.pdf_renderers import (
+    AcroFormRenderer,
+    PDFRenderer,
+    RenderError,
+    RenderRequest,
+    RendererRegistry,
+)
+
+
+class FakeRenderer(PDFRenderer):
+    """Renderer with scripted availability, latency and failures."""
+
+    def __init__(self, name, available=True, delay=0.0, fail=False, output=b"%PDF-fake"):
+        self.name = name
+        self.available = available
+        self.delay = delay
+        self.fail = fail
+        self.output = output
+        self.probes = 0
+        self.renders = 0
+
+    def probe(self):
+        self.probes += 1
+        if not self.available:
+            raise ImportError(f"{self.name} not installed")
+
+    def render(self, request):
+        self.renders += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} broke")
+        return self.output
+
+    def warm_up(self):
+        self.render(REQUEST)
+
+
+REQUEST = RenderRequest(html="<p>x</p>")
+
+
+@pytest.mark.asyncio
+class TestRendererRegistry:
+    """Tests for RendererRegistry."""
+
+    async def test_unavailable_backend_probed_once_and_skipped(self):
+        """
+        render: A backend that failed its probe should not be retried per request.
+        """
+        missing = FakeRenderer("weasyprint", available=False)
+        fallback = FakeRenderer("reportlab")
+        registry = RendererRegistry([missing, fallback])
+
+        for _ in range(3):
+            pdf_bytes, name = await registry.render(REQUEST)
+
+        assert name == "reportlab"
+        assert missing.probes == 1
+        assert missing.renders == 0
+        assert registry.get_stats()["backends"]["weasyprint"]["probe_error"].startswith("ImportError")
+
+    async def test_ordered_falls_through_on_error(self):
+        """
+        render: In ordered mode a failing backend falls through to the next one.
+        """
+        broken = FakeRenderer("weasyprint", fail=True)
+        fallback = FakeRenderer("reportlab")
+        registry = RendererRegistry([broken, fallback])
+
+        _, name = await registry.render(REQUEST)
+
+        assert name == "reportlab"
+        assert registry.get_stats()["backends"]["weasyprint"]["errors"] == 1
+
+    async def test_latency_mode_prefers_fastest(self):
+        """
+        render: Latency mode should settle on the backend with the lower median.
+        """
+        slow = FakeRenderer("weasyprint", delay=0.02)
+        fast = FakeRenderer("reportlab", delay=0.0)
+        registry = RendererRegistry([slow, fast], selection="latency")
+
+        names = [(await registry.render(REQUEST))[1] for _ in range(5)]
+
+        # Both get measured, then the fast one wins
+        assert set(names[:2]) == {"weasyprint", "reportlab"}
+        assert names[2:] == ["reportlab"] * 3
+
+    async def test_latency_mode_demotes_backend_over_error_budget(self):
+        """
+        render: A fast backend that keeps failing should be demoted.
+        """
+        flaky = FakeRenderer("reportlab", fail=True)
+        steady = FakeRenderer("weasyprint", delay=0.005)
+        registry = RendererRegistry([flaky, steady], selection="latency", error_budget=0.2)
+
+        await registry.render(REQUEST)
+        await registry.render(REQUEST)
+
+        assert flaky.renders == 1
+        assert steady.renders == 2
+
+    async def test_all_backends_failing_raises(self):
+        """
+        render: RenderError when nothing can render.
+        """
+        registry = RendererRegistry([FakeRenderer("weasyprint", available=False)])
+
+        with pytest.raises(RenderError):
+            await registry.render(REQUEST)
+
+    async def test_stats_report_latency_and_size(self):
+        """
+        get_stats: Should export per-backend timings and output sizes.
+        """
+        registry = RendererRegistry([FakeRenderer("reportlab", output=b"%PDF" + b"x" * 96)])
+
+        await registry.render(REQUEST)
+        stats = registry.get_stats()["backends"]["reportlab"]
+
+        assert stats["renders"] == 1
+        assert stats["avg_bytes"] == 100
+        assert stats["p50_ms"] is not None
+
+    async def test_warm_up_renders_available_backends_without_stats(self):
+        """
+        warm_up: Each available backend renders once; stats start clean.
+        """
+        missing = FakeRenderer("weasyprint", available=False)
+        ready = FakeRenderer("reportlab")
+        flaky = FakeRenderer("acroform", fail=True)
+        registry = RendererRegistry([missing, ready, flaky])
+
+        timings = registry.warm_up()
+
+        assert set(timings) == {"reportlab"}
+        assert (missing.renders, ready.renders, flaky.renders) == (0, 1, 1)
+        assert registry.get_stats()["backends"]["reportlab"]["renders"] == 0
+        assert registry.get_stats()["backends"]["acroform"]["available"] is True
+
+
+class TestAcroFormRenderer:
+    """Tests for the AcroForm backend."""
+
+    def test_requires_structured_document(self):
+        assert not AcroFormRenderer().supports(RenderRequest(html="<p>x</p>"))
+
+    def test_probe_fails_without_template(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            "app.services.pdf_personalization_service.TEMPLATE_WITH_FIELDS", tmp_path / "missing.pdf"
+        )
+
+        with pytest.raises(RuntimeError):
+            AcroFormRenderer().probe()
+
+
+def _write_form_template(path, fields):
+    """Two-page PDF with one text field per name (stands in for the designer template)."""
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(path))
+    for i, name in enumerate(fields):
+        c.acroForm.textfield(name=name, x=50, y=700 - 60 * i, width=400, height=40)
+    c.showPage()
+    c.drawString(50, 700, "Page two")
+    c.showPage()
+    c.save()
+
+
+@pytest.fixture
+def form_template(tmp_path, monkeypatch):
+    from app.services import pdf_personalization_service as service
+
+    path = tmp_path / "template.pdf"
+    _write_form_template(path, sorted(service.REQUIRED_FIELDS))
+    monkeypatch.setattr(service, "TEMPLATE_WITH_FIELDS", path)
+    return path
+
+
+class TestAcroFormMode:
+    """Tests for PDF_RENDER_MODE=acroform and the cached fill path."""
+
+    def test_acroform_mode_puts_acroform_first(self, monkeypatch):
+        from app.services import pdf_renderers
+
+        monkeypatch.setattr(pdf_renderers, "_registry", None)
+        monkeypatch.setattr(pdf_renderers.settings, "PDF_RENDERERS", "weasyprint,reportlab,acroform")
+        monkeypatch.setattr(pdf_renderers.settings, "PDF_RENDER_MODE", "acroform")
+
+        names = [r.name for r in pdf_renderers.get_renderer_registry().renderers]
+
+        assert names == ["acroform", "weasyprint", "reportlab"]
+
+    async def test_renders_document_through_template(self, form_template):
+        from pypdf import PdfReader
+        from app.services.ebook_document import EbookDocument
+
+        registry = RendererRegistry([AcroFormRenderer()])
+        registry.probe()
+        document = EbookDocument(
+            first_name="Jane", company_name="Acme", industry="healthcare",
+            personalized_hook="Acme is scaling clinical AI.",
+            case_study_framing="Like Acme, PQR needed...",
+            personalized_cta="Book an assessment."
+        )
+
+        pdf_bytes, name = await registry.render(RenderRequest(html="", document=document))
+
+        assert name == "acroform"
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        assert len(reader.pages) == 2
+        assert "/AcroForm" not in reader.trailer["/Root"]
+
+    def test_template_read_once_until_replaced(self, form_template):
+        from app.services import pdf_personalization_service as service
+
+        service._read_template.cache_clear()
+        content = {"hook": "Hello", "cta_assessment": "Next", "cta_footer": "Next"}
+        service.personalize_ebook("executive", "healthcare", "exploring", "Acme", content)
+        service.personalize_ebook("executive", "retail", "exploring", "Acme", content)
+        assert service._read_template.cache_info().misses == 1
+
+        # A replaced template (new mtime) is picked up
+        _write_form_template(form_template, [service.FIELD_HOOK])
+        os.utime(form_template, (time.time() + 10, time.time() + 10))
+        with pytest.raises(ValueError):
+            service.personalize_ebook("executive", "healthcare", "exploring", "Acme", content)
@@ -3,11 +3,19 @@ Tests for RAD orchestrator.
 Tests resolution logic and data aggregation using mock API responses.
 """
 
+import asyncio
 import pytest
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.services.rad_orchestrator import RADOrchestrator, SOURCE_PRIORITY
+from app.services.rad_orchestrator import (
+    EnrichmentContext,
+    FIELD_MAPPINGS,
+    RADOrchestrator,
+    RESOLUTION_PLAN,
+    SOURCE_PRIORITY,
+    get_rad_orchestrator,
+)
 
 
 @pytest.mark.asyncio
@@ -91,7 +99,6 @@ class TestRADOrchestrator:
             "gnews": {},
             "zoominfo": {}
         }
-        orchestrator.data_sources = ["apollo", "pdl", "hunter"]
 
         result = orchestrator._resolve_profile("john@acme.com", "acme.com", raw_data)
 
@@ -119,7 +126,6 @@ class TestRADOrchestrator:
             "gnews": {},
             "zoominfo": {}
         }
-        orchestrator.data_sources = ["apollo", "pdl"]
 
         result = orchestrator._resolve_profile("john@acme.com", "acme.com", raw_data)
 
@@ -232,10 +238,32 @@ class TestRADDataFlow:
         """
         enrich: data_sources list should reflect which APIs returned data.
         """
-        await orchestrator.enrich("john@acme.com")
+        context = EnrichmentContext()
+        result = await orchestrator.enrich("john@acme.com", context=context)
 
         # In mock mode, all APIs return mock data
-        assert len(orchestrator.data_sources) >= 0  # May be 0 if all mocked with errors
+        assert len(context.data_sources) >= 0  # May be 0 if all mocked with errors
+        assert result["data_sources"] == context.data_sources
+        assert context.domain == "acme.com"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_enrich_keeps_per_call_state(self, orchestrator):
+        """
+        enrich: A shared orchestrator keeps each call's sources and vendor
+        calls on that call's context.
+        """
+        acme, globex = EnrichmentContext(), EnrichmentContext()
+
+        await asyncio.gather(
+            orchestrator.enrich("john@acme.com", context=acme),
+            orchestrator.enrich("jane@globex.com", context=globex),
+        )
+
+        assert acme.email == "john@acme.com"
+        assert globex.email == "jane@globex.com"
+        assert acme.vendor_calls["apollo"] == 1
+        assert globex.vendor_calls["apollo"] == 1
+        assert orchestrator.vendor_calls["apollo"] == 2
 
     @pytest.mark.asyncio
     async def test_enrich_returns_complete_profile(self, orchestrator):
@@ -251,6 +279,71 @@ class TestRADDataFlow:
         assert "data_quality_score" in result
 
 
+class TestResolutionPlan:
+    """Tests for the compiled field-resolution plan."""
+
+    @pytest.fixture
+    def orchestrator(self, mock_supabase):
+        return RADOrchestrator(mock_supabase)
+
+    def test_plan_covers_every_mapped_field(self):
+        assert [field for field, _ in RESOLUTION_PLAN] == list(FIELD_MAPPINGS)
+
+    def test_plan_sources_sorted_by_priority(self):
+        for field, sources in RESOLUTION_PLAN:
+            priorities = [SOURCE_PRIORITY.get(source, 0) for source, _ in sources]
+            assert priorities == sorted(priorities, reverse=True), field
+
+    def test_plan_ties_keep_mapping_order(self):
+        plan = dict(RESOLUTION_PLAN)
+
+        # pdl_company and zoominfo share priority 4; pdl_company is mapped first
+        assert plan["employee_count"] == (("pdl_company", "employee_count"), ("zoominfo", "employee_count"))
+
+    def test_resolve_profile_records_provenance(self, orchestrator):
+        """
+        _resolve_profile: The winning source of each field is recorded.
+        """
+        raw_data = {
+            "apollo": {"first_name": "John", "company_name": ""},
+            "pdl": {"first_name": "Johnny", "job_company_name": "Acme"},
+            "zoominfo": {"_error": "timeout", "company_name": "Ignored"},
+        }
+        provenance = {}
+
+        result = orchestrator._resolve_profile("john@acme.com", "acme.com", raw_data, provenance)
+
+        assert result["first_name"] == "John"
+        assert result["company_name"] == "Acme"
+        assert provenance == {"first_name": "apollo", "company_name": "pdl"}
+
+    def test_plan_matches_ad_hoc_resolution(self, orchestrator):
+        """
+        _resolve_profile: The compiled plan resolves every field exactly like
+        sorting the candidates per field.
+        """
+        raw_data = {
+            source: {source_field: f"{source}:{source_field}" for sources in FIELD_MAPPINGS.values()
+                     for s, source_field in sources if s == source}
+            for source in SOURCE_PRIORITY
+        }
+        raw_data["apollo"] = {"_error": "rate limited"}
+
+        result = orchestrator._resolve_profile("john@acme.com", "acme.com", raw_data)
+
+        for field, sources in FIELD_MAPPINGS.items():
+            assert result.get(field) == orchestrator._resolve_field(field, sources, raw_data), field
+
+    @pytest.mark.asyncio
+    async def test_enrich_exposes_field_sources(self, orchestrator):
+        context = EnrichmentContext()
+
+        result = await orchestrator.enrich("john@acme.com", context=context)
+
+        assert result["field_sources"] is context.field_sources
+        assert set(context.field_sources) <= set(result)
+
+
 class TestSourcePriority:
     """Tests for source priority configuration."""
 
@@ -267,3 +360,94 @@ class TestSourcePriority:
         assert SOURCE_PRIORITY["apollo"] > SOURCE_PRIORITY["pdl"]
         assert SOURCE_PRIORITY["apollo"] > SOURCE_PRIORITY["hunter"]
         assert SOURCE_PRIORITY["zoominfo"] > SOURCE_PRIORITY["pdl"]
+
+
+class TestBatchPlanner:
+    """Tests for domain-grouped batch enrichment."""
+
+    @pytest.fixture
+    def orchestrator(self, mock_supabase):
+        return RADOrchestrator(mock_supabase)
+
+    @pytest.mark.asyncio
+    async def test_batch_fetches_company_data_once_per_domain(self, orchestrator):
+        """
+        enrich_batch: Company sources should be fetched once per domain,
+        person sources once per email.
+        """
+        emails = [f"user{i}@acme.com" for i in range(4)] + ["jane@globex.com"]
+
+        context = EnrichmentContext()
+        results = await orchestrator.enrich_batch(emails, context=context)
+
+        assert [r["email"] for r in results] == emails
+        report = context.batch_report
+        assert report["leads"] == 5
+        assert report["domains"] == 2
+        assert report["vendor_calls"]["gnews"] == 2
+        assert report["vendor_calls"]["zoominfo"] == 2
+        assert report["vendor_calls"]["pdl_company"] == 2
+        assert report["vendor_calls"]["apollo"] == 5
+        assert report["vendor_calls"]["hunter"] == 5
+        assert report["company_fetches_saved"] == 9
+
+    @pytest.mark.asyncio
+    async def test_batch_shares_company_data_across_leads(self, orchestrator):
+        """
+        enrich_batch: Leads at the same domain should resolve the same company data.
+        """
+        results = await orchestrator.enrich_batch(["a@acme.com", "b@acme.com"])
+
+        assert results[0]["company_context"] == results[1]["company_context"]
+        assert results[0]["domain"] == results[1]["domain"] == "acme.com"
+
+    @pytest.mark.asyncio
+    async def test_batch_isolates_lead_failures(self, orchestrator):
+        """
+        enrich_batch: A failing lead should not abort the rest of the batch.
+        """
+        original_enrich = orchestrator.enrich
+
+        async def flaky_enrich(email, *args, **kwargs):
+            if email.startswith("bad"):
+                raise RuntimeError("boom")
+            return await original_enrich(email, *args, **kwargs)
+
+        orchestrator.enrich = flaky_enrich
+
+        results = await orchestrator.enrich_batch(["bad@acme.com", "good@acme.com"])
+
+        assert results[0]["_error"] == "boom"
+        assert results[1]["email"] == "good@acme.com"
+
+
+@pytest.mark.asyncio
+class TestSingleFlightEnrichment:
+    """Tests for coalescing concurrent enrichments of the same lead."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_enrich_same_email_coalesces_vendor_calls(self, mock_supabase):
+        """
+        enrich: Two concurrent enrichments of one email should share vendor fetches.
+        """
+        from app.services.single_flight import SingleFlight
+
+        group = SingleFlight()
+        orchestrator = RADOrchestrator(mock_supabase, single_flight=group)
+
+        first, second = await asyncio.gather(
+            orchestrator.enrich("jane@acme.com"),
+            orchestrator.enrich("jane@acme.com"),
+        )
+
+        assert first["email"] == second["email"] == "jane@acme.com"
+        assert orchestrator.vendor_calls["apollo"] == 1
+        assert orchestrator.vendor_calls["gnews"] == 1
+        assert group.get_stats()["coalesced"] >= 6
+
+
+class TestSharedOrchestrator:
+    """Tests for the process-wide orchestrator instance."""
+
+    def test_get_rad_orchestrator_returns_singleton(self):
+        assert get_rad_orchestrator() is get_rad_orchestrator()
@@ -0,0 +1,189 @@
+"""
+Tests for per-vendor token-bucket rate limiting.
+Covers queueing, dropping past the max wait, and 429/Retry-After retries.
+"""
+
+import asyncio
+import pytest
+import httpx
+
+from app.services.enrichment_apis import ApolloAPI, EnrichmentAPIError, parse_retry_after
+from app.services.rate_limiter import (
+    TokenBucket,
+    VendorRateLimiter,
+    RateLimitExceeded,
+    parse_vendor_limits,
+)
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket reservations."""
+
+    def test_burst_admitted_without_wait(self):
+        """
+        reserve: Calls within the burst should not wait.
+        """
+        bucket = TokenBucket(rate=1, burst=3)
+
+        assert [bucket.reserve(1, max_wait=0) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_calls_beyond_burst_queue_in_order(self):
+        """
+        reserve: Calls past the burst should wait progressively longer.
+        """
+        bucket = TokenBucket(rate=10, burst=1)
+        bucket.reserve(1, max_wait=0)
+
+        second = bucket.reserve(1, max_wait=10)
+        third = bucket.reserve(1, max_wait=10)
+
+        assert second == pytest.approx(0.1, abs=0.02)
+        assert third == pytest.approx(0.2, abs=0.02)
+
+    def test_reservation_refused_past_max_wait(self):
+        """
+        reserve: A call needing more than max_wait should not take tokens.
+        """
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.reserve(1, max_wait=0)
+
+        assert bucket.reserve(1, max_wait=0.5) is None
+        assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+
+    def test_pause_delays_admissions(self):
+        """
+        pause: Retry-After should delay calls even with tokens available.
+        """
+        bucket = TokenBucket(rate=100, burst=10)
+        bucket.pause(2.0)
+
+        assert bucket.reserve(1, max_wait=10) == pytest.approx(2.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+class TestVendorRateLimiter:
+    """Tests for VendorRateLimiter.run."""
+
+    def _limiter(self, **kwargs) -> VendorRateLimiter:
+        params = dict(default_rate=100, default_burst=2, max_wait=1.0, max_retries=2)
+        params.update(kwargs)
+        return VendorRateLimiter(**params)
+
+    async def test_burst_is_queued_not_failed(self):
+        """
+        run: A burst larger than the bucket should be throttled, not dropped.
+        """
+        limiter = self._limiter()
+
+        async def call():
+            return "ok"
+
+        results = await asyncio.gather(*[limiter.run("apollo", call) for _ in range(5)])
+
+        assert results == ["ok"] * 5
+        stats = limiter.get_stats()["apollo"]
+        assert stats["admitted"] == 5
+        assert stats["throttled"] == 3
+        assert stats["dropped"] == 0
+
+    async def test_call_dropped_past_max_wait(self):
+        """
+        run: Calls that would queue past max_wait should raise RateLimitExceeded.
+        """
+        limiter = self._limiter(default_rate=1, default_burst=1, max_wait=0.1)
+
+        async def call():
+            return "ok"
+
+        assert await limiter.run("hunter", call) == "ok"
+        with pytest.raises(RateLimitExceeded):
+            await limiter.run("hunter", call)
+        assert limiter.get_stats()["hunter"]["dropped"] == 1
+
+    async def test_429_retried_honoring_retry_after(self):
+        """
+        run: A 429 with Retry-After should be retried after the given delay.
+        """
+        limiter = self._limiter()
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise EnrichmentAPIError("pdl", "rate limited", status_code=429, retry_after=0.05)
+            return "ok"
+
+        assert await limiter.run("pdl", call) == "ok"
+        assert attempts == 2
+        assert limiter.get_stats()["pdl"]["retried"] == 1
+
+    async def test_429_gives_up_after_max_retries(self):
+        """
+        run: Persistent 429s should surface once retries are exhausted.
+        """
+        limiter = self._limiter(max_retries=1, max_wait=5.0)
+
+        async def call():
+            raise EnrichmentAPIError("pdl", "rate limited", status_code=429, retry_after=0.01)
+
+        with pytest.raises(EnrichmentAPIError):
+            await limiter.run("pdl", call)
+        stats = limiter.get_stats()["pdl"]
+        assert stats["retried"] == 1
+        assert stats["dropped"] == 1
+
+    async def test_other_errors_not_retried(self):
+        """
+        run: Non-429 errors should propagate immediately.
+        """
+        limiter = self._limiter()
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            raise EnrichmentAPIError("apollo", "bad request", status_code=400)
+
+        with pytest.raises(EnrichmentAPIError):
+            await limiter.run("apollo", call)
+        assert attempts == 1
+
+    async def test_vendor_overrides_applied(self):
+        """
+        bucket: Per-vendor overrides should replace the default rate and burst.
+        """
+        limiter = self._limiter(overrides={"gnews": (0.5, 10)})
+
+        assert limiter.bucket("gnews").rate == 0.5
+        assert limiter.bucket("gnews").burst == 10
+        assert limiter.bucket("apollo").rate == 100
+
+
+class TestRetryAfterParsing:
+    """Tests for Retry-After handling in enrichment API errors."""
+
+    def test_parse_delta_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_parse_invalid_returns_none(self):
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_handle_error_carries_retry_after(self):
+        """
+        _handle_error: A 429 response should expose Retry-After on the error.
+        """
+        response = httpx.Response(429, headers={"Retry-After": "7"}, text="slow down")
+
+        with pytest.raises(EnrichmentAPIError) as exc_info:
+            ApolloAPI(api_key="test")._handle_error(response)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after == 7.0
+
+    def test_parse_vendor_limits(self):
+        assert parse_vendor_limits("apollo=1.5/5, gnews=0.2/10,bad") == {
+            "apollo": (1.5, 5),
+            "gnews": (0.2, 10),
+        }
@@ -0,0 +1,208 @@
+"""
+Tests for single-flight request coalescing.
+Covers in-process coalescing and cross-worker advisory locks.
+"""
+
+import asyncio
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from app.services.single_flight import RESULT_RETENTION_SECONDS, SingleFlight, AdvisoryLockTable
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Tests for in-process coalescing."""
+
+    async def test_concurrent_same_key_executes_once(self):
+        """
+        do: Concurrent callers with the same key should share one call.
+        """
+        group = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"name": "Jane"}
+
+        results = await asyncio.gather(*[
+            group.do(("apollo", "jane@acme.com"), fetch) for _ in range(3)
+        ])
+
+        assert calls == 1
+        assert all(r == {"name": "Jane"} for r in results)
+        stats = group.get_stats()
+        assert stats["calls"] == 3
+        assert stats["executed"] == 1
+        assert stats["coalesced"] == 2
+        assert stats["in_flight"] == 0
+
+    async def test_distinct_keys_execute_separately(self):
+        """
+        do: Different (source, subject) keys should not be coalesced.
+        """
+        group = SingleFlight()
+        calls = []
+
+        async def fetch_for(key):
+            async def fetch():
+                calls.append(key)
+                await asyncio.sleep(0.01)
+                return key
+            return fetch
+
+        keys = [("apollo", "jane@acme.com"), ("hunter", "jane@acme.com"), ("gnews", "acme.com")]
+        results = await asyncio.gather(*[group.do(k, await fetch_for(k)) for k in keys])
+
+        assert results == keys
+        assert len(calls) == 3
+        assert group.get_stats()["coalesced"] == 0
+
+    async def test_sequential_calls_are_not_cached(self):
+        """
+        do: Once a call completes, the next call should fetch again.
+        """
+        group = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await group.do(("pdl", "jane@acme.com"), fetch) == 1
+        assert await group.do(("pdl", "jane@acme.com"), fetch) == 2
+
+    async def test_error_propagates_to_all_callers(self):
+        """
+        do: A failing fetch should raise for every coalesced caller.
+        """
+        group = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("vendor down")
+
+        results = await asyncio.gather(
+            group.do(("zoominfo", "acme.com"), fetch),
+            group.do(("zoominfo", "acme.com"), fetch),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert group.get_stats()["executed"] == 1
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """
+        do: Cancelling one caller should leave the shared fetch running.
+        """
+        group = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.create_task(group.do(("gnews", "acme.com"), fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(group.do(("gnews", "acme.com"), fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "ok"
+
+
+@pytest.mark.asyncio
+class TestAdvisoryLockTable:
+    """Tests for cross-worker coordination through the SQLite lock table."""
+
+    async def test_peer_worker_reuses_leader_result(self, tmp_path):
+        """
+        do: A second worker should reuse the result published by the leader.
+        """
+        db = str(tmp_path / "locks.db")
+        worker_a = SingleFlight(AdvisoryLockTable(db))
+        worker_b = SingleFlight(AdvisoryLockTable(db))
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.2)
+            return {"company": "Acme"}
+
+        results = await asyncio.gather(
+            worker_a.do(("gnews", "acme.com"), fetch),
+            worker_b.do(("gnews", "acme.com"), fetch),
+        )
+
+        assert calls == 1
+        assert results == [{"company": "Acme"}, {"company": "Acme"}]
+        total_cross = (
+            worker_a.get_stats()["coalesced_cross_worker"] +
+            worker_b.get_stats()["coalesced_cross_worker"]
+        )
+        assert total_cross == 1
+
+    async def test_peer_fetches_locally_when_leader_fails(self, tmp_path):
+        """
+        do: If the leader fails, the waiting worker should fetch itself.
+        """
+        db = str(tmp_path / "locks.db")
+        worker_a = SingleFlight(AdvisoryLockTable(db))
+        worker_b = SingleFlight(AdvisoryLockTable(db))
+
+        async def failing_fetch():
+            await asyncio.sleep(0.2)
+            raise RuntimeError("vendor down")
+
+        async def fetch():
+            return "fallback"
+
+        async def late_peer():
+            await asyncio.sleep(0.05)
+            return await worker_b.do(("zoominfo", "acme.com"), fetch)
+
+        results = await asyncio.gather(
+            worker_a.do(("zoominfo", "acme.com"), failing_fetch),
+            late_peer(),
+            return_exceptions=True
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] == "fallback"
+
+
+class TestLockExpiry:
+    """Tests for lock expiry in the advisory-lock table."""
+
+    def test_expired_lock_can_be_taken_over(self, tmp_path):
+        """
+        try_acquire: An expired lock should not block a new leader.
+        """
+        table = AdvisoryLockTable(str(tmp_path / "locks.db"), ttl_seconds=-1)
+
+        assert table.try_acquire("apollo:jane@acme.com", "worker-a") is True
+        assert table.try_acquire("apollo:jane@acme.com", "worker-b") is True
+
+    def test_expired_rows_purged_for_all_keys(self, tmp_path, monkeypatch):
+        """
+        try_acquire: Published results for other keys are deleted once their
+        retention window has passed.
+        """
+        table = AdvisoryLockTable(str(tmp_path / "locks.db"))
+        for email in ("a@acme.com", "b@acme.com", "c@acme.com"):
+            table.try_acquire(f"apollo:{email}", "worker-a")
+            table.publish(f"apollo:{email}", "worker-a", {"email": email})
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + RESULT_RETENTION_SECONDS + 1)
+        table.try_acquire("apollo:d@acme.com", "worker-a")
+
+        with closing(sqlite3.connect(table.path)) as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM single_flight_locks")]
+        assert keys == ["apollo:d@acme.com"]
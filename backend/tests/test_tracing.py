@@ -0,0 +1,96 @@
+"""
+Tests for span-based stage timing (app/services/tracing.py).
+"""
+
+import asyncio
+import pytest
+
+from app.services import tracing
+from app.services.tracing import InMemoryExporter, span, start_trace
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracing.add_exporter(exporter)
+    yield exporter
+    tracing.remove_exporter(exporter)
+
+
+@pytest.mark.asyncio
+class TestSpans:
+    """Tests for span recording and trace summaries."""
+
+    async def test_nested_spans_summarized_by_stage(self, exporter):
+        with start_trace("webhook", webhook_id="wh-1") as trace:
+            with span("vendor.apollo"):
+                await asyncio.sleep(0.01)
+            with span("llm.anthropic", attempt=1):
+                with span("inner"):
+                    pass
+
+        summary = trace.summary()
+        assert set(summary["stages"]) == {"webhook", "vendor.apollo", "llm.anthropic", "inner"}
+        assert summary["stages"]["vendor.apollo"] >= 10
+        spans = {s["name"]: s for s in summary["spans"]}
+        assert spans["inner"]["parent_id"] == spans["llm.anthropic"]["span_id"]
+        assert spans["llm.anthropic"]["parent_id"] == spans["webhook"]["span_id"]
+        assert spans["llm.anthropic"]["attributes"] == {"attempt": 1}
+        assert summary["total_ms"] >= summary["stages"]["vendor.apollo"]
+        assert exporter.names() == ["vendor.apollo", "inner", "llm.anthropic", "webhook"]
+
+    async def test_exception_marks_span_failed(self):
+        with start_trace("job") as trace:
+            with pytest.raises(RuntimeError):
+                with span("pdf.render"):
+                    raise RuntimeError("boom")
+
+        failed = next(s for s in trace.summary()["spans"] if s["name"] == "pdf.render")
+        assert failed["status"] == "error"
+        assert "boom" in failed["error"]
+
+    async def test_tasks_and_threads_record_into_trace(self):
+        def blocking():
+            with span("thread.stage"):
+                pass
+
+        async def fetch(source):
+            with span(f"vendor.{source}"):
+                await asyncio.sleep(0)
+
+        with start_trace("job") as trace:
+            await asyncio.gather(fetch("apollo"), fetch("pdl"))
+            await asyncio.to_thread(blocking)
+
+        assert {"vendor.apollo", "vendor.pdl", "thread.stage"} <= set(trace.stage_totals())
+
+    async def test_span_outside_trace_only_exported(self, exporter):
+        with span("orphan"):
+            pass
+
+        assert tracing.current_trace() is None
+        assert exporter.spans[0].trace_id is None
+
+
+@pytest.mark.asyncio
+class TestPipelineTimings:
+    """Stage timings persisted by the webhook pipeline."""
+
+    async def test_queued_webhook_persists_stage_timings(self, mock_supabase):
+        from app.routes.marketo import process_queued_webhook
+        from app.services.webhook_queue import WebhookQueue
+
+        mock_supabase.enqueue_webhook(
+            "wh-1", "12345", "john@acme.com",
+            {"leadId": "12345", "email": "john@acme.com", "firstName": "John", "company": "Acme"}
+        )
+        queue = WebhookQueue(mock_supabase, process_queued_webhook)
+
+        await queue.process(mock_supabase.claim_webhooks(limit=1)[0])
+
+        webhook = mock_supabase.get_webhook("wh-1")
+        assert webhook["status"] == "completed"
+        stages = webhook["stage_timings"]["stages"]
+        for stage in ("webhook", "vendor.apollo", "profile.resolve", "pdf.template",
+                      "pdf.render", "storage.upload"):
+            assert stage in stages
@@ -0,0 +1,275 @@
+"""
+Tests for the fast-ack Marketo webhook queue.
+Uses the mock Supabase client as the durable queue.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.rad_orchestrator import get_rad_orchestrator
+from app.services.supabase_client import get_supabase_client
+from app.services.webhook_queue import WebhookQueue
+
+
+def _enqueue(supabase, webhook_id="wh-1", lead_id="12345"):
+    return supabase.enqueue_webhook(
+        webhook_id, lead_id, "john@acme.com",
+        {"leadId": lead_id, "email": "john@acme.com", "firstName": "John"}
+    )
+
+
+class TestWebhookQueueStorage:
+    """Tests for the marketo_webhooks queue methods on SupabaseClient."""
+
+    def test_claim_marks_processing_and_counts_attempts(self, mock_supabase):
+        """
+        claim_webhooks: Claimed rows should be processing with attempts incremented.
+        """
+        _enqueue(mock_supabase)
+
+        claimed = mock_supabase.claim_webhooks(limit=5)
+
+        assert len(claimed) == 1
+        assert claimed[0]["status"] == "processing"
+        assert claimed[0]["attempts"] == 1
+        assert mock_supabase.claim_webhooks(limit=5) == []
+
+    def test_claim_oldest_first(self, mock_supabase):
+        """
+        claim_webhooks: The oldest queued webhook should be claimed first.
+        """
+        _enqueue(mock_supabase, "wh-new")
+        older = _enqueue(mock_supabase, "wh-old")
+        older["created_at"] = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+
+        assert mock_supabase.claim_webhooks(limit=1)[0]["id"] == "wh-old"
+
+    def test_stale_processing_rows_reclaimed(self, mock_supabase):
+        """
+        claim_webhooks: A webhook left processing by a dead worker should be reclaimed.
+        """
+        _enqueue(mock_supabase)
+        claimed = mock_supabase.claim_webhooks(limit=1)[0]
+        claimed["claimed_at"] = (datetime.utcnow() - timedelta(minutes=10)).isoformat()
+
+        reclaimed = mock_supabase.claim_webhooks(limit=1, stale_after_seconds=300)
+
+        assert reclaimed[0]["id"] == "wh-1"
+        assert reclaimed[0]["attempts"] == 2
+
+    def test_queue_stats(self, mock_supabase):
+        """
+        get_webhook_queue_stats: Should report depth and the oldest queued webhook.
+        """
+        _enqueue(mock_supabase, "wh-1")
+        _enqueue(mock_supabase, "wh-2")
+        mock_supabase.claim_webhooks(limit=1)
+
+        stats = mock_supabase.get_webhook_queue_stats()
+
+        assert stats["queued"] == 1
+        assert stats["processing"] == 1
+        assert stats["oldest_queued_at"] is not None
+
+
+@pytest.mark.asyncio
+class TestWebhookQueueWorkers:
+    """Tests for WebhookQueue processing."""
+
+    async def test_worker_processes_queued_webhook(self, mock_supabase):
+        """
+        Workers should claim, run the handler and mark the webhook completed.
+        """
+        handler = AsyncMock(return_value="https://storage.example.com/pdfs/test.pdf")
+        queue = WebhookQueue(mock_supabase, handler, workers=2, poll_interval=0.01)
+        _enqueue(mock_supabase)
+
+        queue.start()
+        queue.notify()
+        for _ in range(100):
+            if mock_supabase._mock_webhooks[0]["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+        webhook = mock_supabase._mock_webhooks[0]
+        assert webhook["status"] == "completed"
+        assert webhook["pdf_url"] == "https://storage.example.com/pdfs/test.pdf"
+        assert handler.call_count == 1
+        stats = queue.get_stats()
+        assert stats["completed"] == 1
+        assert stats["queued"] == 0
+
+    async def test_failed_webhook_requeued_then_failed(self, mock_supabase):
+        """
+        process: Failures should be re-queued until max_attempts, then marked failed.
+        """
+        handler = AsyncMock(side_effect=RuntimeError("vendor down"))
+        queue = WebhookQueue(mock_supabase, handler, max_attempts=2)
+        _enqueue(mock_supabase)
+
+        await queue.process(mock_supabase.claim_webhooks()[0])
+        assert mock_supabase._mock_webhooks[0]["status"] == "queued"
+
+        await queue.process(mock_supabase.claim_webhooks()[0])
+        webhook = mock_supabase._mock_webhooks[0]
+        assert webhook["status"] == "failed"
+        assert webhook["error_message"] == "vendor down"
+        assert queue.get_stats()["retried"] == 1
+        assert queue.get_stats()["failed"] == 1
+
+    async def test_failed_marketo_update_requeued(self, mock_supabase):
+        """
+        process: A lead update that fails after the PDF is built re-queues the
+        webhook instead of marking it completed.
+        """
+        from app.routes.marketo import process_queued_webhook
+        marketo = MagicMock()
+        marketo.outbox.update_lead = AsyncMock(side_effect=RuntimeError("Marketo 503"))
+        queue = WebhookQueue(mock_supabase, process_queued_webhook, max_attempts=3)
+        _enqueue(mock_supabase)
+
+        with patch("app.routes.marketo.settings.MARKETO_DEFERRED_PDF", False), \
+             patch("app.routes.marketo.settings.is_marketo_configured", return_value=True), \
+             patch("app.routes.marketo.get_marketo_service", return_value=marketo), \
+             patch("app.routes.marketo._run_webhook_pipeline",
+                   AsyncMock(return_value=({}, "https://storage.example.com/pdfs/wh-1.pdf"))):
+            await queue.process(mock_supabase.claim_webhooks()[0])
+
+        webhook = mock_supabase._mock_webhooks[0]
+        assert webhook["status"] == "queued"
+        assert webhook["error_message"] == "Marketo 503"
+        callback = next(s for s in webhook["stage_timings"]["spans"] if s["name"] == "marketo.callback")
+        assert callback["status"] == "error"
+        assert queue.get_stats()["retried"] == 1
+
+    async def test_queue_wait_recorded(self, mock_supabase):
+        """
+        process: Time spent queued should appear in the stats.
+        """
+        queue = WebhookQueue(mock_supabase, AsyncMock(return_value="url"))
+        webhook = _enqueue(mock_supabase)
+        webhook["created_at"] = (datetime.utcnow() - timedelta(seconds=30)).isoformat()
+
+        await queue.process(mock_supabase.claim_webhooks()[0])
+
+        assert queue.get_stats()["max_queue_wait_s"] >= 30
+
+    async def test_worker_survives_status_update_failure(self, mock_supabase):
+        """
+        _worker: A database error while recording the outcome should not kill the worker.
+        """
+        handler = AsyncMock(return_value="url")
+        queue = WebhookQueue(mock_supabase, handler, workers=1, poll_interval=0.01)
+        _enqueue(mock_supabase, "wh-1")
+        _enqueue(mock_supabase, "wh-2")
+
+        with patch.object(
+            mock_supabase, "update_webhook",
+            side_effect=[RuntimeError("db down"), {"id": "wh-2"}]
+        ) as update:
+            queue.start()
+            for _ in range(100):
+                if update.call_count == 2:
+                    break
+                await asyncio.sleep(0.01)
+            await queue.stop()
+
+        assert handler.call_count == 2
+        assert update.call_count == 2
+
+
+class TestFastAckWebhook:
+    """Tests for the fast-ack webhook mode."""
+
+    def test_webhook_queues_and_returns_immediately(self, mock_supabase):
+        """
+        POST /rad/marketo/webhook: In async mode the payload is queued, not processed.
+        """
+        orchestrator = MagicMock()
+        app.dependency_overrides[get_supabase_client] = lambda: mock_supabase
+        app.dependency_overrides[get_rad_orchestrator] = lambda: orchestrator
+        try:
+            with patch("app.routes.marketo.settings.MARKETO_WEBHOOK_ASYNC", True), \
+                 patch("app.routes.marketo.settings.MARKETO_WEBHOOK_SECRET", "test-webhook-secret"):
+                response = TestClient(app).post(
+                    "/rad/marketo/webhook",
+                    json={"leadId": "12345", "email": "john@acme.com"},
+                    headers={"X-Marketo-Secret": "test-webhook-secret"}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
+        assert response.json()["pdfUrl"] is None
+        orchestrator.enrich.assert_not_called()
+        assert mock_supabase._mock_webhooks[0]["status"] == "queued"
+        assert mock_supabase._mock_webhooks[0]["payload"]["leadId"] == "12345"
+
+    def test_enqueue_failure_falls_back_to_inline(self, mock_supabase):
+        """
+        POST /rad/marketo/webhook: If the queue can't be written the webhook is processed inline.
+        """
+        app.dependency_overrides[get_supabase_client] = lambda: mock_supabase
+        try:
+            with patch("app.routes.marketo.settings.MARKETO_WEBHOOK_ASYNC", True), \
+                 patch("app.routes.marketo.settings.MARKETO_WEBHOOK_SECRET", "test-webhook-secret"), \
+                 patch.object(mock_supabase, "enqueue_webhook", side_effect=RuntimeError("db down")), \
+                 patch("app.routes.marketo._run_webhook_pipeline",
+                       AsyncMock(return_value=({}, "https://storage.example.com/pdfs/inline.pdf"))):
+                response = TestClient(app).post(
+                    "/rad/marketo/webhook",
+                    json={"leadId": "12345", "email": "john@acme.com"},
+                    headers={"X-Marketo-Secret": "test-webhook-secret"}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.json()["pdfUrl"] == "https://storage.example.com/pdfs/inline.pdf"
+
+
+class TestWebhookServices:
+    """The webhook pipeline writes through the client it is given."""
+
+    def test_inline_webhook_uses_injected_services(self, test_client, mock_supabase):
+        """
+        POST /rad/marketo/webhook: Enrichment, personalization and the PDF go
+        through the dependency-injected services.
+        """
+        with patch("app.routes.marketo.settings.MARKETO_WEBHOOK_ASYNC", False), \
+             patch("app.routes.marketo.settings.MARKETO_DEFERRED_PDF", False), \
+             patch("app.routes.marketo.settings.MARKETO_WEBHOOK_SECRET", "test-webhook-secret"):
+            response = test_client.post(
+                "/rad/marketo/webhook",
+                json={"leadId": "12345", "email": "inline@acme.com", "firstName": "Ann"},
+                headers={"X-Marketo-Secret": "test-webhook-secret"}
+            )
+
+        assert response.json()["status"] == "completed"
+        assert mock_supabase.get_finalize_data("inline@acme.com")["normalized_data"]["first_name"] == "Ann"
+        assert mock_supabase._mock_storage
+        assert get_supabase_client().get_finalize_data("inline@acme.com") is None
+
+    async def test_queue_worker_uses_its_client(self, mock_supabase):
+        """
+        process_queued_webhook: A worker started with its own client writes
+        there, not through the services built on the global client.
+        """
+        from app.routes.marketo import process_queued_webhook
+        webhook = {"id": "wh-9", "payload": {"leadId": "12345", "email": "worker@acme.com"}}
+
+        with patch("app.routes.marketo.settings.MARKETO_DEFERRED_PDF", False):
+            pdf_url = await process_queued_webhook(webhook, mock_supabase)
+
+        assert pdf_url
+        assert mock_supabase.get_finalize_data("worker@acme.com") is not None
+        assert mock_supabase._mock_raw_data
+        assert get_supabase_client().get_finalize_data("worker@acme.com") is None
@@ -0,0 +1,53 @@
+-- Migration: Use marketo_webhooks as a durable work queue
+-- Purpose: Fast-ack webhook mode persists the payload with status 'queued' and
+-- returns immediately; backend workers claim rows and run the pipeline.
+
+-- ============================================================================
+-- QUEUE COLUMNS
+-- ============================================================================
+
+ALTER TABLE marketo_webhooks DROP CONSTRAINT IF EXISTS marketo_webhooks_status_check;
+ALTER TABLE marketo_webhooks ADD CONSTRAINT marketo_webhooks_status_check
+    CHECK (status IN ('received', 'queued', 'processing', 'completed', 'failed'));
+
+ALTER TABLE marketo_webhooks ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE marketo_webhooks ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ;
+
+-- Claim order: oldest queued first
+CREATE INDEX IF NOT EXISTS idx_marketo_webhooks_queue
+    ON marketo_webhooks(created_at)
+    WHERE status IN ('queued', 'processing');
+
+COMMENT ON COLUMN marketo_webhooks.attempts IS 'Number of times a worker has claimed this webhook';
+COMMENT ON COLUMN marketo_webhooks.claimed_at IS 'When a worker last claimed this webhook (stale claims are retried)';
+
+-- ============================================================================
+-- CLAIM FUNCTION
+-- Atomically claims queued webhooks (and processing ones whose worker died).
+-- SKIP LOCKED lets several workers/instances poll without double-claiming.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION claim_marketo_webhooks(
+    batch_size INTEGER DEFAULT 1,
+    stale_after_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF marketo_webhooks
+LANGUAGE sql
+AS $$
+    UPDATE marketo_webhooks
+    SET status = 'processing',
+        attempts = attempts + 1,
+        claimed_at = NOW()
+    WHERE id IN (
+        SELECT id FROM marketo_webhooks
+        WHERE status = 'queued'
+           OR (status = 'processing'
+               AND claimed_at < NOW() - make_interval(secs => stale_after_seconds))
+        ORDER BY created_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
+
+COMMENT ON FUNCTION claim_marketo_webhooks IS 'Claims the oldest queued Marketo webhooks for processing';
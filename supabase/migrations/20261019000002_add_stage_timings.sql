@@ -0,0 +1,10 @@
+-- Migration: Per-stage pipeline timings
+-- Purpose: Persist the span summary (vendor fetches, profile resolution, LLM
+-- provider attempts, compliance, template/PDF render, Storage upload, Marketo
+-- callback) recorded by app/services/tracing.py for each webhook and job.
+
+ALTER TABLE marketo_webhooks ADD COLUMN IF NOT EXISTS stage_timings JSONB;
+ALTER TABLE personalization_jobs ADD COLUMN IF NOT EXISTS stage_timings JSONB;
+
+COMMENT ON COLUMN marketo_webhooks.stage_timings IS 'Trace summary: total_ms, per-stage totals (stages) and the span list';
+COMMENT ON COLUMN personalization_jobs.stage_timings IS 'Trace summary: total_ms, per-stage totals (stages) and the span list';
@@ -0,0 +1,18 @@
+-- Migration: Per-lead LLM token and cost accounting
+-- Purpose: Attribute provider-reported input/output tokens and estimated spend
+-- to each lead, with a per-stage breakdown (ebook_personalization,
+-- personalization). Neither /rad/enrich nor the Marketo webhook creates a
+-- personalization_jobs row, so outputs are keyed by email and job_id becomes
+-- optional.
+
+ALTER TABLE personalization_outputs ALTER COLUMN job_id DROP NOT NULL;
+ALTER TABLE personalization_outputs ADD COLUMN IF NOT EXISTS email VARCHAR(255);
+ALTER TABLE personalization_outputs ADD COLUMN IF NOT EXISTS input_tokens INTEGER;
+ALTER TABLE personalization_outputs ADD COLUMN IF NOT EXISTS output_tokens INTEGER;
+ALTER TABLE personalization_outputs ADD COLUMN IF NOT EXISTS cost_usd NUMERIC(12, 6);
+ALTER TABLE personalization_outputs ADD COLUMN IF NOT EXISTS usage_by_stage JSONB;
+
+CREATE INDEX IF NOT EXISTS idx_personalization_outputs_email ON personalization_outputs(email);
+
+COMMENT ON COLUMN personalization_outputs.cost_usd IS 'Estimated USD spend across all LLM stages (MODEL_PRICING in llm_service.py)';
+COMMENT ON COLUMN personalization_outputs.usage_by_stage IS 'Per-stage usage: provider, model, input/output tokens, cost, prompt size and trim steps';